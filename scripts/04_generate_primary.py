@@ -25,9 +25,18 @@ if str(_project_root) not in sys.path:
 
 import argparse
 import logging
+from typing import Any, Dict, List, Optional
 
 from src.config.loader import ConfigLoader
+from src.generate.orchestration.journal import RunJournal
 from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.orchestration.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_QUEUE_PATH,
+    Task,
+    WorkQueue,
+    run_worker,
+)
 from src.utils.logging_setup import setup_logging, log_section_clean, log_info_box, log_status_item
 
 
@@ -66,9 +75,104 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Override number of sessions per module (optional).",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every artifact with fresh LLM calls: ignore the build manifest and the response cache "
+             "(fresh responses replace cached ones).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its journal: skip finished artifacts, remove partial files.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Process N sessions concurrently, logging each session as one block in order (default: 1).",
+    )
+    parser.add_argument(
+        "--worker",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_QUEUE_PATH,
+        default=None,
+        metavar="QUEUE_DB",
+        help=f"Lease sessions from a shared work queue until none are left; start on several machines "
+             f"to share the work (default queue: {DEFAULT_QUEUE_PATH}).",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        metavar="S",
+        help=f"With --worker: seconds before a session leased by a dead worker is requeued (default: {DEFAULT_LEASE_SECONDS:.0f}).",
+    )
     return parser.parse_args()
 
 
+def run_queue_worker(
+    args: argparse.Namespace,
+    generator: ContentGenerator,
+    outline_path: Path,
+    module_ids: Optional[List[int]],
+    journal: RunJournal,
+    logger: logging.Logger
+) -> List[Dict[str, Any]]:
+    """Generate sessions leased from the shared work queue (--worker mode).
+    
+    Every worker enqueues all selected sessions (existing tasks are kept),
+    then leases and generates one session at a time until the queue is
+    drained. Partial files are cleaned up per leased session (other workers
+    may be writing theirs) and the stage summary is logged once after the
+    last.
+    
+    Args:
+        args: Parsed command-line arguments
+        generator: ContentGenerator for the outline
+        outline_path: Outline JSON the sessions come from
+        module_ids: Selected module IDs, or None for all
+        journal: Run journal of this worker
+        logger: Logger instance
+        
+    Returns:
+        Session results of the sessions this worker generated (last attempt each)
+    """
+    plan = generator.plan_sessions(module_ids)
+    jobs_by_key = {}
+    for job in plan["sessions"]:
+        module, session = job["module"], job["session"]
+        jobs_by_key[f"module_{module['module_id']:02d}/session_{session['session_number']:02d}"] = job
+    queue = WorkQueue(args.worker, lease_seconds=args.lease_seconds)
+    name = f"04_generate_primary:{Path(outline_path).name}"
+    added = queue.enqueue(name, [(key, {}) for key in jobs_by_key])
+    logger.info(f"📬 Work queue {queue.path} [{name}]: {added} session(s) added, {queue.counts(name)}")
+    
+    results_by_task: Dict[str, Dict[str, Any]] = {}
+    
+    def generate_session(task: Task) -> bool:
+        job = jobs_by_key[task.key]
+        journal.cleanup(within=job["session_dir"])
+        result = generator.generate_session(plan, job, incremental=not args.force, journal=journal)
+        results_by_task[task.key] = result
+        return result.get("status") == "success"
+    
+    stats = run_worker(queue, name, generate_session)
+    logger.info(
+        f"📬 Worker finished: {stats['done']} session(s) done, {stats['failed']} failed attempt(s), "
+        f"{stats['lost']} lost lease(s); queue: {queue.counts(name)}"
+    )
+    for key, error in queue.failures(name):
+        logger.warning(f"  ❌ {key} failed for good: {error}")
+    results = list(results_by_task.values())
+    generator.summarize_sessions(plan, results, incremental=not args.force)
+    return results
+
+
 def main() -> int:
     args = parse_args()
     
@@ -105,6 +209,8 @@ def main() -> int:
         
         config_info = {
             "Diagrams per Session": str(diagrams_per_session),
+            "Regenerate": "ALL (--force)" if args.force else "STALE ONLY (build manifest)",
+            "Work Queue": str(args.worker) if args.worker else "NONE (single process)",
             "Log File": str(log_file) if log_file else "None"
         }
         log_info_box(logger, "CONFIGURATION", config_info, emoji="⚙️")
@@ -144,10 +250,26 @@ def main() -> int:
             module_ids = args.modules
             logger.info(f"Processing specific modules: {module_ids}")
 
+        # Journal progress so an interrupted run continues with --resume
+        try:
+            journal = RunJournal.start_or_resume(args.resume, stage="04_generate_primary", modules=module_ids)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"🧾 Run journal: {journal.path} (continue with --resume {journal.run_id})")
+
         generator = ContentGenerator(config_loader, outline_path=outline_path)
+        # --force means new LLM output, not byte-identical cached answers
+        generator.llm_client.response_cache.refresh = args.force
 
-        # Use new session-based generation
-        results = generator.stage2_generate_content_by_session(module_ids)
+        if args.worker:
+            # Share the sessions with workers on other machines
+            results = run_queue_worker(args, generator, outline_path, module_ids, journal, logger)
+        else:
+            # Use new session-based generation
+            results = generator.stage2_generate_content_by_session(
+                module_ids, workers=args.workers, incremental=not args.force, journal=journal
+            )
 
         successful = sum(1 for r in results if r.get("status") == "success")
         failed = len(results) - successful
@@ -242,6 +364,7 @@ def main() -> int:
             logger.info("All sessions processed successfully with no critical issues")
             logger.info("=" * 80)
 
+        journal.finish("success" if exit_code == 0 else "failed", stage="04_generate_primary", successful=successful, failed=failed)
         return exit_code
     except Exception as exc:  # noqa: BLE001
         logger.error(f"\nERROR: {exc}", exc_info=True)
@@ -27,12 +27,25 @@ if str(_project_root) not in sys.path:
 import argparse
 import logging
 import re
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 from src.config.loader import ConfigLoader, ConfigurationError
+from src.generate.orchestration.journal import RunJournal
+from src.generate.orchestration.manifest import BuildManifest, content_hash, inputs_hash
+from src.generate.orchestration.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_QUEUE_PATH,
+    Task,
+    WorkQueue,
+    run_worker,
+)
+from src.llm.batch import BatchResult, GenerationRequest, run_batch
+from src.llm.cache import NON_OUTPUT_PARAMS
 from src.llm.client import OllamaClient, LLMError
-from src.utils.helpers import slugify
-from src.utils.logging_setup import setup_logging, log_section_clean, log_info_box
+from src.llm.context_budget import outline_digest
+from src.llm.prefix import DEFAULT_SHARED_SYSTEM_PROMPT, build_session_prefix
+from src.utils.helpers import atomic_write_text, slugify
+from src.utils.logging_setup import OrderedLogSections, setup_logging, log_section_clean, log_info_box
 from src.utils.error_collector import ErrorCollector
 from src.utils.summary_generator import generate_stage_summary
 
@@ -62,6 +75,18 @@ Examples:
   
   # Generate specific types only
   %(prog)s --all --types application visualization
+  
+  # Process 4 sessions at a time
+  %(prog)s --all --workers 4
+  
+  # Regenerate everything, not just materials whose inputs changed
+  %(prog)s --all --force
+  
+  # Continue an interrupted run
+  %(prog)s --all --resume 20250101_120000_1a2b3c
+  
+  # Share the sessions with workers on other machines (same command on each)
+  %(prog)s --all --worker
         """
     )
     group = parser.add_mutually_exclusive_group(required=False)
@@ -102,6 +127,43 @@ Examples:
         action="store_true",
         help="Validate generated content for quality issues.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Process N sessions concurrently, logging each session as one block in order (default: 1).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every material with fresh LLM calls: ignore the build manifest and the response cache "
+             "(fresh responses replace cached ones).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its journal: skip finished materials, remove partial files.",
+    )
+    parser.add_argument(
+        "--worker",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_QUEUE_PATH,
+        default=None,
+        metavar="QUEUE_DB",
+        help=f"Lease sessions from a shared work queue one at a time until none are left (instead of --workers); "
+             f"start on several machines to share the work (default queue: {DEFAULT_QUEUE_PATH}).",
+    )
+    parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        metavar="S",
+        help=f"With --worker: seconds before a session leased by a dead worker is requeued (default: {DEFAULT_LEASE_SECONDS:.0f}).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -186,19 +248,26 @@ def build_prompt(
     )
 
 
-def load_session_content(session_dir: Path) -> str:
-    """Load all existing content from a session folder.
+def material_filename(material_type: str) -> str:
+    """Get the filename of a secondary material (visualization is Mermaid)."""
+    ext = ".mmd" if material_type == "visualization" else ".md"
+    return f"{material_type}{ext}"
+
+
+def load_session_sections(session_dir: Path) -> List[Tuple[str, str]]:
+    """Load the existing materials of a session folder as titled sections.
     
     Args:
         session_dir: Path to session directory
         
     Returns:
-        Combined text of all session materials
+        List of (name, formatted text) pairs: primary materials in order, then
+        one per diagram
     """
     if not session_dir.exists():
-        return ""
+        return []
     
-    combined = []
+    sections: List[Tuple[str, str]] = []
     
     # Read primary materials in order
     primary_files = ["lecture.md", "lab.md", "study_notes.md", "questions.md"]
@@ -207,9 +276,8 @@ def load_session_content(session_dir: Path) -> str:
         if material_path.exists():
             try:
                 content = material_path.read_text(encoding="utf-8")
-                combined.append(f"## {material_file.replace('.md', '').replace('_', ' ').title()}\n\n")
-                combined.append(content)
-                combined.append("\n\n")
+                title = material_file.replace('.md', '').replace('_', ' ').title()
+                sections.append((material_file, f"## {title}\n\n\n{content}\n\n\n"))
             except Exception:
                 pass
     
@@ -218,14 +286,95 @@ def load_session_content(session_dir: Path) -> str:
     for diagram_path in diagram_files:
         try:
             content = diagram_path.read_text(encoding="utf-8")
-            combined.append(f"## {diagram_path.name}\n\n")
-            combined.append("```mermaid\n")
-            combined.append(content)
-            combined.append("\n```\n\n")
+            sections.append((diagram_path.name, f"## {diagram_path.name}\n\n\n```mermaid\n\n{content}\n\n```\n\n"))
         except Exception:
             pass
     
-    return "\n".join(combined)
+    return sections
+
+
+def load_session_content(session_dir: Path) -> str:
+    """Load all existing content from a session folder.
+    
+    Args:
+        session_dir: Path to session directory
+        
+    Returns:
+        Combined text of all session materials
+    """
+    return "\n".join(text for _, text in load_session_sections(session_dir))
+
+
+def analyze_secondary(material_type: str, content: str, config_loader: ConfigLoader) -> Dict[str, Any]:
+    """Analyze a secondary material against its content requirements.
+    
+    Args:
+        material_type: Secondary material type (e.g., "application")
+        content: Cleaned-up generated content
+        config_loader: ConfigLoader instance
+        
+    Returns:
+        Analysis metrics including a 'warnings' list
+    """
+    from src.utils.content_analysis import (
+        analyze_application,
+        analyze_extension,
+        analyze_visualization,
+        analyze_integration,
+        analyze_investigation,
+        analyze_open_questions,
+    )
+    
+    # Get content requirements for this material type
+    requirements = config_loader.get_content_requirements().get(material_type, {})
+    
+    # Analyze content based on type
+    if material_type == "application":
+        return analyze_application(content, requirements)
+    if material_type == "extension":
+        return analyze_extension(content, requirements)
+    if material_type == "visualization":
+        return analyze_visualization(content, requirements)
+    if material_type == "integration":
+        return analyze_integration(content, requirements)
+    if material_type == "investigation":
+        return analyze_investigation(content, requirements)
+    if material_type == "open_questions":
+        return analyze_open_questions(content, requirements)
+    # Fallback for unknown types
+    return {
+        'word_count': len(content.split()),
+        'char_count': len(content),
+        'warnings': []
+    }
+
+
+# Warning text marking a critical issue (missing required elements, no
+# content, structural failures); other warnings (word count, minor format
+# problems, recommendations) are not critical
+CRITICAL_KEYWORDS = [
+    'no questions detected',
+    'no applications found',
+    'no topics found',
+    'missing required',
+    'only 0',
+    'only 1',
+    'only 2',  # For applications requiring 3-5
+    'no diagram',
+    'invalid syntax',
+    'cannot parse',
+    'failed to generate'
+]
+
+
+def is_critical_warning(warning: str) -> bool:
+    """Whether a validation warning is a critical issue (see CRITICAL_KEYWORDS)."""
+    warning_lower = warning.lower()
+    if any(keyword in warning_lower for keyword in CRITICAL_KEYWORDS):
+        return True
+    # Patterns like "Only 0 found" are below any minimum
+    only_match = re.search(r'only (\d+)', warning_lower)
+    return bool(only_match) and int(only_match.group(1)) == 0
 
 
 def generate_secondary_for_session(
@@ -238,9 +387,16 @@ def generate_secondary_for_session(
     outline_text: str,
     logger: logging.Logger,
     error_collector: ErrorCollector = None,
+    outline_modules: Optional[List[Dict[str, Any]]] = None,
+    incremental: bool = False,
+    journal: Optional[RunJournal] = None,
 ) -> Dict[str, Path]:
     """Generate secondary materials for a specific session.
     
+    Every written material is recorded in the session's build manifest with a
+    hash of its inputs: the session's outline entry, prompt template, model
+    and parameters, and the content of the primary materials it reads.
+    
     Args:
         module: Module dictionary from outline
         session: Session dictionary from outline
@@ -248,11 +404,19 @@ def generate_secondary_for_session(
         types: List of secondary material types to generate
         config_loader: ConfigLoader instance
         llm_client: OllamaClient instance
-        outline_text: Outline text for context
+        outline_text: Outline text for context (used when outline_modules is not given)
         logger: Logger instance
+        error_collector: Optional ErrorCollector for validation issues
+        outline_modules: All outline modules; the prompt gets a digest of them
+                        (this module in full, others as titles)
+        incremental: Keep materials whose inputs are unchanged since they
+                    were built instead of regenerating them
+        journal: Optional run journal; materials it shows finished are kept
+                and every start, completion and failure is recorded
         
     Returns:
-        Dictionary mapping material_type -> output_path
+        Dictionary mapping material_type -> output_path (including materials
+        that were up to date)
     """
     # Import cleanup functions
     from src.generate.processors.cleanup import full_cleanup_pipeline
@@ -264,26 +428,92 @@ def generate_secondary_for_session(
     session_title = session.get("session_title", f"Session {session_number}")
     
     # Load all content from this session folder
-    session_content = load_session_content(session_dir)
+    session_sections = load_session_sections(session_dir)
     
-    if not session_content:
+    if not session_sections:
         logger.warning(f"No content found in session directory: {session_dir}")
         return results
     
     prompts_cfg = config_loader.load_llm_config().get("prompts", {})
-
+    manifest = BuildManifest.load(session_dir)
+    
+    # In prefix mode the outline and session content (the bulk of every prompt)
+    # go once into a shared prefix that all material types of this session reuse
+    subject = config_loader.get_course_subject()
+    prefix = None
+    outline = outline_digest(outline_modules, module.get("module_id")) if outline_modules else outline_text
+    context_pieces = [("outline", outline)] + session_sections
+    language = config_loader.get_language()
+    
+    def material_inputs(material_type: str, prompt_cfg: Dict[str, str]) -> str:
+        # Hash of everything a material is built from; the primary materials
+        # count by content, so a regenerated lecture makes the material stale
+        return inputs_hash({
+            "operation": material_type,
+            "outline": {"module_id": module_id, "module_name": module_name, "session": session, "digest": outline},
+            "course": {"subject": subject, "language": language},
+            "prompt": prompt_cfg,
+            "shared_prefix": prompts_cfg.get("shared_prefix") if llm_client.prefix_enabled else None,
+            "context_tokens": llm_client.context_budget.budget_for(material_type) if llm_client.context_budget.enabled else None,
+            "model": llm_client.model_for(material_type),
+            "params": {k: v for k, v in llm_client.default_params.items() if k not in NON_OUTPUT_PARAMS},
+            "upstream": {name: content_hash(text) for name, text in session_sections},
+        })
+    
+    # Materials whose inputs are unchanged keep their files
+    digests: Dict[str, str] = {}
+    stale_types: List[str] = []
     for material_type in types:
-        prompt_key = f"secondary_{material_type}"
-        prompt_cfg = prompts_cfg.get(prompt_key)
+        prompt_cfg = prompts_cfg.get(f"secondary_{material_type}")
         if not prompt_cfg:
-            logger.warning(f"No prompt template configured for {prompt_key}; skipping.")
+            logger.warning(f"No prompt template configured for secondary_{material_type}; skipping.")
             continue
+        digests[material_type] = material_inputs(material_type, prompt_cfg)
+        out_path = session_dir / material_filename(material_type)
+        if journal is not None and journal.is_done(out_path):
+            logger.info(f"  ⏭️  {material_type} already finished in run {journal.run_id} for session {session_number}")
+            results[material_type] = out_path
+        elif incremental and manifest.is_fresh(out_path.name, digests[material_type]):
+            logger.info(f"  ⏭️  {material_type} up to date for session {session_number}")
+            results[material_type] = out_path
+        else:
+            stale_types.append(material_type)
+    if not stale_types:
+        return results
+    types = stale_types
+    
+    def fit_context(operation: Optional[str] = None, max_tokens: Optional[int] = None) -> Tuple[str, str]:
+        # Fit the outline and each session material into the context budget
+        fitted = llm_client.context_budget.fit(context_pieces, operation, max_tokens)
+        return fitted[0][1], "\n".join(text for _, text in fitted[1:])
+    
+    if llm_client.prefix_enabled:
+        # One prefix serves every material type, so it gets the largest of their budgets
+        outline_var, session_content_var = fit_context(
+            "session prefix",
+            max_tokens=max(llm_client.context_budget.budget_for(t) for t in types) if types else None
+        )
+        shared_system = prompts_cfg.get("shared_prefix", {}).get("system")
+        prefix = build_session_prefix(
+            {"subject": subject},
+            module,
+            session,
+            extra_sections=[("COURSE OUTLINE", outline_var), ("SESSION CONTENT", session_content_var)],
+            system_prompt=shared_system.format(subject=subject) if shared_system else DEFAULT_SHARED_SYSTEM_PROMPT,
+        )
+        outline_var = "(see COURSE OUTLINE above)"
+        session_content_var = "(see SESSION CONTENT above)"
+
+    # Build every material type's request first, then generate them as one
+    # batch so they share the client's pool and concurrency limits
+    batch: List[GenerationRequest] = []
+    for material_type in types:
+        prompt_cfg = prompts_cfg[f"secondary_{material_type}"]
 
         # Build prompt with session-specific context
+        if prefix is None:
+            outline_var, session_content_var = fit_context(material_type)
         template = prompt_cfg.get("template", "")
-        # Get subject and language from config
-        subject = config_loader.get_course_subject()
-        language = config_loader.get_language()
         # Use session_content for session-level generation
         user_prompt = template.format(
             module_name=module_name,
@@ -291,8 +521,8 @@ def generate_secondary_for_session(
             session_number=session_number,
             session_title=session_title,
             subject=subject,
-            outline=outline_text[:50000],  # Allow up to 50K chars for outline (128K context window)
-            session_content=session_content[:50000],  # Allow up to 50K chars for session content (128K context window)
+            outline=outline_var,
+            session_content=session_content_var,
             material_type=material_type,
             language=language,
         )
@@ -300,17 +530,48 @@ def generate_secondary_for_session(
 
         logger.info(f"Generating {material_type} for session {session_number}: {session_title}...")
         
-        # Get operation-specific timeout for this material type
-        operation_timeout = config_loader.get_operation_timeout(material_type)
-        
-        try:
-            content = llm_client.generate(
-                prompt=user_prompt,
-                system_prompt=system_prompt,
-                operation=material_type,
-                timeout_override=operation_timeout
-            )
-        except LLMError as e:
+        # Each material type has its own operation timeout
+        batch.append(GenerationRequest(
+            prompt=user_prompt,
+            system_prompt=system_prompt,
+            operation=material_type,
+            timeout=config_loader.get_operation_timeout(material_type),
+            prefix=prefix
+        ))
+    
+    def log_progress(done: int, total: int, result: BatchResult) -> None:
+        status = "✓" if result.ok else "✗"
+        logger.info(f"  {status} {result.label} finished in {result.seconds:.1f}s ({done}/{total})")
+    
+    if journal is not None:
+        for request in batch:
+            journal.start(session_dir / material_filename(request.operation))
+    
+    first_error = None
+    for request, result in zip(batch, llm_client.generate_many(batch, progress=log_progress)):
+        material_type = request.operation
+        operation_timeout = request.timeout
+        if not result.ok:
+            e = result.error
+            if journal is not None:
+                journal.failed(session_dir / material_filename(material_type), e)
+            if not isinstance(e, LLMError):
+                # Not an LLM failure (e.g., a bug or I/O error): record it and
+                # keep saving the other types; re-raised after the loop
+                error_context = f"Module {module_id} Session {session_number} - {material_type} generation failed"
+                logger.error(f"  ✗ {error_context}")
+                logger.error(f"     Error: {type(e).__name__}: {e}", exc_info=e)
+                if error_collector:
+                    error_collector.add_error(
+                        type=type(e).__name__,
+                        message=str(e),
+                        context=error_context,
+                        content_type=material_type,
+                        module_id=module_id,
+                        session_num=session_number
+                    )
+                first_error = first_error or e
+                continue
             # Extract request ID from error message if present
             error_msg = str(e)
             request_id = None
@@ -350,88 +611,48 @@ def generate_secondary_for_session(
                     session_num=session_number
                 )
             
-            # Re-raise to be caught by outer exception handler
-            raise
-        
-        # Apply cleanup to generated content
-        content, _ = full_cleanup_pipeline(content, material_type)
-
-        # Validate and log content metrics
-        from src.utils.content_analysis import (
-            analyze_application,
-            analyze_extension,
-            analyze_visualization,
-            analyze_integration,
-            analyze_investigation,
-            analyze_open_questions,
-            log_content_metrics
-        )
-        
-        # Get content requirements for this material type
-        content_requirements = config_loader.get_content_requirements()
-        requirements = content_requirements.get(material_type, {})
+            # Keep the other material types; re-raised below for the outer exception handler
+            first_error = first_error or e
+            continue
         
-        # Analyze content based on type
-        if material_type == "application":
-            metrics = analyze_application(content, requirements)
-        elif material_type == "extension":
-            metrics = analyze_extension(content, requirements)
-        elif material_type == "visualization":
-            metrics = analyze_visualization(content, requirements)
-        elif material_type == "integration":
-            metrics = analyze_integration(content, requirements)
-        elif material_type == "investigation":
-            metrics = analyze_investigation(content, requirements)
-        elif material_type == "open_questions":
-            metrics = analyze_open_questions(content, requirements)
-        else:
-            # Fallback for unknown types
-            metrics = {
-                'word_count': len(content.split()),
-                'char_count': len(content),
-                'warnings': []
-            }
+        # Apply cleanup to generated content, then validate it
+        content, _ = full_cleanup_pipeline(result.value, material_type)
+        metrics = analyze_secondary(material_type, content, config_loader)
+
+        # Output that fails validation (critical issues only) on a small model
+        # tier (llm.model_tiers) is generated once more on the next larger tier
+        critical_issues = [w for w in metrics.get('warnings', []) if is_critical_warning(w)]
+        model = request.model or llm_client.model_for(material_type)
+        escalated_model = llm_client.escalate_model(material_type, model, critical_issues)
+        if escalated_model != model:
+            try:
+                retry_text = llm_client.generate(
+                    request.prompt,
+                    request.system_prompt,
+                    operation=material_type,
+                    timeout_override=operation_timeout,
+                    prefix=request.prefix,
+                    model=escalated_model
+                )
+            except LLMError as e:
+                logger.warning(f"  Retry of {material_type} on {escalated_model} failed, keeping first result: {e}")
+            else:
+                retry_content, _ = full_cleanup_pipeline(retry_text, material_type)
+                retry_metrics = analyze_secondary(material_type, retry_content, config_loader)
+                retry_critical = [w for w in retry_metrics.get('warnings', []) if is_critical_warning(w)]
+                if len(retry_critical) <= len(critical_issues):
+                    content, metrics = retry_content, retry_metrics
         
         # Log metrics with validation status
+        from src.utils.content_analysis import log_content_metrics
         log_content_metrics(material_type, metrics, logger)
         
         # Add warnings to error collector if provided
         if error_collector and metrics.get('warnings'):
             context_str = f"Module {module_id} Session {session_number}"
             for warning in metrics['warnings']:
-                # Determine severity based on warning content
-                # Critical issues: missing required elements, no content, structural failures
-                # Warnings: word count issues, minor format problems, recommendations
-                warning_lower = warning.lower()
-                
-                # Critical keywords that indicate serious problems
-                critical_keywords = [
-                    'no questions detected',
-                    'no applications found',
-                    'no topics found',
-                    'missing required',
-                    'only 0',
-                    'only 1',
-                    'only 2',  # For applications requiring 3-5
-                    'no diagram',
-                    'invalid syntax',
-                    'cannot parse',
-                    'failed to generate'
-                ]
-                
-                # Check if this is a critical issue
-                is_critical = any(keyword in warning_lower for keyword in critical_keywords)
-                
-                # Also check for patterns like "Only N found" where N is below minimum
-                only_match = re.search(r'only (\d+)', warning_lower)
-                if only_match:
-                    count = int(only_match.group(1))
-                    # If count is 0 or very low, likely critical
-                    if count == 0:
-                        is_critical = True
-                
                 # Use appropriate method based on severity
-                if is_critical:
+                if is_critical_warning(warning):
                     error_collector.add_error(
                         type='validation',
                         message=warning,
@@ -451,14 +672,174 @@ def generate_secondary_for_session(
                     )
 
         # Save directly in session folder (flat structure)
-        ext = ".mmd" if material_type == "visualization" else ".md"
-        out_path = session_dir / f"{material_type}{ext}"
-        out_path.write_text(content, encoding="utf-8")
+        out_path = session_dir / material_filename(material_type)
+        atomic_write_text(out_path, content)
+        manifest.record(out_path.name, digests[material_type], content)
+        if journal is not None:
+            journal.done(out_path, content)
         results[material_type] = out_path
         logger.info(f"  → Saved to: {out_path}")
+    if first_error is not None:
+        raise first_error
     return results
 
 
+def process_session(
+    module: Dict[str, Any],
+    session: Dict[str, Any],
+    session_dir: Path,
+    total_sessions: int,
+    types: List[str],
+    config_loader: ConfigLoader,
+    llm_client: OllamaClient,
+    outline_text: str,
+    logger: logging.Logger,
+    error_collector: ErrorCollector,
+    outline_modules: Optional[List[Dict[str, Any]]] = None,
+    incremental: bool = False,
+    journal: Optional[RunJournal] = None,
+) -> bool:
+    """Generate one session's secondary materials and log the outcome.
+    
+    Errors are logged, not raised, so sessions can run one after another or
+    concurrently with the same output.
+    
+    Args:
+        module: Module dictionary
+        session: Session dictionary
+        session_dir: Session directory containing primary materials
+        total_sessions: Number of sessions being processed (for the header)
+        types: Secondary material types to generate
+        config_loader: ConfigLoader instance
+        llm_client: OllamaClient instance
+        outline_text: Full outline text (fallback context)
+        logger: Logger instance
+        error_collector: ErrorCollector for the session's validation issues
+        outline_modules: All outline modules, for the outline digest
+        incremental: Regenerate only materials whose inputs changed
+        journal: Optional run journal to record progress in and resume from
+        
+    Returns:
+        True if at least one material was generated
+    """
+    module_id = module.get('module_id', 0)
+    module_name = module.get('module_name', f"Module {module_id}")
+    session_number = session.get('session_number', 0)
+    session_title = session.get('session_title', f"Session {session_number}")
+    
+    logger.info(f"\n  Session {session_number}/{total_sessions}: {session_title}")
+    
+    if not session_dir.exists():
+        logger.warning(f"  ⚠ Session directory not found: {session_dir}")
+        return False
+    
+    try:
+        results = generate_secondary_for_session(
+            module,
+            session,
+            session_dir,
+            types,
+            config_loader,
+            llm_client,
+            outline_text,
+            logger,
+            error_collector=error_collector,
+            outline_modules=outline_modules,
+            incremental=incremental,
+            journal=journal,
+        )
+        if results:
+            logger.info(f"  ✓ Generated {len(results)} secondary materials")
+            return True
+        logger.warning(f"  ⚠ No materials generated for session {session_number}")
+        return False
+    except LLMError as e:
+        # Extract request ID and error details
+        error_msg = str(e)
+        request_id = None
+        if "[" in error_msg and "]" in error_msg:
+            try:
+                request_id = error_msg[error_msg.find("[")+1:error_msg.find("]")]
+            except (ValueError, IndexError):
+                pass
+        
+        is_timeout = "timeout" in error_msg.lower()
+        error_type = "Timeout" if is_timeout else "LLM Error"
+        
+        logger.error(f"  ✗ {error_type} for session {session_number}: {session_title}")
+        logger.error(f"     Module: {module_name} (ID: {module_id})")
+        if request_id:
+            logger.error(f"     Request ID: {request_id} (filter logs: grep '[{request_id}]' output/logs/*.log)")
+        logger.error(f"     Error: {error_msg}")
+        if is_timeout:
+            logger.error(f"     Troubleshooting: See docs/TROUBLESHOOTING.md for timeout resolution steps")
+        return False
+    except Exception as e:
+        error_type = type(e).__name__
+        logger.error(f"  ✗ {error_type} for session {session_number}: {session_title}")
+        logger.error(f"     Module: {module_name} (ID: {module_id})")
+        logger.error(f"     Error: {str(e)}")
+        logger.error(f"     Full traceback:", exc_info=True)
+        return False
+
+
+def run_queue_worker(
+    args: argparse.Namespace,
+    jobs: List[Tuple[Dict[str, Any], Dict[str, Any], Path, List[str]]],
+    run_session: Callable[..., bool],
+    outline_path: Path,
+    error_collector: ErrorCollector,
+    journal: RunJournal,
+    logger: logging.Logger,
+) -> List[bool]:
+    """Process sessions leased from the shared work queue (--worker mode).
+    
+    Every worker enqueues all selected sessions (existing tasks are kept),
+    then leases and processes one session at a time until the queue is
+    drained. Sessions whose primary materials are missing fail the attempt
+    and are retried later, so workers can start while stage 04 finishes.
+    Partial files are cleaned up per leased session, since other workers
+    may be writing theirs.
+    
+    Args:
+        args: Parsed command-line arguments
+        jobs: (module, session, session_dir, header) of the selected sessions
+        run_session: Processes one job with an ErrorCollector
+        outline_path: Outline JSON the sessions come from
+        error_collector: ErrorCollector for validation issues
+        journal: Run journal of this worker
+        logger: Logger instance
+        
+    Returns:
+        Outcome of each session this worker processed (last attempt each)
+    """
+    jobs_by_key = {}
+    for job in jobs:
+        module, session = job[0], job[1]
+        jobs_by_key[f"module_{module.get('module_id', 0):02d}/session_{session.get('session_number', 0):02d}"] = job
+    queue = WorkQueue(args.worker, lease_seconds=args.lease_seconds)
+    name = f"05_generate_secondary:{Path(outline_path).name}:{','.join(args.types)}"
+    added = queue.enqueue(name, [(key, {}) for key in jobs_by_key])
+    logger.info(f"📬 Work queue {queue.path} [{name}]: {added} session(s) added, {queue.counts(name)}")
+    
+    outcomes: Dict[str, bool] = {}
+    
+    def process_task(task: Task) -> bool:
+        module, session, session_dir, _ = jobs_by_key[task.key]
+        journal.cleanup(within=session_dir)
+        outcomes[task.key] = run_session((module, session, session_dir, []), error_collector)
+        return outcomes[task.key]
+    
+    stats = run_worker(queue, name, process_task)
+    logger.info(
+        f"📬 Worker finished: {stats['done']} session(s) done, {stats['failed']} failed attempt(s), "
+        f"{stats['lost']} lost lease(s); queue: {queue.counts(name)}"
+    )
+    for key, error in queue.failures(name):
+        logger.warning(f"  ❌ {key} failed for good: {error}")
+    return list(outcomes.values())
+
+
 def main() -> int:
     args = parse_args()
     
@@ -490,6 +871,9 @@ def main() -> int:
     config_info = {
         "Content Validation": "ENABLED" if args.validate else "DISABLED",
         "Dry Run": "ENABLED (no LLM calls)" if args.dry_run else "DISABLED",
+        "Workers": args.workers,
+        "Work Queue": str(args.worker) if args.worker else "NONE (single process)",
+        "Regenerate": "ALL (--force)" if args.force else "STALE ONLY (build manifest)",
         "Log File": str(log_file) if log_file else "None"
     }
     log_info_box(logger, "CONFIGURATION", config_info, emoji="⚙️")
@@ -535,6 +919,9 @@ def main() -> int:
         modules_path_str = directories.get('modules', 'modules')
         base_modules_dir = Path(modules_path_str)
         
+        # Prompts get a digest of the whole outline, not just the selected modules
+        outline_modules = list(modules)
+        
         # Filter modules if specific IDs requested (not --all)
         if not args.all and args.modules:
             original_count = len(modules)
@@ -566,97 +953,111 @@ def main() -> int:
                     session_title = session.get('session_title', '')
                     logger.info(f"  Session {session_num}: {session_title}")
                     for sec_type in args.types:
-                        ext = ".mmd" if sec_type == "visualization" else ".md"
-                        logger.info(f"    Would generate: {sec_type}{ext}")
+                        logger.info(f"    Would generate: {material_filename(sec_type)}")
             logger.info("\n" + "=" * 80)
             logger.info(f"Would generate {len(args.types)} secondary materials for {total_sessions} sessions")
             logger.info("=" * 80)
             return 0
 
         llm_cfg = config_loader.get_llm_parameters()
-        llm_client = OllamaClient(llm_cfg)
+        llm_client = OllamaClient(llm_cfg, content_requirements=config_loader.get_content_requirements())
+        # --force means new LLM output, not byte-identical cached answers
+        llm_client.response_cache.refresh = args.force
 
         outline_text = find_latest_outline(args.outline)
         
+        # Journal progress so an interrupted run continues with --resume
+        try:
+            journal = RunJournal.start_or_resume(args.resume, stage="05_generate_secondary", types=args.types)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"🧾 Run journal: {journal.path} (continue with --resume {journal.run_id})")
+        if not args.worker:
+            # Queue workers clean up each session they lease instead
+            journal.cleanup()
+        
         # Initialize error collector for tracking validation issues
         error_collector = ErrorCollector()
 
-        successful = 0
-        failed = 0
-        session_count = 0
-
+        # Sessions in outline order; each module header is logged with its first session
+        jobs = []
         for i, module in enumerate(modules, 1):
             module_id = module.get('module_id', 0)
             module_name = module.get('module_name', f"Module {module_id}")
             module_slug = slugify(f"module_{module_id:02d}_{module_name}")
-            module_dir = base_modules_dir / module_slug
-            
             sessions = module.get('sessions', [])
-            
-            logger.info(f"\n{'='*60}")
-            logger.info(f"[{i}/{len(modules)}] Module {module_id}: {module_name} ({len(sessions)} sessions)")
-            logger.info(f"{'='*60}")
-            
-            for session in sessions:
-                session_number = session.get('session_number', 0)
-                session_title = session.get('session_title', f"Session {session_number}")
-                session_dir = module_dir / f"session_{session_number:02d}"
-                session_count += 1
-                
-                logger.info(f"\n  Session {session_number}/{total_sessions}: {session_title}")
-                
-                if not session_dir.exists():
-                    logger.warning(f"  ⚠ Session directory not found: {session_dir}")
-                    failed += 1
-                    continue
-                
-                try:
-                    results = generate_secondary_for_session(
-                        module,
-                        session,
-                        session_dir,
-                        args.types,
-                        config_loader,
-                        llm_client,
-                        outline_text,
-                        logger,
-                        error_collector=error_collector,
-                    )
-                    if results:
-                        successful += 1
-                        logger.info(f"  ✓ Generated {len(results)} secondary materials")
-                    else:
-                        failed += 1
-                        logger.warning(f"  ⚠ No materials generated for session {session_number}")
-                except LLMError as e:
-                    failed += 1
-                    # Extract request ID and error details
-                    error_msg = str(e)
-                    request_id = None
-                    if "[" in error_msg and "]" in error_msg:
-                        try:
-                            request_id = error_msg[error_msg.find("[")+1:error_msg.find("]")]
-                        except (ValueError, IndexError):
-                            pass
-                    
-                    is_timeout = "timeout" in error_msg.lower()
-                    error_type = "Timeout" if is_timeout else "LLM Error"
-                    
-                    logger.error(f"  ✗ {error_type} for session {session_number}: {session_title}")
-                    logger.error(f"     Module: {module_name} (ID: {module_id})")
-                    if request_id:
-                        logger.error(f"     Request ID: {request_id} (filter logs: grep '[{request_id}]' output/logs/*.log)")
-                    logger.error(f"     Error: {error_msg}")
-                    if is_timeout:
-                        logger.error(f"     Troubleshooting: See docs/TROUBLESHOOTING.md for timeout resolution steps")
-                except Exception as e:
-                    failed += 1
-                    error_type = type(e).__name__
-                    logger.error(f"  ✗ {error_type} for session {session_number}: {session_title}")
-                    logger.error(f"     Module: {module_name} (ID: {module_id})")
-                    logger.error(f"     Error: {str(e)}")
-                    logger.error(f"     Full traceback:", exc_info=True)
+            header = [
+                f"\n{'='*60}",
+                f"[{i}/{len(modules)}] Module {module_id}: {module_name} ({len(sessions)} sessions)",
+                f"{'='*60}",
+            ]
+            for position, session in enumerate(sessions):
+                session_dir = base_modules_dir / module_slug / f"session_{session.get('session_number', 0):02d}"
+                jobs.append((module, session, session_dir, header if position == 0 else []))
+        session_count = len(jobs)
+
+        def run_session(job, collector: ErrorCollector) -> bool:
+            module, session, session_dir, header = job
+            for line in header:
+                logger.info(line)
+            return process_session(
+                module,
+                session,
+                session_dir,
+                total_sessions,
+                args.types,
+                config_loader,
+                llm_client,
+                outline_text,
+                logger,
+                collector,
+                outline_modules,
+                incremental=not args.force,
+                journal=journal,
+            )
+
+        if args.worker:
+            # Share the sessions with workers on other machines
+            outcomes = run_queue_worker(args, jobs, run_session, outline_path, error_collector, journal, logger)
+            session_count = len(outcomes)
+        elif args.workers <= 1:
+            outcomes = [run_session(job, error_collector) for job in jobs]
+        else:
+            # Sessions run concurrently with their own collectors; each session's
+            # logs are written as one section, in outline order
+            collectors = [ErrorCollector() for _ in jobs]
+            with OrderedLogSections() as sections:
+                def session_task(index: int) -> bool:
+                    try:
+                        with sections.capture(index):
+                            return run_session(jobs[index], collectors[index])
+                    finally:
+                        sections.close(index)
 
+                batch = run_batch(
+                    [lambda index=index: session_task(index) for index in range(len(jobs))],
+                    args.workers,
+                    labels=[
+                        f"m{module.get('module_id', 0)}s{session.get('session_number', 0)}"
+                        for module, session, _, _ in jobs
+                    ],
+                )
+            for collector in collectors:
+                error_collector.merge(collector)
+            outcomes = [result.ok and result.value for result in batch]
+        successful = sum(1 for ok in outcomes if ok)
+        failed = session_count - successful
+
+        # Report prefill work saved by shared session prefixes
+        llm_client.log_prefix_reuse()
+        budget_stats = llm_client.context_budget.get_stats()
+        if budget_stats['trimmed']:
+            logger.info(
+                f"📏 Context budget: trimmed {budget_stats['trimmed']}/{budget_stats['fitted']} contexts, "
+                f"~{budget_stats['tokens_in']} → ~{budget_stats['tokens_out']} tokens"
+            )
+        
         # Generate stage summary with error collector
         generate_stage_summary(
             error_collector,
@@ -664,7 +1065,9 @@ def main() -> int:
             logger,
             total_items=session_count,
             successful_items=successful,
-            failed_items=failed
+            failed_items=failed,
+            llm_metrics=llm_client.metrics.get_summary(),
+            model_tiers=llm_client.tiers.get_stats()
         )
         
         # Check for critical issues
@@ -719,6 +1122,7 @@ def main() -> int:
                 logger.info("All sessions processed successfully with no issues")
             logger.info("=" * 80)
         
+        journal.finish("success" if exit_code == 0 else "failed", stage="05_generate_secondary", successful=successful, failed=failed)
         return exit_code
     except ConfigurationError as exc:
         logger.error(f"Configuration error: {exc}", exc_info=True)
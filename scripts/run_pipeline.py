@@ -22,6 +22,8 @@ import subprocess
 from typing import Optional
 from src.config.loader import ConfigLoader
 from src.generate.orchestration.batch import BatchCourseProcessor
+from src.generate.orchestration.journal import RunJournal
+from src.generate.orchestration.work_queue import DEFAULT_QUEUE_PATH
 from src.utils.course_selection import select_course_template, GENERATE_ALL_COURSES
 from src.utils.logging_setup import (
     setup_logging, 
@@ -95,6 +97,27 @@ def parse_args() -> argparse.Namespace:
     )
     
     # Other options
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Regenerate every artifact in stages 04 and 05, not only those whose inputs changed'
+    )
+    parser.add_argument(
+        '--resume',
+        type=str,
+        default=None,
+        metavar='RUN_ID',
+        help='Continue an interrupted pipeline run: skip finished stages and artifacts, remove partial files'
+    )
+    parser.add_argument(
+        '--worker',
+        type=Path,
+        nargs='?',
+        const=DEFAULT_QUEUE_PATH,
+        default=None,
+        metavar='QUEUE_DB',
+        help='Run stages 04 and 05 as queue workers sharing sessions with other machines (see 04/05 --worker)'
+    )
     parser.add_argument(
         '--no-interactive',
         action='store_true',
@@ -166,6 +189,12 @@ def run_script(script_name: str, args: argparse.Namespace, logger: logging.Logge
             cmd.extend([str(m) for m in args.modules])
         else:
             cmd.append('--all')
+        if args.force:
+            cmd.append('--force')
+        if getattr(args, 'run_id', None):
+            cmd.extend(['--resume', args.run_id])
+        if getattr(args, 'worker', None):
+            cmd.extend(['--worker', str(args.worker)])
     
     elif script_name == '05_generate_secondary.py':
         if outline_path:
@@ -178,6 +207,12 @@ def run_script(script_name: str, args: argparse.Namespace, logger: logging.Logge
         
         if args.types:
             cmd.extend(['--types'] + args.types)
+        if args.force:
+            cmd.append('--force')
+        if getattr(args, 'run_id', None):
+            cmd.extend(['--resume', args.run_id])
+        if getattr(args, 'worker', None):
+            cmd.extend(['--worker', str(args.worker)])
     
     elif script_name == '06_website.py':
         if outline_path:
@@ -243,38 +278,60 @@ def main() -> int:
         # Set environment variable for subprocess scripts and ConfigLoader
         os.environ["COURSE_LANGUAGE"] = args.language
     
+    # Journal finished stages (and, via stages 04/05, artifacts) so an
+    # interrupted run continues with --resume
+    try:
+        journal = RunJournal.start_or_resume(args.resume, stage="pipeline", course=args.course)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return 1
+    args.run_id = journal.run_id
+    logger.info(f"🧾 Run journal: {journal.path} (continue with --resume {journal.run_id})")
+    
+    def finished_earlier(stage: str) -> bool:
+        # Stages finished before an interruption are not run again
+        if journal.stage_result(stage) is None:
+            return False
+        logger.info(f"⏭️  Stage {stage} already finished in run {journal.run_id}")
+        return True
+    
     stages_run = 0
     stages_failed = 0
     
     # Stage 01: Environment Setup
-    if not args.skip_setup:
+    if args.skip_setup:
+        logger.info("⏭️  Skipping Stage 01 (environment setup)")
+    elif not finished_earlier("01"):
         log_section_clean(logger, "STAGE 01: Environment Setup", emoji="🔧")
         rc = run_script('01_setup_environment.py', args, logger)
         stages_run += 1
         if rc != 0:
             logger.error(f"❌ Stage 01 failed with exit code {rc}")
             stages_failed += 1
+            journal.finish("failed", stage="01")
             return rc
+        journal.stage_done("01")
         logger.info("✅ Stage 01 complete")
-    else:
-        logger.info("⏭️  Skipping Stage 01 (environment setup)")
     
     # Stage 02: Validation and Testing
-    if not args.skip_validation:
+    if args.skip_validation:
+        logger.info("⏭️  Skipping Stage 02 (validation/testing)")
+    elif not finished_earlier("02"):
         log_section_clean(logger, "STAGE 02: Validation & Testing", emoji="🧪")
         rc = run_script('02_run_tests.py', args, logger)
         stages_run += 1
         if rc != 0:
             logger.error(f"❌ Stage 02 failed with exit code {rc}")
             stages_failed += 1
+            journal.finish("failed", stage="02")
             return rc
+        journal.stage_done("02")
         logger.info("✅ Stage 02 complete")
-    else:
-        logger.info("⏭️  Skipping Stage 02 (validation/testing)")
     
     # Course selection (if not specified and not in non-interactive mode)
-    # This happens after validation/testing to ensure system is ready
-    selected_course = args.course
+    # This happens after validation/testing to ensure system is ready;
+    # a resumed run keeps the course it selected
+    selected_course = args.course or (journal.stage_result("course") or {}).get("course")
     if not selected_course and not args.no_interactive:
         logger.info("")
         config_loader = ConfigLoader(config_dir)
@@ -294,21 +351,31 @@ def main() -> int:
         logger.info(summary['summary'])
         
         # Return appropriate exit code
+        journal.finish("success" if len(summary['failed']) == 0 else "failed")
         return 0 if len(summary['failed']) == 0 else 1
     
     # Update args.course if selected interactively
     if selected_course and selected_course != GENERATE_ALL_COURSES:
         args.course = selected_course
+        if journal.stage_result("course") is None:
+            journal.stage_done("course", course=selected_course)
     
     # Stage 03: Outline Generation
     outline_path = None
-    if not args.skip_outline:
+    if args.skip_outline:
+        logger.info("⏭️  Skipping Stage 03 (outline generation)")
+    elif finished_earlier("03"):
+        # Later stages keep using the outline this run generated
+        recorded_outline = journal.stage_result("03").get("outline_path")
+        outline_path = Path(recorded_outline) if recorded_outline else None
+    else:
         log_section_clean(logger, "STAGE 03: Outline Generation", emoji="📑")
         rc = run_script('03_generate_outline.py', args, logger)
         stages_run += 1
         if rc != 0:
             logger.error(f"❌ Stage 03 failed with exit code {rc}")
             stages_failed += 1
+            journal.finish("failed", stage="03")
             return rc
         logger.info("✅ Stage 03 complete")
         logger.info("")
@@ -320,11 +387,13 @@ def main() -> int:
             logger.info(f"Using outline for subsequent stages: {outline_path}")
         else:
             logger.warning("Could not find generated outline - stages 04-06 may fail")
-    else:
-        logger.info("⏭️  Skipping Stage 03 (outline generation)")
+        journal.stage_done("03", outline_path=str(outline_path) if outline_path else None)
     
     # Stage 04: Primary Materials
-    if not args.skip_primary:
+    # (a failed stage 04/05 runs again on resume; its finished artifacts are kept)
+    if args.skip_primary:
+        logger.info("⏭️  Skipping Stage 04 (primary materials)")
+    elif not finished_earlier("04"):
         log_section_clean(logger, "STAGE 04: Primary Materials Generation", emoji="📚")
         rc = run_script('04_generate_primary.py', args, logger, outline_path)
         stages_run += 1
@@ -333,12 +402,13 @@ def main() -> int:
             stages_failed += 1
             # Don't return here - allow secondary to run even if primary fails
         else:
+            journal.stage_done("04")
             logger.info("✅ Stage 04 complete")
-    else:
-        logger.info("⏭️  Skipping Stage 04 (primary materials)")
     
     # Stage 05: Secondary Materials
-    if not args.skip_secondary:
+    if args.skip_secondary:
+        logger.info("⏭️  Skipping Stage 05 (secondary materials)")
+    elif not finished_earlier("05"):
         log_section_clean(logger, "STAGE 05: Secondary Materials Generation", emoji="📖")
         rc = run_script('05_generate_secondary.py', args, logger, outline_path)
         stages_run += 1
@@ -346,12 +416,13 @@ def main() -> int:
             logger.error(f"❌ Stage 05 failed with exit code {rc}")
             stages_failed += 1
         else:
+            journal.stage_done("05")
             logger.info("✅ Stage 05 complete")
-    else:
-        logger.info("⏭️  Skipping Stage 05 (secondary materials)")
     
     # Stage 06: Website Generation
-    if not args.skip_website:
+    if args.skip_website:
+        logger.info("⏭️  Skipping Stage 06 (website generation)")
+    elif not finished_earlier("06"):
         log_section_clean(logger, "STAGE 06: Website Generation", emoji="🌐")
         rc = run_script('06_website.py', args, logger, outline_path)
         stages_run += 1
@@ -359,9 +430,10 @@ def main() -> int:
             logger.error(f"❌ Stage 06 failed with exit code {rc}")
             stages_failed += 1
         else:
+            journal.stage_done("06")
             logger.info("✅ Stage 06 complete")
-    else:
-        logger.info("⏭️  Skipping Stage 06 (website generation)")
+    
+    journal.finish("success" if stages_failed == 0 else "failed", stages_run=stages_run, stages_failed=stages_failed)
     
     # Final summary
     logger.info("")
@@ -392,6 +464,9 @@ def main() -> int:
     if log_file:
         logger.info(f"📝 Full log available at: {log_file}")
         logger.info("")
+    if stages_failed > 0:
+        logger.info(f"🧾 Continue this run with: --resume {journal.run_id}")
+        logger.info("")
     
     return 1 if stages_failed > 0 else 0
 
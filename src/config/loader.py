@@ -565,6 +565,16 @@ class ConfigLoader:
             'key_concepts': items_per_field.get('key_concepts', {'min': 3, 'max': 7})
         }
     
+    def get_outline_structured_output(self) -> bool:
+        """Whether outlines are generated with a JSON schema passed to Ollama's format field.
+        
+        Returns:
+            Value of outline_generation.structured_output (default: False)
+        """
+        llm_config = self.get_llm_config()
+        outline_config = llm_config.get('outline_generation', {})
+        return bool(outline_config.get('structured_output', False))
+    
     def get_content_requirements(self) -> Dict[str, Dict[str, int]]:
         """Get content generation requirements for different content types.
         
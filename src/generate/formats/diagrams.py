@@ -5,7 +5,9 @@ from pathlib import Path
 from typing import Optional
 
 from src.generate.formats import ContentGenerator
-from src.utils.helpers import ensure_directory, slugify
+from src.llm.client import GuardTrippedError
+from src.llm.guards import RepetitionGuard, mermaid_header_guard
+from src.utils.helpers import atomic_write_text, ensure_directory, slugify
 from src.utils.error_collector import ErrorCollector
 from src.utils.logging_setup import log_status_with_text
 from src.utils.smart_retry import get_retry_system
@@ -66,6 +68,8 @@ class DiagramGenerator(ContentGenerator):
         retry_system = get_retry_system()
         
         # Retry loop
+        aborted = False  # Previous attempt was cut off by a stream guard (nothing to return yet)
+        model = self.llm_client.model_for("diagram")  # Tier model, escalated after failed validations
         for attempt in range(max_retries + 1):
             if attempt > 0:
                 context_info = context_parts[0] if context_parts else context
@@ -90,7 +94,7 @@ class DiagramGenerator(ContentGenerator):
                         max_retries
                     )
                     
-                    if not should_retry:
+                    if not should_retry and not aborted:
                         logger.warning(f"  Smart retry system suggests skipping retry (low success rate)")
                         break
                     
@@ -137,14 +141,25 @@ class DiagramGenerator(ContentGenerator):
             # Get operation-specific timeout for diagram generation
             operation_timeout = self.config_loader.get_operation_timeout("diagram")
             
-            # Generate diagram
-            diagram = self.llm_client.generate_with_template(
-                template,
-                variables,
-                system_prompt=system_prompt,
-                operation="diagram",
-                timeout_override=operation_timeout
-            )
+            # Generate diagram; output that cannot become a diagram is aborted mid-stream
+            # except on the last attempt
+            guards = [mermaid_header_guard(), RepetitionGuard()] if attempt < max_retries else None
+            try:
+                diagram = self.llm_client.generate_with_template(
+                    template,
+                    variables,
+                    system_prompt=system_prompt,
+                    operation="diagram",
+                    model=model,
+                    timeout_override=operation_timeout,
+                    guards=guards
+                )
+            except GuardTrippedError as e:
+                logger.warning(f"  Generation aborted early, will retry: {e.reason}")
+                previous_warnings = [e.reason]
+                aborted = True
+                continue
+            aborted = False
             
             # Get content requirements for validation
             content_reqs = self.config_loader.get_content_requirements()
@@ -281,6 +296,7 @@ class DiagramGenerator(ContentGenerator):
             
             # Store warnings for next retry
             previous_warnings = all_warnings
+            model = self.llm_client.escalate_model("diagram", model, critical_issues)
             logger.warning(f"  Critical issues detected, will retry: {len(critical_issues)} issues")
         
         # Should not reach here, but return last attempt
@@ -314,7 +330,7 @@ class DiagramGenerator(ContentGenerator):
         filename = f"diagram_{module_id:02d}_{diagram_num}_{topic_slug}.mmd"
         
         filepath = output_dir / filename
-        filepath.write_text(diagram, encoding='utf-8')
+        atomic_write_text(filepath, diagram)
         
         logger.info(f"Saved diagram to: {filepath}")
         return filepath
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from src.generate.formats import ContentGenerator
-from src.utils.helpers import ensure_directory, format_module_filename
+from src.utils.helpers import atomic_write_text, ensure_directory, format_module_filename
 from src.utils.error_collector import ErrorCollector
 from src.utils.smart_retry import get_retry_system
 
@@ -79,6 +79,7 @@ class LabGenerator(ContentGenerator):
         lab_reqs = content_reqs.get('lab', {})
         
         # Retry loop
+        model = self.llm_client.model_for("lab")  # Tier model, escalated after failed validations
         for attempt in range(max_retries + 1):
             if attempt > 0:
                 logger.warning(f"  Retry attempt {attempt}/{max_retries} for lab: {context}")
@@ -126,6 +127,7 @@ class LabGenerator(ContentGenerator):
                 current_variables,
                 system_prompt=system_prompt,
                 operation="lab",
+                model=model,
                 timeout_override=operation_timeout
             )
             
@@ -202,6 +204,7 @@ class LabGenerator(ContentGenerator):
             
             # Store warnings for next retry
             previous_warnings = all_warnings
+            model = self.llm_client.escalate_model("lab", model, critical_issues)
             logger.warning(f"  Critical issues detected, will retry: {len(critical_issues)} issues")
             for i, issue in enumerate(critical_issues, 1):
                 logger.warning(f"    [CRITICAL] Issue {i}: {issue}")
@@ -238,7 +241,7 @@ class LabGenerator(ContentGenerator):
         )
         
         filepath = output_dir / filename
-        filepath.write_text(lab, encoding='utf-8')
+        atomic_write_text(filepath, lab)
         
         logger.info(f"Saved lab {lab_number} to: {filepath}")
         return filepath
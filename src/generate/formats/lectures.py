@@ -5,7 +5,9 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from src.generate.formats import ContentGenerator
-from src.utils.helpers import ensure_directory, format_module_filename
+from src.llm.client import GuardTrippedError
+from src.llm.guards import RepetitionGuard, WordLimitGuard
+from src.utils.helpers import atomic_write_text, ensure_directory, format_module_filename
 from src.utils.error_collector import ErrorCollector
 from src.utils.smart_retry import get_retry_system
 
@@ -72,7 +74,7 @@ class LectureGenerator(ContentGenerator):
             "key_concepts": key_concepts_str,
             "subject": subject,
             "content_length": str(module_info.get('content_length', 2000)),
-            "outline_context": outline_context[:50000] if outline_context else "Not provided",  # 128K context window allows full context
+            "outline_context": self.llm_client.context_budget.fit_piece(outline_context, "lecture") if outline_context else "Not provided",
             "session_number": str(session_number),
             "total_sessions": str(total_sessions),
             "session_title": session_title or module_name,
@@ -97,6 +99,8 @@ class LectureGenerator(ContentGenerator):
         retry_system = get_retry_system()
         
         # Retry loop
+        aborted = False  # Previous attempt was cut off by a stream guard (nothing to return yet)
+        model = self.llm_client.model_for("lecture")  # Tier model, escalated after failed validations
         for attempt in range(max_retries + 1):
             # Validate prompt quality before generation (proactive validation) - only on first attempt
             if attempt == 0:
@@ -136,7 +140,7 @@ class LectureGenerator(ContentGenerator):
                         max_retries
                     )
                     
-                    if not should_retry:
+                    if not should_retry and not aborted:
                         logger.warning(f"  Smart retry system suggests skipping retry (low success rate)")
                         break
                     
@@ -183,14 +187,26 @@ class LectureGenerator(ContentGenerator):
             # Get operation-specific timeout for lecture generation
             operation_timeout = self.config_loader.get_operation_timeout("lecture")
             
-            # Generate lecture
-            content = self.llm_client.generate_with_template(
-                template,
-                variables,
-                system_prompt=system_prompt,
-                operation="lecture",
-                timeout_override=operation_timeout
-            )
+            # Generate lecture; runaway output is aborted mid-stream except on the last attempt
+            guards = None
+            if attempt < max_retries:
+                guards = [WordLimitGuard(lecture_reqs.get('max_word_count', 1500)), RepetitionGuard()]
+            try:
+                content = self.llm_client.generate_with_template(
+                    template,
+                    variables,
+                    system_prompt=system_prompt,
+                    operation="lecture",
+                    model=model,
+                    timeout_override=operation_timeout,
+                    guards=guards
+                )
+            except GuardTrippedError as e:
+                logger.warning(f"  Generation aborted early, will retry: {e.reason}")
+                previous_warnings = [e.reason]
+                aborted = True
+                continue
+            aborted = False
             
             # Add header
             header = f"""# {module_name}
@@ -275,6 +291,7 @@ class LectureGenerator(ContentGenerator):
             
             # Store warnings for next retry
             previous_warnings = all_warnings
+            model = self.llm_client.escalate_model("lecture", model, critical_issues)
             logger.warning(f"  Critical issues detected, will retry: {len(critical_issues)} issues")
             # Log full names of critical issues
             for i, issue in enumerate(critical_issues, 1):
@@ -310,7 +327,7 @@ class LectureGenerator(ContentGenerator):
         )
         
         filepath = output_dir / filename
-        filepath.write_text(lecture, encoding='utf-8')
+        atomic_write_text(filepath, lecture)
         
         logger.info(f"Saved lecture to: {filepath}")
         return filepath
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from src.generate.formats import ContentGenerator
-from src.utils.helpers import ensure_directory, format_module_filename
+from src.utils.helpers import atomic_write_text, ensure_directory, format_module_filename
 from src.utils.error_collector import ErrorCollector
 from src.utils.logging_setup import log_status_with_text
 from src.utils.content_analysis.question_fixes import auto_fix_questions
@@ -98,6 +98,7 @@ class QuestionGenerator(ContentGenerator):
         retry_system = get_retry_system()
         
         # Retry loop
+        model = self.llm_client.model_for("questions")  # Tier model, escalated after failed validations
         for attempt in range(max_retries + 1):
             if attempt > 0:
                 logger.warning(f"  Retry attempt {attempt}/{max_retries} for questions: {context}")
@@ -178,6 +179,7 @@ class QuestionGenerator(ContentGenerator):
                 variables,
                 system_prompt=system_prompt,
                 operation="questions",
+                model=model,
                 timeout_override=operation_timeout
             )
             
@@ -329,6 +331,7 @@ class QuestionGenerator(ContentGenerator):
             
             # Store warnings for next retry
             previous_warnings = all_warnings
+            model = self.llm_client.escalate_model("questions", model, critical_issues)
             logger.warning(f"  Critical issues detected, will retry: {len(critical_issues)} issues")
         
         # Should not reach here, but return last attempt
@@ -361,7 +364,7 @@ class QuestionGenerator(ContentGenerator):
         )
         
         filepath = output_dir / filename
-        filepath.write_text(questions, encoding='utf-8')
+        atomic_write_text(filepath, questions)
         
         logger.info(f"Saved questions to: {filepath}")
         return filepath
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 
 from src.generate.formats import ContentGenerator
-from src.utils.helpers import ensure_directory, format_module_filename
+from src.utils.helpers import atomic_write_text, ensure_directory, format_module_filename
 from src.utils.content_analysis import (
     analyze_study_notes, 
     log_content_metrics,
@@ -84,6 +84,7 @@ class StudyNotesGenerator(ContentGenerator):
         retry_system = get_retry_system()
         
         # Retry loop
+        model = self.llm_client.model_for("study_notes")  # Tier model, escalated after failed validations
         for attempt in range(max_retries + 1):
             if attempt > 0:
                 logger.warning(f"  Retry attempt {attempt}/{max_retries} for study notes: {context}")
@@ -178,6 +179,7 @@ class StudyNotesGenerator(ContentGenerator):
                 variables,
                 system_prompt=system_prompt,
                 operation="study_notes",
+                model=model,
                 timeout_override=operation_timeout
             )
             
@@ -261,6 +263,7 @@ class StudyNotesGenerator(ContentGenerator):
             
             # Store warnings for next retry
             previous_warnings = all_warnings
+            model = self.llm_client.escalate_model("study_notes", model, critical_issues)
             logger.warning(f"  Critical issues detected, will retry: {len(critical_issues)} issues")
             # Log full names of critical issues
             for i, issue in enumerate(critical_issues, 1):
@@ -296,7 +299,7 @@ class StudyNotesGenerator(ContentGenerator):
         )
         
         filepath = output_dir / filename
-        filepath.write_text(notes, encoding='utf-8')
+        atomic_write_text(filepath, notes)
         
         logger.info(f"Saved study notes to: {filepath}")
         return filepath
@@ -117,6 +117,11 @@ class BatchCourseProcessor:
             if args.types:
                 cmd.extend(['--types'] + args.types)
         
+        # Stages 04/05 as queue workers: other machines running the same
+        # batch with --worker share each course's sessions
+        if script_name in ('04_generate_primary.py', '05_generate_secondary.py') and getattr(args, 'worker', None):
+            cmd.extend(['--worker', str(args.worker)])
+        
         logger_instance.debug(f"Running: {' '.join(str(c) for c in cmd)}")
         
         try:
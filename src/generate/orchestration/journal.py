@@ -0,0 +1,310 @@
+"""Crash-safe run journal for exact resume.
+
+A run killed in the middle of stage 2 used to leave whatever it was writing
+behind (a truncated lecture.md then counted as existing), and the only way to
+continue was to rerun everything or guess which files were complete. Each
+pipeline or stage run now appends its progress to output/.runs/<run-id>.jsonl:
+when every artifact starts, finishes (with the hash of the file written),
+retries or fails, plus which pipeline stages finished. Every line is flushed
+and fsynced before the work it describes continues, so the journal survives a
+kill at any point.
+
+Resuming a run replays the journal: artifacts that finished and whose file
+still has the recorded hash are skipped, and artifacts that started but never
+finished have their partial files (and any temporary files of an interrupted
+atomic write) removed so they are generated again.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.generate.orchestration.manifest import content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = Path("output/.runs")
+
+
+def new_run_id() -> str:
+    """Create a run ID (timestamp plus a random suffix).
+
+    Returns:
+        Run ID such as "20250101_120000_1a2b3c"
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class RunJournal:
+    """Append-only record of one run's artifacts and stages.
+
+    Safe to use from the worker threads of one process; stage scripts started
+    by run_pipeline.py append to the pipeline's journal one after another.
+
+    Attributes:
+        run_id: Run ID
+        path: Journal file (<directory>/<run_id>.jsonl)
+        info: Fields of the run_start event (e.g., course, stage)
+    """
+
+    def __init__(self, run_id: str, directory: Union[str, Path] = DEFAULT_JOURNAL_DIR):
+        """Initialize a journal without reading or writing it.
+
+        Args:
+            run_id: Run ID
+            directory: Directory holding journals (default: output/.runs)
+        """
+        self.run_id = run_id
+        self.path = Path(directory) / f"{run_id}.jsonl"
+        self.info: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._done: Dict[str, str] = {}  # artifact -> content hash
+        self._attempts: Dict[str, int] = {}  # artifact -> starts + retries
+        self._unfinished: Dict[str, None] = {}  # artifacts started but not done or failed
+        self._stages: Dict[str, Dict[str, Any]] = {}  # finished stage -> its fields
+
+    @classmethod
+    def create(
+        cls,
+        directory: Union[str, Path] = DEFAULT_JOURNAL_DIR,
+        run_id: Optional[str] = None,
+        **info: Any
+    ) -> "RunJournal":
+        """Start the journal of a new run.
+
+        Args:
+            directory: Directory holding journals (default: output/.runs)
+            run_id: Run ID (default: a new one)
+            **info: Fields recorded in the run_start event (e.g., stage, course)
+
+        Returns:
+            The new RunJournal
+
+        Raises:
+            FileExistsError: If a journal with this run ID exists
+        """
+        journal = cls(run_id or new_run_id(), directory)
+        if journal.path.exists():
+            raise FileExistsError(f"Run journal already exists: {journal.path}")
+        journal.path.parent.mkdir(parents=True, exist_ok=True)
+        journal.info = dict(info)
+        journal._append("run_start", **info)
+        return journal
+
+    @classmethod
+    def load(cls, run_id: str, directory: Union[str, Path] = DEFAULT_JOURNAL_DIR) -> "RunJournal":
+        """Open an existing run's journal to resume it.
+
+        A last line cut short by a kill is ignored.
+
+        Args:
+            run_id: Run ID to resume
+            directory: Directory holding journals (default: output/.runs)
+
+        Returns:
+            RunJournal with the run's recorded progress
+
+        Raises:
+            FileNotFoundError: If there is no journal for run_id
+        """
+        journal = cls(run_id, directory)
+        if not journal.path.exists():
+            raise FileNotFoundError(f"No run journal for run ID {run_id} (looked for {journal.path})")
+        for line in journal.path.read_text(encoding="utf-8").splitlines():
+            try:
+                journal._replay(json.loads(line))
+            except ValueError:
+                logger.warning(f"⚠️  Ignoring unreadable line in run journal {journal.path}")
+        return journal
+
+    @classmethod
+    def start_or_resume(
+        cls,
+        run_id: Optional[str] = None,
+        directory: Union[str, Path] = DEFAULT_JOURNAL_DIR,
+        **info: Any
+    ) -> "RunJournal":
+        """Resume run_id's journal, or start a new run if no ID is given.
+
+        Args:
+            run_id: Run ID to resume (e.g., from --resume), or None
+            directory: Directory holding journals (default: output/.runs)
+            **info: Fields recorded when a new run starts
+
+        Returns:
+            RunJournal
+
+        Raises:
+            FileNotFoundError: If run_id is given but has no journal
+        """
+        if run_id:
+            return cls.load(run_id, directory)
+        return cls.create(directory, **info)
+
+    def _replay(self, event: Dict[str, Any]) -> None:
+        """Apply one recorded event to the in-memory state."""
+        kind = event.get("event")
+        artifact = event.get("artifact")
+        if kind == "run_start":
+            self.info = {k: v for k, v in event.items() if k not in ("event", "time")}
+        elif kind == "start":
+            self._attempts[artifact] = self._attempts.get(artifact, 0) + 1
+            self._done.pop(artifact, None)
+            self._unfinished[artifact] = None
+        elif kind == "retry":
+            self._attempts[artifact] = self._attempts.get(artifact, 0) + 1
+        elif kind == "done":
+            self._done[artifact] = event["hash"]
+            self._unfinished.pop(artifact, None)
+        elif kind == "failed":
+            self._unfinished.pop(artifact, None)
+        elif kind == "stage_done":
+            self._stages[event["stage"]] = {k: v for k, v in event.items() if k not in ("event", "time", "stage")}
+
+    def _append(self, kind: str, **fields: Any) -> None:
+        """Durably append an event and apply it."""
+        event = {"time": datetime.now().isoformat(timespec="seconds"), "event": kind, **fields}
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._replay(event)
+
+    def start(self, artifact: Union[str, Path]) -> None:
+        """Record that an artifact is being generated.
+
+        Args:
+            artifact: Artifact file path
+        """
+        self._append("start", artifact=str(artifact))
+
+    def retry(self, artifact: Union[str, Path], error: Exception) -> None:
+        """Record a retried attempt of an artifact.
+
+        Args:
+            artifact: Artifact file path
+            error: Error that caused the retry
+        """
+        self._append("retry", artifact=str(artifact), error=str(error))
+
+    def done(self, artifact: Union[str, Path], content: str) -> None:
+        """Record that an artifact's file was written.
+
+        Args:
+            artifact: Artifact file path
+            content: Text written to the file
+        """
+        self._append("done", artifact=str(artifact), hash=content_hash(content))
+
+    def failed(self, artifact: Union[str, Path], error: Exception) -> None:
+        """Record that an artifact failed.
+
+        Args:
+            artifact: Artifact file path
+            error: Final error
+        """
+        artifact = str(artifact)
+        self._append("failed", artifact=artifact, error=str(error), attempts=self.attempts(artifact))
+
+    def attempts(self, artifact: Union[str, Path]) -> int:
+        """Get how many times an artifact was attempted in this run (including resumes).
+
+        Args:
+            artifact: Artifact file path
+
+        Returns:
+            Number of starts and retries recorded
+        """
+        with self._lock:
+            return self._attempts.get(str(artifact), 0)
+
+    def is_done(self, artifact: Union[str, Path]) -> bool:
+        """Check whether an artifact finished in this run and its file is intact.
+
+        Args:
+            artifact: Artifact file path
+
+        Returns:
+            True if a done event was recorded and the file still has its hash
+        """
+        with self._lock:
+            recorded = self._done.get(str(artifact))
+        path = Path(artifact)
+        if recorded is None or not path.exists():
+            return False
+        return content_hash(path.read_text(encoding="utf-8")) == recorded
+
+    def unfinished(self) -> List[str]:
+        """Get artifacts that started but neither finished nor failed.
+
+        Returns:
+            Artifact paths, in the order they started
+        """
+        with self._lock:
+            return list(self._unfinished)
+
+    def cleanup(self, within: Optional[Union[str, Path]] = None) -> List[Path]:
+        """Remove the partial files of unfinished artifacts before resuming.
+
+        Deletes each unfinished artifact's file and the temporary files of an
+        interrupted atomic write next to it, so a half-written file can never
+        count as existing. Queue workers sharing a journal pass the directory
+        of the session they just leased, so files other workers are still
+        writing are left alone.
+
+        Args:
+            within: Only clean up artifacts under this directory (default: all)
+
+        Returns:
+            Paths removed
+        """
+        removed: List[Path] = []
+        for artifact in self.unfinished():
+            path = Path(artifact)
+            if within is not None and not path.is_relative_to(within):
+                continue
+            candidates = [path] + sorted(path.parent.glob(f".{path.name}.*.tmp")) if path.parent.exists() else []
+            for candidate in candidates:
+                if candidate.exists():
+                    candidate.unlink()
+                    removed.append(candidate)
+        if removed:
+            logger.info(f"🧹 Removed {len(removed)} partial file(s) left by run {self.run_id}")
+        return removed
+
+    def stage_done(self, stage: str, **fields: Any) -> None:
+        """Record that a pipeline stage finished.
+
+        Args:
+            stage: Stage name (e.g., "03")
+            **fields: Values later stages need on resume (e.g., outline_path)
+        """
+        self._append("stage_done", stage=stage, **fields)
+
+    def stage_result(self, stage: str) -> Optional[Dict[str, Any]]:
+        """Get the fields of a finished stage.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            Fields recorded with stage_done(), or None if the stage did not finish
+        """
+        with self._lock:
+            return self._stages.get(stage)
+
+    def finish(self, status: str, **fields: Any) -> None:
+        """Record the end of a (pipeline or stage) run.
+
+        Args:
+            status: Outcome (e.g., "success", "failed")
+            **fields: Extra fields (e.g., counts)
+        """
+        self._append("run_end", status=status, **fields)
@@ -0,0 +1,144 @@
+"""Input-hash build manifest for incremental regeneration.
+
+Stage 04 used to decide what to skip by checking whether lecture.md and the
+other files existed, and stage 05 regenerated everything, so editing one
+prompt template meant either a full rerun or deleting files by hand. Each
+session directory now keeps a manifest recording, per artifact, a hash of
+everything the artifact was built from (outline entry, resolved prompt
+template, model and parameters, and the content hashes of upstream
+artifacts) and a hash of the file written.
+
+An artifact is fresh when its recorded input hash matches the current one and
+the file on disk still has the recorded content hash. Upstream content hashes
+are part of the inputs, so a regenerated lecture whose text changed makes the
+lab, notes, questions and secondary materials built from it stale in turn.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.helpers import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Hash an artifact's content.
+
+    Args:
+        text: Artifact text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def inputs_hash(inputs: Dict[str, Any]) -> str:
+    """Hash the inputs an artifact is built from.
+
+    Args:
+        inputs: JSON-serializable inputs (key order does not matter)
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON form
+    """
+    canonical = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Record of what each artifact in a session directory was built from.
+
+    Stored as .manifest.json in the session directory; safe to update from
+    the concurrent nodes of one session.
+
+    Attributes:
+        path: Manifest file path
+        entries: Artifact filename to {"inputs", "output", "built_at"}
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Initialize the manifest.
+
+        Args:
+            path: Manifest file path
+            entries: Existing entries (default: none)
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = dict(entries or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, session_dir: Path) -> "BuildManifest":
+        """Load a session directory's manifest.
+
+        A missing or unreadable manifest loads empty, so every artifact is
+        stale (the behavior of sessions generated before manifests existed).
+
+        Args:
+            session_dir: Session output directory
+
+        Returns:
+            BuildManifest for the directory
+        """
+        path = Path(session_dir) / MANIFEST_FILENAME
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable build manifest {path}: {e}")
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("artifacts", {}))
+
+    def is_fresh(self, filename: str, inputs_digest: str) -> bool:
+        """Check whether an artifact is up to date.
+
+        Args:
+            filename: Artifact filename in the session directory
+            inputs_digest: Current inputs_hash() of the artifact
+
+        Returns:
+            True if the inputs are unchanged and the file still has the
+            content that was recorded
+        """
+        with self._lock:
+            entry = self.entries.get(filename)
+        if not entry or entry.get("inputs") != inputs_digest:
+            return False
+        artifact_path = self.path.parent / filename
+        if not artifact_path.exists():
+            return False
+        return content_hash(artifact_path.read_text(encoding="utf-8")) == entry.get("output")
+
+    def record(self, filename: str, inputs_digest: str, content: str) -> None:
+        """Record a freshly written artifact and save the manifest.
+
+        Args:
+            filename: Artifact filename in the session directory
+            inputs_digest: inputs_hash() the artifact was built from
+            content: Text written to the file
+        """
+        with self._lock:
+            self.entries[filename] = {
+                "inputs": inputs_digest,
+                "output": content_hash(content),
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self.save()
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        data = {"version": MANIFEST_VERSION, "artifacts": self.entries}
+        atomic_write_text(self.path, json.dumps(data, indent=2, sort_keys=True))
@@ -6,12 +6,22 @@ This module coordinates the full workflow of generating educational course mater
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 import time
 
-from src.config.loader import ConfigLoader
+from src.config.loader import ConfigLoader, ConfigurationError
+from src.llm.batch import run_batch
+from src.llm.cache import NON_OUTPUT_PARAMS
 from src.llm.client import OllamaClient, LLMError
+from src.llm.prefix import (
+    DEFAULT_SHARED_SYSTEM_PROMPT,
+    SharedPrefix,
+    build_session_prefix,
+    shared_prefix,
+)
+from src.generate.orchestration.journal import RunJournal
+from src.generate.orchestration.manifest import BuildManifest, content_hash, inputs_hash
+from src.generate.orchestration.scheduler import TaskGraph, TaskResult
 from src.generate.stages.stage1_outline import OutlineGenerator
 from src.generate.formats.lectures import LectureGenerator
 from src.generate.formats.diagrams import DiagramGenerator
@@ -19,8 +29,8 @@ from src.generate.formats.questions import QuestionGenerator
 from src.generate.formats.study_notes import StudyNotesGenerator
 from src.generate.formats.labs import LabGenerator
 from src.generate.processors.parser import OutlineParser
-from src.utils.helpers import ensure_directory, slugify
-from src.utils.logging_setup import log_section_header
+from src.utils.helpers import atomic_write_text, ensure_directory, slugify
+from src.utils.logging_setup import OrderedLogSections, log_section_header
 from src.utils.error_collector import ErrorCollector
 from src.utils.summary_generator import generate_stage_summary
 from src.utils.content_analysis import (
@@ -72,7 +82,11 @@ class ContentGenerator:
         # Initialize LLM client with logging configuration
         llm_config = config_loader.get_llm_parameters()
         logging_intervals = config_loader.get_logging_intervals()
-        self.llm_client = OllamaClient(llm_config, logging_config=logging_intervals)
+        self.llm_client = OllamaClient(
+            llm_config,
+            logging_config=logging_intervals,
+            content_requirements=config_loader.get_content_requirements()
+        )
         
         # Initialize generators
         self.outline_generator = OutlineGenerator(config_loader, self.llm_client)
@@ -133,12 +147,42 @@ class ContentGenerator:
         
         return False
     
+    def _build_session_prefix(
+        self,
+        course_metadata: Dict[str, Any],
+        module: Dict[str, Any],
+        session: Dict[str, Any],
+        total_sessions: int
+    ) -> Optional[SharedPrefix]:
+        """Build the shared prompt prefix for all operations of one session.
+        
+        Args:
+            course_metadata: Outline course metadata
+            module: Outline module containing the session
+            session: Outline session
+            total_sessions: Total sessions being generated
+            
+        Returns:
+            SharedPrefix, or None if prefix mode is disabled (llm.prompt_prefix)
+        """
+        if not self.llm_client.prefix_enabled:
+            return None
+        subject = self.config_loader.get_course_subject()
+        try:
+            system_template = self.config_loader.get_prompt_template("shared_prefix").get("system")
+        except ConfigurationError:
+            system_template = None
+        system_prompt = system_template.format(subject=subject) if system_template else DEFAULT_SHARED_SYSTEM_PROMPT
+        course = {**course_metadata, "subject": subject}
+        return build_session_prefix(course, module, session, total_sessions, system_prompt=system_prompt)
+    
     def _retry_generation(
         self,
         generation_func: Callable[[], Any],
         max_retries: int = 2,
         retry_delay: float = 2.0,
-        operation_name: str = "generation"
+        operation_name: str = "generation",
+        on_retry: Optional[Callable[[Exception], None]] = None
     ) -> Any:
         """Retry a generation operation for transient failures.
         
@@ -153,6 +197,8 @@ class ContentGenerator:
             retry_delay: Initial delay between retries in seconds (default: 2.0).
                         Uses exponential backoff: delay * (2 ** attempt)
             operation_name: Name of operation for logging context (e.g., "lecture generation")
+            on_retry: Optional callback receiving the error before each retry
+                     (e.g., to journal the retry)
             
         Returns:
             Result from generation_func (typically generated content string)
@@ -194,6 +240,8 @@ class ContentGenerator:
                     f"  Transient error in {operation_name} (attempt {attempt + 1}/{max_retries + 1}): {e}. "
                     f"Retrying in {wait_time:.1f}s..."
                 )
+                if on_retry is not None:
+                    on_retry(e)
                 time.sleep(wait_time)
         
         # Should not reach here, but raise last error if we do
@@ -405,28 +453,437 @@ class ContentGenerator:
         logger.info(f"Stage 1 complete. Outline saved to: {outline_path}")
         return outline_path
         
-    def stage2_generate_content_by_session(
+    def _add_session_nodes(
         self,
-        module_ids: Optional[List[int]] = None,
-        skip_existing: bool = False
-    ) -> List[Dict[str, Any]]:
-        """Stage 2: Generate PRIMARY content per SESSION (not per module).
+        graph: TaskGraph,
+        module: Dict[str, Any],
+        session: Dict[str, Any],
+        session_dir: Path,
+        prefix: Optional[SharedPrefix],
+        existing_files: List[str],
+        total_modules: int,
+        total_sessions: int,
+        incremental: bool = False,
+        journal: Optional[RunJournal] = None
+    ) -> Dict[str, Any]:
+        """Add one session's primary artifacts to the task graph.
+        
+        Lab and study notes depend on the lecture, questions on the lecture
+        and lab, and each diagram only on the outline. Every node generates
+        under the session's shared prefix with the usual
+        transient-failure retries, then cleans up and writes its file. Issues
+        go to a per-session ErrorCollector.
+        
+        Each written artifact is recorded in the session's build manifest with
+        a hash of its inputs (outline entry, prompt template, model and
+        parameters, upstream artifact content). In incremental mode a node
+        whose inputs are unchanged loads its file instead of generating.
+        With a run journal, nodes finished earlier in the run are loaded too,
+        and every start, retry, completion and failure is journaled.
         
         Args:
-            module_ids: List of module IDs to process. If None, processes all.
-                    
+            graph: Task graph to add the nodes to
+            module: Outline module containing the session
+            session: Outline session
+            session_dir: Session output directory
+            prefix: Shared prompt prefix of the session (None if disabled)
+            existing_files: Files to load instead of generating (resume)
+            total_modules: Number of modules being generated
+            total_sessions: Number of sessions being generated
+            incremental: Load artifacts the build manifest shows up to date
+            journal: Optional run journal to record progress in and resume from
+            
         Returns:
-            List of results for each session
+            Dict with the node keys of lecture, lab, notes and questions, the
+            list of diagram node keys, the session_data passed to generators,
+            the session's error_collector and the filenames found up to date
         """
-        log_section_header(logger, "STAGE 2: Generating Primary Content (Session-Based)", major=True)
+        from src.generate.processors.cleanup import full_cleanup_pipeline
+        
+        module_id = module.get('module_id')
+        module_name = module.get('module_name', f'Module {module_id}')
+        session_num = session.get('session_number')
+        session_title = session.get('session_title', f'Session {session_num}')
+        name = f"m{module_id}s{session_num}"
+        error_collector = ErrorCollector()
+        
+        # Prepare session-specific data for generators
+        session_data = {
+            'id': module_id,
+            'name': module_name,
+            'session_number': session_num,
+            'session_title': session_title,
+            'subtopics': session.get('subtopics', []),
+            'learning_objectives': session.get('learning_objectives', []),
+            'key_concepts': session.get('key_concepts', []),
+            'rationale': session.get('rationale', '')
+        }
+        
+        # Build comprehensive outline context for lecture generation
+        # Include module description and rationale for better context
+        module_desc = module.get('module_description', '')
+        session_rationale = session.get('rationale', '')
+        outline_context_parts = [
+            f"Module {module_id}/{total_modules}: {module_name}",
+            f"Session {session_num}/{total_sessions}: {session_title}"
+        ]
+        if module_desc:
+            outline_context_parts.append(f"Module Overview: {module_desc}")
+        if session_rationale:
+            outline_context_parts.append(f"Session Rationale: {session_rationale}")
+        outline_context = "\n".join(outline_context_parts)
+        
+        manifest = BuildManifest.load(session_dir)
+        up_to_date: List[str] = []
+        content_reqs = self.config_loader.get_content_requirements()
+        shared_inputs = {
+            'outline': {
+                'module_id': module_id,
+                'module_name': module_name,
+                'module_description': module_desc,
+                'session': session,
+                'outline_context': outline_context,
+            },
+            'course': {
+                'subject': self.config_loader.get_course_subject(),
+                'language': self.config_loader.get_language(),
+            },
+            'prefix': prefix.text if prefix else None,
+            'params': {k: v for k, v in self.llm_client.default_params.items() if k not in NON_OUTPUT_PARAMS},
+        }
+        
+        def artifact_inputs(operation: str, upstream: Dict[str, str], **extra: Any) -> str:
+            # Hash of everything an artifact is built from; upstream artifacts
+            # count by content, so a changed lecture invalidates its dependents
+            return inputs_hash({
+                **shared_inputs,
+                'operation': operation,
+                'prompt': self.config_loader.get_prompt_template(operation),
+                'requirements': content_reqs.get(operation),
+                'model': self.llm_client.model_for(operation),
+                'upstream': {filename: content_hash(text) for filename, text in upstream.items()},
+                **extra,
+            })
+        
+        def build(filename: str, digest: str, label: str, generate: Callable[[], str]) -> str:
+            # Load the artifact if the manifest shows it up to date, otherwise
+            # generate it (with retry for transient failures) and record it
+            path = session_dir / filename
+            if journal is not None and journal.is_done(path):
+                logger.info(f"  ⏭️  {label} already finished in run {journal.run_id} ({name}: {session_title})")
+                return path.read_text(encoding='utf-8')
+            if incremental and manifest.is_fresh(filename, digest):
+                logger.info(f"  ⏭️  {label} up to date ({name}: {session_title})")
+                up_to_date.append(filename)
+                return path.read_text(encoding='utf-8')
+            if journal is not None:
+                journal.start(path)
+            try:
+                with shared_prefix(prefix):
+                    content = self._retry_generation(
+                        generate,
+                        max_retries=2,
+                        operation_name=f"{label} generation",
+                        on_retry=(lambda e: journal.retry(path, e)) if journal is not None else None
+                    )
+                atomic_write_text(path, content)
+            except Exception as e:
+                if journal is not None:
+                    journal.failed(path, e)
+                raise
+            manifest.record(filename, digest, content)
+            if journal is not None:
+                journal.done(path, content)
+            return content
+        
+        def artifact(
+            kind: str,
+            filename: str,
+            generate: Callable[[Dict[str, Any]], str],
+            upstream: Sequence[Tuple[str, str]] = ()
+        ) -> Callable[[Dict[str, Any]], str]:
+            # Node that builds, cleans up and saves one artifact, or loads it
+            # when resuming
+            path = session_dir / filename
+            if filename in existing_files:
+                return lambda inputs: path.read_text(encoding='utf-8')
+            operation = kind.replace(' ', '_')
+            
+            def run(inputs: Dict[str, Any]) -> str:
+                digest = artifact_inputs(operation, {upstream_file: inputs[key] for upstream_file, key in upstream})
+                
+                def generate_clean() -> str:
+                    logger.info(f"  → Generating {kind} ({name}: {session_title})...")
+                    content, _ = full_cleanup_pipeline(generate(inputs), operation)
+                    return content
+                return build(filename, digest, kind, generate_clean)
+            return run
+        
+        lecture = graph.add(f"{name}:lecture", artifact(
+            "lecture", "lecture.md",
+            lambda inputs: self.lecture_generator.generate_lecture(
+                session_data,
+                outline_context=outline_context,
+                session_number=session_num,
+                total_sessions=total_sessions,
+                session_title=session_title,
+                error_collector=error_collector
+            )
+        ), label=f"{name} lecture")
+        lab = graph.add(f"{name}:lab", artifact(
+            "lab", "lab.md",
+            lambda inputs: self.lab_generator.generate_lab(
+                session_data,
+                lab_number=session_num,
+                lecture_context=inputs[lecture],
+                error_collector=error_collector
+            ),
+            upstream=[("lecture.md", lecture)]
+        ), deps=[lecture], label=f"{name} lab")
+        notes = graph.add(f"{name}:study_notes", artifact(
+            "study notes", "study_notes.md",
+            lambda inputs: self.study_notes_generator.generate_study_notes(
+                session_data,
+                lecture_context=inputs[lecture],
+                error_collector=error_collector
+            ),
+            upstream=[("lecture.md", lecture)]
+        ), deps=[lecture], label=f"{name} study notes")
+        questions = graph.add(f"{name}:questions", artifact(
+            "questions", "questions.md",
+            lambda inputs: self.question_generator.generate_questions(
+                session_data,
+                lecture_context=inputs[lecture],
+                lab_context=inputs[lab],
+                error_collector=error_collector
+            ),
+            upstream=[("lecture.md", lecture), ("lab.md", lab)]
+        ), deps=[lecture, lab], label=f"{name} questions")
+        
+        # Diagrams need only the outline; the configured number per session,
+        # one per subtopic
+        subtopics = session.get('subtopics', [])
+        num_diagrams = min(self.config_loader.get_diagrams_per_session(), len(subtopics))
+        
+        def diagram(i: int) -> Callable[[Dict[str, Any]], Path]:
+            def run(inputs: Dict[str, Any]) -> Path:
+                topic = subtopics[i] if i < len(subtopics) else session_title
+                context = f"{module_name} - {session_title}: {topic}"
+                filename = f"diagram_{i+1}.mmd"
+                build(
+                    filename,
+                    artifact_inputs('diagram', {}, topic=topic, context=context),
+                    f"diagram {i+1}",
+                    lambda: self.diagram_generator.generate_diagram(
+                        topic,
+                        context,
+                        error_collector=error_collector,
+                        module_id=module_id,
+                        session_num=session_num
+                    )
+                )
+                return session_dir / filename
+            return run
         
+        diagrams = [
+            graph.add(f"{name}:diagram_{i+1}", diagram(i), label=f"{name} diagram {i+1}")
+            for i in range(num_diagrams)
+        ]
+        return {
+            'lecture': lecture,
+            'lab': lab,
+            'notes': notes,
+            'questions': questions,
+            'diagrams': diagrams,
+            'session_data': session_data,
+            'error_collector': error_collector,
+            'up_to_date': up_to_date,
+        }
+    
+    def _finish_session(
+        self,
+        session_result: Dict[str, Any],
+        nodes: Dict[str, Any],
+        node_results: Dict[str, TaskResult]
+    ) -> None:
+        """Fill in a session's result from its task graph nodes.
+        
+        Records output paths, scores the lecture, questions and study notes,
+        and marks the session as success, or as error with recovery
+        suggestions if any of its primary artifacts failed (diagram failures
+        are logged only).
+        
+        Args:
+            session_result: Result dict of the session (updated in place)
+            nodes: Node keys returned by _add_session_nodes()
+            node_results: Results of the session's nodes
+        """
+        session_dir = session_result['session_dir']
+        texts: Dict[str, str] = {}
+        first_error: Optional[Exception] = None
+        for kind, filename, path_key in (
+            ('lecture', 'lecture.md', 'lecture_path'),
+            ('lab', 'lab.md', 'lab_path'),
+            ('notes', 'study_notes.md', 'notes_path'),
+            ('questions', 'questions.md', 'questions_path'),
+        ):
+            result = node_results[nodes[kind]]
+            if result.ok:
+                texts[kind] = result.value
+                session_result[path_key] = session_dir / filename
+            elif not result.skipped and first_error is None:
+                first_error = result.error
+        
+        diagram_paths = []
+        for key in nodes['diagrams']:
+            result = node_results[key]
+            if result.ok:
+                diagram_paths.append(result.value)
+            else:
+                logger.error(f"Error generating diagram: {result.error}")
+        session_result['diagram_paths'] = diagram_paths
+        
+        if first_error is not None:
+            self._record_session_error(session_result, first_error)
+            return
+        
+        # Calculate quality scores for generated content
+        from src.utils.content_analysis import analyze_lecture, analyze_questions, analyze_study_notes
+        
+        session_quality = {}
+        content_reqs = self.config_loader.get_content_requirements()
+        
+        lecture_metrics = analyze_lecture(texts['lecture'], requirements=content_reqs.get('lecture', {}))
+        session_quality['lecture'] = calculate_quality_score(lecture_metrics, content_reqs.get('lecture', {}), "lecture")
+        
+        questions_metrics = analyze_questions(texts['questions'])
+        num_questions_val = nodes['session_data'].get('num_questions', 10)
+        session_quality['questions'] = calculate_quality_score(questions_metrics, {'num_questions': num_questions_val}, "questions")
+        
+        notes_metrics = analyze_study_notes(texts['notes'], requirements=content_reqs.get('study_notes', {}))
+        session_quality['study_notes'] = calculate_quality_score(notes_metrics, content_reqs.get('study_notes', {}), "study_notes")
+        
+        session_result['quality_scores'] = session_quality
+        
+        session_result['status'] = 'success'
+        logger.info(f"  ✓ Session {session_result['session_number']} completed")
+    
+    def _record_session_error(self, session_result: Dict[str, Any], e: Exception) -> None:
+        """Log a failed session with recovery suggestions and record it in its result.
+        
+        Args:
+            session_result: Result dict of the session (updated in place)
+            e: First error raised by the session's artifacts
+        """
+        module_id = session_result['module_id']
+        module_name = session_result['module_name']
+        session_num = session_result['session_number']
+        session_title = session_result['session_title']
+        
+        # Provide actionable error message with recovery suggestions
+        error_msg = str(e)
+        recovery_suggestions = []
+        
+        # Extract request ID from LLMError if present
+        request_id = None
+        if isinstance(e, LLMError):
+            if "[" in error_msg and "]" in error_msg:
+                try:
+                    request_id = error_msg[error_msg.find("[")+1:error_msg.find("]")]
+                except (ValueError, IndexError):
+                    pass
+        
+        # Determine error type and material type context
+        error_type = type(e).__name__
+        material_types_generated = []
+        if 'lecture_path' in session_result:
+            material_types_generated.append('lecture')
+        if 'lab_path' in session_result:
+            material_types_generated.append('lab')
+        if 'notes_path' in session_result:
+            material_types_generated.append('study_notes')
+        if 'diagram_paths' in session_result and session_result['diagram_paths']:
+            material_types_generated.append('diagrams')
+        if 'questions_path' in session_result:
+            material_types_generated.append('questions')
+        
+        material_context = f"Generated: {', '.join(material_types_generated)}" if material_types_generated else "No materials generated"
+        
+        # Categorize error and provide specific suggestions
+        is_timeout = "timeout" in error_msg.lower() or "stream timeout" in error_msg.lower()
+        is_connection = "connection" in error_msg.lower() or "unreachable" in error_msg.lower()
+        is_validation = "validation" in error_msg.lower() or "format" in error_msg.lower()
+        
+        if is_timeout:
+            recovery_suggestions.extend([
+                "1. Increase timeout in config/llm_config.yaml for this operation",
+                "2. Check Ollama service status: curl http://localhost:11434/api/version",
+                "3. Consider using a faster model or checking system resources",
+                "4. See docs/TROUBLESHOOTING.md for timeout resolution steps",
+                "5. Retry this session: the pipeline will automatically retry transient failures"
+            ])
+        elif is_connection:
+            recovery_suggestions.extend([
+                "1. Check if Ollama is running: ollama serve",
+                "2. Verify Ollama is accessible: curl http://localhost:11434/api/version",
+                "3. Check network connectivity and firewall settings",
+                "4. Retry this session: the pipeline will automatically retry transient failures"
+            ])
+        elif is_validation:
+            recovery_suggestions.extend([
+                "1. Review generated content for format issues",
+                "2. Check content requirements in config/llm_config.yaml",
+                "3. Regenerate this session with --skip-existing to preserve other content"
+            ])
+        else:
+            recovery_suggestions.extend([
+                "1. Check logs for detailed error information",
+                "2. Verify configuration files are valid",
+                "3. Try regenerating this session: uv run python3 scripts/04_generate_primary.py --modules <module_id>"
+            ])
+        
+        # Log detailed error information
+        logger.error(f"  ✗ Error processing session {session_num}: {error_type}")
+        logger.error(f"     Module: {module_name} (ID: {module_id})")
+        logger.error(f"     Session: {session_title}")
+        logger.error(f"     {material_context}")
+        if request_id:
+            logger.error(f"     Request ID: {request_id} (filter logs: grep '[{request_id}]' output/logs/*.log)")
+        logger.error(f"     Error: {error_msg}")
+        if recovery_suggestions:
+            logger.error("  Recovery suggestions:")
+            for suggestion in recovery_suggestions:
+                logger.error(f"    {suggestion}")
+        
+        session_result['status'] = 'error'
+        session_result['error'] = error_msg
+        session_result['error_type'] = error_type
+        session_result['request_id'] = request_id
+        session_result['material_types_generated'] = material_types_generated
+        session_result['recovery_suggestions'] = recovery_suggestions
+    
+    def plan_sessions(self, module_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Load the outline and list the sessions stage 2 generates.
+        
+        Args:
+            module_ids: List of module IDs to process. If None, processes all.
+            
+        Returns:
+            Dict with the outline_data, its course_metadata, the selected
+            modules, total_sessions (prompts count sessions across the
+            selected modules) and 'sessions': one job dict per session, in
+            outline order, with module, session, session_dir, number
+            (position among all sessions) and first_in_module
+            
+        Raises:
+            ValueError: If there is no JSON outline
+        """
         # Try to get course name from config first (for better path resolution)
         course_name = self.config_loader.get_current_course_template()
         # If not set, derive from course config (for test configs)
         if not course_name:
             try:
                 course_info = self.config_loader.get_course_info()
-                from src.utils.helpers import slugify
                 course_name = slugify(course_info.get('name', ''))
             except Exception:
                 course_name = None
@@ -461,360 +918,139 @@ class ContentGenerator:
         dirs = self._get_output_directories(course_name)
         base_output_dir = dirs.get('modules', Path('output/modules'))
         
-        results = []
-        total_sessions = sum(len(m.get('sessions', [])) for m in modules)
-        session_count = 0
-        quality_results = []  # Collect quality scores for aggregation
-        
+        jobs = []
         for module in modules:
             module_id = module.get('module_id')
             module_name = module.get('module_name', f'Module {module_id}')
-            sessions = module.get('sessions', [])
-            
-            # Create module folder
-            module_slug = slugify(f"module_{module_id:02d}_{module_name}")
-            module_dir = base_output_dir / module_slug
-            
+            module_dir = base_output_dir / slugify(f"module_{module_id:02d}_{module_name}")
+            for position, session in enumerate(module.get('sessions', [])):
+                jobs.append({
+                    'module': module,
+                    'session': session,
+                    'session_dir': module_dir / f"session_{session.get('session_number'):02d}",
+                    'number': len(jobs) + 1,
+                    'first_in_module': position == 0,
+                })
+        
+        return {
+            'outline_data': outline_data,
+            'course_metadata': course_metadata,
+            'modules': modules,
+            'total_sessions': len(jobs),
+            'sessions': jobs,
+        }
+    
+    def generate_session(
+        self,
+        plan: Dict[str, Any],
+        job: Dict[str, Any],
+        skip_existing: bool = False,
+        max_workers: Optional[int] = None,
+        incremental: bool = False,
+        journal: Optional[RunJournal] = None,
+        error_collector: Optional[ErrorCollector] = None
+    ) -> Dict[str, Any]:
+        """Generate one session's primary artifacts as a task graph.
+        
+        Lab, study notes and questions wait for the lecture; diagrams start
+        at once, and independent artifacts overlap.
+        
+        Args:
+            plan: Result of plan_sessions()
+            job: One of plan['sessions']
+            skip_existing: Skip the session if all its files exist and load
+                          existing files instead of regenerating them
+            max_workers: Artifacts generated at once (default: the LLM
+                        client's max_parallel)
+            incremental: Regenerate only artifacts whose inputs changed since
+                        they were built (see manifest.py)
+            journal: Optional run journal (see journal.py); artifacts it shows
+                    finished are kept
+            error_collector: Collector for the session's issues (default: the
+                            generator's)
+                    
+        Returns:
+            Session result dict (status, output paths, quality_scores, and
+            up_to_date / artifact_count for incremental runs)
+        """
+        module = job['module']
+        session = job['session']
+        session_dir = job['session_dir']
+        module_id = module.get('module_id')
+        module_name = module.get('module_name', f'Module {module_id}')
+        session_num = session.get('session_number')
+        session_title = session.get('session_title', f'Session {session_num}')
+        ensure_directory(session_dir)
+        
+        session_result = {
+            'module_id': module_id,
+            'module_name': module_name,
+            'session_number': session_num,
+            'session_title': session_title,
+            'session_dir': session_dir
+        }
+        
+        if job['first_in_module']:
             # Use structured logging for module header
             logger.info("")
             logger.info("=" * 60)
-            logger.info(f"Module {module_id}: {module_name} ({len(sessions)} sessions)")
+            logger.info(f"Module {module_id}: {module_name} ({len(module.get('sessions', []))} sessions)")
             logger.info("=" * 60)
-            
-            for session in sessions:
-                session_count += 1
-                session_num = session.get('session_number')
-                session_title = session.get('session_title', f'Session {session_num}')
-                
-                logger.info(f"\n[{session_count}/{total_sessions}] Session {session_num}: {session_title}")
-                
-                # Create session folder
-                session_dir = module_dir / f"session_{session_num:02d}"
-                ensure_directory(session_dir)
-                
-                session_result = {
-                    'module_id': module_id,
-                    'module_name': module_name,
-                    'session_number': session_num,
-                    'session_title': session_title,
-                    'session_dir': session_dir
-                }
-                
-                # Check if content already exists (incremental generation / resume capability)
-                if skip_existing:
-                    required_files = ['lecture.md', 'lab.md', 'study_notes.md', 'questions.md']
-                    existing_files = [f for f in required_files if (session_dir / f).exists()]
-                    if len(existing_files) == len(required_files):
-                        logger.info(f"  ⏭️  Skipping session {session_num} (all files exist)")
-                        session_result['status'] = 'skipped'
-                        session_result['reason'] = 'files_exist'
-                        results.append(session_result)
-                        continue
-                    elif existing_files:
-                        logger.info(f"  ⚠️  Some files exist for session {session_num}, will regenerate missing files")
-                        # Resume: only generate missing content
-                        if (session_dir / "lecture.md").exists():
-                            lecture_path = session_dir / "lecture.md"
-                            lecture = lecture_path.read_text(encoding='utf-8')
-                            session_result['lecture_path'] = lecture_path
-                        if (session_dir / "lab.md").exists():
-                            lab_path = session_dir / "lab.md"
-                            lab = lab_path.read_text(encoding='utf-8')
-                            session_result['lab_path'] = lab_path
-                        if (session_dir / "study_notes.md").exists():
-                            notes_path = session_dir / "study_notes.md"
-                            notes = notes_path.read_text(encoding='utf-8')
-                            session_result['notes_path'] = notes_path
-                        # Check for existing diagrams
-                        existing_diagrams = sorted(session_dir.glob("diagram_*.mmd"))
-                        if existing_diagrams:
-                            session_result['diagram_paths'] = existing_diagrams
-                        if (session_dir / "questions.md").exists():
-                            questions_path = session_dir / "questions.md"
-                            questions = questions_path.read_text(encoding='utf-8')
-                            session_result['questions_path'] = questions_path
-                
-                try:
-                    # Import cleanup functions
-                    from src.generate.processors.cleanup import (
-                        clean_conversational_artifacts,
-                        standardize_placeholders,
-                        full_cleanup_pipeline
-                    )
-                    
-                    # Prepare session-specific data for generators
-                    session_data = {
-                        'id': module_id,
-                        'name': module_name,
-                        'session_number': session_num,
-                        'session_title': session_title,
-                        'subtopics': session.get('subtopics', []),
-                        'learning_objectives': session.get('learning_objectives', []),
-                        'key_concepts': session.get('key_concepts', []),
-                        'rationale': session.get('rationale', '')
-                    }
-                    
-                    # Build comprehensive outline context for lecture generation
-                    # Include module description and rationale for better context
-                    module_desc = module.get('module_description', '')
-                    session_rationale = session.get('rationale', '')
-                    outline_context_parts = [
-                        f"Module {module_id}/{len(modules)}: {module_name}",
-                        f"Session {session_num}/{total_sessions}: {session_title}"
-                    ]
-                    if module_desc:
-                        outline_context_parts.append(f"Module Overview: {module_desc}")
-                    if session_rationale:
-                        outline_context_parts.append(f"Session Rationale: {session_rationale}")
-                    outline_context = "\n".join(outline_context_parts)
-                    
-                    # Generate lecture (with context) - with retry for transient failures
-                    if 'lecture_path' not in session_result:
-                        logger.info("  → Generating lecture...")
-                        lecture = self._retry_generation(
-                            lambda: self.lecture_generator.generate_lecture(
-                                session_data,
-                                outline_context=outline_context,
-                                session_number=session_num,
-                                total_sessions=total_sessions,
-                                session_title=session_title,
-                                error_collector=self.error_collector
-                            ),
-                            max_retries=2,
-                            operation_name="lecture generation"
-                        )
-                        # Apply cleanup
-                        lecture, _ = full_cleanup_pipeline(lecture, "lecture")
-                        lecture_path = session_dir / "lecture.md"
-                        lecture_path.write_text(lecture, encoding='utf-8')
-                        session_result['lecture_path'] = lecture_path
-                    else:
-                        lecture = session_result.get('lecture', '')
-                        if not lecture:
-                            lecture = session_result['lecture_path'].read_text(encoding='utf-8')
-                    
-                    # Generate lab (with lecture context) - with retry for transient failures
-                    if 'lab_path' not in session_result:
-                        logger.info("  → Generating lab...")
-                        lab = self._retry_generation(
-                            lambda: self.lab_generator.generate_lab(
-                                session_data,
-                                lab_number=session_num,
-                                lecture_context=lecture,
-                                error_collector=self.error_collector
-                            ),
-                            max_retries=2,
-                            operation_name="lab generation"
-                        )
-                        # Apply cleanup
-                        lab, _ = full_cleanup_pipeline(lab, "lab")
-                        lab_path = session_dir / "lab.md"
-                        lab_path.write_text(lab, encoding='utf-8')
-                        session_result['lab_path'] = lab_path
-                    else:
-                        lab = session_result.get('lab', '')
-                        if not lab:
-                            lab = session_result['lab_path'].read_text(encoding='utf-8')
-                    
-                    # Generate study notes (with lecture context) - with retry for transient failures
-                    if 'notes_path' not in session_result:
-                        logger.info("  → Generating study notes...")
-                        notes = self._retry_generation(
-                            lambda: self.study_notes_generator.generate_study_notes(
-                                session_data,
-                                lecture_context=lecture,
-                                error_collector=self.error_collector
-                            ),
-                            max_retries=2,
-                            operation_name="study notes generation"
-                        )
-                        # Apply cleanup
-                        notes, _ = full_cleanup_pipeline(notes, "study_notes")
-                        notes_path = session_dir / "study_notes.md"
-                        notes_path.write_text(notes, encoding='utf-8')
-                        session_result['notes_path'] = notes_path
-                    else:
-                        notes = session_result.get('notes', '')
-                        if not notes:
-                            notes = session_result['notes_path'].read_text(encoding='utf-8')
-                    
-                    # Generate diagrams (can be parallelized) - with retry for transient failures
-                    logger.info("  → Generating diagrams...")
-                    # Get configured number of diagrams per session
-                    subtopics = session.get('subtopics', [])
-                    num_diagrams = min(self.config_loader.get_diagrams_per_session(), len(subtopics))
-                    diagram_paths = []
-                    
-                    # Generate diagrams in parallel (they're independent)
-                    def generate_single_diagram(i: int) -> Path:
-                        topic = subtopics[i] if i < len(subtopics) else session_title
-                        context = f"{module_name} - {session_title}: {topic}"
-                        diagram = self._retry_generation(
-                            lambda: self.diagram_generator.generate_diagram(
-                                topic,
-                                context,
-                                error_collector=self.error_collector,
-                                module_id=module_id,
-                                session_num=session_num
-                            ),
-                            max_retries=2,
-                            operation_name=f"diagram {i+1} generation"
-                        )
-                        diagram_path = session_dir / f"diagram_{i+1}.mmd"
-                        diagram_path.write_text(diagram, encoding='utf-8')
-                        return diagram_path
-                    
-                    # Use parallel generation for diagrams (max 4 workers to avoid overwhelming LLM)
-                    if num_diagrams > 1:
-                        with ThreadPoolExecutor(max_workers=min(4, num_diagrams)) as executor:
-                            futures = [executor.submit(generate_single_diagram, i) for i in range(num_diagrams)]
-                            for future in as_completed(futures):
-                                try:
-                                    diagram_paths.append(future.result())
-                                except Exception as e:
-                                    logger.error(f"Error generating diagram: {e}")
-                    else:
-                        # Single diagram - no need for parallelization
-                        if num_diagrams > 0:
-                            try:
-                                diagram_paths.append(generate_single_diagram(0))
-                            except Exception as e:
-                                logger.error(f"Error generating diagram: {e}")
-                    
-                    session_result['diagram_paths'] = diagram_paths
-                    
-                    # Generate questions (with lecture and lab context) - with retry for transient failures
-                    if 'questions_path' not in session_result:
-                        logger.info("  → Generating questions...")
-                        questions = self._retry_generation(
-                            lambda: self.question_generator.generate_questions(
-                                session_data,
-                                lecture_context=lecture,
-                                lab_context=lab,
-                                error_collector=self.error_collector
-                            ),
-                            max_retries=2,
-                            operation_name="questions generation"
-                        )
-                        # Apply cleanup
-                        questions, _ = full_cleanup_pipeline(questions, "questions")
-                        questions_path = session_dir / "questions.md"
-                        questions_path.write_text(questions, encoding='utf-8')
-                        session_result['questions_path'] = questions_path
-                    else:
-                        questions = session_result.get('questions', '')
-                        if not questions:
-                            questions = session_result['questions_path'].read_text(encoding='utf-8')
-                    
-                    # Calculate quality scores for generated content
-                    from src.utils.content_analysis import analyze_lecture, analyze_questions, analyze_study_notes
-                    
-                    session_quality = {}
-                    content_reqs = self.config_loader.get_content_requirements()
-                    
-                    if 'lecture_path' in session_result:
-                        lecture_metrics = analyze_lecture(lecture, requirements=content_reqs.get('lecture', {}))
-                        session_quality['lecture'] = calculate_quality_score(lecture_metrics, content_reqs.get('lecture', {}), "lecture")
-                    
-                    if 'questions_path' in session_result:
-                        questions_metrics = analyze_questions(questions)
-                        num_questions_val = session_data.get('num_questions', 10)
-                        session_quality['questions'] = calculate_quality_score(questions_metrics, {'num_questions': num_questions_val}, "questions")
-                    
-                    if 'notes_path' in session_result:
-                        notes_metrics = analyze_study_notes(notes, requirements=content_reqs.get('study_notes', {}))
-                        session_quality['study_notes'] = calculate_quality_score(notes_metrics, content_reqs.get('study_notes', {}), "study_notes")
-                    
-                    session_result['quality_scores'] = session_quality
-                    quality_results.append(session_quality)
-                    
-                    session_result['status'] = 'success'
-                    logger.info(f"  ✓ Session {session_num} completed")
-                    
-                except Exception as e:
-                    # Provide actionable error message with recovery suggestions
-                    error_msg = str(e)
-                    recovery_suggestions = []
-                    
-                    # Extract request ID from LLMError if present
-                    request_id = None
-                    if isinstance(e, LLMError):
-                        if "[" in error_msg and "]" in error_msg:
-                            try:
-                                request_id = error_msg[error_msg.find("[")+1:error_msg.find("]")]
-                            except (ValueError, IndexError):
-                                pass
-                    
-                    # Determine error type and material type context
-                    error_type = type(e).__name__
-                    material_types_generated = []
-                    if 'lecture_path' in session_result:
-                        material_types_generated.append('lecture')
-                    if 'lab_path' in session_result:
-                        material_types_generated.append('lab')
-                    if 'notes_path' in session_result:
-                        material_types_generated.append('study_notes')
-                    if 'diagram_paths' in session_result and session_result['diagram_paths']:
-                        material_types_generated.append('diagrams')
-                    if 'questions_path' in session_result:
-                        material_types_generated.append('questions')
-                    
-                    material_context = f"Generated: {', '.join(material_types_generated)}" if material_types_generated else "No materials generated"
-                    
-                    # Categorize error and provide specific suggestions
-                    is_timeout = "timeout" in error_msg.lower() or "stream timeout" in error_msg.lower()
-                    is_connection = "connection" in error_msg.lower() or "unreachable" in error_msg.lower()
-                    is_validation = "validation" in error_msg.lower() or "format" in error_msg.lower()
-                    
-                    if is_timeout:
-                        recovery_suggestions.extend([
-                            "1. Increase timeout in config/llm_config.yaml for this operation",
-                            "2. Check Ollama service status: curl http://localhost:11434/api/version",
-                            "3. Consider using a faster model or checking system resources",
-                            "4. See docs/TROUBLESHOOTING.md for timeout resolution steps",
-                            "5. Retry this session: the pipeline will automatically retry transient failures"
-                        ])
-                    elif is_connection:
-                        recovery_suggestions.extend([
-                            "1. Check if Ollama is running: ollama serve",
-                            "2. Verify Ollama is accessible: curl http://localhost:11434/api/version",
-                            "3. Check network connectivity and firewall settings",
-                            "4. Retry this session: the pipeline will automatically retry transient failures"
-                        ])
-                    elif is_validation:
-                        recovery_suggestions.extend([
-                            "1. Review generated content for format issues",
-                            "2. Check content requirements in config/llm_config.yaml",
-                            "3. Regenerate this session with --skip-existing to preserve other content"
-                        ])
-                    else:
-                        recovery_suggestions.extend([
-                            "1. Check logs for detailed error information",
-                            "2. Verify configuration files are valid",
-                            "3. Try regenerating this session: uv run python3 scripts/04_generate_primary.py --modules <module_id>"
-                        ])
-                    
-                    # Log detailed error information
-                    logger.error(f"  ✗ Error processing session {session_num}: {error_type}")
-                    logger.error(f"     Module: {module_name} (ID: {module_id})")
-                    logger.error(f"     Session: {session_title}")
-                    logger.error(f"     {material_context}")
-                    if request_id:
-                        logger.error(f"     Request ID: {request_id} (filter logs: grep '[{request_id}]' output/logs/*.log)")
-                    logger.error(f"     Error: {error_msg}")
-                    if recovery_suggestions:
-                        logger.error("  Recovery suggestions:")
-                        for suggestion in recovery_suggestions:
-                            logger.error(f"    {suggestion}")
-                    
-                    session_result['status'] = 'error'
-                    session_result['error'] = error_msg
-                    session_result['error_type'] = error_type
-                    session_result['request_id'] = request_id
-                    session_result['material_types_generated'] = material_types_generated
-                    session_result['recovery_suggestions'] = recovery_suggestions
-                
-                results.append(session_result)
+        
+        logger.info(f"\n[{job['number']}/{plan['total_sessions']}] Session {session_num}: {session_title}")
+        
+        # Check if content already exists (incremental generation / resume capability)
+        existing_files = []
+        if skip_existing:
+            required_files = ['lecture.md', 'lab.md', 'study_notes.md', 'questions.md']
+            existing_files = [f for f in required_files if (session_dir / f).exists()]
+            if len(existing_files) == len(required_files):
+                logger.info(f"  ⏭️  Skipping session {session_num} (all files exist)")
+                session_result['status'] = 'skipped'
+                session_result['reason'] = 'files_exist'
+                return session_result
+            elif existing_files:
+                # Resume: existing files are loaded instead of generated
+                logger.info(f"  ⚠️  Some files exist for session {session_num}, will regenerate missing files")
+        
+        # Every operation of this session starts with the same course/session prefix
+        prefix = self._build_session_prefix(plan['course_metadata'], module, session, plan['total_sessions'])
+        graph = TaskGraph()
+        nodes = self._add_session_nodes(
+            graph, module, session, session_dir, prefix, existing_files, len(plan['modules']), plan['total_sessions'],
+            incremental=incremental,
+            journal=journal
+        )
+        
+        def on_node_done(done: int, total: int, result: TaskResult) -> None:
+            status = "✓" if result.ok else ("⏭️" if result.skipped else "✗")
+            logger.info(f"  {status} {result.label} finished in {result.seconds:.1f}s ({done}/{total})")
+        
+        node_results = graph.run(max_workers or self.llm_client.concurrency.max_parallel, progress=on_node_done)
+        self._finish_session(session_result, nodes, node_results)
+        (error_collector or self.error_collector).merge(nodes['error_collector'])
+        session_result['up_to_date'] = nodes['up_to_date']
+        session_result['artifact_count'] = len(graph)
+        return session_result
+    
+    def summarize_sessions(
+        self,
+        plan: Dict[str, Any],
+        results: List[Dict[str, Any]],
+        incremental: bool = False
+    ) -> None:
+        """Log the quality, consistency and stage summaries of generated sessions.
+        
+        Args:
+            plan: Result of plan_sessions()
+            results: Session results from generate_session()
+            incremental: Whether artifacts up to date were kept (logs how many)
+        """
+        quality_results = [r['quality_scores'] for r in results if r.get('status') == 'success']
+        if incremental:
+            up_to_date = sum(len(r.get('up_to_date', [])) for r in results)
+            total = sum(r.get('artifact_count', 0) for r in results)
+            logger.info(f"⏭️  {up_to_date}/{total} artifacts up to date, {total - up_to_date} regenerated")
         
         # Summary statistics
         successful = sum(1 for r in results if r.get('status') == 'success')
@@ -839,12 +1075,15 @@ class ContentGenerator:
             logger.info("=" * 60)
         
         # Cross-session consistency check
-        consistency_result = validate_cross_session_consistency(outline_data)
+        consistency_result = validate_cross_session_consistency(plan['outline_data'])
         if consistency_result['total_issues'] > 0:
             logger.warning(f"Cross-session consistency: {consistency_result['total_issues']} issues found")
             for rec in consistency_result['recommendations'][:3]:
                 logger.info(f"  Recommendation: {rec}")
         
+        # Report prefill work saved by shared session prefixes
+        self.llm_client.log_prefix_reuse()
+        
         # Generate stage summary with error collector
         generate_stage_summary(
             self.error_collector,
@@ -852,11 +1091,80 @@ class ContentGenerator:
             logger,
             total_items=len(results),
             successful_items=successful,
-            failed_items=failed
+            failed_items=failed,
+            llm_metrics=self.llm_client.metrics.get_summary(),
+            model_tiers=self.llm_client.tiers.get_stats()
         )
+    
+    def stage2_generate_content_by_session(
+        self,
+        module_ids: Optional[List[int]] = None,
+        skip_existing: bool = False,
+        max_workers: Optional[int] = None,
+        incremental: bool = False,
+        journal: Optional[RunJournal] = None,
+        workers: int = 1
+    ) -> List[Dict[str, Any]]:
+        """Stage 2: Generate PRIMARY content per SESSION (not per module).
         
-        return results
+        Each session's artifacts run as a task graph (see generate_session());
+        with workers > 1 several sessions run at once, and each session's
+        logs are written as one block, in outline order.
+        
+        Args:
+            module_ids: List of module IDs to process. If None, processes all.
+            skip_existing: Skip sessions whose files all exist and load
+                          existing files instead of regenerating them
+            max_workers: Artifacts generated at once within a session
+                        (default: the LLM client's max_parallel)
+            incremental: Regenerate only artifacts whose inputs changed since
+                        they were built (see manifest.py); changes propagate
+                        to downstream artifacts
+            journal: Optional run journal (see journal.py); artifacts it shows
+                    finished are kept and partial files of unfinished ones
+                    are removed first
+            workers: Sessions generated at once (default: 1, one after another)
+                    
+        Returns:
+            List of results for each session
+        """
+        log_section_header(logger, "STAGE 2: Generating Primary Content (Session-Based)", major=True)
+        
+        plan = self.plan_sessions(module_ids)
+        jobs = plan['sessions']
+        
+        if journal is not None:
+            journal.cleanup()
         
+        options = dict(skip_existing=skip_existing, max_workers=max_workers, incremental=incremental, journal=journal)
+        if workers <= 1:
+            results = [self.generate_session(plan, job, **options) for job in jobs]
+        else:
+            # Sessions run concurrently with their own collectors; each
+            # session's logs are held back and written as one section, in order
+            collectors = [ErrorCollector() for _ in jobs]
+            with OrderedLogSections() as sections:
+                def session_task(index: int) -> Dict[str, Any]:
+                    try:
+                        with sections.capture(index):
+                            return self.generate_session(plan, jobs[index], error_collector=collectors[index], **options)
+                    finally:
+                        sections.close(index)
+                
+                batch = run_batch(
+                    [lambda index=index: session_task(index) for index in range(len(jobs))],
+                    workers,
+                    labels=[f"m{job['module'].get('module_id')}s{job['session'].get('session_number')}" for job in jobs],
+                )
+            # Fold per-session issues into the stage collector in session
+            # order, as a sequential run would have recorded them
+            for collector in collectors:
+                self.error_collector.merge(collector)
+            results = [result.result() for result in batch]
+        
+        self.summarize_sessions(plan, results, incremental=incremental)
+        return results
+    
     def run(
         self,
         generate_outline: bool = True,
@@ -0,0 +1,236 @@
+"""Dependency-graph scheduling for generation tasks.
+
+Stage 2 used to generate each session's lecture, lab, study notes, diagrams and
+questions strictly in order, so the run spent most of its time waiting on one
+request at a time. A TaskGraph models a session's artifacts as nodes with
+explicit dependencies (lab, notes and questions need the lecture; diagrams
+need only the outline) and runs every node whose dependencies are done on a
+bounded worker pool, so independent artifacts of the session overlap.
+
+Stage 2 builds one graph per session (ContentGenerator.generate_session()).
+Sessions overlap only when several run at once: --workers > 1 runs sessions
+through run_batch(), each with its own graph.
+
+- Ready nodes start in the order they were added (e.g., the lecture before the
+  diagrams, so its dependents are unblocked as early as possible).
+- A node receives the values of its dependencies; if a dependency fails, the
+  node and everything downstream of it are skipped with DependencyFailedError.
+- Worker threads get a copy of the caller's context (shared prefix,
+  cancellation token, log section), and an interrupt cancels running requests
+  as in run_batch().
+
+The actual limit on requests to Ollama stays with each endpoint's concurrency
+governor; max_workers only bounds the graph's worker threads.
+"""
+
+import contextvars
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.llm.cancellation import CancellationToken, cancellation_scope
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyFailedError(RuntimeError):
+    """Raised in place of running a node whose dependency failed."""
+
+
+@dataclass
+class TaskNode:
+    """One unit of work in a TaskGraph.
+
+    Attributes:
+        key: Unique node key (e.g., "m1s2:lecture")
+        func: Callable receiving a dict of dependency key to value
+        deps: Keys of the nodes this one needs
+        label: Name used in logs and progress (default: key)
+        order: Position in the graph; lower runs first when several are ready
+    """
+
+    key: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    label: Optional[str] = None
+    order: int = 0
+
+
+@dataclass
+class TaskResult:
+    """Outcome of one node.
+
+    Attributes:
+        key: Node key
+        label: Node name for logs and progress
+        value: Return value (None if the node failed or was skipped)
+        error: Exception raised by the node, or DependencyFailedError if skipped
+        seconds: Time the node took
+        skipped: Whether the node never ran because a dependency failed
+    """
+
+    key: str
+    label: str
+    value: Any = None
+    error: Optional[Exception] = field(default=None, repr=False)
+    seconds: float = 0.0
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether the node succeeded."""
+        return self.error is None
+
+    def result(self) -> Any:
+        """Get the value, raising the node's exception if it failed."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+ProgressCallback = Callable[[int, int, TaskResult], None]
+
+
+class TaskGraph:
+    """Directed acyclic graph of tasks run on a bounded worker pool.
+
+    Dependencies must be added before the nodes that need them, so the graph
+    is acyclic by construction.
+
+    Attributes:
+        nodes: Node key to TaskNode, in insertion order
+    """
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self.nodes: Dict[str, TaskNode] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(
+        self,
+        key: str,
+        func: Callable[[Dict[str, Any]], Any],
+        deps: Sequence[str] = (),
+        label: Optional[str] = None
+    ) -> str:
+        """Add a node.
+
+        Args:
+            key: Unique node key
+            func: Callable receiving a dict of dependency key to value
+            deps: Keys of nodes already in the graph that this node needs
+            label: Name used in logs and progress (default: key)
+
+        Returns:
+            The node key (for use in later deps)
+
+        Raises:
+            ValueError: If the key exists or a dependency is unknown
+        """
+        if key in self.nodes:
+            raise ValueError(f"Duplicate task key: {key}")
+        unknown = [dep for dep in deps if dep not in self.nodes]
+        if unknown:
+            raise ValueError(f"Task {key} depends on unknown tasks: {', '.join(unknown)}")
+        self.nodes[key] = TaskNode(key, func, tuple(deps), label or key, len(self.nodes))
+        return key
+
+    def run(
+        self,
+        max_workers: int,
+        progress: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, TaskResult]:
+        """Run every node once its dependencies have succeeded.
+
+        Args:
+            max_workers: Maximum nodes running at once
+            progress: Optional callback(done, total, result) called in the
+                     calling thread as each node finishes or is skipped
+            cancel_token: Optional token cancelling the run (default: the
+                         active token, if any)
+
+        Returns:
+            Node key to TaskResult, in insertion order. Exceptions raised by
+            nodes are stored, not raised.
+        """
+        total = len(self.nodes)
+        if not total:
+            return {}
+        workers = max(1, min(int(max_workers), total))
+        run_start = time.time()
+        logger.info(f"🧩 Task graph of {total} nodes ({workers} at a time)")
+
+        results: Dict[str, TaskResult] = {}
+        waiting_on = {key: set(node.deps) for key, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {key: [] for key in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.deps:
+                dependents[dep].append(node.key)
+        ready: List[Tuple[int, str]] = [(node.order, key) for key, node in self.nodes.items() if not node.deps]
+        heapq.heapify(ready)
+        running: Dict[Future, str] = {}
+
+        def run_node(node: TaskNode, inputs: Dict[str, Any]) -> TaskResult:
+            start = time.time()
+            try:
+                value = node.func(inputs)
+            except Exception as e:
+                return TaskResult(node.key, node.label, error=e, seconds=time.time() - start)
+            return TaskResult(node.key, node.label, value=value, seconds=time.time() - start)
+
+        def finish(result: TaskResult) -> None:
+            results[result.key] = result
+            if progress is not None:
+                progress(len(results), total, result)
+            for key in dependents[result.key]:
+                if key in results:
+                    continue
+                if not result.ok:
+                    # Skip everything downstream of a failed node
+                    error = DependencyFailedError(f"{self.nodes[key].label} skipped: {result.label} failed")
+                    finish(TaskResult(key, self.nodes[key].label, error=error, skipped=True))
+                    continue
+                waiting_on[key].discard(result.key)
+                if not waiting_on[key]:
+                    heapq.heappush(ready, (self.nodes[key].order, key))
+
+        scope_token = cancel_token.child() if cancel_token is not None else None
+        with cancellation_scope(scope_token) as token, ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                while ready or running:
+                    while ready and len(running) < workers:
+                        _, key = heapq.heappop(ready)
+                        node = self.nodes[key]
+                        inputs = {dep: results[dep].value for dep in node.deps}
+                        # Copy the context so worker threads see the shared prefix and the token
+                        running[executor.submit(contextvars.copy_context().run, run_node, node, inputs)] = key
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        del running[future]
+                        result = future.result()
+                        if not result.ok:
+                            logger.warning(f"🧩 {result.label} failed after {result.seconds:.1f}s: {result.error}")
+                        finish(result)
+            except BaseException:
+                # Interrupted: disconnect running requests and drop queued ones
+                for future in running:
+                    future.cancel()
+                token.cancel("task graph interrupted")
+                raise
+            finally:
+                if scope_token is not None:
+                    scope_token.detach()
+
+        failed = sum(1 for result in results.values() if not result.ok and not result.skipped)
+        skipped = sum(1 for result in results.values() if result.skipped)
+        logger.info(
+            f"🧩 Task graph done in {time.time() - run_start:.1f}s: "
+            f"{total - failed - skipped}/{total} succeeded, {failed} failed, {skipped} skipped"
+        )
+        return {key: results[key] for key in self.nodes}
@@ -0,0 +1,396 @@
+"""Lease-based work queue for spreading sessions across worker processes.
+
+Stages 04 and 05 (and BatchCourseProcessor, which runs them per course)
+process every session inside one process, so a course with hundreds of
+sessions could only use one machine. Worker processes started with
+`--worker` share a queue instead: each one leases a task (one session), keeps
+the lease alive with a heartbeat while it works, and marks the task done or
+failed. A worker that dies stops heartbeating; when its lease expires the
+task goes back to the queue for another worker, up to max_attempts.
+
+Every worker enqueues the full task list when it starts (tasks already in the
+queue are left as they are), so the same command can be started on any
+number of machines that share the output directory. The queue is a single
+SQLite file in rollback-journal mode; the shared filesystem must support file
+locks, and lease expiry assumes the workers' clocks roughly agree.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = Path("output/.work_queue.sqlite")
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (queue, key)
+)
+"""
+
+
+def default_worker_id() -> str:
+    """Create a worker ID naming this machine and process.
+
+    Returns:
+        Worker ID such as "gpu-box-2:41234"
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Task:
+    """A leased task.
+
+    Attributes:
+        id: Task row ID
+        queue: Queue name (e.g., "04_generate_primary:outline.json")
+        key: Task key, unique within the queue (e.g., "module_01/session_02")
+        payload: JSON payload given when the task was enqueued
+        attempts: Attempts so far, including this one
+        lease_expires: Time (epoch seconds) the lease runs out unless renewed
+    """
+    id: int
+    queue: str
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+    lease_expires: float
+
+
+class WorkQueue:
+    """SQLite-backed task queue with leases, heartbeats and requeue.
+
+    Every call opens its own connection, so one WorkQueue can be used from
+    several threads and any number of processes can share the file.
+
+    Attributes:
+        path: SQLite database file
+        lease_seconds: How long a lease lasts without a heartbeat
+        max_attempts: Attempts of a task before it is marked failed
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_QUEUE_PATH,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ):
+        """Open (and if needed create) a queue.
+
+        Args:
+            path: SQLite database file (default: output/.work_queue.sqlite)
+            lease_seconds: How long a lease lasts without a heartbeat
+            max_attempts: Attempts of a task before it is marked failed
+        """
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction, holding the database lock."""
+        conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def enqueue(self, queue: str, tasks: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Add tasks that are not in the queue yet.
+
+        Args:
+            queue: Queue name
+            tasks: (key, payload) pairs; keys already in the queue are
+                   skipped whatever their status
+
+        Returns:
+            Number of tasks added
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (queue, key, payload, max_attempts, updated) VALUES (?, ?, ?, ?, ?)",
+                [(queue, key, json.dumps(payload), self.max_attempts, now) for key, payload in tasks]
+            )
+            return conn.total_changes - before
+
+    def _requeue_expired(self, conn: sqlite3.Connection, queue: str, now: float) -> int:
+        """Return tasks whose lease expired to the queue (or fail them)."""
+        cursor = conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+            "error = 'lease of ' || worker || ' expired', worker = NULL, lease_expires = NULL, updated = ? "
+            "WHERE queue = ? AND status = ? AND lease_expires < ?",
+            (FAILED, PENDING, now, queue, LEASED, now)
+        )
+        return cursor.rowcount
+
+    def lease(self, queue: str, worker: str) -> Optional[Task]:
+        """Lease the oldest pending task.
+
+        Tasks whose lease expired are requeued first.
+
+        Args:
+            queue: Queue name
+            worker: ID of the leasing worker
+
+        Returns:
+            The leased Task, or None if no task is pending
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            expired = self._requeue_expired(conn, queue, now)
+            row = conn.execute(
+                "SELECT id, key, payload, attempts FROM tasks WHERE queue = ? AND status = ? ORDER BY id LIMIT 1",
+                (queue, PENDING)
+            ).fetchone()
+            if row is not None:
+                expires = now + self.lease_seconds
+                conn.execute(
+                    "UPDATE tasks SET status = ?, attempts = attempts + 1, worker = ?, lease_expires = ?, updated = ? "
+                    "WHERE id = ?",
+                    (LEASED, worker, expires, now, row[0])
+                )
+        if expired:
+            logger.warning(f"⏰ Requeued {expired} task(s) whose worker stopped heartbeating")
+        if row is None:
+            return None
+        task_id, key, payload, attempts = row
+        return Task(task_id, queue, key, json.loads(payload), attempts + 1, expires)
+
+    def heartbeat(self, task: Task, worker: str) -> bool:
+        """Renew a lease.
+
+        Args:
+            task: Leased task
+            worker: ID of the worker holding the lease
+
+        Returns:
+            False if the lease was lost (it expired and was requeued)
+        """
+        now = time.time()
+        expires = now + self.lease_seconds
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND status = ? AND worker = ?",
+                (expires, now, task.id, LEASED, worker)
+            )
+        if cursor.rowcount != 1:
+            return False
+        task.lease_expires = expires
+        return True
+
+    def complete(self, task: Task, worker: str) -> bool:
+        """Mark a leased task done.
+
+        Args:
+            task: Leased task
+            worker: ID of the worker holding the lease
+
+        Returns:
+            False if the lease was lost before completion
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, error = NULL, updated = ? "
+                "WHERE id = ? AND status = ? AND worker = ?",
+                (DONE, time.time(), task.id, LEASED, worker)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task: Task, worker: str, error: str) -> Optional[str]:
+        """Record a failed attempt; the task is requeued until max_attempts.
+
+        Args:
+            task: Leased task
+            worker: ID of the worker holding the lease
+            error: Error message
+
+        Returns:
+            The task's new status (PENDING or FAILED), or None if the lease was lost
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+                "worker = NULL, lease_expires = NULL, error = ?, updated = ? "
+                "WHERE id = ? AND status = ? AND worker = ?",
+                (FAILED, PENDING, error, time.time(), task.id, LEASED, worker)
+            )
+            if cursor.rowcount != 1:
+                return None
+            return conn.execute("SELECT status FROM tasks WHERE id = ?", (task.id,)).fetchone()[0]
+
+    def counts(self, queue: str) -> Dict[str, int]:
+        """Count a queue's tasks by status.
+
+        Args:
+            queue: Queue name
+
+        Returns:
+            Dict with the number of pending, leased, done and failed tasks
+        """
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._transaction() as conn:
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE queue = ? GROUP BY status", (queue,)
+            ):
+                counts[status] = count
+        return counts
+
+    def failures(self, queue: str) -> List[Tuple[str, str]]:
+        """Get the tasks that failed for good.
+
+        Args:
+            queue: Queue name
+
+        Returns:
+            (key, last error) pairs in enqueue order
+        """
+        with self._transaction() as conn:
+            return list(conn.execute(
+                "SELECT key, COALESCE(error, '') FROM tasks WHERE queue = ? AND status = ? ORDER BY id",
+                (queue, FAILED)
+            ))
+
+
+class LeaseHeartbeat:
+    """Renew a task's lease from a background thread while it is worked on.
+
+    Attributes:
+        lost: True once a renewal found the lease gone
+    """
+
+    def __init__(self, queue: WorkQueue, task: Task, worker: str, interval: Optional[float] = None):
+        """Initialize the heartbeat.
+
+        Args:
+            queue: Queue holding the task
+            task: Leased task
+            worker: ID of the worker holding the lease
+            interval: Seconds between renewals (default: a third of the lease)
+        """
+        self.queue = queue
+        self.task = task
+        self.worker = worker
+        self.interval = interval if interval is not None else queue.lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"heartbeat-{task.key}", daemon=True)
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.task, self.worker):
+                    self.lost = True
+                    return
+            except sqlite3.Error as e:
+                # A busy database is retried at the next beat; the lease
+                # only runs out after several missed beats
+                logger.warning(f"⚠️  Heartbeat for {self.task.key} failed: {e}")
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(
+    queue: WorkQueue,
+    name: str,
+    handler: Callable[[Task], bool],
+    worker: Optional[str] = None,
+    poll_interval: float = 5.0
+) -> Dict[str, int]:
+    """Lease and run tasks until none are pending or leased by other workers.
+
+    While other workers hold leases, the worker keeps polling so it can take
+    over tasks whose lease expires.
+
+    Args:
+        queue: Work queue
+        name: Queue name
+        handler: Runs one task; returns True on success. False or an
+                 exception fails the attempt (requeued until max_attempts)
+        worker: Worker ID (default: hostname:pid)
+        poll_interval: Seconds between polls while no task is pending
+
+    Returns:
+        Dict with the number of tasks this worker completed ("done"),
+        attempts that failed ("failed") and leases it lost ("lost")
+    """
+    worker = worker or default_worker_id()
+    stats = {"done": 0, "failed": 0, "lost": 0}
+    while True:
+        task = queue.lease(name, worker)
+        if task is None:
+            counts = queue.counts(name)
+            if counts[LEASED] == 0 and counts[PENDING] == 0:
+                return stats
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"📬 {worker} leased {task.key} (attempt {task.attempts})")
+        heartbeat = LeaseHeartbeat(queue, task, worker)
+        try:
+            with heartbeat:
+                ok = handler(task)
+            error = None if ok else "task reported failure"
+        except Exception as e:  # noqa: BLE001 - any task error fails the attempt
+            logger.error(f"❌ Task {task.key} raised {type(e).__name__}: {e}", exc_info=True)
+            ok, error = False, f"{type(e).__name__}: {e}"
+
+        if ok and queue.complete(task, worker):
+            stats["done"] += 1
+            continue
+        status = None if ok else queue.fail(task, worker, error)
+        if status is None:
+            # The lease expired mid-task and another worker took the task over;
+            # atomic writes keep the shared files whole either way
+            logger.warning(f"⚠️  Lost the lease on {task.key}; another worker owns it now")
+            stats["lost"] += 1
+        elif status == PENDING:
+            logger.warning(f"🔁 Task {task.key} failed (attempt {task.attempts}), requeued: {error}")
+            stats["failed"] += 1
+        else:
+            logger.error(f"❌ Task {task.key} failed after {task.attempts} attempt(s): {error}")
+            stats["failed"] += 1
@@ -0,0 +1,89 @@
+"""JSON schema for schema-constrained outline generation.
+
+With outline_generation.structured_output enabled, the schema built here is
+sent as Ollama's ``format`` field. Ollama then constrains decoding to JSON
+matching it, so the outline needs neither the extraction strategies of
+OutlineGenerator._extract_json_from_response nor retries for prose, code
+fences or missing fields. The required fields mirror
+OutlineGenerator._validate_outline_json.
+"""
+
+from typing import Any, Dict
+
+
+def _string_list(bounds: Dict[str, int]) -> Dict[str, Any]:
+    """Schema for a list of strings with min/max item bounds.
+
+    Args:
+        bounds: Dict with optional min and max item counts
+
+    Returns:
+        JSON schema for the list
+    """
+    schema: Dict[str, Any] = {"type": "array", "items": {"type": "string"}}
+    if bounds.get('min') is not None:
+        schema["minItems"] = int(bounds['min'])
+    if bounds.get('max') is not None:
+        schema["maxItems"] = int(bounds['max'])
+    return schema
+
+
+def build_outline_schema(num_modules: int, bounds: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Build the JSON schema of a course outline.
+
+    Args:
+        num_modules: Exact number of modules required
+        bounds: Item bounds per session field (subtopics, learning_objectives,
+               key_concepts), as returned by ConfigLoader.get_outline_bounds()
+
+    Returns:
+        JSON schema dict suitable for Ollama's format field
+    """
+    session_schema = {
+        "type": "object",
+        "properties": {
+            "session_number": {"type": "integer"},
+            "session_title": {"type": "string"},
+            "subtopics": _string_list(bounds.get('subtopics', {})),
+            "learning_objectives": _string_list(bounds.get('learning_objectives', {})),
+            "key_concepts": _string_list(bounds.get('key_concepts', {})),
+            "rationale": {"type": "string"},
+        },
+        "required": [
+            "session_number", "session_title", "subtopics",
+            "learning_objectives", "key_concepts", "rationale",
+        ],
+    }
+    module_schema = {
+        "type": "object",
+        "properties": {
+            "module_id": {"type": "integer"},
+            "module_name": {"type": "string"},
+            "module_description": {"type": "string"},
+            "sessions": {"type": "array", "items": session_schema, "minItems": 1},
+        },
+        "required": ["module_id", "module_name", "module_description", "sessions"],
+    }
+    return {
+        "type": "object",
+        "properties": {
+            "course_metadata": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "level": {"type": "string"},
+                    "duration_weeks": {"type": "integer"},
+                    "total_sessions": {"type": "integer"},
+                    "total_modules": {"type": "integer"},
+                },
+                "required": ["name", "level", "duration_weeks", "total_sessions", "total_modules"],
+            },
+            "modules": {
+                "type": "array",
+                "items": module_schema,
+                "minItems": int(num_modules),
+                "maxItems": int(num_modules),
+            },
+        },
+        "required": ["course_metadata", "modules"],
+    }
@@ -11,16 +11,19 @@ import re
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from src.config.loader import ConfigLoader
-from src.llm.client import OllamaClient
-from src.utils.helpers import ensure_directory, format_timestamp
+from src.llm.client import GuardTrippedError, OllamaClient
+from src.llm.guards import StreamGuard, json_object_guard
+from src.llm.json_stream import JSONStreamGuard
+from src.utils.helpers import atomic_write_text, ensure_directory, format_timestamp
 from src.utils.logging_setup import (
     log_section_header,
     log_parameters,
     log_validation_results,
 )
+from src.generate.stages.outline_schema import build_outline_schema
 from src.generate.stages.outline_quality import (
     validate_outline_quality
 )
@@ -233,6 +236,23 @@ class OutlineGenerator:
         logger.info(f"Normalized session numbering: 1-{session_counter - 1} across {len(modules)} modules")
         return data
     
+    def _outline_guards(self, structured_output: bool) -> List[StreamGuard]:
+        """Create stream guards for one outline generation attempt.
+        
+        Attempts that cannot produce JSON are aborted as soon as that is visible
+        in the stream instead of after the full generation.
+        
+        Args:
+            structured_output: Whether the attempt is schema-constrained (pure JSON
+                              expected, validated character by character)
+            
+        Returns:
+            Fresh guards for the attempt
+        """
+        if structured_output:
+            return [JSONStreamGuard()]
+        return [json_object_guard()]
+    
     def _validate_outline_json(self, data: Dict[str, Any], expected_modules: int) -> bool:
         """Validate the structure and completeness of outline JSON.
         
@@ -621,6 +641,13 @@ class OutlineGenerator:
         }
         logger.info("Using optimized parameters for outline generation: num_ctx=32000, num_predict=4000 (reduced from default 128K/64K for faster generation, format:json removed for compatibility)")
         
+        # Schema-constrained generation: Ollama only decodes JSON matching the
+        # outline schema, and the stream is validated as it arrives
+        structured_output = self.config_loader.get_outline_structured_output()
+        if structured_output:
+            outline_params["format"] = build_outline_schema(expected_module_count, bounds)
+            logger.info("Structured output enabled: outline JSON schema passed to Ollama (format), stream validated incrementally")
+        
         # Check Ollama connection and performance before generation
         logger.info("Checking Ollama service connection and performance...")
         is_connected, response_time = self.llm_client.check_connection(timeout=5)
@@ -659,6 +686,9 @@ class OutlineGenerator:
         else:
             logger.debug("No models currently loaded (GPU will be used when model loads)")
         
+        max_retries = 3
+        model = self.llm_client.model_for("outline")  # Tier model, escalated after failed validations
+        
         # Track generation time
         generation_start = time.time()
         
@@ -669,7 +699,9 @@ class OutlineGenerator:
                 system_prompt=system_prompt,
                 params=outline_params,
                 operation="outline",
-                timeout_override=operation_timeout
+                model=model,
+                timeout_override=operation_timeout,
+                guards=self._outline_guards(structured_output)
             )
             
             generation_time = time.time() - generation_start
@@ -706,6 +738,11 @@ class OutlineGenerator:
             else:
                 logger.info(f"Generation performance: {generation_time:.2f}s (within expected range)")
             
+        except GuardTrippedError as e:
+            generation_time = time.time() - generation_start
+            logger.warning(f"LLM generation aborted after {generation_time:.2f} seconds: {e.reason}")
+            raw_response = e.partial_text
+            
         except Exception as e:
             generation_time = time.time() - generation_start
             logger.error(f"LLM generation failed after {generation_time:.2f} seconds: {e}")
@@ -734,7 +771,6 @@ class OutlineGenerator:
         outline_data = self._extract_json_from_response(raw_response)
         
         # Multi-strategy retry if extraction or validation fails
-        max_retries = 3
         retry_attempt = 0
         
         while (outline_data is None or 
@@ -742,7 +778,9 @@ class OutlineGenerator:
               retry_attempt < max_retries:
             
             retry_attempt += 1
-            logger.warning(f"Attempt {retry_attempt}/{max_retries}: {'JSON extraction' if outline_data is None else 'JSON validation'} failed. Retrying...")
+            failure = f"{'JSON extraction' if outline_data is None else 'JSON validation'} failed"
+            logger.warning(f"Attempt {retry_attempt}/{max_retries}: {failure}. Retrying...")
+            model = self.llm_client.escalate_model("outline", model, [failure])
             
             # Strategy 1: Retry with more explicit prompt (same params)
             if retry_attempt == 1:
@@ -760,6 +798,9 @@ class OutlineGenerator:
                 retry_params = outline_params.copy()
                 retry_params["num_predict"] = 8000  # Further increase
                 logger.info("Retry strategy 3: Simplified prompt and increased num_predict to 8000")
+                if retry_params.pop("format", None) is not None:
+                    # Last resort for models that cannot follow the schema grammar
+                    logger.info("Retry strategy 3: Structured output disabled, using free-form JSON")
             
             try:
                 # Add exponential backoff
@@ -774,7 +815,9 @@ class OutlineGenerator:
                     system_prompt=retry_system_prompt,
                     params=retry_params,
                     operation="outline",
-                    timeout_override=operation_timeout
+                    model=model,
+                    timeout_override=operation_timeout,
+                    guards=self._outline_guards(structured_output) if retry_attempt < max_retries else None
                 )
                 
                 # Validate retry response length
@@ -1011,7 +1054,7 @@ class OutlineGenerator:
         }
         
         metadata_path = output_dir / f"{filename_base}_metadata.json"
-        metadata_path.write_text(json.dumps(metadata, indent=2), encoding='utf-8')
+        atomic_write_text(metadata_path, json.dumps(metadata, indent=2))
         
         return metadata_path
     
@@ -1048,7 +1091,7 @@ class OutlineGenerator:
         filename_base = filepath.stem
         
         # Write markdown file
-        filepath.write_text(outline, encoding='utf-8')
+        atomic_write_text(filepath, outline)
         abs_filepath = filepath.resolve()
         logger.info(f"Saved outline (markdown) to: {abs_filepath}")
         
@@ -1056,7 +1099,7 @@ class OutlineGenerator:
         saved_files = [abs_filepath]
         if json_data:
             json_filepath = filepath.with_suffix('.json')
-            json_filepath.write_text(json.dumps(json_data, indent=2), encoding='utf-8')
+            atomic_write_text(json_filepath, json.dumps(json_data, indent=2))
             abs_json_filepath = json_filepath.resolve()
             logger.info(f"Saved outline (JSON) to: {abs_json_filepath}")
             saved_files.append(abs_json_filepath)
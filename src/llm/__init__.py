@@ -1,12 +1,72 @@
 """LLM integration module for Ollama API client."""
 
-from src.llm.client import LLMError, OllamaClient
+from src.llm.async_client import AsyncOllamaClient
+from src.llm.batch import BatchResult, GenerationRequest, run_batch
+from src.llm.cache import ResponseCache, make_cache_key
+from src.llm.cancellation import CancellationToken, cancellation_scope
+from src.llm.client import GuardTrippedError, LLMError, OllamaClient, RequestCancelledError, StreamTimeoutError
+from src.llm.coalesce import RequestCoalescer, get_request_coalescer
+from src.llm.concurrency import ConcurrencyGovernor, get_concurrency_governor
+from src.llm.context_budget import ContextBudget, outline_digest
+from src.llm.connection_pool import OllamaConnectionPool
+from src.llm.guards import PrefixGuard, RepetitionGuard, StreamGuard, WordLimitGuard
 from src.llm.health import OllamaHealthMonitor
+from src.llm.hedging import HedgePolicy
+from src.llm.json_stream import JSONStreamGuard, JSONStreamParser
+from src.llm.latency import LatencyProfile, StreamDeadlines, get_latency_profile
+from src.llm.metrics import MetricsSink, RequestMetrics, get_metrics_sink
+from src.llm.prefix import SharedPrefix, build_session_prefix, shared_prefix
 from src.llm.request_handler import RequestHandler
+from src.llm.router import Endpoint, EndpointRouter
+from src.llm.sizing import RequestSizer, estimate_tokens
+from src.llm.tiers import ModelTiers, escalate_on_any_issue
+from src.llm.watchdog import RequestWatchdog, get_watchdog
 
 __all__ = [
     "OllamaClient",
+    "AsyncOllamaClient",
     "LLMError",
+    "StreamTimeoutError",
+    "GuardTrippedError",
+    "RequestCancelledError",
+    "GenerationRequest",
+    "BatchResult",
+    "run_batch",
+    "ResponseCache",
+    "make_cache_key",
+    "CancellationToken",
+    "cancellation_scope",
+    "RequestCoalescer",
+    "get_request_coalescer",
+    "ConcurrencyGovernor",
+    "get_concurrency_governor",
+    "OllamaConnectionPool",
+    "ContextBudget",
+    "outline_digest",
     "OllamaHealthMonitor",
+    "HedgePolicy",
+    "StreamGuard",
+    "PrefixGuard",
+    "WordLimitGuard",
+    "RepetitionGuard",
+    "JSONStreamParser",
+    "JSONStreamGuard",
+    "LatencyProfile",
+    "StreamDeadlines",
+    "get_latency_profile",
+    "MetricsSink",
+    "RequestMetrics",
+    "get_metrics_sink",
+    "SharedPrefix",
+    "build_session_prefix",
+    "shared_prefix",
     "RequestHandler",
+    "Endpoint",
+    "EndpointRouter",
+    "RequestSizer",
+    "estimate_tokens",
+    "ModelTiers",
+    "escalate_on_any_issue",
+    "RequestWatchdog",
+    "get_watchdog",
 ]
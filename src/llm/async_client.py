@@ -0,0 +1,160 @@
+"""Asyncio front end for OllamaClient.
+
+AsyncOllamaClient exposes `await generate()` and `async for token in
+stream()` for asyncio code. Each request runs OllamaClient.generate() on a
+worker thread, so it goes through the same response cache, request
+coalescing, endpoint router, hedging, concurrency governor, guards, retries
+and chunk parsing as every other request. Cancelling the awaiting task (or
+closing a stream early) cancels the request's CancellationToken, which
+disconnects it so Ollama stops generating.
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from src.llm.cancellation import CancellationToken, get_active_token
+from src.llm.client import LLMError, OllamaClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncOllamaClient:
+    """Asyncio interface to an OllamaClient.
+
+    Attributes:
+        client: The OllamaClient requests run on (its cache, router,
+               concurrency, metrics and tiers apply unchanged)
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        client: Optional[OllamaClient] = None,
+        **client_kwargs: Any
+    ):
+        """Initialize the client.
+
+        Args:
+            config: LLM configuration dictionary (as for OllamaClient)
+            client: Existing OllamaClient to share instead of creating one
+            **client_kwargs: Further OllamaClient arguments (max_retries,
+                            retry_delay, logging_config, content_requirements)
+
+        Raises:
+            ValueError: If neither config nor client is given
+        """
+        if client is None:
+            if config is None:
+                raise ValueError("AsyncOllamaClient needs an LLM config or an OllamaClient")
+            client = OllamaClient(config, **client_kwargs)
+        self.client = client
+
+    def close(self) -> None:
+        """Close pooled HTTP connections of the underlying client."""
+        self.client.close()
+
+    async def generate(self, prompt: str, **kwargs: Any) -> str:
+        """Generate text without blocking the event loop.
+
+        Args:
+            prompt: The user prompt
+            **kwargs: OllamaClient.generate() arguments (system_prompt,
+                     operation, params, use_cache, guards, cancel_token, ...)
+
+        Returns:
+            Generated text
+
+        Raises:
+            LLMError: If generation fails
+            asyncio.CancelledError: If the task was cancelled (the request
+                                   is disconnected)
+        """
+        return await self._run(prompt, kwargs)
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """Generate text and yield it piece by piece as it streams in.
+
+        Cache hits and coalesced requests arrive as one piece. If a retry or
+        hedge produces text that does not continue what was already yielded,
+        LLMError is raised. Leaving the loop early disconnects the request.
+
+        Args:
+            prompt: The user prompt
+            **kwargs: OllamaClient.generate() arguments
+
+        Yields:
+            New text since the previous piece
+
+        Raises:
+            LLMError: If generation fails
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def publish(text: Optional[str]) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, text)
+            except RuntimeError:
+                pass  # Loop closed after the consumer went away
+
+        task = asyncio.ensure_future(self._run(prompt, kwargs, on_text=publish, on_done=lambda: publish(None)))
+        emitted = ""
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                # Only continuations of what was yielded are new text; a retry
+                # starts over and is picked up once it gets past that point
+                if len(text) > len(emitted) and text.startswith(emitted):
+                    piece, emitted = text[len(emitted):], text
+                    yield piece
+            text = await task
+            if not text.startswith(emitted):
+                raise LLMError(f"Stream restarted with different output after {len(emitted)} chars were yielded")
+            if len(text) > len(emitted):
+                yield text[len(emitted):]
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def _run(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        on_text: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[], None]] = None
+    ) -> str:
+        """Run OllamaClient.generate() on a worker thread under a child token.
+
+        The thread sees the task's context (shared prefix, cancellation
+        scope); cancelling the task cancels the token.
+
+        Args:
+            prompt: The user prompt
+            kwargs: OllamaClient.generate() arguments
+            on_text: Optional streamed-text listener (see OllamaClient.generate())
+            on_done: Optional callback run on the thread when generate() returns
+
+        Returns:
+            Generated text
+        """
+        kwargs = dict(kwargs)
+        parent = kwargs.pop("cancel_token", None) or get_active_token()
+        token = parent.child() if parent is not None else CancellationToken()
+
+        def call() -> str:
+            try:
+                return self.client.generate(prompt, cancel_token=token, on_text=on_text, **kwargs)
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        try:
+            return await asyncio.to_thread(call)
+        except asyncio.CancelledError:
+            token.cancel("asyncio task cancelled")
+            raise
+        finally:
+            token.detach()
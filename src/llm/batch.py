@@ -0,0 +1,189 @@
+"""Bounded-concurrency batch execution.
+
+OllamaClient.generate_many() sends a list of GenerationRequest specs with at
+most max_concurrency in flight and returns one BatchResult per request, in
+input order, holding either the text or the exception. run_batch() is the
+underlying runner for arbitrary callables (e.g., format generators with their
+own validation and retries) so every batch shares the same worker handling:
+
+- Worker threads get a copy of the caller's context, so the active shared
+  prefix (src.llm.prefix) and cancellation token (src.llm.cancellation) apply
+  to their requests.
+- The batch runs under its own cancellation scope; if the caller is
+  interrupted (KeyboardInterrupt), requests still running are disconnected
+  and queued ones never start.
+- The progress callback runs in the calling thread, once per finished item.
+
+The actual limit on requests to Ollama stays with each endpoint's concurrency
+governor; max_concurrency only bounds the batch's worker threads.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from src.llm.cancellation import CancellationToken, cancellation_scope
+from src.llm.guards import StreamGuard
+from src.llm.prefix import SharedPrefix
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class GenerationRequest:
+    """One generate() call of a batch.
+
+    Attributes:
+        prompt: The user prompt
+        system_prompt: Optional system prompt
+        operation: Operation name (e.g., "application")
+        timeout: Optional timeout override in seconds
+        params: Optional generation parameters
+        prefix: Optional shared prefix (default: the active prefix)
+        guards: Optional stream guards (use new instances per request)
+        use_cache: Use the response cache and request coalescing
+        label: Name used in logs and progress (default: operation)
+        model: Optional model (default: the operation's tier model)
+    """
+
+    prompt: str
+    system_prompt: Optional[str] = None
+    operation: Optional[str] = None
+    timeout: Optional[int] = None
+    params: Optional[Dict[str, Any]] = None
+    prefix: Optional[SharedPrefix] = None
+    guards: Optional[Sequence[StreamGuard]] = None
+    use_cache: bool = True
+    label: Optional[str] = None
+    model: Optional[str] = None
+
+    @classmethod
+    def coerce(cls, spec: Any) -> "GenerationRequest":
+        """Convert a request spec to a GenerationRequest.
+
+        Args:
+            spec: GenerationRequest, or dict with the same keys ("system" is
+                  accepted for system_prompt)
+
+        Returns:
+            GenerationRequest
+
+        Raises:
+            TypeError: If spec is neither
+        """
+        if isinstance(spec, cls):
+            return spec
+        if isinstance(spec, dict):
+            spec = dict(spec)
+            if "system" in spec:
+                spec["system_prompt"] = spec.pop("system")
+            return cls(**spec)
+        raise TypeError(f"Expected GenerationRequest or dict, got {type(spec).__name__}")
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """Outcome of one batch item.
+
+    Attributes:
+        index: Position of the item in the batch
+        label: Item name for logs and progress
+        value: Return value (None if the item failed)
+        error: Exception raised by the item (None if it succeeded)
+        seconds: Time the item took
+    """
+
+    index: int
+    label: str
+    value: Optional[T] = None
+    error: Optional[Exception] = field(default=None, repr=False)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item succeeded."""
+        return self.error is None
+
+    def result(self) -> T:
+        """Get the value, raising the item's exception if it failed."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+ProgressCallback = Callable[[int, int, BatchResult], None]
+
+
+def run_batch(
+    tasks: Sequence[Callable[[], T]],
+    max_concurrency: int,
+    progress: Optional[ProgressCallback] = None,
+    labels: Optional[Sequence[str]] = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> List[BatchResult[T]]:
+    """Run callables with bounded concurrency and collect their outcomes.
+
+    Args:
+        tasks: Zero-argument callables
+        max_concurrency: Maximum tasks running at once
+        progress: Optional callback(done, total, result) called in the calling
+                 thread as each task finishes
+        labels: Optional task names for logs and progress (default: "item N")
+        cancel_token: Optional token cancelling the batch (default: the
+                     active token, if any)
+
+    Returns:
+        One BatchResult per task, in input order. Exceptions raised by tasks
+        are stored, not raised.
+    """
+    total = len(tasks)
+    labels = list(labels) if labels is not None else [f"item {i + 1}" for i in range(total)]
+    results: List[Optional[BatchResult[T]]] = [None] * total
+    if not total:
+        return []
+    workers = max(1, min(int(max_concurrency), total))
+    batch_start = time.time()
+    logger.info(f"📦 Batch of {total} ({workers} at a time)")
+
+    def run(index: int) -> BatchResult[T]:
+        start = time.time()
+        try:
+            value = tasks[index]()
+        except Exception as e:
+            return BatchResult(index, labels[index], error=e, seconds=time.time() - start)
+        return BatchResult(index, labels[index], value=value, seconds=time.time() - start)
+
+    done = 0
+    scope_token = cancel_token.child() if cancel_token is not None else None
+    with cancellation_scope(scope_token) as token, ThreadPoolExecutor(max_workers=workers) as executor:
+        # Copy the context so worker threads see the shared prefix and the token
+        futures = [executor.submit(contextvars.copy_context().run, run, i) for i in range(total)]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.index] = result
+                done += 1
+                if not result.ok:
+                    logger.warning(f"📦 {result.label} failed after {result.seconds:.1f}s: {result.error}")
+                if progress is not None:
+                    progress(done, total, result)
+        except BaseException:
+            # Interrupted: disconnect running requests and drop queued ones
+            for future in futures:
+                future.cancel()
+            token.cancel("batch interrupted")
+            raise
+        finally:
+            if scope_token is not None:
+                scope_token.detach()
+
+    failed = sum(1 for result in results if not result.ok)
+    logger.info(
+        f"📦 Batch done in {time.time() - batch_start:.1f}s: {total - failed}/{total} succeeded"
+    )
+    return results
@@ -0,0 +1,298 @@
+"""Content-addressed on-disk cache for LLM responses.
+
+This module stores successful generation results keyed by a hash of the model,
+system prompt, prompt and the generation parameters that affect the output, so
+re-running a stage with byte-identical prompts (after a crash, a config tweak
+that doesn't change prompts, or a website-only change) is answered from disk
+instead of the model. Entries are plain JSON files; file modification times
+track recency for LRU eviction, which keeps the cache safe to share between
+processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "output/.llm_cache"
+DEFAULT_MAX_SIZE_MB = 512
+DEFAULT_SEED = 42
+
+# Request options that change performance or memory use but not the generated text
+NON_OUTPUT_PARAMS = frozenset({
+    "stream",
+    "keep_alive",
+    "num_thread",
+    "num_gpu",
+    "main_gpu",
+    "num_batch",
+    "use_mmap",
+    "use_mlock",
+    "low_vram",
+})
+
+
+def make_cache_key(
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """Compute the content address of a generation request.
+
+    Args:
+        model: Model name
+        prompt: User prompt
+        system_prompt: Optional system prompt
+        params: Generation parameters (options not affecting output are ignored)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    output_params = {k: v for k, v in (params or {}).items() if k not in NON_OUTPUT_PARAMS}
+    canonical = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt or "",
+            "prompt": prompt,
+            "params": output_params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-capped, LRU-evicted on-disk store of LLM responses.
+
+    Attributes:
+        directory: Cache directory
+        max_size_bytes: Total size cap for cached entries
+        enabled: Whether lookups and stores are performed
+        refresh: Skip lookups but keep storing, so fresh responses replace
+                 cached ones (set for forced regeneration)
+        deterministic: Pin temperature and seed so cached answers are reproducible
+        seed: Seed used in deterministic mode
+        temperature: Temperature used in deterministic mode
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+        enabled: bool = True,
+        deterministic: bool = False,
+        seed: int = DEFAULT_SEED,
+        temperature: float = 0.0
+    ):
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory (created on first store)
+            max_size_mb: Total size cap in megabytes (default: 512)
+            enabled: Perform lookups and stores (default: True)
+            deterministic: Pin temperature and seed in generation parameters
+            seed: Seed used in deterministic mode (default: 42)
+            temperature: Temperature used in deterministic mode (default: 0.0)
+        """
+        self.directory = Path(directory)
+        self.max_size_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self.enabled = bool(enabled)
+        self.refresh = False
+        self.deterministic = bool(deterministic)
+        self.seed = seed
+        self.temperature = temperature
+
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None  # Computed lazily from disk
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[Dict[str, Any]] = None) -> "ResponseCache":
+        """Create a cache from the llm.response_cache config section.
+
+        A missing section disables the cache.
+
+        Args:
+            cache_config: Optional dict with enabled, directory, max_size_mb,
+                         deterministic, seed and temperature keys
+
+        Returns:
+            Configured ResponseCache
+        """
+        if not cache_config:
+            return cls(enabled=False)
+        return cls(
+            directory=cache_config.get("directory", DEFAULT_CACHE_DIR),
+            max_size_mb=cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+            enabled=cache_config.get("enabled", True),
+            deterministic=cache_config.get("deterministic", False),
+            seed=cache_config.get("seed", DEFAULT_SEED),
+            temperature=cache_config.get("temperature", 0.0)
+        )
+
+    def pin_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply deterministic-mode overrides to generation parameters.
+
+        Args:
+            params: Generation parameters
+
+        Returns:
+            New parameters dict (unchanged copy unless deterministic mode is on)
+        """
+        pinned = dict(params)
+        if self.deterministic:
+            pinned["temperature"] = self.temperature
+            pinned["seed"] = self.seed
+        return pinned
+
+    def _entry_path(self, key: str) -> Path:
+        """Path of the cache file for a key (sharded by key prefix)."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response and mark it recently used.
+
+        Args:
+            key: Cache key from make_cache_key()
+
+        Returns:
+            Cached response text, or None on a miss (always in refresh mode)
+        """
+        if not self.enabled or self.refresh:
+            return None
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            response = entry["response"]
+        except FileNotFoundError:
+            response = None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable cache entry {path}: {e}")
+            response = None
+
+        with self._lock:
+            if response is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        try:
+            os.utime(path)  # Refresh LRU position
+        except OSError:
+            pass
+        return response
+
+    def put(self, key: str, response: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Store a response and evict least recently used entries over the cap.
+
+        Args:
+            key: Cache key from make_cache_key()
+            response: Generated text
+            metadata: Optional extra fields stored alongside (e.g., model, operation)
+        """
+        if not self.enabled:
+            return
+        path = self._entry_path(key)
+        entry = {"key": key, "response": response, "created_at": time.time(), **(metadata or {})}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, path)
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write LLM cache entry {path}: {e}")
+            return
+
+        with self._lock:
+            self._stores += 1
+            if self._total_size is not None:
+                self._total_size += len(data) - old_size
+        self._evict_if_needed()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """List cache entries as (mtime, size, path)."""
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_size(self) -> int:
+        """Total size of cached entries in bytes."""
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = sum(size for _, size, _ in self._entries())
+            return self._total_size
+
+    def _evict_if_needed(self) -> None:
+        """Delete least recently used entries until the cache fits its cap."""
+        if self.total_size() <= self.max_size_bytes:
+            return
+        with self._lock:
+            # Rescan: other processes may share the directory
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self._evictions += 1
+            self._total_size = total
+
+    def clear(self) -> None:
+        """Delete all cached entries."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._total_size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dict with enabled, hits, misses, stores, evictions, size_bytes and
+            max_size_bytes
+        """
+        size = self.total_size() if self.enabled else 0
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "size_bytes": size,
+                "max_size_bytes": self.max_size_bytes,
+            }
@@ -0,0 +1,198 @@
+"""Cancellation of in-flight LLM requests.
+
+A CancellationToken is handed to OllamaClient.generate() (or activated for a
+block of code with cancellation_scope(), like src.llm.prefix.shared_prefix) and
+cancelled from any thread. Cancelling shuts down the request's socket — while
+it waits for Ollama's response headers as well as while it streams — so the
+blocked reader returns at once and Ollama, seeing the client disconnect, stops
+generating and frees its slot. Without this, a timed-out or superseded request
+kept decoding tokens nobody would read.
+
+Tokens form a tree: a child (one per request) is cancelled with its parent
+(e.g., a session scope shared by worker threads), but cancelling a child leaves
+the parent alone. Worker threads see the active token when work is submitted
+with contextvars.copy_context().run.
+"""
+
+import contextvars
+import logging
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_active_token: contextvars.ContextVar[Optional["CancellationToken"]] = contextvars.ContextVar(
+    "active_cancellation_token", default=None
+)
+
+
+class CancellationToken:
+    """Thread-safe cancellation signal with callbacks.
+
+    Attributes:
+        reason: Why the token was cancelled (None while not cancelled)
+    """
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        """Initialize the token.
+
+        Args:
+            parent: Optional parent token; cancelling it cancels this token
+        """
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._parent = parent
+        if parent is not None:
+            parent.add_callback(self._cancel_from_parent)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token has been cancelled."""
+        return self._event.is_set()
+
+    def child(self) -> "CancellationToken":
+        """Create a token that is cancelled together with this one.
+
+        Call detach() on the child when it is no longer needed so the parent
+        does not keep it alive.
+
+        Returns:
+            New child token
+        """
+        return CancellationToken(parent=self)
+
+    def detach(self) -> None:
+        """Stop following the parent token (no-op for root tokens)."""
+        if self._parent is not None:
+            self._parent.remove_callback(self._cancel_from_parent)
+            self._parent = None
+
+    def _cancel_from_parent(self) -> None:
+        self.cancel(self._parent.reason if self._parent is not None else "parent cancelled")
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the token and run its callbacks (once).
+
+        Args:
+            reason: Description for logs and errors
+
+        Returns:
+            True if this call cancelled the token, False if it already was
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Cancellation callback failed: {e}")
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Run callback when the token is cancelled (immediately if it already is).
+
+        Args:
+            callback: Zero-argument callable; exceptions are logged and ignored
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        try:
+            callback()
+        except Exception as e:
+            logger.debug(f"Cancellation callback failed: {e}")
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Unregister a callback added with add_callback().
+
+        Args:
+            callback: Callback to remove (ignored if not registered)
+        """
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep until the token is cancelled or timeout passes.
+
+        Args:
+            timeout: Maximum seconds to wait (None = until cancelled)
+
+        Returns:
+            True if the token was cancelled
+        """
+        return self._event.wait(timeout)
+
+
+def get_active_token() -> Optional[CancellationToken]:
+    """Get the token activated for the current thread or task, if any."""
+    return _active_token.get()
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken] = None) -> Iterator[CancellationToken]:
+    """Context manager activating a token for the enclosed generate() calls.
+
+    Args:
+        token: Token to activate (default: a new child of the active token,
+              or a new root token; detached from its parent on exit)
+
+    Yields:
+        The active token
+    """
+    created = token is None
+    if created:
+        parent = get_active_token()
+        token = parent.child() if parent is not None else CancellationToken()
+    context_token = _active_token.set(token)
+    try:
+        yield token
+    finally:
+        _active_token.reset(context_token)
+        if created:
+            token.detach()
+
+
+def shutdown_socket(sock: Any) -> None:
+    """Shut down a socket so a read blocked on it in another thread returns.
+
+    Closing a socket does not wake a thread blocked in recv(); shutdown does,
+    and the peer sees the disconnect immediately.
+
+    Args:
+        sock: Socket (None or an already closed socket is ignored)
+    """
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except (OSError, ValueError):
+        pass
+
+
+def abort_response(response: Any) -> None:
+    """Disconnect a streaming requests.Response and close it.
+
+    Args:
+        response: requests.Response (or None)
+    """
+    if response is None:
+        return
+    raw = getattr(response, "raw", None)
+    connection = getattr(raw, "_connection", None) or getattr(raw, "connection", None)
+    shutdown_socket(getattr(connection, "sock", None))
+    try:
+        response.close()
+    except Exception as e:
+        logger.debug(f"Closing aborted response failed: {e}")
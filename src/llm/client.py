@@ -6,13 +6,31 @@ This module provides a client to interact with the Ollama API for text generatio
 import json
 import logging
 import re
+import threading
 import time
 import uuid
-from typing import Any, Dict, Optional, Set, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 import requests
 
+from src.llm.batch import BatchResult, GenerationRequest, ProgressCallback, run_batch
+from src.llm.cache import ResponseCache, make_cache_key
+from src.llm.cancellation import CancellationToken, abort_response, get_active_token
+from src.llm.coalesce import CoalescedRequestCancelled, get_request_coalescer
+from src.llm.concurrency import ConcurrencyCancelledError, get_concurrency_governor
+from src.llm.guards import GUARD_CHECK_INTERVAL, StreamGuard, run_guards
+from src.llm.hedging import HedgePolicy
+from src.llm.connection_pool import OllamaConnectionPool
 from src.llm.health import OllamaHealthMonitor
+from src.llm.health_state import get_health_state
+from src.llm.latency import StreamDeadlines, get_latency_profile
+from src.llm.metrics import RequestMetrics, get_metrics_sink
+from src.llm.prefix import PrefixReuseStats, SharedPrefix, get_active_prefix
 from src.llm.request_handler import RequestHandler
+from src.llm.router import Endpoint, EndpointRouter
+from src.llm.context_budget import ContextBudget
+from src.llm.sizing import RequestSizer, estimate_tokens
+from src.llm.tiers import ModelTiers
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +56,92 @@ class LLMError(Exception):
     pass
 
 
+class StreamTimeoutError(LLMError):
+    """Raised when a response stream exceeds its time limit."""
+    pass
+
+
+class RequestCancelledError(LLMError):
+    """Raised when a request is cancelled while it is in flight."""
+    pass
+
+
+class GuardTrippedError(LLMError):
+    """Raised when a stream guard aborts a generation.
+    
+    Attributes:
+        guard: Name of the guard that tripped
+        reason: Why the output was rejected
+        partial_text: Text streamed before the abort
+    """
+    
+    def __init__(self, message: str, guard: str, reason: str, partial_text: str = ""):
+        super().__init__(message)
+        self.guard = guard
+        self.reason = reason
+        self.partial_text = partial_text
+
+
+def format_request_id(operation: Optional[str]) -> str:
+    """Format request ID with operation abbreviation.
+    
+    Args:
+        operation: Optional operation name (e.g., "lecture", "lab")
+        
+    Returns:
+        Formatted request ID in format [op:uuid] or [req:uuid]
+    """
+    uuid_short = uuid.uuid4().hex[:6]
+    if operation:
+        abbrev = OPERATION_ABBREVIATIONS.get(operation, operation[:3])
+        return f"{abbrev}:{uuid_short}"
+    return f"req:{uuid_short}"
+
+
+def extract_chunk_text(data: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    """Extract generated text from one streamed Ollama JSON chunk.
+    
+    Tries multiple field names: 'response' (standard for most Ollama models),
+    'thinking' (models like qwen3-vl), 'content', 'text' and a nested
+    'message' structure.
+    
+    Args:
+        data: Parsed JSON chunk
+        
+    Returns:
+        Tuple of (response_text, has_response_field). response_text is None
+        if no text field was found or its value is None.
+    """
+    if "response" in data:
+        return data["response"], True
+    if "thinking" in data and data["thinking"] is not None:
+        return data["thinking"], True
+    if "content" in data and data["content"] is not None:
+        return data["content"], True
+    if "text" in data and data["text"] is not None:
+        return data["text"], True
+    if "message" in data:
+        # Handle nested message structure
+        message = data["message"]
+        if isinstance(message, dict):
+            return message.get("content") or message.get("text") or message.get("response"), True
+        if isinstance(message, str):
+            return message, True
+    return None, False
+
+
+def has_text_field(data: Dict[str, Any]) -> bool:
+    """Check whether a chunk carries any text field (even if empty).
+    
+    Args:
+        data: Parsed JSON chunk
+        
+    Returns:
+        True if the chunk has a response, thinking, content or text field
+    """
+    return "response" in data or "thinking" in data or "content" in data or "text" in data
+
+
 class OllamaClient:
     """Client for interacting with Ollama API.
     
@@ -49,6 +153,19 @@ class OllamaClient:
         model: Name of the LLM model to use
         timeout: Request timeout in seconds
         default_params: Default generation parameters
+        connection_pool: Shared keep-alive HTTP pool used for all requests
+        concurrency: Process-wide governor limiting in-flight requests per endpoint
+        response_cache: On-disk content-addressed cache of generated responses
+        coalescer: Process-wide single-flight layer for identical in-flight requests
+        sizer: Per-request num_ctx / num_predict sizing policy
+        context_budget: Per-operation token budget for prompt context (llm.context_budget)
+        prefix_enabled: Whether shared session prefixes are applied (llm.prompt_prefix)
+        prefix_stats: Reuse and prefill-savings statistics for shared prefixes
+        metrics: Process-wide sink of per-request token counts and durations
+        router: Least-outstanding-requests routing across llm.endpoints
+        latency: Latency profile the connect, first-chunk and stall deadlines are learned from
+        hedging: Policy for duplicating slow short requests (llm.hedging)
+        tiers: Per-operation model tiers and escalation (llm.model_tiers)
     """
     
     def __init__(
@@ -56,7 +173,8 @@ class OllamaClient:
         config: Dict[str, Any],
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        logging_config: Optional[Dict[str, Any]] = None
+        logging_config: Optional[Dict[str, Any]] = None,
+        content_requirements: Optional[Dict[str, Dict[str, Any]]] = None
     ):
         """Initialize the Ollama client.
         
@@ -67,6 +185,9 @@ class OllamaClient:
             logging_config: Optional logging configuration dictionary with:
                 - heartbeat_interval: Interval for heartbeat logs (seconds, default: 5.0)
                 - progress_log_interval: Interval for stream progress logs (seconds, default: 2.0)
+            content_requirements: Optional content requirements from
+                ConfigLoader.get_content_requirements(), used to cap num_predict
+                per operation when llm.context_sizing is enabled
         """
         self.api_url = config.get("api_url", "http://localhost:11434/api/generate")
         self.model = config["model"]
@@ -84,14 +205,117 @@ class OllamaClient:
             self.progress_log_interval = 2.0
             heartbeat_interval = 5.0
         
-        # Initialize health monitor and request handler
-        base_url = self.api_url.replace('/api/generate', '')
-        self.health_monitor = OllamaHealthMonitor(base_url)
-        self.request_handler = RequestHandler(base_url, heartbeat_interval=heartbeat_interval)
+        # Shared keep-alive connection pool for health checks, probes and generation
+        self.connection_pool = OllamaConnectionPool.from_config(config.get("connection_pool"))
+        
+        self.heartbeat_interval = heartbeat_interval
+        self.health_config = config.get("health_state", {})
+        self.concurrency_config = config.get("concurrency")
         
+        # On-disk response cache (disabled unless llm.response_cache is configured)
+        self.response_cache = ResponseCache.from_config(config.get("response_cache"))
+        
+        # Per-request num_ctx / num_predict sizing (disabled unless llm.context_sizing is configured)
+        self.sizer = RequestSizer.from_config(
+            config.get("context_sizing"), self.default_params, content_requirements
+        )
+        
+        # Token budget callers fit prompt context into (50K-character cap per
+        # piece unless llm.context_budget is configured)
+        self.context_budget = ContextBudget.from_config(config.get("context_budget"))
+        
+        # Shared-prefix prompt layout (disabled unless llm.prompt_prefix.enabled)
+        prefix_config = config.get("prompt_prefix") or {}
+        self.prefix_enabled = bool(prefix_config.get("enabled", False))
+        self.prefix_reserve_tokens = int(prefix_config.get("reserve_tokens", 16384))
+        self.prefix_stats = PrefixReuseStats()
+        
+        # Final stream chunk (token counts and durations) per request ID, and
+        # the process-wide sink the resulting metrics are recorded in
+        self._final_chunks: Dict[str, Dict[str, Any]] = {}
+        self.metrics = get_metrics_sink()
+        
+        # Streamed-text listeners per request ID (see generate(on_text=...))
+        self._text_listeners: Dict[str, Callable[[str], None]] = {}
+        
+        # Latency profile per (model, operation) used to learn stream deadlines
+        # (static limits unless llm.adaptive_timeouts is configured), and the
+        # first-chunk time and largest chunk gap observed per request ID
+        self.latency = get_latency_profile(config.get("adaptive_timeouts"))
+        self._stream_timings: Dict[str, Dict[str, float]] = {}
+        
+        # Cancellation token per in-flight request ID (cancelled by
+        # _cancel_request, e.g. when a coalesced request is abandoned)
+        self._request_tokens: Dict[str, CancellationToken] = {}
+        
+        # Hedged requests for short operations (disabled unless llm.hedging is
+        # enabled), and first-chunk signals of primaries
+        self.hedging = HedgePolicy.from_config(config.get("hedging"))
+        self._first_chunk_events: Dict[str, threading.Event] = {}
+        self._hedge_lock = threading.Lock()
+        
+        # Model per operation (llm.model unless llm.model_tiers is enabled)
+        self.tiers = ModelTiers.from_config(config.get("model_tiers"), self.model)
+        
+        # Process-wide single-flight layer: identical in-flight requests share one call
+        self.coalescer = get_request_coalescer()
+        
+        # Endpoints to route requests across (llm.endpoints, default: api_url).
+        # Each has its own process-wide health state and concurrency governor.
+        self.router = EndpointRouter.from_config(
+            config.get("endpoints") or [self.api_url],
+            config.get("router"),
+            self._create_endpoint
+        )
+        self._request_endpoints: Dict[str, Endpoint] = {}
+        
+        # Primary endpoint state (pre-flight checks, GPU usage, health monitoring)
+        primary = self.router.primary
+        self.api_url = primary.api_url
+        self.health_state = primary.health_state
+        self.concurrency = primary.governor
+        self.health_monitor = primary.health_monitor
+        self.request_handler = primary.request_handler
+        
+        endpoints_info = ""
+        if len(self.router.endpoints) > 1:
+            endpoints_info = f", endpoints={[e.base_url for e in self.router.endpoints]}"
         logger.info(
-            f"Initialized OllamaClient: model={self.model}, url={self.api_url}"
+            f"Initialized OllamaClient: model={self.model}, url={self.api_url}{endpoints_info}"
         )
+        if self.tiers.enabled:
+            logger.info(f"Model tiers: {self.tiers.describe()}")
+    
+    def _create_endpoint(self, base_url: str) -> Endpoint:
+        """Create the health state, governor and request handler for one endpoint.
+        
+        Args:
+            base_url: Base Ollama API URL
+            
+        Returns:
+            Endpoint sharing this client's connection pool
+        """
+        # Process-wide cached health state shared by pre-flight checks,
+        # in-flight health monitoring and GPU usage checks
+        health_state = get_health_state(
+            base_url,
+            connection_pool=self.connection_pool,
+            ttl=self.health_config.get("ttl", 5.0),
+            background_refresh=self.health_config.get("background_refresh", True)
+        )
+        # Process-wide limit on in-flight requests to this endpoint
+        governor = get_concurrency_governor(base_url, self.concurrency_config)
+        health_monitor = OllamaHealthMonitor(
+            base_url, connection_pool=self.connection_pool, health_state=health_state
+        )
+        request_handler = RequestHandler(
+            base_url,
+            heartbeat_interval=self.heartbeat_interval,
+            connection_pool=self.connection_pool,
+            health_state=health_state,
+            governor=governor
+        )
+        return Endpoint(base_url, health_state, health_monitor, governor, request_handler)
     
     def _format_request_id(self, operation: Optional[str]) -> str:
         """Format request ID with operation abbreviation.
@@ -102,11 +326,7 @@ class OllamaClient:
         Returns:
             Formatted request ID in format [op:uuid] or [req:uuid]
         """
-        uuid_short = uuid.uuid4().hex[:6]
-        if operation:
-            abbrev = OPERATION_ABBREVIATIONS.get(operation, operation[:3])
-            return f"{abbrev}:{uuid_short}"
-        return f"req:{uuid_short}"
+        return format_request_id(operation)
     
     def check_connection(self, timeout: int = 5) -> Tuple[bool, Optional[float]]:
         """Check if Ollama service is reachable and responding.
@@ -122,9 +342,8 @@ class OllamaClient:
         try:
             # Use the version endpoint for a lightweight health check
             version_url = self.api_url.replace('/api/generate', '/api/version')
-            import time
             start_time = time.time()
-            response = requests.get(version_url, timeout=timeout)
+            response = self.connection_pool.get(version_url, timeout=timeout)
             response_time = time.time() - start_time
             response.raise_for_status()
             
@@ -142,6 +361,10 @@ class OllamaClient:
             logger.warning(f"Ollama connection check failed: {e}")
             return False, None
     
+    def close(self) -> None:
+        """Close pooled HTTP connections held by this client."""
+        self.connection_pool.close()
+    
     def check_gpu_usage(self) -> Dict[str, Any]:
         """Check if Ollama is currently using GPU acceleration.
         
@@ -152,8 +375,8 @@ class OllamaClient:
             - models_loaded: List[str] (list of loaded model names)
             - details: List[Dict] (per-model processor info)
         """
-        from src.utils.helpers import check_ollama_gpu_usage
-        return check_ollama_gpu_usage()
+        # Read from the shared cached /api/ps result instead of running `ollama ps`
+        return self.health_state.get_gpu_usage()
         
     def generate(
         self,
@@ -161,7 +384,13 @@ class OllamaClient:
         system_prompt: Optional[str] = None,
         params: Optional[Dict[str, Any]] = None,
         operation: Optional[str] = None,
-        timeout_override: Optional[int] = None
+        timeout_override: Optional[int] = None,
+        use_cache: bool = True,
+        prefix: Optional[SharedPrefix] = None,
+        guards: Optional[Sequence[StreamGuard]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        model: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None
     ) -> str:
         """Generate text using the Ollama API.
         
@@ -171,6 +400,21 @@ class OllamaClient:
             params: Optional parameters to override defaults
             operation: Optional operation name for logging context (e.g., "lecture", "lab")
             timeout_override: Optional timeout override in seconds (overrides instance timeout)
+            use_cache: Look up and store the response in the response cache (default: True)
+            prefix: Optional shared prefix placed before the prompt (default: the
+                   prefix activated with src.llm.prefix.shared_prefix, if any).
+                   Ignored unless llm.prompt_prefix is enabled.
+            guards: Optional stream guards (src.llm.guards); the stream is closed
+                   and GuardTrippedError raised as soon as one trips
+            cancel_token: Optional token (default: the token activated with
+                   src.llm.cancellation.cancellation_scope, if any); cancelling
+                   it disconnects the request so Ollama stops generating, and
+                   RequestCancelledError is raised
+            model: Optional model (default: the operation's tier model, see
+                   model_for())
+            on_text: Optional callback receiving the text streamed so far
+                   after every chunk (from the request thread; a retry starts
+                   over). Not called for cache hits or coalesced requests.
             
         Returns:
             Generated text
@@ -178,6 +422,8 @@ class OllamaClient:
         Raises:
             LLMError: If generation fails
         """
+        model = model or self.tiers.model_for(operation)
+        
         # Use timeout override if provided, otherwise use instance timeout
         effective_timeout = timeout_override if timeout_override is not None else self.timeout
         
@@ -185,14 +431,33 @@ class OllamaClient:
         request_id = self._format_request_id(operation)
         request_start_time = time.time()
         
-        # Merge parameters
+        # Lay out the request as shared session prefix + task so Ollama can
+        # reuse the prefix already in its KV cache
+        prefix = prefix or get_active_prefix()
+        if prefix is not None and not self.prefix_enabled:
+            prefix = None
+        if prefix is not None:
+            system_prompt, prompt = prefix.assemble(prompt, system_prompt)
+        
+        # Merge parameters, size the context window and output budget for this
+        # prompt (explicit params win), and pin temperature and seed in
+        # deterministic cache mode
         generation_params = {**self.default_params}
+        sized = self.sizer.size(prompt, system_prompt, operation, params)
+        if prefix is not None and "num_ctx" in sized:
+            # One context size per prefix: a num_ctx change reloads the model
+            # and drops the cached prefix
+            sized["num_ctx"] = max(
+                sized["num_ctx"], self.sizer.bucket_for(prefix.tokens + self.prefix_reserve_tokens)
+            )
+        generation_params.update(sized)
         if params:
             generation_params.update(params)
+        generation_params = self.response_cache.pin_params(generation_params)
             
         # Build request payload
         payload = {
-            "model": self.model,
+            "model": model,
             "prompt": prompt,
             "stream": True,  # Use streaming for better responsiveness
             **generation_params
@@ -204,12 +469,26 @@ class OllamaClient:
         # Consolidated INFO message with key details (compact format)
         op_abbrev = OPERATION_ABBREVIATIONS.get(operation, operation[:3] if operation else "req")
         timeout_info = f" | t={effective_timeout}s" if timeout_override else ""
+        prefix_info = f" | prefix={prefix.name}" if prefix is not None else ""
         logger.info(
-            f"[{request_id}] 🚀 {op_abbrev} | m={self.model} | p={len(prompt)}c{timeout_info}"
+            f"[{request_id}] 🚀 {op_abbrev} | m={model} | p={len(prompt)}c{timeout_info}{prefix_info}"
         )
+        # Answer byte-identical requests from the on-disk response cache
+        cache_key = None
+        if use_cache and self.response_cache.enabled:
+            cache_key = make_cache_key(model, prompt, system_prompt, generation_params)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"[{request_id}] 💾 Cache hit ({len(cached)}c, key {cache_key[:12]})")
+                return cached
         
         # Detailed information at DEBUG level
         logger.debug(f"[{request_id}] System prompt: {len(system_prompt) if system_prompt else 0} chars")
+        if self.sizer.enabled:
+            logger.debug(
+                f"[{request_id}] Sizing: ~{estimate_tokens(prompt) + estimate_tokens(system_prompt)} prompt tokens "
+                f"-> num_ctx={generation_params.get('num_ctx')}, num_predict={generation_params.get('num_predict')}"
+            )
         logger.debug(f"[{request_id}] Timeout: {effective_timeout}s" + (f" (overridden from {self.timeout}s)" if timeout_override else ""))
         
         # Log payload summary (truncate large prompts for readability)
@@ -224,26 +503,302 @@ class OllamaClient:
         params_summary = {k: v for k, v in generation_params.items() if k not in ['prompt', 'system']}
         logger.debug(f"[{request_id}] Generation parameters: {params_summary}")
         
+        # Identical requests already in flight share one call to Ollama
+        coalesce_key = None
+        if use_cache:
+            coalesce_key = f"{self.api_url}|" + (
+                cache_key or make_cache_key(model, prompt, system_prompt, generation_params)
+            )
+            if guards:
+                # Guarded calls may abort, so they only share flights with the same guards
+                coalesce_key += "|guards=" + ",".join(guard.name for guard in guards)
+        
+        # Short operations are duplicated if their first chunk is late
+        hedge_delay = self.hedging.delay(self.latency, model, operation)
+        
+        # Per-request token, cancelled with the caller's (or the active) token
+        parent_token = cancel_token or get_active_token()
+        
+        def execute() -> str:
+            # Counted per request sent (not for cache hits or coalesced followers)
+            self.tiers.record(operation, model)
+            token = parent_token.child() if parent_token is not None else CancellationToken()
+            self._request_tokens[request_id] = token
+            if on_text is not None:
+                self._text_listeners[request_id] = on_text
+            try:
+                if hedge_delay is not None:
+                    text = self._execute_hedged(
+                        hedge_delay, request_id, payload, prompt, operation, effective_timeout, timeout_override,
+                        request_start_time, guards=guards, cancel_token=token
+                    )
+                else:
+                    text = self._execute_with_retries(
+                        request_id, payload, prompt, operation, effective_timeout, timeout_override,
+                        request_start_time, guards=guards, cancel_token=token
+                    )
+            finally:
+                self._request_tokens.pop(request_id, None)
+                self._text_listeners.pop(request_id, None)
+                token.detach()
+                final_chunk = self._final_chunks.pop(request_id, {})
+            if prefix is not None:
+                self._record_prefix_use(request_id, prefix, prompt, system_prompt, final_chunk)
+            if cache_key and text:
+                self.response_cache.put(
+                    cache_key,
+                    text,
+                    {"model": model, "operation": operation or "unknown"}
+                )
+            return text
+        
+        if coalesce_key is None:
+            return execute()
+        try:
+            return self.coalescer.run(
+                coalesce_key,
+                execute,
+                request_id=request_id,
+                on_cancel=lambda: self._cancel_request(request_id)
+            )
+        except CoalescedRequestCancelled as e:
+            error_msg = f"[{request_id}] Request cancelled: {e}"
+            logger.warning(error_msg)
+            raise LLMError(error_msg) from e
+    
+    def generate_many(
+        self,
+        requests: Sequence[Union[GenerationRequest, Dict[str, Any]]],
+        max_concurrency: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[BatchResult[str]]:
+        """Generate text for several prompts with bounded concurrency.
+        
+        Every item goes through generate(), so it shares this client's
+        connection pool, concurrency governors, cache and metrics.
+        
+        Args:
+            requests: GenerationRequest specs (or dicts with prompt, system,
+                     operation, timeout, ... keys)
+            max_concurrency: Maximum requests in flight from this batch
+                            (default: the parallel slots of all endpoints)
+            progress: Optional callback(done, total, result) called in the
+                     calling thread as each request finishes
+            cancel_token: Optional token cancelling the whole batch
+            
+        Returns:
+            One BatchResult per request, in input order, with the generated
+            text as value or the exception as error
+        """
+        specs = [GenerationRequest.coerce(spec) for spec in requests]
+        if max_concurrency is None:
+            max_concurrency = sum(endpoint.governor.max_parallel for endpoint in self.router.endpoints)
+        
+        def task(spec: GenerationRequest):
+            return lambda: self.generate(
+                spec.prompt,
+                spec.system_prompt,
+                spec.params,
+                operation=spec.operation,
+                timeout_override=spec.timeout,
+                use_cache=spec.use_cache,
+                prefix=spec.prefix,
+                guards=spec.guards,
+                model=spec.model
+            )
+        
+        return run_batch(
+            [task(spec) for spec in specs],
+            max_concurrency,
+            progress=progress,
+            labels=[spec.label or spec.operation or f"request {i + 1}" for i, spec in enumerate(specs)],
+            cancel_token=cancel_token
+        )
+    
+    def model_for(self, operation: Optional[str]) -> str:
+        """Get the model generate() uses for an operation.
+        
+        Args:
+            operation: Operation name
+            
+        Returns:
+            The operation's tier model (llm.model_tiers), or llm.model
+        """
+        return self.tiers.model_for(operation)
+    
+    def escalate_model(self, operation: str, model: str, issues: Sequence[str]) -> str:
+        """Pick the model for a retry after a failed validation.
+        
+        Generators call this with the critical issues of an attempt and pass
+        the result to the next generate() call as model.
+        
+        Args:
+            operation: Operation name
+            model: Model that produced the failed output
+            issues: Validation issues of the failed output
+            
+        Returns:
+            The next larger tier's model, or model if escalation does not apply
+            (see ModelTiers.escalate())
+        """
+        return self.tiers.escalate(operation, model, issues)
+    
+    def _cancel_request(self, request_id: str) -> None:
+        """Cancel a request: disconnect it and stop monitoring it.
+        
+        Args:
+            request_id: Request ID
+        """
+        token = self._request_tokens.get(request_id)
+        if token is not None:
+            token.cancel("request cancelled")
+        endpoint = self._request_endpoints.get(request_id, self.router.primary)
+        endpoint.request_handler.cancel_request(request_id)
+    
+    def _fail_over(self, request_id: str, endpoint: Endpoint, tried: List[Endpoint], reason: str) -> bool:
+        """Eject a failed endpoint and decide whether to retry elsewhere at once.
+        
+        Args:
+            request_id: Request ID for logging
+            endpoint: Endpoint the attempt failed on
+            tried: Endpoints already tried for this request (updated in place)
+            reason: Failure description for logging
+            
+        Returns:
+            True if another endpoint is available and the request should be
+            retried there immediately (no backoff)
+        """
+        tried.append(endpoint)
+        self.router.eject(endpoint, reason)
+        if not self.router.has_alternative(tried):
+            return False
+        self.router.record_failover()
+        logger.warning(f"[{request_id}] 🔀 Failing over from {endpoint.base_url}: {reason}")
+        return True
+    
+    def log_prefix_reuse(self) -> Dict[str, Any]:
+        """Log how much prefill work shared prefixes saved so far.
+        
+        Returns:
+            Prefix reuse statistics (see PrefixReuseStats.get_stats())
+        """
+        stats = self.prefix_stats.get_stats()
+        if stats["requests"]:
+            logger.info(
+                f"♻️ Prompt prefix reuse: {stats['reused_requests']}/{stats['requests']} requests "
+                f"over {stats['prefixes']} prefixes, ~{stats['prefill_tokens_saved']} prefill tokens saved"
+            )
+        return stats
+    
+    def _record_prefix_use(
+        self,
+        request_id: str,
+        prefix: SharedPrefix,
+        prompt: str,
+        system_prompt: Optional[str],
+        final_chunk: Dict[str, Any]
+    ) -> None:
+        """Record a completed prefixed request and log the prefill it saved.
+        
+        Args:
+            request_id: Request ID for logging
+            prefix: Prefix the request used
+            prompt: Assembled prompt that was sent
+            system_prompt: System prompt that was sent
+            final_chunk: Final stream chunk (may carry prompt_eval_count)
+        """
+        prompt_eval_count = final_chunk.get("prompt_eval_count")
+        saved = self.prefix_stats.record(
+            prefix,
+            estimate_tokens(prompt) + estimate_tokens(system_prompt),
+            prompt_eval_count
+        )
+        if saved:
+            logger.info(
+                f"[{request_id}] ♻️ Prefix {prefix.name} reused: ~{saved} prefill tokens saved"
+                + (f" ({prompt_eval_count} evaluated)" if prompt_eval_count is not None else "")
+            )
+    
+    def _execute_with_retries(
+        self,
+        request_id: str,
+        payload: Dict[str, Any],
+        prompt: str,
+        operation: Optional[str],
+        effective_timeout: int,
+        timeout_override: Optional[int],
+        request_start_time: float,
+        guards: Optional[Sequence[StreamGuard]] = None,
+        avoid: Sequence[Endpoint] = (),
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """Send a generation request with pre-flight checks, monitoring and retries.
+        
+        Args:
+            request_id: Request ID for logging
+            payload: JSON payload for /api/generate
+            prompt: The user prompt (used to allow empty responses for empty prompts)
+            operation: Optional operation name for logging context
+            effective_timeout: Timeout in seconds for this request
+            timeout_override: Timeout override passed to generate(), if any
+            request_start_time: Time generate() was called
+            guards: Optional stream guards checked while the response streams
+            avoid: Endpoints to prefer not to use (e.g., the one a hedged request's
+                   primary is waiting on); used only if no other is healthy
+            cancel_token: Optional token; once cancelled, the connection is shut
+                         down and no further attempt is made
+            
+        Returns:
+            Generated text
+            
+        Raises:
+            LLMError: If generation fails after all retries
+            GuardTrippedError: If a stream guard aborted the generation (not retried)
+            RequestCancelledError: If cancel_token was cancelled
+        """
+        cancel_token = cancel_token or CancellationToken()
+        model = payload["model"]
         # Calculate payload size for logging
         payload_size = len(json.dumps(payload))
         
-        # Attempt generation with retries
-        for attempt in range(self.max_retries + 1):
+        # Attempt generation with retries. Connection errors and stream
+        # timeouts fail over to another endpoint without consuming an attempt.
+        tried: List[Endpoint] = []
+        attempt = 0
+        while attempt <= self.max_retries:
+            if cancel_token.cancelled:
+                raise RequestCancelledError(
+                    f"[{request_id}] Request cancelled before attempt {attempt + 1}: {cancel_token.reason}"
+                )
             attempt_start_time = time.time()
+            endpoint = (
+                (avoid and self.router.select(exclude=[*tried, *avoid]))
+                or self.router.select(exclude=tried)
+                or self.router.select()
+                or self.router.primary
+            )
+            self._request_endpoints[request_id] = endpoint
+            self.router.start_request(endpoint)
             try:
-                logger.debug(f"[{request_id}] Attempt {attempt + 1}/{self.max_retries + 1}: Sending request to {self.api_url}")
+                logger.debug(f"[{request_id}] Attempt {attempt + 1}/{self.max_retries + 1}: Sending request to {endpoint.api_url}")
                 
                 # Use separate connection and read timeouts for streaming
-                # Connection timeout: short (5s) to fail fast if Ollama is down
-                # Read timeout: longer (effective_timeout) to wait for Ollama to start generating
-                # For streaming, we need to wait for Ollama to process and start sending chunks
-                connect_timeout = 5  # Fast failure if Ollama is unreachable
-                read_timeout = effective_timeout  # Allow time for model to start generating
+                # Connection timeout: short to fail fast if Ollama is down
+                # Read timeout: the first-chunk deadline (also bounds gaps between chunks)
+                # Both are learned from the latency profile once it has enough
+                # samples; an explicit timeout_override keeps the static limits
+                if timeout_override is None:
+                    deadlines = self.latency.deadlines(model, operation, effective_timeout)
+                else:
+                    deadlines = StreamDeadlines.static(effective_timeout)
+                connect_timeout = deadlines.connect
+                read_timeout = deadlines.first_chunk
                 
                 # Log timeout configuration at INFO level for visibility
                 logger.info(
-                    f"[{request_id}] Timeout configuration: connect={connect_timeout}s, "
-                    f"read={read_timeout}s (total limit: {effective_timeout}s)"
+                    f"[{request_id}] Timeout configuration: {deadlines.describe()} "
+                    f"(base timeout: {effective_timeout}s)"
                 )
                 if effective_timeout > 300:
                     logger.warning(
@@ -251,16 +806,22 @@ class OllamaClient:
                         f"this may indicate a slow model or system. Consider using a faster model."
                     )
                 
-                # Pre-flight connection check before blocking request
+                # Pre-flight check against the shared cached health state
                 logger.info(f"[{request_id}] Pre-flight check: Verifying Ollama service is reachable...")
                 preflight_start = time.time()
-                is_connected, conn_time = self.check_connection(timeout=3)
+                snapshot = endpoint.health_state.get_snapshot()
+                if not snapshot.available:
+                    # Cached state may be stale; confirm with a fresh probe before failing
+                    snapshot = endpoint.health_state.refresh()
+                is_connected, conn_time = snapshot.available, snapshot.response_time
                 preflight_elapsed = time.time() - preflight_start
+                if not is_connected and self._fail_over(request_id, endpoint, tried, "pre-flight check failed"):
+                    continue
                 if not is_connected:
                     error_msg = (
                         f"[{request_id}] Pre-flight check failed after {preflight_elapsed:.2f}s: "
                         f"Ollama service unreachable. "
-                        f"Check if Ollama is running: curl {self.api_url.replace('/api/generate', '/api/version')}"
+                        f"Check if Ollama is running: curl {endpoint.api_url.replace('/api/generate', '/api/version')}"
                     )
                     logger.error(error_msg)
                     raise LLMError(error_msg)
@@ -270,12 +831,24 @@ class OllamaClient:
                         f"(Ollama may be under heavy load or system resources constrained)"
                     )
                 else:
-                    logger.debug(f"[{request_id}] Pre-flight check passed: Ollama reachable ({conn_time:.3f}s)")
+                    logger.debug(
+                        f"[{request_id}] Pre-flight check passed: Ollama reachable "
+                        f"({conn_time:.3f}s, snapshot age {snapshot.age:.1f}s)"
+                    )
+                
+                # A model that is not loaded yet has to be read from disk before
+                # its first token; learned first-chunk deadlines assume a warm model
+                if deadlines.learned and not self._model_loaded(snapshot, model):
+                    deadlines.first_chunk = max(deadlines.first_chunk, effective_timeout)
+                    read_timeout = deadlines.first_chunk
+                    logger.info(
+                        f"[{request_id}] Model {model} not loaded - allowing {read_timeout:.0f}s for the first chunk"
+                    )
                 
                 # Log request context at INFO level
                 logger.info(
                     f"[{request_id}] Sending request to Ollama: "
-                    f"model={self.model}, operation={operation or 'unknown'}, "
+                    f"model={model}, operation={operation or 'unknown'}, "
                     f"payload={payload_size} bytes, prompt={len(prompt)} chars"
                 )
                 
@@ -285,102 +858,151 @@ class OllamaClient:
                 try:
                     # Use request handler for better timeout monitoring and health checks
                     def make_request():
-                        return requests.post(
-                            self.api_url,
+                        return self.connection_pool.post(
+                            endpoint.api_url,
                             json=payload,
+                            headers={"X-Request-ID": request_id},
                             timeout=(connect_timeout, read_timeout),  # (connect, read) tuple
                             stream=True
                         )
                     
-                    response = self.request_handler.execute_with_monitoring(
+                    response = endpoint.request_handler.execute_with_monitoring(
                         request_func=make_request,
                         timeout=read_timeout,
                         request_id=request_id,
-                        model=self.model,
+                        model=model,
                         connect_timeout=connect_timeout,
-                        read_timeout=read_timeout
+                        read_timeout=read_timeout,
+                        keep_watching=True,
+                        cancel_token=cancel_token
                     )
                     
                     http_response_time = time.time() - request_send_time
                     logger.info(f"[{request_id}] ✅ HTTP {response.status_code} in {http_response_time:.2f}s")
+                except ConcurrencyCancelledError as e:
+                    self._raise_if_cancelled(cancel_token, request_id, "while waiting for an LLM slot", e)
+                    raise
                 except requests.Timeout as e:
                     elapsed = time.time() - request_send_time
-                    if elapsed < connect_timeout + 1:
+                    if isinstance(e, requests.ConnectTimeout):
                         # Connection timeout: Ollama unreachable
                         error_msg = (
                             f"[{request_id}] Connection timeout after {elapsed:.2f}s "
                             f"(limit: {connect_timeout}s) - Ollama service unreachable. "
                             f"Operation: {operation or 'unknown'}. "
                             f"Diagnostics: Check if Ollama is running: "
-                            f"curl {self.api_url.replace('/api/generate', '/api/version')}. "
+                            f"curl {endpoint.api_url.replace('/api/generate', '/api/version')}. "
                             f"If Ollama is running, check network connectivity and firewall settings."
                         )
                     else:
                         # Read timeout: Ollama received request but didn't respond
                         error_msg = (
                             f"[{request_id}] Read timeout after {elapsed:.2f}s "
-                            f"(limit: {read_timeout}s) - Ollama received request but didn't start generating. "
+                            f"(limit: {read_timeout:.1f}s) - Ollama received request but didn't start generating. "
                             f"Operation: {operation or 'unknown'}. "
-                            f"Model: {self.model}. "
+                            f"Model: {model}. "
                             f"This may indicate: (1) Model is too slow for this timeout, "
                             f"(2) System resources are constrained, (3) Model is hung. "
                             f"Solutions: (1) Increase timeout in config/llm_config.yaml "
                             f"(current: {effective_timeout}s), (2) Use a faster model, "
                             f"(3) Check Ollama logs: ollama logs, (4) Restart Ollama service."
                         )
+                        if deadlines.learned:
+                            # Far beyond this operation's usual time to first token: likely hung
+                            logger.error(error_msg)
+                            raise StreamTimeoutError(
+                                f"{error_msg} Limit learned from the latency profile ({deadlines.samples} samples)."
+                            ) from e
                     logger.error(error_msg)
                     raise LLMError(error_msg) from e
                 
-                # Log response status
-                logger.debug(f"[{request_id}] Response status: {response.status_code}")
-                response.raise_for_status()
+                try:
+                    if cancel_token.cancelled:
+                        # Closing the connection makes Ollama drop the request
+                        abort_response(response)
+                        raise RequestCancelledError(
+                            f"[{request_id}] Request cancelled before streaming: {cancel_token.reason}"
+                        )
+                    
+                    # Log response status
+                    logger.debug(f"[{request_id}] Response status: {response.status_code}")
+                    response.raise_for_status()
                 
-                # Log that we got a response and are starting to parse the stream
-                logger.info(f"[{request_id}] 📡 Stream active ({response.status_code})")
+                    # Log that we got a response and are starting to parse the stream
+                    logger.info(f"[{request_id}] 📡 Stream active ({response.status_code})")
                 
-                # Verify response has content-type and headers
-                content_type = response.headers.get('Content-Type', 'unknown')
-                logger.debug(f"[{request_id}] Response Content-Type: {content_type}")
+                    # Verify response has content-type and headers
+                    content_type = response.headers.get('Content-Type', 'unknown')
+                    logger.debug(f"[{request_id}] Response Content-Type: {content_type}")
                 
-                # Check if response is actually streaming (chunked transfer)
-                transfer_encoding = response.headers.get('Transfer-Encoding', '')
-                if 'chunked' in transfer_encoding.lower():
-                    logger.debug(f"[{request_id}] Chunked transfer encoding detected - stream should start immediately")
-                else:
-                    logger.debug(f"[{request_id}] Transfer encoding: {transfer_encoding or 'none'} (may buffer before streaming)")
+                    # Check if response is actually streaming (chunked transfer)
+                    transfer_encoding = response.headers.get('Transfer-Encoding', '')
+                    if 'chunked' in transfer_encoding.lower():
+                        logger.debug(f"[{request_id}] Chunked transfer encoding detected - stream should start immediately")
+                    else:
+                        logger.debug(f"[{request_id}] Transfer encoding: {transfer_encoding or 'none'} (may buffer before streaming)")
+                
+                    # Parse streaming response with timeout tracking
+                    # Allow empty responses if prompt was empty
+                    is_empty_prompt = not prompt.strip()
+                    logger.debug(f"[{request_id}] Starting stream parsing (timeout: {effective_timeout}s)")
+                    generated_text = self._parse_streaming_response(
+                        response, request_id, effective_timeout, allow_empty=is_empty_prompt, deadlines=deadlines,
+                        guards=guards, cancel_token=cancel_token
+                    )
                 
-                # Parse streaming response with timeout tracking
-                # Allow empty responses if prompt was empty
-                is_empty_prompt = not prompt.strip()
-                logger.debug(f"[{request_id}] Starting stream parsing (timeout: {effective_timeout}s)")
-                generated_text = self._parse_streaming_response(response, request_id, effective_timeout, allow_empty=is_empty_prompt)
+                finally:
+                    # Stream consumed (or failed); stop watchdog checks and release the slot
+                    endpoint.request_handler.finish_request(request_id)
                 
                 # Calculate statistics
                 request_duration = time.time() - request_start_time
                 word_count_est = len(generated_text.split())
                 chars_per_sec = len(generated_text) / request_duration if request_duration > 0 else 0
                 
+                # Real token counts and prefill/decode/load times from the final chunk
+                final_chunk = self._final_chunks.get(request_id)
+                metrics_info = ""
+                metrics = None
+                if final_chunk:
+                    metrics = RequestMetrics.from_final_chunk(
+                        request_id, operation, model, final_chunk, time.time() - request_send_time
+                    )
+                    self.metrics.record(metrics)
+                    metrics_info = f" | {metrics.describe()}"
+                    if metrics.reloaded:
+                        logger.warning(
+                            f"[{request_id}] Model load took {metrics.load_seconds:.1f}s "
+                            f"(model was (re)loaded - check num_ctx changes and keep_alive)"
+                        )
+                
+                self._record_latency(request_id, model, operation, request_send_time, conn_time, metrics)
+                
                 # Single consolidated completion message at INFO level
                 logger.info(
                     f"[{request_id}] ✓ Done {request_duration:.2f}s: {len(generated_text)}c "
-                    f"(~{word_count_est}w @{chars_per_sec:.0f}c/s)"
+                    f"(~{word_count_est}w @{chars_per_sec:.0f}c/s){metrics_info}"
                 )
                 return generated_text
                 
-            except requests.ConnectionError as e:
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
                 attempt_duration = time.time() - attempt_start_time
+                self._raise_if_cancelled(cancel_token, request_id, f"after {attempt_duration:.1f}s", e)
+                if self._fail_over(request_id, endpoint, tried, f"connection error: {e}"):
+                    continue
                 if attempt < self.max_retries:
                     logger.warning(
                         f"[{request_id}] Connection error (attempt {attempt + 1}/{self.max_retries + 1}, "
                         f"elapsed: {attempt_duration:.2f}s): {e}"
                     )
                     logger.info(f"[{request_id}] Retrying in {self.retry_delay * (2 ** attempt):.1f}s...")
-                    time.sleep(self.retry_delay * (2 ** attempt))
+                    cancel_token.wait(self.retry_delay * (2 ** attempt))
+                    attempt += 1
                     continue
                 total_duration = time.time() - request_start_time
                 error_msg = (
                     f"[{request_id}] Connection error after {total_duration:.2f}s: {e}. "
-                    f"Check if Ollama is running: curl {self.api_url.replace('/api/generate', '/api/version')}"
+                    f"Check if Ollama is running: curl {endpoint.api_url.replace('/api/generate', '/api/version')}"
                 )
                 logger.error(error_msg)
                 raise LLMError(error_msg)
@@ -388,6 +1010,7 @@ class OllamaClient:
             except requests.Timeout as e:
                 attempt_duration = time.time() - attempt_start_time
                 total_duration = time.time() - request_start_time
+                self._raise_if_cancelled(cancel_token, request_id, f"after {attempt_duration:.1f}s", e)
                 
                 if attempt < self.max_retries:
                     logger.warning(
@@ -395,15 +1018,16 @@ class OllamaClient:
                         f"elapsed: {attempt_duration:.2f}s, limit: {effective_timeout}s): {e}"
                     )
                     logger.info(f"[{request_id}] Retrying in {self.retry_delay * (2 ** attempt):.1f}s...")
-                    time.sleep(self.retry_delay * (2 ** attempt))
+                    cancel_token.wait(self.retry_delay * (2 ** attempt))
+                    attempt += 1
                     continue
                 # Final timeout after all retries - provide comprehensive error message
                 error_msg = (
                     f"[{request_id}] Request timeout after {total_duration:.2f}s elapsed "
                     f"(limit: {effective_timeout}s) across {self.max_retries + 1} attempts. "
                     f"Received 0 chunks, 0 bytes before timeout. "
-                    f"Operation: {operation or 'unknown'}. Model: {self.model}. "
-                    f"Diagnostics: (1) Check Ollama service: curl {self.api_url.replace('/api/generate', '/api/version')}, "
+                    f"Operation: {operation or 'unknown'}. Model: {model}. "
+                    f"Diagnostics: (1) Check Ollama service: curl {endpoint.api_url.replace('/api/generate', '/api/version')}, "
                     f"(2) Check Ollama logs: ollama logs, (3) Consider increasing timeout in config/llm_config.yaml "
                     f"(current: {effective_timeout}s), (4) Use a faster model, (5) Check system resources (CPU/memory). "
                     f"Error: {e}"
@@ -417,6 +1041,11 @@ class OllamaClient:
                 logger.error(error_msg)
                 raise LLMError(error_msg)
                 
+            except StreamTimeoutError:
+                if self._fail_over(request_id, endpoint, tried, "stream timeout"):
+                    continue
+                raise
+                
             except LLMError:
                 # Re-raise LLMError as-is (it already has request_id)
                 raise
@@ -426,21 +1055,270 @@ class OllamaClient:
                 error_msg = f"[{request_id}] Unexpected error after {total_duration:.2f}s: {e}"
                 logger.error(error_msg, exc_info=True)
                 raise LLMError(error_msg)
+            
+            finally:
+                self.router.finish_request(endpoint)
+                self._request_endpoints.pop(request_id, None)
+                self._stream_timings.pop(request_id, None)
                 
+    def _start_attempt(self, request_id: str, func, token: CancellationToken, is_hedge: bool) -> Future:
+        """Run one copy of a hedged request in a background thread.
+        
+        Args:
+            request_id: Request ID of the copy
+            func: Callable returning the generated text
+            token: Cancellation token of the copy
+            is_hedge: Whether this is the duplicate (its final chunk is dropped
+                     if it loses; the primary's is popped by generate())
+            
+        Returns:
+            Future with the copy's text or exception
+        """
+        future: Future = Future()
+        
+        def run() -> None:
+            future.set_running_or_notify_cancel()
+            try:
+                result = func()
+            except BaseException as e:
+                outcome = (False, e)
+            else:
+                outcome = (True, result)
+            token.detach()
+            with self._hedge_lock:
+                if token.cancelled and is_hedge:
+                    # Lost the race: drop what the copy left behind
+                    self._final_chunks.pop(request_id, None)
+            if outcome[0]:
+                future.set_result(outcome[1])
+            else:
+                future.set_exception(outcome[1])
+        
+        threading.Thread(target=run, name=f"hedge-{request_id}", daemon=True).start()
+        return future
+    
+    def _cancel_copy(self, request_id: str, future: Future, token: CancellationToken, is_hedge: bool) -> None:
+        """Cancel the losing copy of a hedged request.
+        
+        Args:
+            request_id: Request ID of the losing copy
+            future: Future of the losing copy
+            token: Cancellation token of the losing copy
+            is_hedge: Whether the losing copy is the duplicate
+        """
+        with self._hedge_lock:
+            if future.done():
+                if is_hedge:
+                    self._final_chunks.pop(request_id, None)
+                return
+        token.cancel("other copy finished first")
+        logger.info(f"[{request_id}] ✂️ Cancelled (other copy finished first)")
+    
+    def _execute_hedged(
+        self,
+        delay: float,
+        request_id: str,
+        payload: Dict[str, Any],
+        prompt: str,
+        operation: Optional[str],
+        effective_timeout: int,
+        timeout_override: Optional[int],
+        request_start_time: float,
+        guards: Optional[Sequence[StreamGuard]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """Send a request and a duplicate if its first chunk is late.
+        
+        The duplicate (hedge) is sent after delay seconds without a first
+        chunk, preferably to another endpoint. The first copy to succeed wins
+        and the other is cancelled; if one copy fails, the other's result is
+        used.
+        
+        Args:
+            delay: Seconds to wait for the first chunk before hedging
+            request_id: Request ID of the primary copy
+            payload: JSON payload for /api/generate
+            prompt: The user prompt
+            operation: Operation name
+            effective_timeout: Timeout in seconds for each copy
+            timeout_override: Timeout override passed to generate(), if any
+            request_start_time: Time generate() was called
+            guards: Optional stream guards (each copy gets its own checks)
+            cancel_token: Optional token cancelling both copies
+            
+        Returns:
+            Generated text of the winning copy
+            
+        Raises:
+            LLMError: If both copies fail (the primary's error is raised)
+        """
+        cancel_token = cancel_token or CancellationToken()
+        first_chunk = threading.Event()
+        self._first_chunk_events[request_id] = first_chunk
+        try:
+            primary_token = cancel_token.child()
+            primary = self._start_attempt(request_id, lambda: self._execute_with_retries(
+                request_id, payload, prompt, operation, effective_timeout, timeout_override,
+                request_start_time, guards=guards, cancel_token=primary_token
+            ), primary_token, is_hedge=False)
+            wait([primary], timeout=delay)
+            if primary.done() or first_chunk.is_set():
+                return primary.result()
+            
+            hedge_id = self._format_request_id(operation)
+            primary_endpoint = self._request_endpoints.get(request_id)
+            logger.info(
+                f"[{request_id}] ⏩ No first chunk after {delay:.1f}s (p{round(self.hedging.quantile * 100)}) "
+                f"- hedging with [{hedge_id}]"
+            )
+            hedge_token = cancel_token.child()
+            hedge = self._start_attempt(hedge_id, lambda: self._execute_with_retries(
+                hedge_id, payload, prompt, operation, effective_timeout, timeout_override,
+                time.time(), guards=guards, avoid=[primary_endpoint] if primary_endpoint else (),
+                cancel_token=hedge_token
+            ), hedge_token, is_hedge=True)
+            
+            copies = {primary: request_id, hedge: hedge_id}
+            tokens = {primary: primary_token, hedge: hedge_token}
+            pending = set(copies)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        continue
+                    winner_id = copies[future]
+                    for other in pending:
+                        self._cancel_copy(copies[other], other, tokens[other], is_hedge=other is hedge)
+                    if future is hedge:
+                        # Report the winner's metrics under the caller's request ID
+                        self._final_chunks[request_id] = self._final_chunks.pop(hedge_id, {})
+                        self.hedging.record("hedge_wins")
+                        logger.info(f"[{request_id}] ⏩ Hedge [{winner_id}] finished first")
+                    else:
+                        self.hedging.record("primary_wins")
+                    return future.result()
+            self.hedging.record("both_failed")
+            return primary.result()
+        finally:
+            self._first_chunk_events.pop(request_id, None)
+    
+    def _check_guards(
+        self,
+        response: requests.Response,
+        request_id: str,
+        guards: Sequence[StreamGuard],
+        text: str,
+        elapsed: float
+    ) -> None:
+        """Run stream guards and abort the stream if one trips.
+        
+        Args:
+            response: Streaming HTTP response (closed when a guard trips)
+            request_id: Request ID for logging
+            guards: Guards to run
+            text: Text streamed so far
+            elapsed: Seconds since the stream started
+            
+        Raises:
+            GuardTrippedError: If a guard rejected the partial output
+        """
+        tripped = run_guards(guards, text)
+        if tripped is None:
+            return
+        guard, reason = tripped
+        # Closing the connection makes Ollama stop generating for this request
+        abort_response(response)
+        error_msg = (
+            f"[{request_id}] 🛑 Guard '{guard.name}' aborted generation after {elapsed:.1f}s, "
+            f"{len(text)} chars: {reason}"
+        )
+        logger.warning(error_msg)
+        raise GuardTrippedError(error_msg, guard=guard.name, reason=reason, partial_text=text)
+    
+    def _raise_if_cancelled(
+        self,
+        cancel_token: Optional[CancellationToken],
+        request_id: str,
+        detail: str,
+        cause: Optional[BaseException] = None
+    ) -> None:
+        """Raise RequestCancelledError if a failure was caused by cancellation.
+        
+        A cancelled request's connection is shut down, so its reader fails with
+        a connection or parsing error; that failure must not be retried.
+        
+        Args:
+            cancel_token: Token of the request (None = not cancellable)
+            request_id: Request ID for logging
+            detail: How far the request got, for the error message
+            cause: Error the cancellation surfaced as, if any
+            
+        Raises:
+            RequestCancelledError: If cancel_token was cancelled
+        """
+        if cancel_token is None or not cancel_token.cancelled:
+            return
+        error_msg = f"[{request_id}] ✂️ Request cancelled {detail}: {cancel_token.reason}"
+        logger.info(error_msg)
+        raise RequestCancelledError(error_msg) from cause
+    
+    def _model_loaded(self, snapshot, model: str) -> bool:
+        """Whether a model is among the models loaded in a health snapshot."""
+        names = {m.get("name") or m.get("model") for m in snapshot.models_loaded}
+        return model in names or f"{model}:latest" in names
+    
+    def _record_latency(
+        self,
+        request_id: str,
+        model: str,
+        operation: Optional[str],
+        request_send_time: float,
+        connect_time: float,
+        metrics: Optional[RequestMetrics]
+    ) -> None:
+        """Add a completed request to the latency profile.
+        
+        Args:
+            request_id: Request ID
+            model: Model the request used
+            operation: Operation name
+            request_send_time: Time the request was sent
+            connect_time: Pre-flight round trip to the endpoint in seconds
+            metrics: Metrics from the final chunk, if it was received
+        """
+        timings = self._stream_timings.get(request_id)
+        if not timings or not timings.get("first_chunk_at"):
+            return
+        now = time.time()
+        decode_tps = metrics.decode_tps if metrics else 0.0
+        self.latency.record(
+            model,
+            operation,
+            ttft=timings["first_chunk_at"] - request_send_time,
+            total=now - request_send_time,
+            max_gap=timings.get("max_gap", 0.0),
+            decode_tps=decode_tps,
+            connect=connect_time
+        )
+    
     def _parse_streaming_response(
         self, 
         response: requests.Response, 
         request_id: str,
         timeout: int,
-        allow_empty: bool = False
+        allow_empty: bool = False,
+        deadlines: Optional[StreamDeadlines] = None,
+        guards: Optional[Sequence[StreamGuard]] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> str:
         """Parse streaming JSON response from Ollama with adaptive timeout handling.
         
         This method implements adaptive timeout logic:
-        - Initial stream timeout: `timeout * 1.5` (e.g., 180s → 270s)
+        - Initial stream timeout: `deadlines.total` (static: `timeout * 1.5`, e.g., 180s → 270s)
         - Adaptive extension: If stream is making progress (chunks arriving or text growing),
-          timeout extends up to `timeout * 3.5` (e.g., 180s → 630s max)
-        - Stuck detection: Streams without progress for 30s are detected early and fail fast
+          timeout extends up to `deadlines.max_total` (static: `timeout * 2.0`)
+        - Stuck detection: Streams without progress for `deadlines.stall` (static: 30s)
+          are detected early and fail fast
         - Progress monitoring: Logs stream progress every 2s with chunk rate, text growth, speed
         
         Args:
@@ -449,6 +1327,13 @@ class OllamaClient:
             timeout: Base timeout in seconds (used to calculate stream timeout limits)
             allow_empty: If True, allow empty responses (e.g., for empty prompts).
                         If False, empty responses raise LLMError.
+            deadlines: Stream deadlines (default: static limits derived from timeout)
+            guards: Optional stream guards run every GUARD_CHECK_INTERVAL new
+                   characters; a tripped guard closes the stream
+            cancel_token: Optional token; cancelling it shuts down the stream
+                   from any thread. The stream is also shut down whenever
+                   parsing fails, so Ollama never keeps generating a response
+                   nobody reads.
             
         Returns:
             Complete generated text from streamed response
@@ -456,6 +1341,8 @@ class OllamaClient:
         Raises:
             LLMError: If response parsing fails, times out, or stream is stuck.
                      Error messages include actionable guidance and recommendations.
+            GuardTrippedError: If a stream guard rejected the partial output
+            RequestCancelledError: If cancel_token was cancelled
         
         Example:
             >>> response = requests.post(url, json=payload, stream=True)
@@ -469,12 +1356,17 @@ class OllamaClient:
         last_chunk_time = stream_start_time
         chunk_count = 0
         bytes_received = 0
-        base_stream_timeout = timeout * 1.5  # Base stream timeout: 1.5x connection timeout
+        deadlines = deadlines or StreamDeadlines.static(timeout)
+        base_stream_timeout = deadlines.total  # Base stream timeout (static: 1.5x base timeout)
         max_stream_time = base_stream_timeout  # Current effective timeout (may be extended adaptively)
-        max_adaptive_extension = timeout * 2.0  # Maximum total timeout (3.5x base timeout)
+        max_adaptive_extension = deadlines.max_total  # Maximum total timeout
         progress_log_interval = self.progress_log_interval  # Use configurable interval (default: 2.0s)
         waiting_log_interval = 10.0  # Log waiting status every 10 seconds if no chunks
-        stuck_detection_interval = 30.0  # Detect stuck streams after 30s without progress
+        stuck_detection_interval = deadlines.stall  # Detect stuck streams without progress
+        max_chunk_gap = 0.0  # Largest gap between chunks (recorded in the latency profile)
+        guards = list(guards or [])
+        guard_checked_length = 0  # Text length at the last guard check
+        text_listener = self._text_listeners.get(request_id)
         chunks_without_text = 0  # Track consecutive chunks without text extraction
         max_chunks_without_text = 100  # Fail fast if no text after 100 chunks
         first_chunk_received = False
@@ -482,11 +1374,17 @@ class OllamaClient:
         last_text_length = 0  # Track text growth for progress detection
         last_text_check_time = stream_start_time
         adaptive_extension_applied = False  # Track if we've extended timeout
+        stream_done = False  # Final chunk received
         
         logger.info(f"[{request_id}] Starting stream parsing, waiting for first chunk...")
         logger.debug(f"[{request_id}] Entering iter_lines() loop - this will block until first line arrives or timeout")
         logger.debug(f"[{request_id}] Stream timeout limit: {max_stream_time:.1f}s (base: {base_stream_timeout:.1f}s, max: {max_adaptive_extension:.1f}s)")
         
+        def abort() -> None:
+            abort_response(response)
+        
+        if cancel_token is not None:
+            cancel_token.add_callback(abort)
         try:
             # Use iter_lines with decode_unicode=True and chunk_size=1 to get immediate feedback
             # chunk_size=1 ensures we get data as soon as it arrives (not buffered)
@@ -494,6 +1392,12 @@ class OllamaClient:
                 current_time = time.time()
                 elapsed = current_time - stream_start_time
                 
+                if cancel_token is not None and cancel_token.cancelled:
+                    abort()
+                    self._raise_if_cancelled(
+                        cancel_token, request_id, f"after {elapsed:.1f}s ({chunk_count} chunks)"
+                    )
+                
                 # Adaptive timeout extension: if stream is making progress, extend timeout
                 if first_chunk_received and chunk_count > 0:
                     # Check if we're making progress (text is growing or chunks arriving)
@@ -562,8 +1466,9 @@ class OllamaClient:
                     
                     # Calculate performance metrics
                     chars_per_sec = len(generated_text) / elapsed if elapsed > 0 else 0
-                    tokens_est = len(generated_text) / 4  # Rough estimate: ~4 chars per token
-                    tokens_per_sec = tokens_est / elapsed if elapsed > 0 else 0
+                    tokens_est = chunk_count  # Ollama streams one token per chunk
+                    decode_elapsed = elapsed - first_chunk_time if first_chunk_time is not None else elapsed
+                    tokens_per_sec = tokens_est / decode_elapsed if decode_elapsed > 0 else 0
                     
                     # Build operation-specific recommendations
                     operation_context = f"Operation: {operation}" if operation else "Operation: unknown"
@@ -607,7 +1512,7 @@ class OllamaClient:
                         f"{recommendation}"
                     )
                     logger.error(error_msg)
-                    raise LLMError(error_msg)
+                    raise StreamTimeoutError(error_msg)
                 
                 # Log waiting status if no chunks received - use INFO level for better visibility
                 if chunk_count == 0 and elapsed >= waiting_log_interval:
@@ -631,20 +1536,23 @@ class OllamaClient:
                 # Log progress periodically at INFO level (compact format)
                 if current_time - last_progress_log >= progress_log_interval:
                     chars_per_sec = len(generated_text) / elapsed if elapsed > 0 else 0
-                    chunks_per_sec = chunk_count / elapsed if elapsed > 0 else 0
-                    tokens_est = len(generated_text) / 4  # Rough estimate: ~4 chars per token
-                    tokens_per_sec = tokens_est / elapsed if elapsed > 0 else 0
+                    # Ollama streams one token per chunk; rate measured from the first token (decode only)
+                    decode_elapsed = elapsed - first_chunk_time if first_chunk_time is not None else elapsed
+                    tokens_per_sec = chunk_count / decode_elapsed if decode_elapsed > 0 else 0
                     
                     logger.info(
                         f"[{request_id}] 📊 {elapsed:.1f}s: {len(generated_text)}c @{chars_per_sec:.0f}c/s "
-                        f"({chunk_count}ch, ~{tokens_est:.0f}t @{tokens_per_sec:.0f}t/s)"
+                        f"({chunk_count}t @{tokens_per_sec:.0f}t/s)"
                     )
                     last_progress_log = current_time
                 
                 if line:
                     bytes_received += len(line)
+                    if chunk_count > 0:
+                        max_chunk_gap = max(max_chunk_gap, current_time - last_chunk_time)
                     chunk_count += 1
                     last_chunk_time = current_time
+                    self.request_handler.record_progress(request_id)
                     text_extracted_this_chunk = False
                     
                     # Log when first chunk is received
@@ -654,6 +1562,9 @@ class OllamaClient:
                             f"[{request_id}] First chunk after {first_chunk_time:.2f}s ({bytes_received}b)"
                         )
                         first_chunk_received = True
+                        first_chunk_event = self._first_chunk_events.get(request_id)
+                        if first_chunk_event is not None:
+                            first_chunk_event.set()
                     
                     try:
                         data = json.loads(line)
@@ -675,37 +1586,7 @@ class OllamaClient:
                         continue
                     
                     # Try multiple field names for response text
-                    # Note: Some models (like qwen3-vl) use 'thinking' field, but most use 'response'
-                    response_text = None
-                    has_response_field = False
-                    
-                    # Check 'response' field first (standard for most Ollama models including ministral-3:3b)
-                    if "response" in data:
-                        has_response_field = True
-                        if data["response"] is not None:
-                            response_text = data["response"]
-                    # Also check 'thinking' field for compatibility with models that use it
-                    elif "thinking" in data and data["thinking"] is not None:
-                        response_text = data["thinking"]
-                        has_response_field = True
-                        has_response_field = True
-                        if data["response"] is not None:
-                            response_text = data["response"]
-                    elif "content" in data and data["content"] is not None:
-                        response_text = data["content"]
-                        has_response_field = True
-                    elif "text" in data and data["text"] is not None:
-                        response_text = data["text"]
-                        has_response_field = True
-                    elif "message" in data:
-                        # Handle nested message structure
-                        message = data["message"]
-                        if isinstance(message, dict):
-                            response_text = message.get("content") or message.get("text") or message.get("response")
-                            has_response_field = True
-                        elif isinstance(message, str):
-                            response_text = message
-                            has_response_field = True
+                    response_text, has_response_field = extract_chunk_text(data)
                     
                     # Extract text if we have a non-empty string
                     if response_text is not None and isinstance(response_text, str):
@@ -713,6 +1594,15 @@ class OllamaClient:
                             generated_text += response_text
                             text_extracted_this_chunk = True
                             chunks_without_text = 0  # Reset counter on successful extraction
+                            if text_listener is not None:
+                                try:
+                                    text_listener(generated_text)
+                                except Exception as e:
+                                    logger.debug(f"[{request_id}] Text listener failed: {e}")
+                            if guards and not data.get("done", False) and \
+                                    len(generated_text) - guard_checked_length >= GUARD_CHECK_INTERVAL:
+                                guard_checked_length = len(generated_text)
+                                self._check_guards(response, request_id, guards, generated_text, elapsed)
                         # Empty string is normal in streaming (keep-alive chunks)
                         # Don't count empty strings as failures - they're expected in streaming
                         # The response field exists, so the stream is working correctly
@@ -740,12 +1630,7 @@ class OllamaClient:
                     # Only check if we haven't extracted any text yet
                     # Check if response field exists (even if empty) vs missing
                     # Check for any response field (response is standard, thinking is for some models)
-                    has_response_field_in_chunk = (
-                        "response" in data or 
-                        "thinking" in data or 
-                        "content" in data or 
-                        "text" in data
-                    )
+                    has_response_field_in_chunk = has_text_field(data)
                     
                     if not generated_text:
                         # Check if response field exists but is empty (normal in streaming) vs missing (problem)
@@ -785,6 +1670,14 @@ class OllamaClient:
                                 raise LLMError(error_msg)
                         
                     if data.get("done", False):
+                        # Keep token counts and durations reported by the final chunk
+                        self._final_chunks[request_id] = {
+                            k: v for k, v in data.items() if k not in ("response", "thinking", "context")
+                        }
+                        self._stream_timings[request_id] = {
+                            "first_chunk_at": stream_start_time + (first_chunk_time or 0.0),
+                            "max_gap": max_chunk_gap,
+                        }
                         stream_duration = time.time() - stream_start_time
                         chars_per_sec = len(generated_text) / stream_duration if stream_duration > 0 else 0
                         logger.debug(
@@ -792,12 +1685,20 @@ class OllamaClient:
                             f"{chunk_count} chunks, {bytes_received} bytes, "
                             f"{len(generated_text)} chars ({chars_per_sec:.1f} chars/s)"
                         )
+                        stream_done = True
                         break
                         
-        except LLMError:
-            # Re-raise LLMError as-is
+        except (LLMError, requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            # Re-raise LLMError as-is; connection failures are retried (or failed over) by the caller.
+            # Either way nobody reads the rest of this stream: disconnect so Ollama stops generating it.
+            abort()
+            if not isinstance(e, RequestCancelledError):
+                self._raise_if_cancelled(
+                    cancel_token, request_id, f"after {time.time() - stream_start_time:.1f}s ({chunk_count} chunks)", e
+                )
             raise
         except json.JSONDecodeError as e:
+            abort()
             # Log detailed error with sample data
             error_msg = (
                 f"[{request_id}] JSON decode error in stream parsing: {e}. "
@@ -808,6 +1709,10 @@ class OllamaClient:
             logger.error(error_msg)
             raise LLMError(error_msg)
         except Exception as e:
+            abort()
+            self._raise_if_cancelled(
+                cancel_token, request_id, f"after {time.time() - stream_start_time:.1f}s ({chunk_count} chunks)", e
+            )
             error_msg = (
                 f"[{request_id}] Error parsing stream: {e}. "
                 f"Processed {chunk_count} chunks, {bytes_received} bytes, "
@@ -815,6 +1720,13 @@ class OllamaClient:
             )
             logger.error(error_msg, exc_info=True)
             raise LLMError(error_msg)
+        finally:
+            if cancel_token is not None:
+                cancel_token.remove_callback(abort)
+        
+        # A cancelled stream may simply end early
+        if not stream_done:
+            self._raise_if_cancelled(cancel_token, request_id, f"after {chunk_count} chunks")
         
         # Final validation: check if we got any text
         if not generated_text:
@@ -935,7 +1847,12 @@ class OllamaClient:
         system_prompt: Optional[str] = None,
         params: Optional[Dict[str, Any]] = None,
         operation: Optional[str] = None,
-        timeout_override: Optional[int] = None
+        timeout_override: Optional[int] = None,
+        use_cache: bool = True,
+        prefix: Optional[SharedPrefix] = None,
+        guards: Optional[Sequence[StreamGuard]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        model: Optional[str] = None
     ) -> str:
         """Generate text using a template and variables.
         
@@ -946,6 +1863,11 @@ class OllamaClient:
             params: Optional generation parameters
             operation: Optional operation name for logging context (e.g., "lecture", "lab")
             timeout_override: Optional timeout override in seconds (overrides instance timeout)
+            use_cache: Look up and store the response in the response cache (default: True)
+            prefix: Optional shared prefix placed before the prompt (see generate())
+            guards: Optional stream guards (see generate())
+            cancel_token: Optional cancellation token (see generate())
+            model: Optional model (see generate())
             
         Returns:
             Generated text
@@ -962,5 +1884,16 @@ class OllamaClient:
         formatted_prompt = self.format_prompt(template, variables)
         
         # Generate with formatted prompt and operation context
-        return self.generate(formatted_prompt, system_prompt, params, operation=operation, timeout_override=timeout_override)
+        return self.generate(
+            formatted_prompt,
+            system_prompt,
+            params,
+            operation=operation,
+            timeout_override=timeout_override,
+            use_cache=use_cache,
+            prefix=prefix,
+            guards=guards,
+            cancel_token=cancel_token,
+            model=model
+        )
 
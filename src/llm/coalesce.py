@@ -0,0 +1,195 @@
+"""Single-flight coalescing of identical in-flight LLM requests.
+
+When several threads submit the same request (same endpoint, model, system
+prompt, prompt and parameters) while it is already running, only the first
+caller (the leader) sends it to Ollama; the others (followers) wait for the
+leader's result. Cancelling a shared flight propagates to the underlying
+request and to every waiting caller.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescedRequestCancelled(Exception):
+    """Raised to callers of a coalesced request that was cancelled."""
+    pass
+
+
+class _Flight:
+    """One in-flight request shared by a leader and its followers."""
+
+    def __init__(self, key: str, request_id: Optional[str], on_cancel: Optional[Callable[[], None]]):
+        self.key = key
+        self.request_id = request_id
+        self.on_cancel = on_cancel
+        self.future: Future = Future()
+        self.followers = 0
+        self.started_at = time.time()
+        self.cancelled = threading.Event()
+
+
+class RequestCoalescer:
+    """Per-key single-flight execution with shared futures.
+
+    Use run(key, fn) for every call; concurrent calls with the same key share
+    one execution of fn. Results are not cached after the flight completes
+    (see ResponseCache for that).
+    """
+
+    def __init__(self):
+        """Initialize coalescer."""
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._executed = 0
+        self._coalesced = 0
+        self._cancelled = 0
+        self._abandoned = 0
+
+    def run(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        request_id: Optional[str] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run fn, or wait for an identical in-flight call to finish.
+
+        Args:
+            key: Request identity (identical requests must share a key)
+            fn: Zero-argument callable performing the request
+            request_id: Optional request ID for logging
+            on_cancel: Called (once) if the flight is cancelled while this
+                      caller leads it, e.g., to abort the HTTP request
+            timeout: Maximum seconds a follower waits for the leader; on
+                    expiry the follower detaches and raises
+                    CoalescedRequestCancelled (the leader keeps running)
+
+        Returns:
+            Result of fn (shared by all callers of the flight)
+
+        Raises:
+            CoalescedRequestCancelled: If the flight was cancelled or the
+                follower wait timed out
+            Exception: Whatever fn raised, re-raised in every caller
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight(key, request_id, on_cancel)
+                self._flights[key] = flight
+                leader = True
+            else:
+                flight.followers += 1
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            logger.info(
+                f"[{request_id or 'req'}] 🔗 Joined in-flight identical request [{flight.request_id}] "
+                f"(started {time.time() - flight.started_at:.1f}s ago)"
+            )
+            try:
+                return flight.future.result(timeout=timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    flight.followers -= 1
+                    self._abandoned += 1
+                raise CoalescedRequestCancelled(
+                    f"Gave up waiting for in-flight request [{flight.request_id}] after {timeout}s"
+                )
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(flight)
+            if not flight.future.done():
+                flight.future.set_exception(e)
+            if flight.cancelled.is_set():
+                raise CoalescedRequestCancelled(f"Request [{flight.request_id}] was cancelled") from e
+            raise
+        self._finish(flight)
+        if flight.cancelled.is_set():
+            raise CoalescedRequestCancelled(f"Request [{flight.request_id}] was cancelled")
+        flight.future.set_result(result)
+        return result
+
+    def _finish(self, flight: _Flight) -> None:
+        """Remove a completed flight so later calls start a new one."""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            self._executed += 1
+
+    def cancel(self, key: str) -> bool:
+        """Cancel an in-flight request and release all of its waiters.
+
+        Waiting followers raise CoalescedRequestCancelled immediately; the
+        leader's on_cancel callback is invoked and the leader raises
+        CoalescedRequestCancelled once its call returns.
+
+        Args:
+            key: Request identity passed to run()
+
+        Returns:
+            True if a flight was cancelled, False if none was in flight
+        """
+        with self._lock:
+            flight = self._flights.pop(key, None)
+            if flight is None:
+                return False
+            self._cancelled += 1
+        flight.cancelled.set()
+        if not flight.future.done():
+            flight.future.set_exception(
+                CoalescedRequestCancelled(f"Request [{flight.request_id}] was cancelled")
+            )
+        if flight.on_cancel is not None:
+            try:
+                flight.on_cancel()
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"[{flight.request_id}] Cancellation callback failed: {e}")
+        logger.info(f"[{flight.request_id}] 🛑 Cancelled shared request ({flight.followers} waiting callers released)")
+        return True
+
+    def in_flight(self) -> int:
+        """Number of distinct requests currently in flight."""
+        with self._lock:
+            return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics.
+
+        Returns:
+            Dict with executed (calls that reached Ollama), coalesced (calls
+            saved by joining an in-flight request), cancelled, abandoned
+            (follower waits that timed out) and in_flight
+        """
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "cancelled": self._cancelled,
+                "abandoned": self._abandoned,
+                "in_flight": len(self._flights),
+            }
+
+
+# Global coalescer instance
+_global_coalescer = RequestCoalescer()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Get the global request coalescer instance.
+
+    Returns:
+        Global RequestCoalescer instance
+    """
+    return _global_coalescer
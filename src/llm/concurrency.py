@@ -0,0 +1,351 @@
+"""Global concurrency governor for Ollama requests.
+
+This module limits the number of in-flight generation requests per Ollama
+endpoint. Within a process a semaphore bounds concurrent threads; across
+processes (e.g., scripts 04 and 05 running side by side) a set of slot lock
+files provides the same bound. The limit should match the number of parallel
+slots the Ollama server is configured with (OLLAMA_NUM_PARALLEL), so extra
+requests queue on the client instead of oversubscribing the model server and
+running into stream timeouts.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.llm.cancellation import CancellationToken
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PARALLEL = 4
+NUM_PARALLEL_ENV = "OLLAMA_NUM_PARALLEL"
+# Queue waits longer than this are logged at INFO level
+WAIT_LOG_THRESHOLD = 1.0
+POLL_INTERVAL_MIN = 0.01
+POLL_INTERVAL_MAX = 0.5
+# How often a cancellable wait for a slot checks its token
+CANCEL_CHECK_INTERVAL = 0.1
+
+
+class ConcurrencyTimeoutError(TimeoutError):
+    """Raised when a request slot could not be acquired in time."""
+    pass
+
+
+class ConcurrencyCancelledError(Exception):
+    """Raised when a request is cancelled while it waits for a slot."""
+    pass
+
+
+def resolve_max_parallel(configured: Optional[Any] = None) -> int:
+    """Resolve the per-endpoint request limit.
+
+    Uses the configured value if set, otherwise the OLLAMA_NUM_PARALLEL
+    environment variable, otherwise DEFAULT_MAX_PARALLEL.
+
+    Args:
+        configured: Value of llm.concurrency.max_parallel (may be None)
+
+    Returns:
+        Positive request limit
+    """
+    for value, source in ((configured, "config"), (os.environ.get(NUM_PARALLEL_ENV), NUM_PARALLEL_ENV)):
+        if value in (None, ""):
+            continue
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid max_parallel from {source}: {value!r}. Ignoring.")
+            continue
+        if limit > 0:
+            return limit
+        logger.warning(f"max_parallel from {source} must be positive, got {limit}. Ignoring.")
+    return DEFAULT_MAX_PARALLEL
+
+
+class ConcurrencyGovernor:
+    """Limit in-flight requests to one Ollama endpoint.
+
+    Attributes:
+        endpoint: Endpoint the limit applies to (base URL)
+        max_parallel: Maximum concurrent requests
+        cross_process: Whether the limit is shared with other processes
+        lock_dir: Directory holding the cross-process slot lock files
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_parallel: int = DEFAULT_MAX_PARALLEL,
+        cross_process: bool = True,
+        lock_dir: Optional[str] = None
+    ):
+        """Initialize the governor.
+
+        Args:
+            endpoint: Endpoint the limit applies to (base URL)
+            max_parallel: Maximum concurrent requests (default: 4)
+            cross_process: Share the limit with other processes through slot
+                          lock files (default: True; ignored where fcntl is
+                          unavailable)
+            lock_dir: Directory for slot lock files (default: system temp dir)
+        """
+        self.endpoint = endpoint.rstrip('/')
+        self.max_parallel = max(1, int(max_parallel))
+        self.cross_process = bool(cross_process) and fcntl is not None
+        if cross_process and fcntl is None:
+            logger.debug("fcntl unavailable; concurrency limit applies to this process only")
+        self.lock_dir = Path(lock_dir) if lock_dir else Path(tempfile.gettempdir()) / "ollama-slots"
+
+        self._semaphore = threading.BoundedSemaphore(self.max_parallel)
+        self._lock = threading.Lock()
+        self._free_slots: List[int] = list(range(self.max_parallel))
+        self._held: Dict[int, Any] = {}  # slot index -> open lock file
+
+        self._in_flight = 0
+        self._waiting = 0
+        self._peak_in_flight = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @classmethod
+    def from_config(cls, endpoint: str, concurrency_config: Optional[Dict[str, Any]] = None) -> "ConcurrencyGovernor":
+        """Create a governor from the llm.concurrency config section.
+
+        Args:
+            endpoint: Endpoint the limit applies to (base URL)
+            concurrency_config: Optional dict with max_parallel, cross_process
+                               and lock_dir keys
+
+        Returns:
+            Configured ConcurrencyGovernor
+        """
+        concurrency_config = concurrency_config or {}
+        return cls(
+            endpoint,
+            max_parallel=resolve_max_parallel(concurrency_config.get("max_parallel")),
+            cross_process=concurrency_config.get("cross_process", True),
+            lock_dir=concurrency_config.get("lock_dir")
+        )
+
+    def _slot_path(self, index: int) -> Path:
+        """Path of the lock file for a cross-process slot."""
+        digest = hashlib.sha1(self.endpoint.encode("utf-8")).hexdigest()[:12]
+        return self.lock_dir / f"{digest}.slot{index}.lock"
+
+    def _try_lock_file_slot(self) -> Optional[int]:
+        """Try to lock one free cross-process slot without blocking.
+
+        Returns:
+            Slot index, or None if all slots are held by some process
+        """
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(self.max_parallel):
+            with self._lock:
+                if index not in self._free_slots:
+                    continue
+                self._free_slots.remove(index)
+            handle = open(self._slot_path(index), "a+")
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                with self._lock:
+                    self._free_slots.append(index)
+                continue
+            with self._lock:
+                self._held[index] = handle
+            return index
+        return None
+
+    def _start_wait(self) -> float:
+        with self._lock:
+            self._waiting += 1
+        return time.time()
+
+    def _finish_wait(self, wait_start: float, request_id: Optional[str], acquired: bool) -> None:
+        wait = time.time() - wait_start
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                return
+            self._in_flight += 1
+            self._acquired += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            in_flight = self._in_flight
+        prefix = f"[{request_id}] " if request_id else ""
+        if wait >= WAIT_LOG_THRESHOLD:
+            logger.info(
+                f"{prefix}⏳ Waited {wait:.1f}s for an LLM slot ({in_flight}/{self.max_parallel} in flight)"
+            )
+        else:
+            logger.debug(f"{prefix}Acquired LLM slot after {wait:.3f}s ({in_flight}/{self.max_parallel} in flight)")
+
+    def acquire(
+        self,
+        request_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Optional[int]:
+        """Block until a request slot is free.
+
+        Args:
+            request_id: Optional request ID for logging
+            timeout: Maximum seconds to wait (default: wait indefinitely)
+            cancel_token: Optional token; the wait is given up once it is
+                         cancelled (checked every CANCEL_CHECK_INTERVAL)
+
+        Returns:
+            Cross-process slot index (None when the limit is process-local);
+            pass it to release()
+
+        Raises:
+            ConcurrencyTimeoutError: If no slot became free within timeout
+            ConcurrencyCancelledError: If cancel_token was cancelled first
+        """
+        wait_start = self._start_wait()
+        deadline = None if timeout is None else wait_start + timeout
+        acquired = False
+
+        def check_cancelled() -> None:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise ConcurrencyCancelledError(
+                    f"Cancelled while waiting for an LLM slot for {self.endpoint}: {cancel_token.reason}"
+                )
+
+        try:
+            while True:
+                check_cancelled()
+                wait = None if deadline is None else max(0.0, deadline - time.time())
+                if cancel_token is not None:
+                    wait = CANCEL_CHECK_INTERVAL if wait is None else min(wait, CANCEL_CHECK_INTERVAL)
+                if self._semaphore.acquire(timeout=wait):
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    raise ConcurrencyTimeoutError(f"No LLM slot free for {self.endpoint} after {timeout}s")
+            if not self.cross_process:
+                acquired = True
+                return None
+            poll = POLL_INTERVAL_MIN
+            while True:
+                slot = self._try_lock_file_slot()
+                if slot is not None:
+                    acquired = True
+                    return slot
+                if deadline is not None and time.time() >= deadline:
+                    self._semaphore.release()
+                    raise ConcurrencyTimeoutError(
+                        f"No LLM slot free for {self.endpoint} after {timeout}s (held by other processes)"
+                    )
+                if cancel_token is None:
+                    time.sleep(poll)
+                elif cancel_token.wait(poll):
+                    self._semaphore.release()
+                    check_cancelled()
+                poll = min(poll * 2, POLL_INTERVAL_MAX)
+        finally:
+            self._finish_wait(wait_start, request_id, acquired)
+
+    def release(self, slot: Optional[int] = None) -> None:
+        """Release a slot obtained from acquire().
+
+        Args:
+            slot: Value returned by acquire()
+        """
+        if slot is not None:
+            with self._lock:
+                handle = self._held.pop(slot, None)
+            if handle is not None:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                finally:
+                    handle.close()
+                with self._lock:
+                    self._free_slots.append(slot)
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+        self._semaphore.release()
+
+    @contextmanager
+    def slot(self, request_id: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[None]:
+        """Context manager holding one request slot.
+
+        Args:
+            request_id: Optional request ID for logging
+            timeout: Maximum seconds to wait for the slot
+        """
+        held = self.acquire(request_id, timeout=timeout)
+        try:
+            yield
+        finally:
+            self.release(held)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue and in-flight statistics.
+
+        Returns:
+            Dict with max_parallel, in_flight, waiting, peak_in_flight,
+            acquired, total_wait, avg_wait, max_wait and cross_process
+        """
+        with self._lock:
+            return {
+                "max_parallel": self.max_parallel,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "peak_in_flight": self._peak_in_flight,
+                "acquired": self._acquired,
+                "total_wait": self._total_wait,
+                "avg_wait": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait": self._max_wait,
+                "cross_process": self.cross_process,
+            }
+
+
+# Process-wide registry of governors, keyed by endpoint
+_governors: Dict[str, ConcurrencyGovernor] = {}
+_registry_lock = threading.Lock()
+
+
+def get_concurrency_governor(
+    endpoint: str,
+    concurrency_config: Optional[Dict[str, Any]] = None
+) -> ConcurrencyGovernor:
+    """Get the process-wide concurrency governor for an endpoint.
+
+    The first caller for an endpoint determines its configuration; later
+    callers share the same instance, so every client, stage and thread in the
+    process draws from one pool of slots.
+
+    Args:
+        endpoint: Endpoint base URL
+        concurrency_config: llm.concurrency config section used if the
+                           governor is created
+
+    Returns:
+        Shared ConcurrencyGovernor instance
+    """
+    key = endpoint.rstrip('/')
+    with _registry_lock:
+        governor = _governors.get(key)
+        if governor is None:
+            governor = ConcurrencyGovernor.from_config(key, concurrency_config)
+            _governors[key] = governor
+            logger.debug(
+                f"Concurrency governor for {key}: max_parallel={governor.max_parallel}, "
+                f"cross_process={governor.cross_process}"
+            )
+        return governor
@@ -0,0 +1,243 @@
+"""Shared HTTP connection pool for Ollama requests.
+
+This module provides a thread-safe, keep-alive HTTP transport that is owned by
+an OllamaClient and shared by its health monitor and request handler, so that
+health checks, version probes and generation calls reuse TCP connections
+instead of opening a new one per request.
+
+Its connections are cancellable: a request sent while a cancellation token is
+active (src.llm.cancellation) has its socket shut down when the token is
+cancelled, even while it is still waiting for Ollama's response headers.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.llm.cancellation import CancellationToken, get_active_token, shutdown_socket
+
+logger = logging.getLogger(__name__)
+
+# Defaults used when llm_config.yaml has no connection_pool section
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+
+
+class _CancellableConnectionMixin:
+    """Shut down the socket of an in-flight request when its token is cancelled.
+
+    The token active when a request is sent is followed until the response
+    headers arrive; from then on the response's reader (OllamaClient's stream
+    parser) aborts it. Ollama sends headers only with the first token, so
+    without this a request could not be cancelled while the model loads or
+    evaluates the prompt.
+    """
+
+    _cancel_token: Optional[CancellationToken] = None
+
+    def _abort_on_cancel(self) -> None:
+        shutdown_socket(getattr(self, "sock", None))
+
+    def _release_cancellation(self) -> None:
+        if self._cancel_token is not None:
+            self._cancel_token.remove_callback(self._abort_on_cancel)
+            self._cancel_token = None
+
+    def connect(self) -> None:
+        super().connect()
+        if self._cancel_token is not None and self._cancel_token.cancelled:
+            # Cancelled while connecting, before the socket could be shut down
+            self._abort_on_cancel()
+
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        token = get_active_token()
+        if token is not None:
+            if token.cancelled:
+                raise ConnectionAbortedError(f"Request cancelled: {token.reason}")
+            self._cancel_token = token
+            token.add_callback(self._abort_on_cancel)
+        try:
+            return super().request(*args, **kwargs)
+        except BaseException:
+            self._release_cancellation()
+            raise
+
+    def getresponse(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            self._release_cancellation()
+
+
+class _CancellableHTTPConnection(_CancellableConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CancellableHTTPSConnection(_CancellableConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CancellableHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CancellableHTTPConnection
+
+
+class _CancellableHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CancellableHTTPSConnection
+
+
+class _CancellableHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools use cancellable connections."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CancellableHTTPConnectionPool,
+            "https": _CancellableHTTPSConnectionPool,
+        }
+
+
+class OllamaConnectionPool:
+    """Thread-safe pooled HTTP transport for the Ollama API.
+
+    Wraps a single requests.Session mounted with an HTTPAdapter whose urllib3
+    pool keeps connections alive between requests. urllib3 connection pools are
+    thread-safe, so one instance can be shared by every thread that talks to
+    the same Ollama service.
+
+    Attributes:
+        pool_connections: Number of per-host pools to cache
+        pool_maxsize: Maximum keep-alive connections per host
+        keep_alive: Whether connections are reused between requests
+        pool_block: Whether to block when the pool is exhausted
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        pool_block: bool = False
+    ):
+        """Initialize the connection pool.
+
+        Args:
+            pool_connections: Number of per-host pools to cache (default: 4)
+            pool_maxsize: Maximum keep-alive connections per host (default: 16)
+            keep_alive: Reuse TCP connections between requests (default: True).
+                       If False, every request is sent with "Connection: close".
+            pool_block: Block when all pooled connections are in use instead of
+                       opening a temporary extra connection (default: False)
+        """
+        self.pool_connections = max(1, int(pool_connections))
+        self.pool_maxsize = max(1, int(pool_maxsize))
+        self.keep_alive = bool(keep_alive)
+        self.pool_block = bool(pool_block)
+
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._request_count = 0
+
+        logger.debug(
+            f"Initialized OllamaConnectionPool: pool_connections={self.pool_connections}, "
+            f"pool_maxsize={self.pool_maxsize}, keep_alive={self.keep_alive}"
+        )
+
+    @classmethod
+    def from_config(cls, pool_config: Optional[Dict[str, Any]] = None) -> "OllamaConnectionPool":
+        """Create a connection pool from the llm.connection_pool config section.
+
+        Args:
+            pool_config: Optional dictionary with pool_connections, pool_maxsize,
+                        keep_alive and pool_block keys
+
+        Returns:
+            Configured OllamaConnectionPool
+        """
+        pool_config = pool_config or {}
+        return cls(
+            pool_connections=pool_config.get("pool_connections", DEFAULT_POOL_CONNECTIONS),
+            pool_maxsize=pool_config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE),
+            keep_alive=pool_config.get("keep_alive", True),
+            pool_block=pool_config.get("pool_block", False)
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        """Get the shared session, creating it on first use."""
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a session mounted with pooled adapters.
+
+        Returns:
+            Configured requests.Session
+        """
+        session = requests.Session()
+        # Retries are handled by OllamaClient, not by urllib3
+        adapter = _CancellableHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+            pool_block=self.pool_block
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request through the shared session.
+
+        Args:
+            method: HTTP method (e.g., "GET", "POST")
+            url: Request URL
+            **kwargs: Extra arguments passed to requests.Session.request
+
+        Returns:
+            requests.Response object
+        """
+        session = self.session
+        with self._lock:
+            self._request_count += 1
+        return session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request through the shared session."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request through the shared session."""
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics.
+
+        Returns:
+            Dict with requests_sent, pool_connections, pool_maxsize and keep_alive
+        """
+        with self._lock:
+            return {
+                "requests_sent": self._request_count,
+                "pool_connections": self.pool_connections,
+                "pool_maxsize": self.pool_maxsize,
+                "keep_alive": self.keep_alive,
+            }
+
+    def close(self) -> None:
+        """Close all pooled connections.
+
+        The pool can still be used afterwards; a new session is created lazily.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
@@ -0,0 +1,230 @@
+"""Token-budgeted prompt context.
+
+Stage 05 used to paste up to 50K characters of outline and 50K characters of
+session content into every secondary material prompt, and the lecture prompt
+took up to 50K characters of outline context. Prefill dominates the cost of
+these short outputs, so most of that time went into context the model barely
+used. This module measures each context piece, replaces the full outline with
+a digest (the current module in full, other modules as titles only), and fits
+the pieces into a per-operation token budget: pieces smaller than their fair
+share are kept whole and the rest split what remains, each trimmed at a
+paragraph or line boundary.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.llm.sizing import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_TOKENS = 8000
+# Per-piece character cap applied when budgeting is disabled (previous behavior)
+LEGACY_MAX_CHARS = 50000
+TRIM_MARKER = "\n\n[... trimmed to fit the context budget ...]"
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Trim a text to a token allowance at a paragraph or line boundary.
+
+    Args:
+        text: Text to trim
+        max_tokens: Token allowance
+
+    Returns:
+        The text unchanged if it fits, otherwise its leading part plus a
+        trim marker (empty if the allowance cannot hold the marker)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = int(max_tokens * CHARS_PER_TOKEN) - len(TRIM_MARKER)
+    if max_chars <= 0:
+        return ""
+    cut = text[:max_chars]
+    # Prefer a paragraph break, then a line break, in the last half of the cut
+    for separator in ("\n\n", "\n"):
+        boundary = cut.rfind(separator)
+        if boundary >= max_chars // 2:
+            cut = cut[:boundary]
+            break
+    return cut.rstrip() + TRIM_MARKER
+
+
+def outline_digest(modules: Sequence[Dict[str, Any]], module_id: Any) -> str:
+    """Build a compact outline for prompts about one module.
+
+    Args:
+        modules: Outline modules (module_id, module_name, module_description, sessions)
+        module_id: ID of the module the prompt is about
+
+    Returns:
+        The current module with its description and every session's
+        subtopics, objectives and key concepts; other modules as one title line
+    """
+    lines: List[str] = []
+    for module in modules:
+        sessions = module.get("sessions", []) or []
+        header = f"Module {module.get('module_id', '')}: {module.get('module_name', '')}"
+        if module.get("module_id") != module_id:
+            lines.append(f"{header} ({len(sessions)} sessions)")
+            continue
+        lines.append(f"{header} (current module)")
+        if module.get("module_description"):
+            lines.append(f"  Overview: {module['module_description']}")
+        for session in sessions:
+            lines.append(f"  Session {session.get('session_number', '')}: {session.get('session_title', '')}")
+            for key, label in (
+                ("subtopics", "Subtopics"),
+                ("learning_objectives", "Objectives"),
+                ("key_concepts", "Key Concepts"),
+            ):
+                items = session.get(key) or []
+                if items:
+                    lines.append(f"    {label}: {'; '.join(str(item) for item in items)}")
+    return "\n".join(lines)
+
+
+class ContextBudget:
+    """Fit named context pieces into a per-operation token budget.
+
+    Attributes:
+        enabled: Whether budgets are applied (disabled = 50K-character cap per piece)
+        default_tokens: Budget for operations without their own
+        operations: Budget per operation name
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        default_tokens: int = DEFAULT_CONTEXT_TOKENS,
+        operations: Optional[Dict[str, int]] = None
+    ):
+        """Initialize the budget.
+
+        Args:
+            enabled: Apply token budgets (default: True)
+            default_tokens: Budget for operations without their own (default: 8000)
+            operations: Budget per operation name
+        """
+        self.enabled = bool(enabled)
+        self.default_tokens = int(default_tokens)
+        self.operations = {op: int(tokens) for op, tokens in (operations or {}).items()}
+        self._lock = threading.Lock()
+        self._fitted = 0
+        self._trimmed = 0
+        self._tokens_in = 0
+        self._tokens_out = 0
+
+    @classmethod
+    def from_config(cls, budget_config: Optional[Dict[str, Any]]) -> "ContextBudget":
+        """Create a budget from the llm.context_budget config section.
+
+        A missing section disables budgets and keeps the previous 50K-character
+        cap per piece.
+
+        Args:
+            budget_config: Optional dict with enabled, default_tokens and
+                          operations keys
+
+        Returns:
+            Configured ContextBudget
+        """
+        if not budget_config:
+            return cls(enabled=False)
+        return cls(
+            enabled=budget_config.get("enabled", True),
+            default_tokens=budget_config.get("default_tokens", DEFAULT_CONTEXT_TOKENS),
+            operations=budget_config.get("operations")
+        )
+
+    def budget_for(self, operation: Optional[str]) -> int:
+        """Get an operation's context budget in tokens.
+
+        Args:
+            operation: Operation name
+
+        Returns:
+            The operation's budget, or default_tokens
+        """
+        return self.operations.get(operation or "", self.default_tokens)
+
+    def fit(
+        self,
+        pieces: Sequence[Tuple[str, str]],
+        operation: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
+        """Fit context pieces into a token budget.
+
+        Pieces that fit in an equal share of the remaining budget are kept
+        whole (smallest first); the others split what is left equally.
+
+        Args:
+            pieces: (name, text) pairs, in prompt order
+            operation: Operation whose budget applies
+            max_tokens: Explicit budget (overrides the operation's)
+
+        Returns:
+            (name, text) pairs in the same order, trimmed as needed
+        """
+        if not self.enabled:
+            return [(name, text[:LEGACY_MAX_CHARS]) for name, text in pieces]
+        budget = max_tokens if max_tokens is not None else self.budget_for(operation)
+        sizes = [estimate_tokens(text) for _, text in pieces]
+        total = sum(sizes)
+
+        allowances = list(sizes)
+        if total > budget:
+            remaining = budget
+            pending = sorted(range(len(pieces)), key=lambda i: sizes[i])
+            while pending:
+                share = remaining // len(pending)
+                if sizes[pending[0]] > share:
+                    for i in pending:
+                        allowances[i] = share
+                    break
+                remaining -= sizes[pending.pop(0)]
+
+        fitted = [(name, fit_text(text, allowance)) for (name, text), allowance in zip(pieces, allowances)]
+        fitted_total = sum(estimate_tokens(text) for _, text in fitted)
+        trimmed = [name for (name, _), size, allowance in zip(pieces, sizes, allowances) if size > allowance]
+        with self._lock:
+            self._fitted += 1
+            self._trimmed += 1 if trimmed else 0
+            self._tokens_in += total
+            self._tokens_out += fitted_total
+        if trimmed:
+            logger.info(
+                f"📏 Context for {operation or 'request'}: ~{total} → ~{fitted_total} tokens "
+                f"(budget {budget}, trimmed {', '.join(trimmed)})"
+            )
+        return fitted
+
+    def fit_piece(self, text: str, operation: Optional[str] = None) -> str:
+        """Fit a single context text into an operation's budget.
+
+        Args:
+            text: Context text
+            operation: Operation whose budget applies
+
+        Returns:
+            The text, trimmed as needed
+        """
+        return self.fit([("context", text)], operation)[0][1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how much context the budgets removed.
+
+        Returns:
+            Dict with enabled, fitted (contexts assembled), trimmed (contexts
+            that exceeded their budget), tokens_in and tokens_out (estimated)
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "fitted": self._fitted,
+                "trimmed": self._trimmed,
+                "tokens_in": self._tokens_in,
+                "tokens_out": self._tokens_out,
+            }
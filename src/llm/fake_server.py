@@ -0,0 +1,640 @@
+"""Local fake Ollama server for benchmarks, fault injection and tests.
+
+FakeOllamaServer serves /api/version, /api/tags, /api/ps and a streaming
+/api/generate on localhost using only the standard library. Generation
+streams NDJSON lines in Ollama's format (one line per token, then a done line
+with prompt_eval_count, eval_count and durations), so OllamaClient and the
+pipeline run against it unchanged. Timing and faults are attributes that can
+be changed while the server runs:
+
+- tokens_per_second / token_delay and first_token_delay shape the stream
+- stall_after + stall_seconds pause the stream once mid-generation
+- disconnect_after drops the connection after that many tokens
+- malformed_every inserts a truncated JSON line after every Nth token
+- generate_status returns an HTTP error instead of generating
+
+Without a fixed response_text, the response is a canned output for the
+request's operation, found from the X-Request-ID header the clients send
+(e.g., "lec:1a2b3c4d" is a lecture). The canned outputs pass the content
+analyzers (src.utils.content_analysis) under the default requirements, and the
+outline follows the JSON schema sent in the format field, so a full pipeline
+run completes without retries.
+
+Run standalone as a load target for scripts and benchmarks:
+
+    uv run python -m src.llm.fake_server --port 11434 --tokens-per-second 50 --ttft 0.5
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.llm.client import OPERATION_ABBREVIATIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE = "This is a response from the fake Ollama server."
+# How often the serving thread checks for stop()
+SHUTDOWN_POLL_INTERVAL = 0.05
+
+_OPERATIONS_BY_ABBREVIATION = {abbrev: op for op, abbrev in OPERATION_ABBREVIATIONS.items()}
+
+# Vocabulary for canned prose. No word ends in a-d, so a sentence end never
+# looks like a multiple-choice option ("a." or "d.") to analyze_questions, and
+# none of them form the phrases count_examples or analyze_integration count.
+_NOUNS = (
+    "energy", "system", "process", "pattern", "structure", "function", "signal",
+    "response", "layer", "network", "measure", "result", "change", "model",
+    "theory", "sample", "feature", "rate", "level", "cycle", "force", "balance",
+    "flow", "control", "input", "output", "source", "target", "state", "phase",
+    "factor", "variable", "limit", "range", "scale", "unit", "value", "element",
+    "component", "property", "reaction", "material", "surface", "boundary",
+    "region", "path", "step", "stage", "ratio", "series", "rule", "law",
+    "principle", "concept", "mechanism", "interaction", "gradient", "tissue",
+)
+_VERBS = (
+    "shapes", "drives", "limits", "changes", "explains", "shows", "links",
+    "supports", "reveals", "governs", "follows", "defines", "affects",
+    "produces", "requires", "predicts", "tests", "informs", "guides", "forms",
+    "sets", "alters", "traces", "maps",
+)
+_ADJECTIVES = (
+    "stable", "complex", "simple", "central", "local", "global", "early",
+    "late", "direct", "strong", "weak", "quick", "slow", "active", "constant",
+    "common", "rare", "internal", "external", "critical", "core", "visible",
+    "careful", "precise", "useful", "general", "narrow", "natural",
+    "typical", "small", "large", "steady", "uneven", "gradual", "sharp",
+)
+_SENTENCES = (
+    "The {a} {n} {v} the {n} of every {n}.",
+    "Each {n} {v} a {a} {n} within the {n}.",
+    "A {a} {n} often {v} the {n} near its {n}.",
+    "Students track how the {n} {v} each {a} {n}.",
+    "When the {n} is {a}, it {v} the {n}.",
+    "In practice a {a} {n} {v} both {n} and {n}.",
+    "Careful study of the {n} {v} why the {a} {n} matters.",
+)
+
+
+def _fill(rng: random.Random, template: str) -> str:
+    """Fill a sentence template with random vocabulary."""
+    text = re.sub(r"\{n\}", lambda m: rng.choice(_NOUNS), template)
+    text = re.sub(r"\{v\}", lambda m: rng.choice(_VERBS), text)
+    return re.sub(r"\{a\}", lambda m: rng.choice(_ADJECTIVES), text)
+
+
+def _prose(rng: random.Random, words: int) -> str:
+    """Generate non-repeating filler sentences of at least the given length."""
+    sentences: List[str] = []
+    count = 0
+    while count < words:
+        sentence = _fill(rng, rng.choice(_SENTENCES))
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+
+def _title(rng: random.Random) -> str:
+    """Generate a short title-case phrase."""
+    return f"{rng.choice(_ADJECTIVES).title()} {rng.choice(_NOUNS).title()}"
+
+
+def _lecture(rng: random.Random) -> str:
+    parts = ["# Lecture", "", _prose(rng, 60)]
+    for _ in range(5):
+        parts += ["", f"## {_title(rng)}", "", _prose(rng, 110)]
+        parts.append(_fill(rng, "For example, the {a} {n} {v} the {n} in each {n}."))
+        parts += ["", _prose(rng, 90), _fill(rng, "Consider how the {a} {n} {v} the {n}.")]
+    return "\n".join(parts) + "\n"
+
+
+def _lab(rng: random.Random) -> str:
+    parts = ["# Laboratory Exercise", "", _prose(rng, 40), "", "## Materials", ""]
+    parts += [f"- {_title(rng)}" for _ in range(5)]
+    parts += ["", "## Procedure", ""]
+    parts += [f"{i}. {_prose(rng, 12)}" for i in range(1, 9)]
+    parts += ["", f"⚠️ **Safety:** {_prose(rng, 20)}", "", "## Data Collection", ""]
+    parts += ["| Trial | Measurement | Observation |", "|-------|-------------|-------------|"]
+    parts += [f"| {i} | {rng.randint(10, 99)} | {rng.choice(_ADJECTIVES)} |" for i in range(1, 4)]
+    parts += ["", "## Analysis", "", _prose(rng, 60)]
+    return "\n".join(parts) + "\n"
+
+
+def _questions(rng: random.Random) -> str:
+    parts = ["# Comprehension Questions"]
+    for i in range(1, 11):
+        noun, other = rng.sample(_NOUNS, 2)
+        parts += [
+            "",
+            f"**Question {i}:** Which statement best describes how the {noun} {rng.choice(_VERBS)} the {other}?",
+            "",
+        ]
+        parts += [f"{letter}) The {rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)}" for letter in "ABCD"]
+        parts += ["", f"**Answer:** {rng.choice('ABCD')}", "", f"**Explanation:** {_prose(rng, 28)}"]
+    return "\n".join(parts) + "\n"
+
+
+def _study_notes(rng: random.Random) -> str:
+    parts = ["# Study Notes", "", "## Key Concepts", ""]
+    for name in rng.sample(_NOUNS, 6):
+        parts.append(f"- **{name.title()}**: {_prose(rng, 25)}")
+    parts += ["", "## Summary", "", _prose(rng, 150)]
+    return "\n".join(parts) + "\n"
+
+
+def _diagram(rng: random.Random) -> str:
+    labels = [_title(rng) for _ in range(12)]
+    ids = [chr(ord("A") + i) for i in range(12)]
+    lines = ["graph TD"]
+    for i in range(1, 12):
+        parent = (i - 1) // 2
+        lines.append(f"    {ids[parent]}[{labels[parent]}] --> {ids[i]}[{labels[i]}]")
+    lines.append(f"    {ids[11]}[{labels[11]}] --> {ids[0]}[{labels[0]}]")
+    return "\n".join(lines) + "\n"
+
+
+def _application(rng: random.Random) -> str:
+    parts = ["# Real-World Applications"]
+    for i in range(1, 5):
+        parts += ["", f"## Application {i}: {_title(rng)}", "", _prose(rng, 165)]
+    return "\n".join(parts) + "\n"
+
+
+def _extension(rng: random.Random) -> str:
+    parts = ["# Extension Topics"]
+    for i in range(1, 4):
+        parts += ["", f"## Topic {i}: {_title(rng)}", "", _prose(rng, 115)]
+    return "\n".join(parts) + "\n"
+
+
+def _integration(rng: random.Random) -> str:
+    parts = ["# Integration"]
+    for i in range(1, 4):
+        parts += [
+            "",
+            f"## Link {i}: {_title(rng)}",
+            "",
+            f"This session connects to Module {i} through the {rng.choice(_NOUNS)}. {_prose(rng, 70)}",
+        ]
+    return "\n".join(parts) + "\n"
+
+
+def _question_sections(rng: random.Random, heading: str) -> str:
+    parts = [f"# {heading}s"]
+    for i in range(1, 4):
+        parts += [
+            "",
+            f"## {heading} {i}: How does the {rng.choice(_NOUNS)} {rng.choice(_VERBS).rstrip('s')} the {rng.choice(_NOUNS)}?",
+            "",
+            _prose(rng, 80),
+        ]
+    return "\n".join(parts) + "\n"
+
+
+def _build_canned_outputs(seed: int = 7) -> Dict[str, str]:
+    """Build the canned output of every operation except the outline.
+
+    Args:
+        seed: Random seed (the outputs are deterministic)
+
+    Returns:
+        Dict mapping operation name to response text
+    """
+    rng = random.Random(seed)
+    diagram = _diagram(rng)
+    return {
+        "lecture": _lecture(rng),
+        "lab": _lab(rng),
+        "questions": _questions(rng),
+        "study_notes": _study_notes(rng),
+        "diagram": diagram,
+        "visualization": diagram,
+        "application": _application(rng),
+        "extension": _extension(rng),
+        "integration": _integration(rng),
+        "investigation": _question_sections(rng, "Research Question"),
+        "open_questions": _question_sections(rng, "Open Question"),
+    }
+
+
+CANNED_OUTPUTS = _build_canned_outputs()
+
+
+def canned_outline(body: Dict[str, Any]) -> str:
+    """Build an outline JSON response for a generate request.
+
+    The module count comes from the format schema's modules.minItems (or
+    "EXACTLY N modules" in the prompt), the session count from "EXACTLY N
+    total sessions" in the prompt, and list lengths from the schema's item
+    bounds; otherwise 2 modules of 2 sessions with 3 items per list.
+
+    Args:
+        body: /api/generate request body
+
+    Returns:
+        Outline JSON text
+    """
+    schema = body.get("format") if isinstance(body.get("format"), dict) else {}
+    prompt = body.get("prompt") or ""
+    properties = schema.get("properties", {})
+    num_modules = properties.get("modules", {}).get("minItems")
+    if num_modules is None:
+        match = re.search(r"EXACTLY (\d+) modules", prompt)
+        num_modules = int(match.group(1)) if match else 2
+    num_modules = max(1, int(num_modules))
+    match = re.search(r"EXACTLY (\d+) total sessions", prompt)
+    total_sessions = max(num_modules, int(match.group(1)) if match else num_modules * 2)
+
+    session_properties = (
+        properties.get("modules", {}).get("items", {}).get("properties", {})
+        .get("sessions", {}).get("items", {}).get("properties", {})
+    )
+
+    def items(field: str, label: str, session: int) -> List[str]:
+        count = max(3, int(session_properties.get(field, {}).get("minItems", 3)))
+        return [f"{label} {session}.{i}" for i in range(1, count + 1)]
+
+    modules = []
+    session_number = 1
+    for module_index in range(num_modules):
+        sessions_here = total_sessions // num_modules + (1 if module_index < total_sessions % num_modules else 0)
+        sessions = []
+        for _ in range(sessions_here):
+            sessions.append({
+                "session_number": session_number,
+                "session_title": f"Session {session_number}",
+                "subtopics": items("subtopics", "Subtopic", session_number),
+                "learning_objectives": items("learning_objectives", "Objective", session_number),
+                "key_concepts": items("key_concepts", "Concept", session_number),
+                "rationale": f"Session {session_number} continues the course sequence.",
+            })
+            session_number += 1
+        modules.append({
+            "module_id": module_index + 1,
+            "module_name": f"Module {module_index + 1}",
+            "module_description": f"Fake module {module_index + 1} for local runs.",
+            "sessions": sessions,
+        })
+    outline = {
+        "course_metadata": {
+            "name": "Fake Course",
+            "level": "Introductory",
+            "duration_weeks": total_sessions,
+            "total_sessions": total_sessions,
+            "total_modules": num_modules,
+        },
+        "modules": modules,
+    }
+    return json.dumps(outline, indent=2)
+
+
+def detect_operation(request_id: Optional[str], body: Dict[str, Any]) -> Optional[str]:
+    """Find the operation of a generate request.
+
+    Args:
+        request_id: X-Request-ID header value (e.g., "lec:1a2b3c4d"), if any
+        body: /api/generate request body
+
+    Returns:
+        Operation name, or None if unknown
+    """
+    if request_id and ":" in request_id:
+        operation = _OPERATIONS_BY_ABBREVIATION.get(request_id.split(":", 1)[0])
+        if operation:
+            return operation
+    if body.get("format"):
+        return "outline"
+    text = f"{body.get('system') or ''}\n{body.get('prompt') or ''}".lower()
+    if "mermaid" in text:
+        return "diagram"
+    return None
+
+
+class FakeOllamaServer:
+    """Local stand-in for the Ollama HTTP API with configurable timing and faults.
+
+    Attributes are read on every request, so tests and benchmarks can change
+    them while the server runs.
+
+    Attributes:
+        response_text: Fixed response text (None = canned output per operation)
+        outputs: Per-operation response texts overriding CANNED_OUTPUTS
+        model: Model name reported by /api/tags
+        ps_models: Models reported as loaded by /api/ps
+        chunked: Stream /api/generate with chunked transfer encoding (as Ollama
+                does); otherwise send a Content-Length body
+        token_delay: Seconds between streamed tokens
+        first_token_delay: Seconds before the response headers and first token
+        stall_after: Tokens sent before stalling once (None = never stall)
+        stall_seconds: Length of the stall
+        disconnect_after: Tokens sent before dropping the connection (None = never)
+        malformed_every: Insert a truncated JSON line after every Nth token (0 = never)
+        disconnect: Drop the connection without responding
+        generate_status: HTTP status returned by /api/generate
+        load_duration: Seconds reported as load_duration (simulates a model reload)
+        prompt_cache: Report prompt_eval_count like a KV prefix cache (~4 chars/token)
+        chunks_sent: Streamed /api/generate lines written
+        requests: (method, path, client_port, body) of every request
+        operations: Detected operation of every /api/generate request
+    """
+
+    def __init__(
+        self,
+        response_text: Optional[str] = None,
+        model: str = "gemma3:4b",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        chunked: bool = True,
+        tokens_per_second: Optional[float] = None,
+        first_token_delay: float = 0.0,
+        outputs: Optional[Dict[str, str]] = None
+    ):
+        """Start the server in a background thread.
+
+        Args:
+            response_text: Fixed response text (default: canned per-operation outputs)
+            model: Model name reported by the API
+            host: Address to bind
+            port: Port to bind (0 = a random free port)
+            chunked: Stream with chunked transfer encoding
+            tokens_per_second: Streaming rate (default: as fast as possible)
+            first_token_delay: Seconds before the first token
+            outputs: Per-operation response texts overriding the canned ones
+        """
+        self.response_text = response_text
+        self.outputs: Dict[str, str] = dict(outputs or {})
+        self.model = model
+        self.ps_models = [{"name": model, "size": 1, "size_vram": 1}]
+        self.chunked = chunked
+        self.token_delay = 0.0
+        if tokens_per_second:
+            self.tokens_per_second = tokens_per_second
+        self.first_token_delay = first_token_delay
+        self.stall_after: Optional[int] = None
+        self.stall_seconds = 0.0
+        self.disconnect_after: Optional[int] = None
+        self.malformed_every = 0
+        self.disconnect = False
+        self.generate_status = 200
+        self.load_duration = 0.0
+        self.prompt_cache = False
+        self.chunks_sent = 0
+        self.requests: List[Tuple[str, str, int, Optional[Dict[str, Any]]]] = []
+        self.operations: List[Optional[str]] = []
+        self._last_prompt = ""
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.base_url = f"http://{host}:{self.port}"
+        self.generate_url = f"{self.base_url}/api/generate"
+        # A short poll interval keeps stop() (and test teardown) quick
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": SHUTDOWN_POLL_INTERVAL}, daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Streaming rate (None = as fast as possible)."""
+        return 1.0 / self.token_delay if self.token_delay else None
+
+    @tokens_per_second.setter
+    def tokens_per_second(self, value: Optional[float]) -> None:
+        self.token_delay = 1.0 / value if value else 0.0
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def response_for(self, operation: Optional[str], body: Dict[str, Any]) -> str:
+        """Get the response text for a generate request.
+
+        Args:
+            operation: Detected operation (None if unknown)
+            body: /api/generate request body
+
+        Returns:
+            Response text
+        """
+        if self.response_text is not None:
+            return self.response_text
+        if operation in self.outputs:
+            return self.outputs[operation]
+        if operation == "outline":
+            return canned_outline(body)
+        return CANNED_OUTPUTS.get(operation, DEFAULT_RESPONSE)
+
+    def count(self, path: str) -> int:
+        """Return the number of requests received for a path."""
+        with self._lock:
+            return sum(1 for _, p, _, _ in self.requests if p == path)
+
+    def client_ports(self) -> set:
+        """Return the set of client-side ports seen (one per TCP connection)."""
+        with self._lock:
+            return {port for _, _, port, _ in self.requests}
+
+    def stop(self) -> None:
+        """Shut down the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _prompt_eval_count(self, body: Dict[str, Any]) -> int:
+        """Prompt tokens evaluated, discounting a prefix shared with the last prompt."""
+        if not self.prompt_cache:
+            return 10
+        full_prompt = (body.get("system") or "") + "\x00" + (body.get("prompt") or "")
+        with self._lock:
+            common = 0
+            for a, b in zip(full_prompt, self._last_prompt):
+                if a != b:
+                    break
+                common += 1
+            self._last_prompt = full_prompt
+        return max(1, (len(full_prompt) - common) // 4)
+
+    def _make_handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send small writes right away, like Ollama (Go sets TCP_NODELAY);
+            # otherwise each response waits on the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_not_found(self):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _record(self, body=None):
+                with server._lock:
+                    server.requests.append((self.command, self.path, self.client_address[1], body))
+
+            def _drop_connection(self):
+                self.close_connection = True
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+            def do_GET(self):
+                self._record()
+                if self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-local"})
+                elif self.path == "/api/tags":
+                    self._send_json({"models": [{"name": server.model}]})
+                elif self.path == "/api/ps":
+                    self._send_json({"models": server.ps_models})
+                else:
+                    self._send_not_found()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._record(body)
+                if self.path != "/api/generate":
+                    self._send_not_found()
+                    return
+                operation = detect_operation(self.headers.get("X-Request-ID"), body)
+                with server._lock:
+                    server.operations.append(operation)
+                if server.first_token_delay:
+                    time.sleep(server.first_token_delay)
+                if server.disconnect:
+                    self._drop_connection()
+                    return
+                if server.generate_status != 200:
+                    self._send_json({"error": "model not found"}, status=server.generate_status)
+                    return
+                self._stream(body, server.response_for(operation, body))
+
+            def _stream(self, body, text):
+                model = body.get("model")
+                words = text.split(" ")
+                prompt_eval_count = server._prompt_eval_count(body)
+                lines = []
+                malformed_every = server.malformed_every
+                for i, word in enumerate(words):
+                    token = word if i == 0 else " " + word
+                    lines.append(json.dumps({"model": model, "response": token, "done": False}))
+                    if malformed_every and (i + 1) % malformed_every == 0:
+                        lines.append(f'{{"model": "{model}", "response": "')
+                lines.append(json.dumps({
+                    "model": model, "response": "", "done": True,
+                    "prompt_eval_count": prompt_eval_count, "eval_count": len(words),
+                    "prompt_eval_duration": prompt_eval_count * 1_000_000,  # 1000 tokens/s
+                    "eval_duration": len(words) * 20_000_000,  # 50 tokens/s
+                    "load_duration": int(server.load_duration * 1_000_000_000),
+                }))
+                payloads = [(line + "\n").encode("utf-8") for line in lines]
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                if server.chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                else:
+                    self.send_header("Content-Length", str(sum(len(data) for data in payloads)))
+                self.end_headers()
+
+                stall_after = server.stall_after
+                disconnect_after = server.disconnect_after
+                tokens = 0
+                for data in payloads:
+                    if disconnect_after is not None and tokens >= disconnect_after:
+                        self._drop_connection()
+                        return
+                    if server.chunked:
+                        data = f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n"
+                    try:
+                        self.wfile.write(data)
+                        self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        return  # Client closed the stream
+                    tokens += 1
+                    with server._lock:
+                        server.chunks_sent += 1
+                    if stall_after is not None and tokens == stall_after:
+                        time.sleep(server.stall_seconds)
+                    elif server.token_delay:
+                        time.sleep(server.token_delay)
+                if server.chunked:
+                    try:
+                        self.wfile.write(b"0\r\n\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a fake Ollama server until interrupted.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv)
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Local fake Ollama server for benchmarks and fault injection")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=11434, help="Port to bind (default: 11434)")
+    parser.add_argument("--model", default="gemma3:4b", help="Model name to report (default: gemma3:4b)")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="Streaming rate (default: unthrottled)")
+    parser.add_argument("--ttft", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--stall-after", type=int, default=None, help="Stall once after this many tokens")
+    parser.add_argument("--stall-seconds", type=float, default=0.0, help="Length of the stall")
+    parser.add_argument("--disconnect-after", type=int, default=None, help="Drop the connection after this many tokens")
+    parser.add_argument("--malformed-every", type=int, default=0, help="Insert a malformed JSON line every N tokens")
+    parser.add_argument("--response", default=None, help="Fixed response text (default: canned per-operation outputs)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = FakeOllamaServer(
+        response_text=args.response,
+        model=args.model,
+        host=args.host,
+        port=args.port,
+        tokens_per_second=args.tokens_per_second,
+        first_token_delay=args.ttft,
+    )
+    server.stall_after = args.stall_after
+    server.stall_seconds = args.stall_seconds
+    server.disconnect_after = args.disconnect_after
+    server.malformed_every = args.malformed_every
+    rate = f"{args.tokens_per_second:g} tokens/s" if args.tokens_per_second else "unthrottled"
+    logger.info(f"🧪 Fake Ollama server on {server.base_url} (model={args.model}, {rate}, ttft={args.ttft:g}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        logger.info("🧪 Stopping fake Ollama server")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+"""Guards that abort doomed generations while they stream.
+
+Format validation (JSON extraction, Mermaid checks, lecture analysis) only
+runs after a generation has finished, so an outline that opens with prose, a
+diagram without a Mermaid header or a model stuck repeating itself costs the
+full decode time before the retry loop can react. A guard inspects the text
+streamed so far and returns a reason as soon as the output can no longer turn
+out valid; OllamaClient then closes the HTTP stream (which stops generation on
+the server) and raises GuardTrippedError so the caller can retry right away.
+
+Guards are cheap checks on the accumulated text. The client runs
+them every GUARD_CHECK_INTERVAL new characters while the stream is open; a
+stream that has already finished is never rejected by a guard, since aborting
+it would save nothing.
+"""
+
+import logging
+from typing import Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# New characters streamed between guard checks
+GUARD_CHECK_INTERVAL = 64
+
+# Mermaid diagram type declarations (as in content_analysis.mermaid)
+MERMAID_HEADERS = (
+    "graph", "flowchart", "sequenceDiagram", "classDiagram", "stateDiagram",
+    "erDiagram", "gantt", "pie", "gitgraph", "mindmap", "timeline", "journey",
+)
+
+
+class StreamGuard:
+    """Base class for checks on partially streamed output.
+
+    Attributes:
+        name: Guard name used in logs and errors
+    """
+
+    name = "guard"
+
+    def check(self, text: str) -> Optional[str]:
+        """Inspect the text streamed so far.
+
+        Args:
+            text: Accumulated generated text
+
+        Returns:
+            Reason the generation should be aborted, or None to continue
+        """
+        raise NotImplementedError
+
+
+class PrefixGuard(StreamGuard):
+    """Require one of a set of markers near the start of the output.
+
+    Leading whitespace and a Markdown code fence line (e.g., ```json) are
+    ignored, so fenced output is accepted.
+    """
+
+    def __init__(self, markers: Sequence[str], within_chars: int = 200, name: str = "prefix", description: str = ""):
+        """Initialize the guard.
+
+        Args:
+            markers: Strings one of which must occur in the first within_chars
+            within_chars: Characters after which a missing marker trips the guard
+            name: Guard name
+            description: Reason prefix used when the guard trips
+        """
+        self.markers = tuple(markers)
+        self.within_chars = int(within_chars)
+        self.name = name
+        self.description = description or f"output does not start with {' / '.join(self.markers)}"
+
+    def check(self, text: str) -> Optional[str]:
+        head = strip_code_fence(text)
+        if len(head) < self.within_chars:
+            return None
+        if any(marker in head[:self.within_chars] for marker in self.markers):
+            return None
+        return f"{self.description} (first {self.within_chars} characters: {head[:60]!r}...)"
+
+
+class WordLimitGuard(StreamGuard):
+    """Abort output that runs far past its word limit."""
+
+    name = "word_limit"
+
+    def __init__(self, max_words: int, slack: float = 1.5):
+        """Initialize the guard.
+
+        Args:
+            max_words: Configured maximum word count (e.g., lecture max_word_count)
+            slack: Multiple of max_words tolerated before tripping (default: 1.5)
+        """
+        self.max_words = int(max_words)
+        self.limit = int(self.max_words * float(slack))
+
+    def check(self, text: str) -> Optional[str]:
+        # Cheap pre-check: a word takes at least two characters with its separator
+        if len(text) < self.limit * 2:
+            return None
+        words = len(text.split())
+        if words <= self.limit:
+            return None
+        return f"Output exceeds maximum word count: {words} words so far (max {self.max_words})"
+
+
+class RepetitionGuard(StreamGuard):
+    """Detect a model stuck repeating the same passage."""
+
+    name = "repetition"
+
+    def __init__(self, span: int = 60, repeats: int = 5, window: int = 4000):
+        """Initialize the guard.
+
+        Args:
+            span: Length of the trailing passage compared (characters)
+            repeats: Occurrences of the passage in the window that count as a loop
+            window: Trailing characters searched for repeats
+        """
+        self.span = int(span)
+        self.repeats = int(repeats)
+        self.window = int(window)
+
+    def check(self, text: str) -> Optional[str]:
+        if len(text) < self.span * self.repeats:
+            return None
+        recent = text[-self.window:]
+        tail = recent[-self.span:]
+        # Mostly punctuation/whitespace tails (closing brackets, rules) recur legitimately
+        if sum(ch.isalnum() for ch in tail) < self.span // 3:
+            return None
+        count = recent.count(tail)
+        if count < self.repeats:
+            return None
+        return f"Repetition loop: the same {self.span}-character passage repeated {count} times ({tail.strip()[:40]!r}...)"
+
+
+def strip_code_fence(text: str) -> str:
+    """Drop leading whitespace and an opening Markdown code fence line.
+
+    Args:
+        text: Streamed text
+
+    Returns:
+        Text starting at the first content character
+    """
+    head = text.lstrip()
+    if head.startswith("```"):
+        newline = head.find("\n")
+        if newline == -1:
+            return ""
+        head = head[newline + 1:].lstrip()
+    return head
+
+
+def run_guards(guards: Iterable[StreamGuard], text: str) -> Optional[Tuple[StreamGuard, str]]:
+    """Run guards in order and return the first one that trips.
+
+    A guard raising an exception is logged and skipped; it never fails the
+    generation it is meant to protect.
+
+    Args:
+        guards: Guards to run
+        text: Accumulated generated text
+
+    Returns:
+        (guard, reason) of the first tripped guard, or None
+    """
+    for guard in guards:
+        try:
+            reason = guard.check(text)
+        except Exception as e:
+            logger.debug(f"Guard {guard.name} failed: {e}")
+            continue
+        if reason:
+            return guard, reason
+    return None
+
+
+def json_object_guard(within_chars: int = 200) -> PrefixGuard:
+    """Guard for responses that must be a JSON object (e.g., the course outline).
+
+    Args:
+        within_chars: Characters of preamble tolerated before the opening brace
+
+    Returns:
+        PrefixGuard requiring "{"
+    """
+    return PrefixGuard(("{",), within_chars=within_chars, name="json_start",
+                       description="JSON extraction failed: output does not start with a JSON object")
+
+
+def mermaid_header_guard(within_chars: int = 200) -> PrefixGuard:
+    """Guard for responses that must be a Mermaid diagram.
+
+    Args:
+        within_chars: Characters of preamble tolerated before the diagram type
+
+    Returns:
+        PrefixGuard requiring a Mermaid diagram type declaration
+    """
+    return PrefixGuard(MERMAID_HEADERS, within_chars=within_chars, name="mermaid_header",
+                       description="Missing diagram type declaration (graph/flowchart/etc.)")
+
@@ -5,13 +5,13 @@ including model status checking, resource monitoring, and diagnostics.
 """
 
 import logging
-import subprocess
 import time
 from typing import Any, Dict, List, Optional
 
 import requests
 
-from src.utils.helpers import check_ollama_gpu_usage, run_cmd_capture
+from src.llm.connection_pool import OllamaConnectionPool
+from src.llm.health_state import OllamaHealthState, get_health_state, gpu_usage_from_ps
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +23,26 @@ class OllamaHealthMonitor:
     and collect diagnostics for troubleshooting.
     """
     
-    def __init__(self, api_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        api_url: str = "http://localhost:11434",
+        connection_pool: Optional[OllamaConnectionPool] = None,
+        health_state: Optional[OllamaHealthState] = None
+    ):
         """Initialize health monitor.
         
         Args:
             api_url: Base Ollama API URL (default: http://localhost:11434)
+            connection_pool: Optional shared connection pool. If None, the
+                            monitor creates its own pool.
+            health_state: Optional cached health state. If None, the
+                         process-wide state for api_url is used.
         """
         self.api_url = api_url.rstrip('/')
+        self.connection_pool = connection_pool or OllamaConnectionPool()
+        self.health_state = health_state or get_health_state(
+            self.api_url, connection_pool=self.connection_pool
+        )
         self.version_url = f"{self.api_url}/api/version"
         self.models_url = f"{self.api_url}/api/tags"
         
@@ -48,7 +61,7 @@ class OllamaHealthMonitor:
         """
         start_time = time.time()
         try:
-            response = requests.get(self.version_url, timeout=timeout)
+            response = self.connection_pool.get(self.version_url, timeout=timeout)
             response_time = time.time() - start_time
             response.raise_for_status()
             
@@ -83,8 +96,8 @@ class OllamaHealthMonitor:
             - processor: Optional[str] - Processor info (e.g., "100% GPU")
             - size: Optional[str] - Model size if loaded
         """
-        # Check if model is currently loaded
-        gpu_info = check_ollama_gpu_usage()
+        # Check if model is currently loaded (from cached /api/ps result)
+        gpu_info = self.health_state.get_gpu_usage()
         loaded_models = gpu_info.get("models_loaded", [])
         details = gpu_info.get("details", [])
         
@@ -118,21 +131,16 @@ class OllamaHealthMonitor:
         Returns:
             True if model exists, False otherwise
         """
-        try:
-            response = requests.get(self.models_url, timeout=5)
-            response.raise_for_status()
-            models_data = response.json()
-            models = models_data.get("models", [])
-            
-            # Check if model name matches any available model
-            for model_info in models:
-                model_name = model_info.get("name", "")
-                if model == model_name or model_name.startswith(f"{model}:"):
-                    return True
-            return False
-        except Exception:
+        snapshot = self.health_state.get_snapshot()
+        if not snapshot.available or not snapshot.models_available:
             # If we can't check, assume it might exist
             return True
+        
+        # Check if model name matches any available model
+        for model_name in snapshot.models_available:
+            if model == model_name or model_name.startswith(f"{model}:"):
+                return True
+        return False
     
     def get_diagnostics(self) -> Dict[str, Any]:
         """Collect comprehensive diagnostics about Ollama service.
@@ -144,10 +152,12 @@ class OllamaHealthMonitor:
             - models_available: List of available models
             - system_info: System resource information (if available)
         """
+        # Diagnostics are collected after failures, so force a fresh snapshot
+        snapshot = self.health_state.refresh()
         diagnostics = {
-            "service_status": self.check_service_status(),
-            "gpu_info": check_ollama_gpu_usage(),
-            "models_available": self._get_available_models(),
+            "service_status": snapshot.to_service_status(),
+            "gpu_info": gpu_usage_from_ps(snapshot.models_loaded),
+            "models_available": list(snapshot.models_available),
             "timestamp": time.time()
         }
         
@@ -159,14 +169,7 @@ class OllamaHealthMonitor:
         Returns:
             List of model names
         """
-        try:
-            response = requests.get(self.models_url, timeout=5)
-            response.raise_for_status()
-            models_data = response.json()
-            models = models_data.get("models", [])
-            return [model_info.get("name", "") for model_info in models]
-        except Exception:
-            return []
+        return list(self.health_state.get_snapshot().models_available)
     
     def monitor_request_health(
         self,
@@ -194,8 +197,8 @@ class OllamaHealthMonitor:
         if elapsed < check_interval:
             return None
         
-        # Check service status
-        service_status = self.check_service_status(timeout=3)
+        # Check service status (from shared cached health state)
+        service_status = self.health_state.get_snapshot().to_service_status()
         if not service_status["available"]:
             logger.warning(
                 f"[{request_id}] Health check: Ollama service became unavailable "
@@ -0,0 +1,352 @@
+"""Process-wide cached health state for Ollama services.
+
+This module keeps one health snapshot per Ollama base URL, refreshed at most
+once per TTL (and optionally by a background thread), so that pre-flight
+checks, in-flight health monitoring and GPU usage checks read a shared cached
+view instead of each issuing their own probes or `ollama ps` subprocesses.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from src.llm.connection_pool import OllamaConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 5.0
+DEFAULT_IDLE_TIMEOUT = 60.0
+PROBE_TIMEOUT = 3.0
+
+
+@dataclass
+class HealthSnapshot:
+    """Point-in-time view of an Ollama service.
+
+    Attributes:
+        available: True if /api/version responded successfully
+        response_time: Response time of the version probe in seconds
+        version: Ollama version string if available
+        error: Error message if the service was unreachable
+        models_available: Model names reported by /api/tags
+        models_loaded: Loaded model entries reported by /api/ps
+        checked_at: Time the snapshot was taken (time.time())
+    """
+    available: bool
+    response_time: float
+    version: Optional[str] = None
+    error: Optional[str] = None
+    models_available: List[str] = field(default_factory=list)
+    models_loaded: List[Dict[str, Any]] = field(default_factory=list)
+    checked_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was taken."""
+        return time.time() - self.checked_at
+
+    def to_service_status(self) -> Dict[str, Any]:
+        """Convert to the dict format of OllamaHealthMonitor.check_service_status()."""
+        return {
+            "available": self.available,
+            "response_time": self.response_time,
+            "version": self.version,
+            "error": self.error
+        }
+
+
+def gpu_usage_from_ps(models_loaded: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build GPU usage information from /api/ps model entries.
+
+    Produces the same structure as src.utils.helpers.check_ollama_gpu_usage(),
+    deriving the processor split from each model's size and size_vram fields.
+
+    Args:
+        models_loaded: Model entries from the /api/ps response
+
+    Returns:
+        Dict with using_gpu, processor_info, models_loaded and details keys
+    """
+    if not models_loaded:
+        return {
+            "using_gpu": False,
+            "processor_info": "No models loaded",
+            "models_loaded": [],
+            "details": []
+        }
+
+    names: List[str] = []
+    details: List[Dict[str, str]] = []
+    has_gpu = False
+
+    for model_info in models_loaded:
+        name = model_info.get("name") or model_info.get("model", "")
+        size = model_info.get("size") or 0
+        size_vram = model_info.get("size_vram") or 0
+
+        if size <= 0:
+            processor = "Unknown"
+        else:
+            gpu_pct = round(100 * min(size_vram, size) / size)
+            cpu_pct = 100 - gpu_pct
+            if gpu_pct == 100:
+                processor = "100% GPU"
+            elif gpu_pct == 0:
+                processor = "100% CPU"
+            else:
+                processor = f"{cpu_pct}%/{gpu_pct}% CPU/GPU"
+            if gpu_pct > 0:
+                has_gpu = True
+
+        names.append(name)
+        details.append({"model": name, "processor": processor})
+
+    return {
+        "using_gpu": has_gpu,
+        "processor_info": details[0]["processor"],
+        "models_loaded": names,
+        "details": details
+    }
+
+
+class OllamaHealthState:
+    """Cached, TTL-bounded health state for one Ollama service.
+
+    Readers call get_snapshot(), which returns the cached snapshot if it is
+    younger than the TTL and otherwise refreshes it. Only one refresh runs at a
+    time; concurrent readers wait for it and share the result. An optional
+    background thread keeps the snapshot fresh while it is being read, and
+    stops itself after idle_timeout seconds without readers.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        connection_pool: Optional[OllamaConnectionPool] = None,
+        ttl: float = DEFAULT_TTL,
+        background_refresh: bool = True,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ):
+        """Initialize health state.
+
+        Args:
+            base_url: Base Ollama API URL (e.g., http://localhost:11434)
+            connection_pool: Optional shared connection pool for probes
+            ttl: Maximum age of a snapshot before it is refreshed (seconds)
+            background_refresh: Keep the snapshot fresh from a background thread
+            idle_timeout: Stop the background thread after this many seconds
+                         without reads
+        """
+        self.base_url = base_url.rstrip('/')
+        self.connection_pool = connection_pool or OllamaConnectionPool()
+        self.ttl = max(0.0, float(ttl))
+        self.background_refresh = background_refresh
+        self.idle_timeout = idle_timeout
+
+        self._snapshot: Optional[HealthSnapshot] = None
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._last_read = 0.0
+        self._refresh_count = 0
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> HealthSnapshot:
+        """Get the cached snapshot, refreshing it if older than max_age.
+
+        Args:
+            max_age: Maximum acceptable age in seconds (default: the TTL)
+
+        Returns:
+            Current HealthSnapshot
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._state_lock:
+            self._last_read = time.time()
+            snapshot = self._snapshot
+        self._ensure_refresher()
+
+        if snapshot is not None and snapshot.age <= max_age:
+            return snapshot
+        return self.refresh(max_age=max_age)
+
+    def refresh(self, max_age: Optional[float] = None) -> HealthSnapshot:
+        """Probe the service and update the cached snapshot.
+
+        If another thread is already refreshing, waits for it and returns its
+        result instead of issuing a second set of probes.
+
+        Args:
+            max_age: If given, skip probing when a snapshot younger than this
+                    became available while waiting for the refresh lock
+
+        Returns:
+            Fresh HealthSnapshot
+        """
+        with self._refresh_lock:
+            with self._state_lock:
+                snapshot = self._snapshot
+            if max_age is not None and snapshot is not None and snapshot.age <= max_age:
+                return snapshot
+
+            snapshot = self._probe()
+            with self._state_lock:
+                self._snapshot = snapshot
+                self._refresh_count += 1
+            return snapshot
+
+    def _probe(self) -> HealthSnapshot:
+        """Query /api/version, /api/tags and /api/ps.
+
+        Returns:
+            New HealthSnapshot
+        """
+        start_time = time.time()
+        try:
+            response = self.connection_pool.get(f"{self.base_url}/api/version", timeout=PROBE_TIMEOUT)
+            response_time = time.time() - start_time
+            response.raise_for_status()
+            version = (response.json() if response.content else {}).get("version", "unknown")
+        except requests.RequestException as e:
+            return HealthSnapshot(
+                available=False,
+                response_time=time.time() - start_time,
+                error=str(e)
+            )
+
+        models_available: List[str] = []
+        try:
+            response = self.connection_pool.get(f"{self.base_url}/api/tags", timeout=PROBE_TIMEOUT)
+            response.raise_for_status()
+            models_available = [m.get("name", "") for m in response.json().get("models", [])]
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Health state: could not list models from {self.base_url}: {e}")
+
+        models_loaded: List[Dict[str, Any]] = []
+        try:
+            response = self.connection_pool.get(f"{self.base_url}/api/ps", timeout=PROBE_TIMEOUT)
+            response.raise_for_status()
+            models_loaded = response.json().get("models", [])
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Health state: could not list loaded models from {self.base_url}: {e}")
+
+        return HealthSnapshot(
+            available=True,
+            response_time=response_time,
+            version=version,
+            models_available=models_available,
+            models_loaded=models_loaded
+        )
+
+    def is_available(self) -> bool:
+        """Check availability from the cached snapshot."""
+        return self.get_snapshot().available
+
+    def get_gpu_usage(self) -> Dict[str, Any]:
+        """Get GPU usage information from the cached /api/ps result.
+
+        Returns:
+            Dict in the format of check_ollama_gpu_usage()
+        """
+        snapshot = self.get_snapshot()
+        if not snapshot.available:
+            return {
+                "using_gpu": False,
+                "processor_info": "Unknown (Ollama unavailable)",
+                "models_loaded": [],
+                "details": []
+            }
+        return gpu_usage_from_ps(snapshot.models_loaded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get refresh statistics.
+
+        Returns:
+            Dict with refresh_count, snapshot_age and refresher_running
+        """
+        with self._state_lock:
+            snapshot = self._snapshot
+            refresh_count = self._refresh_count
+        return {
+            "refresh_count": refresh_count,
+            "snapshot_age": snapshot.age if snapshot else None,
+            "refresher_running": self._refresher is not None and self._refresher.is_alive()
+        }
+
+    def _ensure_refresher(self) -> None:
+        """Start the background refresher thread if enabled and not running."""
+        if not self.background_refresh or self.ttl <= 0:
+            return
+        with self._state_lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._stop_event.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop,
+                name=f"ollama-health-{self.base_url}",
+                daemon=True
+            )
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        """Refresh the snapshot every TTL until idle or stopped."""
+        while not self._stop_event.wait(self.ttl):
+            with self._state_lock:
+                idle_for = time.time() - self._last_read
+            if idle_for > self.idle_timeout:
+                logger.debug(f"Health state refresher for {self.base_url} idle for {idle_for:.0f}s, stopping")
+                break
+            try:
+                self.refresh()
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"Health state background refresh failed for {self.base_url}: {e}")
+
+    def stop(self) -> None:
+        """Stop the background refresher thread."""
+        self._stop_event.set()
+        refresher = self._refresher
+        if refresher is not None and refresher is not threading.current_thread():
+            refresher.join(timeout=PROBE_TIMEOUT * 3 + 1)
+
+
+# Process-wide registry of health states, keyed by base URL
+_health_states: Dict[str, OllamaHealthState] = {}
+_registry_lock = threading.Lock()
+
+
+def get_health_state(
+    base_url: str = "http://localhost:11434",
+    connection_pool: Optional[OllamaConnectionPool] = None,
+    ttl: float = DEFAULT_TTL,
+    background_refresh: bool = True
+) -> OllamaHealthState:
+    """Get the process-wide health state for an Ollama base URL.
+
+    The first caller for a URL determines the connection pool and TTL; later
+    callers share the same instance.
+
+    Args:
+        base_url: Base Ollama API URL
+        connection_pool: Connection pool to use if the state is created
+        ttl: Snapshot TTL in seconds if the state is created
+        background_refresh: Enable background refresh if the state is created
+
+    Returns:
+        Shared OllamaHealthState instance
+    """
+    key = base_url.rstrip('/')
+    with _registry_lock:
+        state = _health_states.get(key)
+        if state is None:
+            state = OllamaHealthState(
+                key,
+                connection_pool=connection_pool,
+                ttl=ttl,
+                background_refresh=background_refresh
+            )
+            _health_states[key] = state
+        return state
@@ -0,0 +1,116 @@
+"""Hedged requests for short operations.
+
+A session's diagrams, extensions and visualizations are generated in parallel,
+and the session finishes only when the slowest of them does. With llm.hedging
+enabled, a request of one of these short operations that has not produced its
+first chunk within the operation's observed p90 time to first chunk is sent a
+second time, to another endpoint when one is available (otherwise to another
+concurrency slot of the same one). Whichever copy finishes first wins; the
+other is cancelled and its stream closed as soon as it is reachable, which
+makes Ollama stop generating it.
+
+The delay comes from the latency profile (src.llm.latency), so no request is
+hedged until min_samples requests of its operation have completed.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from src.llm.latency import LatencyProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_OPERATIONS = ("diagram", "extension", "visualization")
+DEFAULT_HEDGE_PERCENTILE = 0.9
+DEFAULT_MIN_DELAY = 1.0
+
+
+class HedgePolicy:
+    """When to hedge a request, and how hedging has worked out so far.
+
+    Attributes:
+        enabled: Whether requests are hedged at all
+        operations: Operations eligible for hedging
+        quantile: Percentile of time to first chunk after which a hedge is sent
+        min_delay: Smallest hedge delay in seconds
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        operations: Iterable[str] = DEFAULT_HEDGE_OPERATIONS,
+        quantile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_delay: float = DEFAULT_MIN_DELAY
+    ):
+        """Initialize the policy.
+
+        Args:
+            enabled: Hedge eligible requests (default: False)
+            operations: Eligible operations (default: diagram, extension, visualization)
+            quantile: Time-to-first-chunk percentile used as the delay (default: 0.9)
+            min_delay: Smallest delay in seconds (default: 1)
+        """
+        self.enabled = bool(enabled)
+        self.operations = frozenset(operations)
+        self.quantile = float(quantile)
+        self.min_delay = float(min_delay)
+        self._lock = threading.Lock()
+        self._stats = {"hedged": 0, "hedge_wins": 0, "primary_wins": 0, "both_failed": 0}
+
+    @classmethod
+    def from_config(cls, hedging_config: Optional[Dict[str, Any]] = None) -> "HedgePolicy":
+        """Create a policy from the llm.hedging config section.
+
+        Args:
+            hedging_config: Optional dict with enabled, operations, percentile
+                           and min_delay keys (missing section = disabled)
+
+        Returns:
+            Configured HedgePolicy
+        """
+        hedging_config = hedging_config or {}
+        return cls(
+            enabled=hedging_config.get("enabled", False),
+            operations=hedging_config.get("operations", DEFAULT_HEDGE_OPERATIONS),
+            quantile=hedging_config.get("percentile", DEFAULT_HEDGE_PERCENTILE),
+            min_delay=hedging_config.get("min_delay", DEFAULT_MIN_DELAY)
+        )
+
+    def delay(self, profile: LatencyProfile, model: str, operation: Optional[str]) -> Optional[float]:
+        """Get the hedge delay for a request.
+
+        Args:
+            profile: Latency profile with time-to-first-chunk samples
+            model: Model name
+            operation: Operation name
+
+        Returns:
+            Seconds to wait for the first chunk before hedging, or None if the
+            request is not hedged (disabled, other operation, too few samples)
+        """
+        if not self.enabled or operation not in self.operations:
+            return None
+        observed = profile.observed(model, operation, "ttft", self.quantile)
+        if observed is None:
+            return None
+        return max(self.min_delay, observed)
+
+    def record(self, outcome: str) -> None:
+        """Count a hedged request's outcome.
+
+        Args:
+            outcome: "hedge_wins", "primary_wins" or "both_failed"
+        """
+        with self._lock:
+            self._stats["hedged"] += 1
+            self._stats[outcome] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hedging statistics.
+
+        Returns:
+            Dict with hedged, hedge_wins, primary_wins and both_failed counts
+        """
+        with self._lock:
+            return dict(self._stats)
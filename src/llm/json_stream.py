@@ -0,0 +1,233 @@
+"""Incremental JSON validation for streamed responses.
+
+Structured outputs (Ollama's ``format`` field with a JSON schema) make a model
+emit a single JSON document, but a response can still break off or go wrong
+part-way through. JSONStreamParser checks the document one character at a
+time as it streams in, so the first character that can no longer be part of
+valid JSON is reported immediately instead of after the whole generation, when
+json.loads finally fails. JSONStreamGuard wraps it as a stream guard
+(src.llm.guards) for OllamaClient.
+
+The parser follows json.loads (strict mode): no comments, trailing commas,
+single quotes or raw control characters inside strings.
+"""
+
+import re
+from typing import List, Optional
+
+from src.llm.guards import StreamGuard
+
+_NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?\Z")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+_LITERALS = {"t": "true", "f": "false", "n": "null"}
+_ESCAPES = frozenset('"\\/bfnrtu')
+_HEX = frozenset("0123456789abcdefABCDEF")
+_WHITESPACE = frozenset(" \t\n\r")
+
+# Parser states between tokens
+_VALUE = "value"                    # A value is required
+_VALUE_OR_CLOSE = "value_or_close"  # After "[": a value or "]"
+_KEY = "key"                        # After "," in an object: a key string
+_KEY_OR_CLOSE = "key_or_close"      # After "{": a key string or "}"
+_COLON = "colon"                    # After an object key
+_NEXT = "next"                      # After a value inside a container: "," or the closing bracket
+_DONE = "done"                      # Top-level value complete: only whitespace may follow
+
+
+class JSONStreamError(ValueError):
+    """Raised when streamed text can no longer be valid JSON.
+
+    Attributes:
+        position: Offset of the offending character in the fed text
+    """
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at character {position}")
+        self.position = position
+
+
+class JSONStreamParser:
+    """Character-level JSON validator that can be fed text in pieces.
+
+    Attributes:
+        position: Number of characters consumed so far
+    """
+
+    def __init__(self):
+        """Initialize the parser at the start of a document."""
+        self.position = 0
+        self._stack: List[str] = []  # Open containers: "{" or "["
+        self._state = _VALUE
+        self._token: Optional[str] = None  # "string", "number" or "literal" while inside one
+        self._buffer = ""  # Number or literal characters read so far
+        self._string_is_key = False
+        self._escape = False
+        self._unicode_left = 0
+
+    @property
+    def complete(self) -> bool:
+        """Whether a complete top-level JSON value has been read."""
+        return self._state == _DONE and self._token is None
+
+    @property
+    def depth(self) -> int:
+        """Number of containers currently open."""
+        return len(self._stack)
+
+    def feed(self, text: str) -> None:
+        """Consume the next piece of the document.
+
+        Args:
+            text: Characters following those already fed
+
+        Raises:
+            JSONStreamError: At the first character that makes the document invalid
+        """
+        for char in text:
+            self._consume(char)
+            self.position += 1
+
+    def close(self) -> None:
+        """Check that the document ended with a complete value.
+
+        Raises:
+            JSONStreamError: If the document is truncated
+        """
+        if self._token == "number":
+            self._finish_number()
+        if not self.complete:
+            raise JSONStreamError("Unexpected end of JSON document", self.position)
+
+    def _fail(self, message: str) -> None:
+        raise JSONStreamError(message, self.position)
+
+    def _consume(self, char: str) -> None:
+        if self._token == "string":
+            self._consume_string(char)
+            return
+        if self._token == "number":
+            if char in _NUMBER_CHARS:
+                self._buffer += char
+                return
+            self._finish_number()
+        elif self._token == "literal":
+            self._buffer += char
+            expected = _LITERALS[self._buffer[0]]
+            if not expected.startswith(self._buffer):
+                self._fail(f"Invalid literal {self._buffer!r}")
+            if self._buffer == expected:
+                self._token = None
+                self._end_value()
+            return
+
+        if char in _WHITESPACE:
+            return
+        state = self._state
+        if state in (_VALUE, _VALUE_OR_CLOSE):
+            if state == _VALUE_OR_CLOSE and char == "]":
+                self._close()
+            else:
+                self._start_value(char)
+        elif state in (_KEY, _KEY_OR_CLOSE):
+            if state == _KEY_OR_CLOSE and char == "}":
+                self._close()
+            elif char == '"':
+                self._token = "string"
+                self._string_is_key = True
+            else:
+                self._fail(f"Expected object key, got {char!r}")
+        elif state == _COLON:
+            if char != ":":
+                self._fail(f"Expected ':', got {char!r}")
+            self._state = _VALUE
+        elif state == _NEXT:
+            container = self._stack[-1]
+            if char == ",":
+                self._state = _KEY if container == "{" else _VALUE
+            elif char == ("}" if container == "{" else "]"):
+                self._close()
+            else:
+                self._fail(f"Expected ',' or closing bracket, got {char!r}")
+        else:
+            self._fail(f"Unexpected {char!r} after the end of the JSON document")
+
+    def _start_value(self, char: str) -> None:
+        if char in "{[":
+            self._stack.append(char)
+            self._state = _KEY_OR_CLOSE if char == "{" else _VALUE_OR_CLOSE
+        elif char == '"':
+            self._token = "string"
+            self._string_is_key = False
+        elif char == "-" or char.isdigit():
+            self._token = "number"
+            self._buffer = char
+        elif char in _LITERALS:
+            self._token = "literal"
+            self._buffer = char
+        else:
+            self._fail(f"Expected a JSON value, got {char!r}")
+
+    def _consume_string(self, char: str) -> None:
+        if self._unicode_left:
+            if char not in _HEX:
+                self._fail(f"Invalid \\u escape character {char!r}")
+            self._unicode_left -= 1
+        elif self._escape:
+            if char not in _ESCAPES:
+                self._fail(f"Invalid escape '\\{char}'")
+            self._escape = False
+            if char == "u":
+                self._unicode_left = 4
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._token = None
+            if self._string_is_key:
+                self._state = _COLON
+            else:
+                self._end_value()
+        elif ord(char) < 0x20:
+            self._fail("Unescaped control character in string")
+
+    def _finish_number(self) -> None:
+        if not _NUMBER_RE.match(self._buffer):
+            self._fail(f"Invalid number {self._buffer!r}")
+        self._token = None
+        self._end_value()
+
+    def _close(self) -> None:
+        self._stack.pop()
+        self._end_value()
+
+    def _end_value(self) -> None:
+        self._state = _NEXT if self._stack else _DONE
+
+
+class JSONStreamGuard(StreamGuard):
+    """Stream guard that trips at the first character of invalid JSON.
+
+    Use one guard per request: it keeps parser state between checks and only
+    feeds the text added since the previous check. Leading whitespace is
+    allowed; anything else before the document (prose, code fences) trips
+    the guard, so it is meant for structured-output requests.
+    """
+
+    name = "json_stream"
+
+    def __init__(self):
+        """Initialize the guard."""
+        self.parser = JSONStreamParser()
+        self._consumed = 0
+
+    def check(self, text: str) -> Optional[str]:
+        if len(text) < self._consumed:
+            # A new stream with the same guard: start over
+            self.parser = JSONStreamParser()
+            self._consumed = 0
+        try:
+            self.parser.feed(text[self._consumed:])
+        except JSONStreamError as e:
+            return f"JSON extraction failed: invalid JSON in streamed output ({e})"
+        finally:
+            self._consumed = len(text)
+        return None
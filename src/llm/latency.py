@@ -0,0 +1,378 @@
+"""Learned per-operation timeouts from observed request latency.
+
+Static timeouts have to be generous enough for the slowest healthy request of
+an operation, so a request that hangs before its first token burns the whole
+window (e.g., 240s for an outline) before it fails. This module keeps a rolling
+latency profile per (model, operation) — connect time, time to first token,
+largest gap between chunks, decode rate and total duration — persisted as JSON
+so it survives between runs. Deadlines for a new request are derived from high
+percentiles of that profile: a hang is detected after a few times the usual
+time to first token, while slow but steadily streaming requests get a total
+limit scaled to what that operation has needed before.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = "output/.llm_latency_profile.json"
+DEFAULT_WINDOW = 50
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_SAFETY_FACTOR = 2.0
+DEFAULT_MIN_CONNECT = 1.0
+DEFAULT_MIN_FIRST_CHUNK = 15.0
+DEFAULT_MIN_STALL = 10.0
+
+# Static limits used until enough samples exist (and as bounds afterwards)
+STATIC_CONNECT_TIMEOUT = 5.0
+STATIC_STALL_TIMEOUT = 30.0
+STATIC_STREAM_MULTIPLIER = 1.5
+STATIC_MAX_STREAM_MULTIPLIER = 2.0
+
+SAMPLE_FIELDS = ("connect", "ttft", "max_gap", "decode_tps", "total")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of values.
+
+    Args:
+        values: Sample values (non-empty)
+        q: Quantile between 0 and 1 (e.g., 0.95)
+
+    Returns:
+        Value at the quantile
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+@dataclass
+class StreamDeadlines:
+    """Time limits applied to one streaming request (all in seconds).
+
+    Attributes:
+        connect: TCP connect timeout
+        first_chunk: Limit for the first chunk to arrive (also the socket read timeout)
+        stall: Gap between chunks after which a stream counts as stuck
+        total: Stream duration limit while the stream is not making progress
+        max_total: Upper bound the total limit may be extended to while
+                   chunks keep arriving
+        learned: Whether the limits come from the latency profile
+        samples: Number of profile samples the limits are based on
+    """
+
+    connect: float
+    first_chunk: float
+    stall: float
+    total: float
+    max_total: float
+    learned: bool = False
+    samples: int = 0
+
+    @classmethod
+    def static(cls, timeout: float) -> "StreamDeadlines":
+        """Fixed limits derived from the configured timeout alone.
+
+        Args:
+            timeout: Base timeout of the operation
+
+        Returns:
+            StreamDeadlines with the historical fixed multipliers
+        """
+        return cls(
+            connect=STATIC_CONNECT_TIMEOUT,
+            first_chunk=timeout,
+            stall=STATIC_STALL_TIMEOUT,
+            total=timeout * STATIC_STREAM_MULTIPLIER,
+            max_total=timeout * STATIC_MAX_STREAM_MULTIPLIER,
+        )
+
+    def describe(self) -> str:
+        """One-line summary for request logs."""
+        source = f"learned from {self.samples} samples" if self.learned else "static"
+        return (
+            f"connect={self.connect:.1f}s, first chunk={self.first_chunk:.1f}s, "
+            f"stall={self.stall:.1f}s, total={self.total:.0f}-{self.max_total:.0f}s ({source})"
+        )
+
+
+class LatencyProfile:
+    """Rolling latency samples per (model, operation), persisted to JSON.
+
+    Attributes:
+        path: JSON file the profile is loaded from and saved to
+        enabled: Whether deadlines are learned (samples are always recorded)
+        window: Samples kept per (model, operation)
+        min_samples: Samples required before learned deadlines are used
+        quantile: Percentile deadlines are derived from (e.g., 0.95)
+        safety_factor: Multiplier applied on top of the percentile
+        min_connect: Floor for the learned connect timeout
+        min_first_chunk: Floor for the learned first-chunk deadline
+        min_stall: Floor for the learned stall deadline
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_PROFILE_PATH,
+        enabled: bool = True,
+        window: int = DEFAULT_WINDOW,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        quantile: float = DEFAULT_PERCENTILE,
+        safety_factor: float = DEFAULT_SAFETY_FACTOR,
+        min_connect: float = DEFAULT_MIN_CONNECT,
+        min_first_chunk: float = DEFAULT_MIN_FIRST_CHUNK,
+        min_stall: float = DEFAULT_MIN_STALL
+    ):
+        """Initialize the profile and load persisted samples.
+
+        Args:
+            path: JSON file for persistence (None = in memory only)
+            enabled: Use learned deadlines (default: True)
+            window: Samples kept per (model, operation) (default: 50)
+            min_samples: Samples needed before deadlines are learned (default: 5)
+            quantile: Percentile used for deadlines (default: 0.95)
+            safety_factor: Multiplier on the percentile (default: 2.0)
+            min_connect: Smallest learned connect timeout (default: 1s)
+            min_first_chunk: Smallest learned first-chunk deadline (default: 15s)
+            min_stall: Smallest learned stall deadline (default: 10s)
+        """
+        self.path = Path(path) if path else None
+        self.enabled = bool(enabled)
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self.quantile = float(quantile)
+        self.safety_factor = float(safety_factor)
+        self.min_connect = float(min_connect)
+        self.min_first_chunk = float(min_first_chunk)
+        self.min_stall = float(min_stall)
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[Dict[str, float]]] = {}
+        self._load()
+
+    @classmethod
+    def from_config(cls, profile_config: Optional[Dict[str, Any]] = None) -> "LatencyProfile":
+        """Create a profile from the llm.adaptive_timeouts config section.
+
+        A missing section disables learned deadlines and keeps the profile in
+        memory only.
+
+        Args:
+            profile_config: Optional dict with enabled, path, window,
+                           min_samples, percentile, safety_factor,
+                           min_connect, min_first_chunk and min_stall keys
+
+        Returns:
+            Configured LatencyProfile
+        """
+        if not profile_config:
+            return cls(path=None, enabled=False)
+        return cls(
+            path=profile_config.get("path", DEFAULT_PROFILE_PATH),
+            enabled=profile_config.get("enabled", True),
+            window=profile_config.get("window", DEFAULT_WINDOW),
+            min_samples=profile_config.get("min_samples", DEFAULT_MIN_SAMPLES),
+            quantile=profile_config.get("percentile", DEFAULT_PERCENTILE),
+            safety_factor=profile_config.get("safety_factor", DEFAULT_SAFETY_FACTOR),
+            min_connect=profile_config.get("min_connect", DEFAULT_MIN_CONNECT),
+            min_first_chunk=profile_config.get("min_first_chunk", DEFAULT_MIN_FIRST_CHUNK),
+            min_stall=profile_config.get("min_stall", DEFAULT_MIN_STALL)
+        )
+
+    @staticmethod
+    def _key(model: str, operation: Optional[str]) -> str:
+        return f"{model}|{operation or 'unknown'}"
+
+    def _load(self) -> None:
+        """Load persisted samples (a missing or unreadable file starts empty)."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._samples = {
+                key: [s for s in samples if isinstance(s, dict)][-self.window:]
+                for key, samples in data.get("profiles", {}).items()
+            }
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable latency profile {self.path}: {e}")
+            self._samples = {}
+
+    def _save(self) -> None:
+        """Write the profile atomically (temp file + rename)."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = json.dumps({"profiles": self._samples}, indent=1).encode("utf-8")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write latency profile {self.path}: {e}")
+
+    def record(
+        self,
+        model: str,
+        operation: Optional[str],
+        ttft: float,
+        total: float,
+        max_gap: float = 0.0,
+        decode_tps: float = 0.0,
+        connect: float = 0.0
+    ) -> None:
+        """Add one successful request to the profile and persist it.
+
+        Args:
+            model: Model name
+            operation: Operation name (None = "unknown")
+            ttft: Seconds from sending the request to the first chunk
+            total: Seconds from sending the request to the last chunk
+            max_gap: Largest gap between two chunks in seconds
+            decode_tps: Output tokens per second
+            connect: Pre-flight round trip to the endpoint in seconds
+        """
+        sample = {
+            "connect": round(connect, 4),
+            "ttft": round(ttft, 4),
+            "max_gap": round(max_gap, 4),
+            "decode_tps": round(decode_tps, 3),
+            "total": round(total, 4),
+        }
+        with self._lock:
+            samples = self._samples.setdefault(self._key(model, operation), [])
+            samples.append(sample)
+            del samples[:-self.window]
+        self._save()
+
+    def _values(self, samples: List[Dict[str, float]], field: str) -> List[float]:
+        return [float(s[field]) for s in samples if s.get(field) is not None]
+
+    def deadlines(self, model: str, operation: Optional[str], timeout: float) -> StreamDeadlines:
+        """Derive the deadlines for a new request.
+
+        The static limits apply until min_samples requests of the operation
+        have been seen. Learned first-chunk and stall deadlines never exceed
+        their static values; the total limit never drops below the static one,
+        so operations that have needed longer in the past get more time.
+
+        Args:
+            model: Model name
+            operation: Operation name
+            timeout: Configured base timeout of the operation
+
+        Returns:
+            StreamDeadlines for the request
+        """
+        static = StreamDeadlines.static(timeout)
+        if not self.enabled:
+            return static
+        with self._lock:
+            samples = list(self._samples.get(self._key(model, operation), []))
+        if len(samples) < self.min_samples:
+            return static
+
+        def high(field: str) -> float:
+            values = self._values(samples, field)
+            return percentile(values, self.quantile) * self.safety_factor if values else 0.0
+
+        first_chunk = _clamp(high("ttft"), self.min_first_chunk, static.first_chunk)
+        total = max(static.total, high("total"))
+        return StreamDeadlines(
+            connect=_clamp(high("connect"), self.min_connect, static.connect),
+            first_chunk=first_chunk,
+            stall=_clamp(high("max_gap"), self.min_stall, static.stall),
+            total=total,
+            max_total=max(static.max_total, total * STATIC_MAX_STREAM_MULTIPLIER / STATIC_STREAM_MULTIPLIER),
+            learned=True,
+            samples=len(samples),
+        )
+
+    def observed(self, model: str, operation: Optional[str], field: str, quantile: float) -> Optional[float]:
+        """Get a percentile of one sample field once min_samples exist.
+
+        Unlike deadlines(), this ignores enabled: a profile kept in memory
+        only still answers for the requests seen in this run.
+
+        Args:
+            model: Model name
+            operation: Operation name
+            field: Sample field (one of SAMPLE_FIELDS)
+            quantile: Percentile as a fraction (e.g., 0.9)
+
+        Returns:
+            Observed value in seconds (or tokens/s), or None with too few samples
+        """
+        with self._lock:
+            samples = list(self._samples.get(self._key(model, operation), []))
+        values = self._values(samples, field)
+        if len(values) < self.min_samples:
+            return None
+        return percentile(values, quantile)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Summarize the profile.
+
+        Returns:
+            Dict mapping "model|operation" to samples and the configured
+            percentile of each field
+        """
+        with self._lock:
+            profiles = {key: list(samples) for key, samples in self._samples.items()}
+        stats = {}
+        for key, samples in sorted(profiles.items()):
+            entry: Dict[str, Any] = {"samples": len(samples)}
+            for field in SAMPLE_FIELDS:
+                values = self._values(samples, field)
+                entry[f"p{round(self.quantile * 100)}_{field}"] = percentile(values, self.quantile) if values else 0.0
+            stats[key] = entry
+        return stats
+
+
+# Process-wide profiles, keyed by file path
+_profiles: Dict[str, LatencyProfile] = {}
+_registry_lock = threading.Lock()
+
+
+def get_latency_profile(profile_config: Optional[Dict[str, Any]] = None) -> LatencyProfile:
+    """Get the process-wide latency profile for a config section.
+
+    Clients configured with the same profile path share one instance, so their
+    samples and the file they persist to stay consistent. Without a config
+    section each caller gets its own disabled in-memory profile.
+
+    Args:
+        profile_config: llm.adaptive_timeouts section
+
+    Returns:
+        LatencyProfile instance
+    """
+    if not profile_config or not profile_config.get("path", DEFAULT_PROFILE_PATH):
+        return LatencyProfile.from_config(profile_config)
+    key = str(Path(profile_config.get("path", DEFAULT_PROFILE_PATH)).resolve())
+    with _registry_lock:
+        profile = _profiles.get(key)
+        if profile is None:
+            profile = LatencyProfile.from_config(profile_config)
+            _profiles[key] = profile
+        return profile
+
@@ -0,0 +1,228 @@
+"""Per-request token and timing metrics reported by Ollama.
+
+The final chunk of every /api/generate stream carries the real prompt and
+output token counts and the time Ollama spent loading the model, evaluating
+the prompt (prefill) and generating tokens (decode). This module turns that
+chunk into a RequestMetrics record and aggregates the records per operation
+and per run, so stage summaries can show whether time goes into prompt size,
+output length or model reloads.
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+# Ollama reports durations in nanoseconds
+NS_PER_SECOND = 1_000_000_000
+# load_duration above this counts as a model (re)load rather than a warm call
+RELOAD_THRESHOLD_SECONDS = 0.5
+
+
+def _seconds(value: Any) -> float:
+    """Convert an Ollama nanosecond duration to seconds (missing = 0)."""
+    try:
+        return float(value) / NS_PER_SECOND
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _count(value: Any) -> int:
+    """Convert an Ollama token count to int (missing = 0)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class RequestMetrics:
+    """Token counts and durations of one completed generation request.
+
+    Attributes:
+        request_id: Request ID
+        operation: Operation name (e.g., "lecture")
+        model: Model name
+        prompt_tokens: Prompt tokens evaluated (prompt_eval_count)
+        output_tokens: Tokens generated (eval_count)
+        prefill_seconds: Prompt evaluation time (prompt_eval_duration)
+        decode_seconds: Generation time (eval_duration)
+        load_seconds: Model load time (load_duration)
+        total_seconds: Server-side total time (total_duration)
+        wall_seconds: Client-side time from send to last chunk
+    """
+
+    request_id: str
+    operation: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    prefill_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    load_seconds: float = 0.0
+    total_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @classmethod
+    def from_final_chunk(
+        cls,
+        request_id: str,
+        operation: Optional[str],
+        model: str,
+        chunk: Dict[str, Any],
+        wall_seconds: float = 0.0
+    ) -> "RequestMetrics":
+        """Build metrics from the final (done) chunk of a stream.
+
+        Args:
+            request_id: Request ID
+            operation: Operation name (None = "unknown")
+            model: Model name
+            chunk: Final chunk with prompt_eval_count, eval_count and *_duration fields
+            wall_seconds: Client-side elapsed time
+
+        Returns:
+            RequestMetrics
+        """
+        return cls(
+            request_id=request_id,
+            operation=operation or "unknown",
+            model=chunk.get("model") or model,
+            prompt_tokens=_count(chunk.get("prompt_eval_count")),
+            output_tokens=_count(chunk.get("eval_count")),
+            prefill_seconds=_seconds(chunk.get("prompt_eval_duration")),
+            decode_seconds=_seconds(chunk.get("eval_duration")),
+            load_seconds=_seconds(chunk.get("load_duration")),
+            total_seconds=_seconds(chunk.get("total_duration")),
+            wall_seconds=wall_seconds,
+        )
+
+    @property
+    def prefill_tps(self) -> float:
+        """Prompt tokens evaluated per second."""
+        return self.prompt_tokens / self.prefill_seconds if self.prefill_seconds > 0 else 0.0
+
+    @property
+    def decode_tps(self) -> float:
+        """Output tokens generated per second."""
+        return self.output_tokens / self.decode_seconds if self.decode_seconds > 0 else 0.0
+
+    @property
+    def reloaded(self) -> bool:
+        """Whether the model was (re)loaded for this request."""
+        return self.load_seconds >= RELOAD_THRESHOLD_SECONDS
+
+    def describe(self) -> str:
+        """One-line summary for request logs."""
+        parts = [
+            f"prefill {self.prompt_tokens}t/{self.prefill_seconds:.2f}s",
+            f"decode {self.output_tokens}t @{self.decode_tps:.1f}t/s",
+        ]
+        if self.reloaded:
+            parts.append(f"load {self.load_seconds:.1f}s")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Metrics as a plain dict (including derived rates)."""
+        data = asdict(self)
+        data.update(prefill_tps=self.prefill_tps, decode_tps=self.decode_tps, reloaded=self.reloaded)
+        return data
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "requests": 0,
+        "prompt_tokens": 0,
+        "output_tokens": 0,
+        "prefill_seconds": 0.0,
+        "decode_seconds": 0.0,
+        "load_seconds": 0.0,
+        "wall_seconds": 0.0,
+        "reloads": 0,
+    }
+
+
+def _add(totals: Dict[str, Any], metrics: RequestMetrics) -> None:
+    totals["requests"] += 1
+    totals["prompt_tokens"] += metrics.prompt_tokens
+    totals["output_tokens"] += metrics.output_tokens
+    totals["prefill_seconds"] += metrics.prefill_seconds
+    totals["decode_seconds"] += metrics.decode_seconds
+    totals["load_seconds"] += metrics.load_seconds
+    totals["wall_seconds"] += metrics.wall_seconds
+    totals["reloads"] += int(metrics.reloaded)
+
+
+def _with_rates(totals: Dict[str, Any]) -> Dict[str, Any]:
+    result = dict(totals)
+    result["prefill_tps"] = totals["prompt_tokens"] / totals["prefill_seconds"] if totals["prefill_seconds"] > 0 else 0.0
+    result["decode_tps"] = totals["output_tokens"] / totals["decode_seconds"] if totals["decode_seconds"] > 0 else 0.0
+    return result
+
+
+class MetricsSink:
+    """Thread-safe collector of RequestMetrics with per-operation aggregates."""
+
+    def __init__(self, keep_records: int = 10000):
+        """Initialize the sink.
+
+        Args:
+            keep_records: Maximum individual records kept for inspection
+                         (aggregates always cover every request)
+        """
+        self.keep_records = keep_records
+        self._lock = threading.Lock()
+        self._records: List[RequestMetrics] = []
+        self._run = _empty_totals()
+        self._by_operation: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, metrics: RequestMetrics) -> None:
+        """Add one request's metrics.
+
+        Args:
+            metrics: Completed request metrics
+        """
+        with self._lock:
+            if len(self._records) < self.keep_records:
+                self._records.append(metrics)
+            _add(self._run, metrics)
+            _add(self._by_operation.setdefault(metrics.operation, _empty_totals()), metrics)
+
+    def records(self) -> List[RequestMetrics]:
+        """Individual request records (up to keep_records)."""
+        with self._lock:
+            return list(self._records)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Aggregate metrics per run and per operation.
+
+        Returns:
+            Dict with "run" totals and "operations" mapping operation name to
+            totals. Totals hold requests, prompt_tokens, output_tokens,
+            prefill_seconds, decode_seconds, load_seconds, wall_seconds,
+            reloads, prefill_tps and decode_tps.
+        """
+        with self._lock:
+            return {
+                "run": _with_rates(self._run),
+                "operations": {op: _with_rates(t) for op, t in sorted(self._by_operation.items())},
+            }
+
+    def reset(self) -> None:
+        """Discard all collected metrics."""
+        with self._lock:
+            self._records.clear()
+            self._run = _empty_totals()
+            self._by_operation.clear()
+
+
+# Global metrics sink shared by all clients in the process
+_global_sink = MetricsSink()
+
+
+def get_metrics_sink() -> MetricsSink:
+    """Get the global metrics sink.
+
+    Returns:
+        Global MetricsSink instance
+    """
+    return _global_sink
@@ -0,0 +1,316 @@
+"""Shared prompt prefixes for per-session operations.
+
+The lecture, lab, study notes, questions and diagrams of one session (and the
+secondary materials of stage 05) all send the same course and session context,
+but each template places it differently and each operation has its own system
+prompt, so Ollama re-prefills the whole prompt for every request. In prefix
+mode the stable context is laid out once, identically and first: a shared
+system prompt, then the course/session blocks, then the operation's own
+instructions and template. Ollama keeps the evaluated prompt in its KV cache
+and only evaluates the part after the longest common prefix, so every request
+after the first one for a session prefills just its task-specific tail.
+"""
+
+import contextvars
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.llm.sizing import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_SYSTEM_PROMPT = (
+    "You are an expert educator producing course materials. The course and session "
+    "context below applies to every task. Follow the task instructions that come "
+    "after it exactly."
+)
+SECTION_RULE = "═" * 63
+TASK_HEADER = f"{SECTION_RULE}\nTASK\n{SECTION_RULE}"
+TASK_ROLE_HEADER = "ROLE AND RULES FOR THIS TASK:"
+
+# Prefix applied to generate() calls that don't pass one explicitly
+_active_prefix: contextvars.ContextVar[Optional["SharedPrefix"]] = contextvars.ContextVar(
+    "active_prompt_prefix", default=None
+)
+
+
+def render_section(title: str, body: str) -> str:
+    """Render one titled block of a prefix.
+
+    Args:
+        title: Section title (e.g., "COURSE")
+        body: Section text
+
+    Returns:
+        Block text in the same banner style as the prompt templates
+    """
+    return f"{SECTION_RULE}\n{title}\n{SECTION_RULE}\n\n{body.strip()}"
+
+
+class SharedPrefix:
+    """Stable leading block of a prompt shared by several requests.
+
+    Attributes:
+        text: Prefix text placed at the start of the user prompt
+        system_prompt: System prompt sent with every request using the prefix
+        name: Label used in logs (e.g., "m1s2")
+        key: Short hash identifying the prefix
+        tokens: Estimated tokens of system prompt + prefix text
+    """
+
+    def __init__(self, text: str, system_prompt: str = DEFAULT_SHARED_SYSTEM_PROMPT, name: Optional[str] = None):
+        """Initialize the prefix.
+
+        Args:
+            text: Prefix text
+            system_prompt: Shared system prompt (default: generic educator prompt)
+            name: Optional label used in logs
+        """
+        self.text = text.rstrip()
+        self.system_prompt = system_prompt
+        digest = hashlib.sha256(f"{system_prompt}\x00{self.text}".encode("utf-8")).hexdigest()
+        self.key = digest[:16]
+        self.name = name or self.key[:8]
+        self.tokens = estimate_tokens(system_prompt) + estimate_tokens(self.text)
+
+    @classmethod
+    def from_sections(
+        cls,
+        sections: Sequence[Tuple[str, str]],
+        system_prompt: str = DEFAULT_SHARED_SYSTEM_PROMPT,
+        name: Optional[str] = None
+    ) -> "SharedPrefix":
+        """Build a prefix from ordered (title, body) sections.
+
+        Empty sections are skipped, so callers can pass optional blocks.
+
+        Args:
+            sections: Ordered (title, body) pairs, most stable first
+            system_prompt: Shared system prompt
+            name: Optional label used in logs
+
+        Returns:
+            SharedPrefix
+        """
+        blocks = [render_section(title, body) for title, body in sections if body and body.strip()]
+        return cls("\n\n".join(blocks), system_prompt=system_prompt, name=name)
+
+    def assemble(self, prompt: str, system_prompt: Optional[str] = None) -> Tuple[str, str]:
+        """Lay out a request as shared prefix followed by its task.
+
+        The operation's own system prompt moves into the task section so the
+        system prompt (which comes first in the chat template) is identical
+        for every request using the prefix.
+
+        Args:
+            prompt: Operation prompt
+            system_prompt: Operation system prompt, if any
+
+        Returns:
+            Tuple of (system_prompt, prompt) to send
+        """
+        task = prompt
+        if system_prompt:
+            task = f"{TASK_ROLE_HEADER}\n{system_prompt.strip()}\n\n{prompt}"
+        return self.system_prompt, f"{self.text}\n\n{TASK_HEADER}\n\n{task}"
+
+
+class PrefixReuseStats:
+    """Track prefix reuse and the prefill work it saved.
+
+    The first request for a prefix pays for the full prefill. For later
+    requests the saving is measured from Ollama's prompt_eval_count, which only
+    counts tokens that were actually evaluated: the estimated prompt size is
+    calibrated against the first request's prompt_eval_count and the shortfall
+    is counted as saved. Without token counts the prefix size is assumed saved.
+    """
+
+    def __init__(self):
+        """Initialize statistics."""
+        self._lock = threading.Lock()
+        self._prefixes: Dict[str, Dict[str, Any]] = {}
+        self._requests = 0
+        self._reused_requests = 0
+        self._prefill_tokens_saved = 0
+        self._prompt_tokens_evaluated = 0
+
+    def record(
+        self,
+        prefix: SharedPrefix,
+        estimated_prompt_tokens: int,
+        prompt_eval_count: Optional[int] = None
+    ) -> int:
+        """Record one completed request that used a prefix.
+
+        Args:
+            prefix: Prefix the request used
+            estimated_prompt_tokens: Estimated tokens of the full prompt sent
+            prompt_eval_count: Tokens Ollama evaluated (from the final chunk)
+
+        Returns:
+            Prefill tokens saved by this request
+        """
+        with self._lock:
+            self._requests += 1
+            if prompt_eval_count is not None:
+                self._prompt_tokens_evaluated += prompt_eval_count
+            entry = self._prefixes.get(prefix.key)
+            if entry is None:
+                # First use pays the full prefill and calibrates the estimate
+                ratio = None
+                if prompt_eval_count and estimated_prompt_tokens:
+                    ratio = prompt_eval_count / estimated_prompt_tokens
+                self._prefixes[prefix.key] = {"name": prefix.name, "tokens": prefix.tokens, "uses": 1, "ratio": ratio}
+                return 0
+            entry["uses"] += 1
+            self._reused_requests += 1
+            if prompt_eval_count is not None and entry["ratio"]:
+                expected = int(estimated_prompt_tokens * entry["ratio"])
+                saved = max(0, expected - prompt_eval_count)
+            else:
+                saved = prefix.tokens
+            self._prefill_tokens_saved += saved
+            return saved
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reuse statistics.
+
+        Returns:
+            Dict with prefixes (distinct prefixes seen), requests,
+            reused_requests, prefill_tokens_saved and prompt_tokens_evaluated
+        """
+        with self._lock:
+            return {
+                "prefixes": len(self._prefixes),
+                "requests": self._requests,
+                "reused_requests": self._reused_requests,
+                "prefill_tokens_saved": self._prefill_tokens_saved,
+                "prompt_tokens_evaluated": self._prompt_tokens_evaluated,
+            }
+
+
+def get_active_prefix() -> Optional[SharedPrefix]:
+    """Get the prefix activated for the current thread or task, if any."""
+    return _active_prefix.get()
+
+
+def activate_prefix(prefix: Optional[SharedPrefix]) -> contextvars.Token:
+    """Make a prefix apply to generate() calls in the current context.
+
+    Worker threads do not inherit the prefix; submit work with
+    contextvars.copy_context().run to propagate it.
+
+    Args:
+        prefix: Prefix to activate (None deactivates)
+
+    Returns:
+        Token for deactivate_prefix()
+    """
+    return _active_prefix.set(prefix)
+
+
+def deactivate_prefix(token: contextvars.Token) -> None:
+    """Restore the prefix that was active before activate_prefix().
+
+    Args:
+        token: Token returned by activate_prefix()
+    """
+    _active_prefix.reset(token)
+
+
+@contextmanager
+def shared_prefix(prefix: Optional[SharedPrefix]) -> Iterator[Optional[SharedPrefix]]:
+    """Context manager activating a prefix for the enclosed generate() calls.
+
+    Args:
+        prefix: Prefix to activate
+    """
+    token = activate_prefix(prefix)
+    try:
+        yield prefix
+    finally:
+        deactivate_prefix(token)
+
+
+def course_sections(course: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Build the course-level prefix section from outline course metadata.
+
+    Args:
+        course: Course metadata (name, subject, level, description, ...)
+
+    Returns:
+        List with one ("COURSE", body) pair (empty body if nothing is known)
+    """
+    labels = (
+        ("name", "Course"),
+        ("subject", "Subject"),
+        ("level", "Level"),
+        ("description", "Description"),
+        ("total_modules", "Modules"),
+        ("total_sessions", "Sessions"),
+    )
+    lines = [f"{label}: {course[key]}" for key, label in labels if course.get(key)]
+    return [("COURSE", "\n".join(lines))]
+
+
+def session_sections(module: Dict[str, Any], session: Dict[str, Any], total_sessions: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Build the module and session prefix sections from outline entries.
+
+    Args:
+        module: Outline module (module_id, module_name, module_description)
+        session: Outline session (session_number, session_title, subtopics, ...)
+        total_sessions: Total sessions in the course, if known
+
+    Returns:
+        List of ("MODULE", body) and ("SESSION", body) pairs
+    """
+    module_lines = [f"Module {module.get('module_id', '')}: {module.get('module_name', '')}".strip()]
+    if module.get("module_description"):
+        module_lines.append(f"Overview: {module['module_description']}")
+
+    of_total = f" of {total_sessions}" if total_sessions else ""
+    session_lines = [f"Session {session.get('session_number', '')}{of_total}: {session.get('session_title', '')}"]
+    for key, label in (
+        ("subtopics", "Subtopics"),
+        ("learning_objectives", "Learning Objectives"),
+        ("key_concepts", "Key Concepts"),
+    ):
+        items = session.get(key) or []
+        if items:
+            session_lines.append(f"{label}:\n" + "\n".join(f"- {item}" for item in items))
+    if session.get("rationale"):
+        session_lines.append(f"Rationale: {session['rationale']}")
+    return [("MODULE", "\n".join(module_lines)), ("SESSION", "\n".join(session_lines))]
+
+
+def build_session_prefix(
+    course: Dict[str, Any],
+    module: Dict[str, Any],
+    session: Dict[str, Any],
+    total_sessions: Optional[int] = None,
+    extra_sections: Sequence[Tuple[str, str]] = (),
+    system_prompt: str = DEFAULT_SHARED_SYSTEM_PROMPT
+) -> SharedPrefix:
+    """Build the shared prefix for every operation of one session.
+
+    Sections go from most to least stable (course, module, session, then any
+    extra blocks such as the outline or session content), so sessions of the
+    same course also share the course block.
+
+    Args:
+        course: Course metadata (name, subject, level, description, ...)
+        module: Outline module
+        session: Outline session
+        total_sessions: Total sessions in the course, if known
+        extra_sections: Additional (title, body) blocks appended after the session
+        system_prompt: Shared system prompt
+
+    Returns:
+        SharedPrefix named m<module>s<session>
+    """
+    sections = course_sections(course) + session_sections(module, session, total_sessions) + list(extra_sections)
+    name = f"m{module.get('module_id', '')}s{session.get('session_number', '')}"
+    return SharedPrefix.from_sections(sections, system_prompt=system_prompt, name=name)
@@ -7,11 +7,17 @@ timeout monitoring, progress tracking, and health checks.
 import logging
 import threading
 import time
-from typing import Any, Callable, Dict, Optional
+from contextlib import nullcontext
+from typing import Callable, Dict, Optional
 
 import requests
 
+from src.llm.cancellation import CancellationToken, cancellation_scope
+from src.llm.concurrency import ConcurrencyGovernor
+from src.llm.connection_pool import OllamaConnectionPool
 from src.llm.health import OllamaHealthMonitor
+from src.llm.health_state import OllamaHealthState
+from src.llm.watchdog import DEFAULT_STALL_INTERVAL, RequestWatchdog, get_watchdog
 
 logger = logging.getLogger(__name__)
 
@@ -20,17 +26,25 @@ class RequestHandler:
     """Handle HTTP requests with timeout monitoring and health checks.
     
     Provides non-blocking request execution with:
-    - Thread-based timeout monitoring
     - Periodic health checks during long requests
     - Progress heartbeat logging
+    - Stalled stream detection
     - Request cancellation capability
+    
+    Monitoring is scheduled on the shared RequestWatchdog, so concurrent
+    requests do not each start their own monitoring threads.
     """
     
     def __init__(
         self,
         api_url: str = "http://localhost:11434",
         health_check_interval: int = 10,
-        heartbeat_interval: float = 5.0
+        heartbeat_interval: float = 5.0,
+        connection_pool: Optional[OllamaConnectionPool] = None,
+        health_state: Optional[OllamaHealthState] = None,
+        stall_interval: float = DEFAULT_STALL_INTERVAL,
+        watchdog: Optional[RequestWatchdog] = None,
+        governor: Optional[ConcurrencyGovernor] = None
     ):
         """Initialize request handler.
         
@@ -38,13 +52,26 @@ class RequestHandler:
             api_url: Base Ollama API URL
             health_check_interval: Interval between health checks in seconds
             heartbeat_interval: Interval for heartbeat logging in seconds (default: 5.0)
+            connection_pool: Optional shared connection pool used for health checks
+            health_state: Optional shared cached health state read by health checks
+            stall_interval: Seconds without stream progress before a stall is reported
+            watchdog: Optional watchdog (default: the process-wide watchdog)
+            governor: Optional concurrency governor. If set, each request holds
+                     one of its slots from send until finish.
         """
         self.api_url = api_url
-        self.health_monitor = OllamaHealthMonitor(api_url)
+        self.health_monitor = OllamaHealthMonitor(
+            api_url, connection_pool=connection_pool, health_state=health_state
+        )
         self.health_check_interval = health_check_interval
         self.heartbeat_interval = heartbeat_interval
-        self._active_requests: Dict[str, threading.Thread] = {}
+        self.stall_interval = stall_interval
+        self.watchdog = watchdog or get_watchdog()
+        self.governor = governor
         self._request_cancelled: Dict[str, bool] = {}
+        self._request_tokens: Dict[str, CancellationToken] = {}
+        self._held_slots: Dict[str, Optional[int]] = {}
+        self._slots_lock = threading.Lock()
     
     def execute_with_monitoring(
         self,
@@ -53,7 +80,9 @@ class RequestHandler:
         request_id: str,
         model: str,
         connect_timeout: int = 5,
-        read_timeout: Optional[int] = None
+        read_timeout: Optional[int] = None,
+        keep_watching: bool = False,
+        cancel_token: Optional[CancellationToken] = None
     ) -> requests.Response:
         """Execute request with timeout monitoring and health checks.
         
@@ -64,35 +93,48 @@ class RequestHandler:
             model: Model name being used
             connect_timeout: Connection timeout in seconds
             read_timeout: Read timeout in seconds (defaults to timeout)
+            keep_watching: Keep the request on the watchdog after the response
+                          headers arrive, so the stream is monitored while it is
+                          consumed. The caller must call finish_request().
+            cancel_token: Optional token cancelled by cancel_request(); the
+                         request is sent under it, so cancelling it shuts
+                         down the connection (see src.llm.cancellation)
             
         Returns:
             requests.Response object
             
         Raises:
+            ConcurrencyCancelledError: If cancel_token was cancelled while
+                                      waiting for a request slot
             requests.Timeout: If request times out
             requests.RequestException: For other request errors
         """
         if read_timeout is None:
             read_timeout = timeout
         
+        # Wait for a free request slot so Ollama's parallel slots are not
+        # oversubscribed (cancelling the token gives up the wait)
+        if self.governor is not None:
+            slot = self.governor.acquire(request_id, cancel_token=cancel_token)
+            with self._slots_lock:
+                self._held_slots[request_id] = slot
+        
         request_start_time = time.time()
         self._request_cancelled[request_id] = False
+        if cancel_token is not None:
+            self._request_tokens[request_id] = cancel_token
         
-        # Start health monitoring thread
-        health_thread = threading.Thread(
-            target=self._monitor_health,
-            args=(request_id, model, request_start_time, timeout),
-            daemon=True
+        # Heartbeats, health checks and stall detection run on the shared watchdog
+        self.watchdog.watch(
+            request_id,
+            model,
+            timeout,
+            heartbeat_interval=self.heartbeat_interval,
+            health_check_interval=self.health_check_interval,
+            stall_interval=self.stall_interval,
+            health_monitor=self.health_monitor
         )
-        health_thread.start()
-        
-        # Start heartbeat logging thread
-        heartbeat_thread = threading.Thread(
-            target=self._heartbeat_logging,
-            args=(request_id, request_start_time, timeout),
-            daemon=True
-        )
-        heartbeat_thread.start()
+        finished = True
         
         try:
             # Execute request with proper timeouts
@@ -101,9 +143,11 @@ class RequestHandler:
                 f"connect={connect_timeout}s, read={read_timeout}s"
             )
             
-            response = request_func()
+            with cancellation_scope(cancel_token) if cancel_token is not None else nullcontext():
+                response = request_func()
             
             # Request completed successfully
+            finished = not keep_watching
             elapsed = time.time() - request_start_time
             logger.info(
                 f"[{request_id}] ✓ Done {elapsed:.2f}s"
@@ -116,7 +160,7 @@ class RequestHandler:
             self._request_cancelled[request_id] = True
             
             # Determine timeout type
-            if elapsed < connect_timeout + 1:
+            if isinstance(e, requests.ConnectTimeout):
                 timeout_type = "connection"
                 timeout_limit = connect_timeout
             else:
@@ -151,102 +195,44 @@ class RequestHandler:
         finally:
             # Clean up
             self._request_cancelled.pop(request_id, None)
+            if finished:
+                self.finish_request(request_id)
     
-    def _monitor_health(
-        self,
-        request_id: str,
-        model: str,
-        start_time: float,
-        timeout: int
-    ) -> None:
-        """Monitor health during request execution.
+    def record_progress(self, request_id: str) -> None:
+        """Record stream progress so the watchdog does not report a stall.
         
         Args:
             request_id: Request ID
-            model: Model name
-            start_time: Request start time
-            timeout: Request timeout
         """
-        while not self._request_cancelled.get(request_id, False):
-            elapsed = time.time() - start_time
-            
-            # Stop monitoring if request completed or timed out
-            if elapsed > timeout * 1.2:  # Slightly longer than timeout
-                break
-            
-            # Wait for check interval
-            time.sleep(self.health_check_interval)
-            
-            # Skip if request was cancelled
-            if self._request_cancelled.get(request_id, False):
-                break
-            
-            # Perform health check
-            health_status = self.health_monitor.monitor_request_health(
-                request_id, model, start_time, timeout, self.health_check_interval
-            )
-            
-            if health_status:
-                issue = health_status.get("issue")
-                if issue == "service_unavailable":
-                    logger.error(
-                        f"[{request_id}] ❌ Critical: Ollama unavailable (may hang/fail)"
-                    )
-                elif issue == "model_not_loaded":
-                    logger.warning(
-                        f"[{request_id}] ⚠️ Model not loaded after {health_status['elapsed']:.1f}s (may be slow)"
-                    )
+        self.watchdog.touch(request_id)
     
-    def _heartbeat_logging(
-        self,
-        request_id: str,
-        start_time: float,
-        timeout: int
-    ) -> None:
-        """Log heartbeat messages during long requests.
-        
-        Uses configurable heartbeat_interval (default: 5 seconds) set during
-        initialization. Can be configured via config/output_config.yaml.
+    def finish_request(self, request_id: str) -> None:
+        """Stop watching a request and release its slot once its stream has been consumed.
         
         Args:
             request_id: Request ID
-            start_time: Request start time
-            timeout: Request timeout
         """
-        heartbeat_interval = self.heartbeat_interval
-        last_heartbeat = start_time
-        
-        while not self._request_cancelled.get(request_id, False):
-            elapsed = time.time() - start_time
-            
-            # Stop if request completed or timed out
-            if elapsed > timeout * 1.2:
-                break
-            
-            # Wait for heartbeat interval
-            time.sleep(heartbeat_interval)
-            
-            # Skip if request was cancelled
-            if self._request_cancelled.get(request_id, False):
-                break
-            
-            # Log heartbeat
-            current_elapsed = time.time() - start_time
-            if current_elapsed - last_heartbeat >= heartbeat_interval:
-                remaining = timeout - current_elapsed
-                logger.debug(
-                    f"[{request_id}] 🔄 Progress: {current_elapsed:.1f}s/{timeout}s ({remaining:.1f}s left)"
-                )
-                last_heartbeat = current_elapsed
+        self.watchdog.unwatch(request_id)
+        self._request_tokens.pop(request_id, None)
+        with self._slots_lock:
+            if request_id not in self._held_slots:
+                return
+            slot = self._held_slots.pop(request_id)
+        self.governor.release(slot)
     
     def cancel_request(self, request_id: str) -> None:
-        """Cancel a request (mark as cancelled).
+        """Cancel a request and stop monitoring it.
         
-        Note: This doesn't actually cancel the HTTP request (requests library
-        doesn't support cancellation), but it stops monitoring threads.
+        If the request was sent with a cancel_token, the token is cancelled:
+        its connection is shut down (before or during streaming), which makes
+        Ollama stop generating and free the slot.
         
         Args:
             request_id: Request ID to cancel
         """
         self._request_cancelled[request_id] = True
+        self.watchdog.unwatch(request_id)
+        token = self._request_tokens.get(request_id)
+        if token is not None:
+            token.cancel("cancel_request")
         logger.info(f"[{request_id}] 🔄 Cancellation requested")
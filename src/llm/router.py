@@ -0,0 +1,280 @@
+"""Routing of generation requests across several Ollama endpoints.
+
+With more than one Ollama server (e.g., one per GPU box) listed under
+llm.endpoints, each request goes to the healthy endpoint with the fewest
+outstanding requests. Endpoints that fail OllamaHealthMonitor checks, refuse
+connections or time out mid-stream are ejected for a cool-down period and
+re-admitted once a health check passes again. A single configured endpoint
+behaves exactly like the client without a router.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from src.llm.concurrency import ConcurrencyGovernor
+from src.llm.health import OllamaHealthMonitor
+from src.llm.health_state import OllamaHealthState
+from src.llm.request_handler import RequestHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EJECT_SECONDS = 30.0
+DEFAULT_PROBE_TIMEOUT = 2.0
+GENERATE_PATH = "/api/generate"
+
+
+def normalize_base_url(url: str) -> str:
+    """Strip the /api/generate path and trailing slashes from an endpoint URL.
+
+    Args:
+        url: Base URL (http://host:11434) or generate URL (.../api/generate)
+
+    Returns:
+        Base URL
+    """
+    url = url.strip().rstrip('/')
+    if url.endswith(GENERATE_PATH):
+        url = url[:-len(GENERATE_PATH)]
+    return url.rstrip('/')
+
+
+class Endpoint:
+    """One Ollama server and the per-endpoint state used to talk to it.
+
+    Attributes:
+        base_url: Base Ollama API URL
+        api_url: /api/generate URL
+        health_state: Process-wide cached health state for the endpoint
+        health_monitor: Health monitor sharing the cached state
+        governor: Process-wide concurrency governor for the endpoint
+        request_handler: Request handler bound to the endpoint's state and governor
+        outstanding: Requests currently routed to the endpoint
+        requests: Requests routed to the endpoint so far
+        ejected_until: Time until which the endpoint is skipped (0 = admitted)
+        failures: Number of times the endpoint was ejected
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        health_state: OllamaHealthState,
+        health_monitor: OllamaHealthMonitor,
+        governor: ConcurrencyGovernor,
+        request_handler: RequestHandler
+    ):
+        """Initialize the endpoint.
+
+        Args:
+            base_url: Base Ollama API URL
+            health_state: Cached health state for the endpoint
+            health_monitor: Health monitor for the endpoint
+            governor: Concurrency governor for the endpoint
+            request_handler: Request handler for the endpoint
+        """
+        self.base_url = normalize_base_url(base_url)
+        self.api_url = f"{self.base_url}{GENERATE_PATH}"
+        self.health_state = health_state
+        self.health_monitor = health_monitor
+        self.governor = governor
+        self.request_handler = request_handler
+        self.outstanding = 0
+        self.ejected_until = 0.0
+        self.failures = 0
+        self.requests = 0
+
+    @property
+    def ejected(self) -> bool:
+        """Whether the endpoint is currently ejected."""
+        return self.ejected_until > time.time()
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.base_url!r}, outstanding={self.outstanding})"
+
+
+class EndpointRouter:
+    """Least-outstanding-requests routing with health-based ejection.
+
+    Attributes:
+        endpoints: Endpoints in configured order (the first one is the primary)
+        eject_seconds: Cool-down before an ejected endpoint is re-checked
+        probe_timeout: Timeout of the health check run before re-admission
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        eject_seconds: float = DEFAULT_EJECT_SECONDS,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT
+    ):
+        """Initialize the router.
+
+        Args:
+            endpoints: Endpoints to route across (at least one)
+            eject_seconds: Seconds an ejected endpoint is skipped (default: 30)
+            probe_timeout: Health check timeout in seconds (default: 2)
+
+        Raises:
+            ValueError: If no endpoints are given
+        """
+        if not endpoints:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.eject_seconds = float(eject_seconds)
+        self.probe_timeout = float(probe_timeout)
+        self._lock = threading.Lock()
+        self._failovers = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        urls: List[str],
+        router_config: Optional[Dict[str, Any]],
+        endpoint_factory: Callable[[str], Endpoint]
+    ) -> "EndpointRouter":
+        """Create a router from llm.endpoints and llm.router.
+
+        Args:
+            urls: Endpoint URLs (duplicates are dropped, order is kept)
+            router_config: Optional dict with eject_seconds and probe_timeout
+            endpoint_factory: Builds an Endpoint for a base URL
+
+        Returns:
+            Configured EndpointRouter
+        """
+        router_config = router_config or {}
+        seen: List[str] = []
+        for url in urls:
+            base_url = normalize_base_url(url)
+            if base_url and base_url not in seen:
+                seen.append(base_url)
+        return cls(
+            [endpoint_factory(base_url) for base_url in seen],
+            eject_seconds=router_config.get("eject_seconds", DEFAULT_EJECT_SECONDS),
+            probe_timeout=router_config.get("probe_timeout", DEFAULT_PROBE_TIMEOUT)
+        )
+
+    @property
+    def primary(self) -> Endpoint:
+        """First configured endpoint."""
+        return self.endpoints[0]
+
+    def _is_healthy(self, endpoint: Endpoint) -> bool:
+        """Check an endpoint, re-admitting or ejecting it as needed.
+
+        Ejected endpoints past their cool-down get a fresh OllamaHealthMonitor
+        service check; admitted endpoints are checked against the cached
+        health snapshot and ejected if it reports them unavailable.
+        """
+        if endpoint.ejected_until:
+            if endpoint.ejected:
+                return False
+            status = endpoint.health_monitor.check_service_status(timeout=self.probe_timeout)
+            if not status["available"]:
+                self.eject(endpoint, f"health check failed: {status['error']}")
+                return False
+            endpoint.health_state.refresh()
+            with self._lock:
+                endpoint.ejected_until = 0.0
+            logger.info(f"🔁 Endpoint {endpoint.base_url} re-admitted after passing health check")
+            return True
+        if not endpoint.health_state.get_snapshot().available:
+            self.eject(endpoint, "health check failed: service unreachable")
+            return False
+        return True
+
+    def select(self, exclude: Collection[Endpoint] = ()) -> Optional[Endpoint]:
+        """Pick the healthy endpoint with the fewest outstanding requests.
+
+        Ties go to the endpoint listed first. With a single endpoint it is
+        always returned, so the caller's pre-flight check reports the failure.
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            Selected endpoint, or None if every remaining endpoint is ejected
+            or unhealthy
+        """
+        if len(self.endpoints) == 1:
+            return None if self.primary in exclude else self.primary
+        candidates = [e for e in self.endpoints if e not in exclude and self._is_healthy(e)]
+        if not candidates:
+            return None
+        with self._lock:
+            return min(candidates, key=lambda e: (e.outstanding, self.endpoints.index(e)))
+
+    def has_alternative(self, exclude: Collection[Endpoint]) -> bool:
+        """Whether an endpoint outside exclude is currently admitted.
+
+        Args:
+            exclude: Endpoints already tried for this request
+
+        Returns:
+            True if a failover target exists
+        """
+        return any(e not in exclude and not e.ejected for e in self.endpoints)
+
+    def start_request(self, endpoint: Endpoint) -> None:
+        """Count a request as outstanding on an endpoint.
+
+        Args:
+            endpoint: Endpoint the request was routed to
+        """
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+    def finish_request(self, endpoint: Endpoint) -> None:
+        """Stop counting a request as outstanding on an endpoint.
+
+        Args:
+            endpoint: Endpoint the request was routed to
+        """
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+
+    def eject(self, endpoint: Endpoint, reason: str) -> None:
+        """Skip an endpoint for eject_seconds.
+
+        A single configured endpoint is never ejected (there is nothing to
+        fail over to; retries with backoff handle it).
+
+        Args:
+            endpoint: Endpoint to eject
+            reason: Reason for logging
+        """
+        if len(self.endpoints) == 1:
+            return
+        with self._lock:
+            endpoint.ejected_until = time.time() + self.eject_seconds
+            endpoint.failures += 1
+        logger.warning(f"⛔ Ejected endpoint {endpoint.base_url} for {self.eject_seconds:.0f}s ({reason})")
+
+    def record_failover(self) -> None:
+        """Count one request moved to another endpoint."""
+        with self._lock:
+            self._failovers += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing statistics.
+
+        Returns:
+            Dict with failovers and per-endpoint base_url, outstanding,
+            requests, failures and ejected
+        """
+        with self._lock:
+            return {
+                "failovers": self._failovers,
+                "endpoints": [
+                    {
+                        "base_url": e.base_url,
+                        "outstanding": e.outstanding,
+                        "requests": e.requests,
+                        "failures": e.failures,
+                        "ejected": e.ejected,
+                    }
+                    for e in self.endpoints
+                ],
+            }
@@ -0,0 +1,215 @@
+"""Per-request sizing of the context window and output budget.
+
+Sending the configured maximum num_ctx (e.g., 128K) and num_predict on every
+call makes Ollama reserve KV cache for the whole window, which costs memory
+and time to first token even for short prompts. This module estimates the
+prompt size, caps the output budget from the content requirements of the
+operation (e.g., lecture max_word_count), and rounds the resulting context
+window up to a small set of bucket sizes so consecutive requests reuse the
+loaded model instead of triggering reloads for every distinct num_ctx.
+"""
+
+import logging
+import math
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Conservative characters-per-token ratio (real tokenizers average ~4 for English)
+CHARS_PER_TOKEN = 3.5
+DEFAULT_CTX_BUCKETS = (2048, 4096, 8192, 16384, 32768, 65536, 131072)
+DEFAULT_TOKENS_PER_WORD = 1.5
+DEFAULT_OUTPUT_HEADROOM = 2.0
+DEFAULT_CTX_MARGIN = 256
+DEFAULT_MIN_NUM_PREDICT = 512
+# Content requirement keys that bound the length of the generated text
+WORD_LIMIT_KEYS = ("max_word_count", "max_total_words")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure (None counts as empty)
+
+    Returns:
+        Estimated token count (rounded up)
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class RequestSizer:
+    """Derive num_ctx and num_predict for each request.
+
+    Attributes:
+        enabled: Whether sizing is applied
+        ctx_buckets: Sorted context window sizes requests are rounded up to
+        max_num_ctx: Upper bound for num_ctx (the configured num_ctx)
+        max_num_predict: Upper bound for num_predict (the configured num_predict)
+        operation_num_predict: Output budgets for operations without word limits
+        content_requirements: Content requirements keyed by operation
+        tokens_per_word: Tokens assumed per generated word
+        output_headroom: Multiplier applied to word-derived output budgets
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ctx_buckets: Iterable[int] = DEFAULT_CTX_BUCKETS,
+        max_num_ctx: Optional[int] = None,
+        max_num_predict: Optional[int] = None,
+        operation_num_predict: Optional[Dict[str, int]] = None,
+        content_requirements: Optional[Dict[str, Dict[str, Any]]] = None,
+        tokens_per_word: float = DEFAULT_TOKENS_PER_WORD,
+        output_headroom: float = DEFAULT_OUTPUT_HEADROOM,
+        ctx_margin: int = DEFAULT_CTX_MARGIN,
+        min_num_predict: int = DEFAULT_MIN_NUM_PREDICT
+    ):
+        """Initialize the sizer.
+
+        Args:
+            enabled: Apply sizing (default: True)
+            ctx_buckets: Allowed num_ctx values
+            max_num_ctx: Largest num_ctx to send (default: largest bucket)
+            max_num_predict: Largest num_predict to send (default: unbounded)
+            operation_num_predict: Output budget per operation, used when the
+                                  operation has no word limit
+            content_requirements: Output of ConfigLoader.get_content_requirements()
+            tokens_per_word: Tokens assumed per generated word (default: 1.5)
+            output_headroom: Multiplier on word-derived budgets so valid but
+                            long answers are not cut off (default: 2.0)
+            ctx_margin: Extra tokens reserved on top of prompt and output (default: 256)
+            min_num_predict: Smallest output budget derived from word limits (default: 512)
+        """
+        self.enabled = bool(enabled)
+        self.ctx_buckets = sorted({int(b) for b in ctx_buckets if int(b) > 0})
+        self.max_num_ctx = int(max_num_ctx) if max_num_ctx else None
+        self.max_num_predict = int(max_num_predict) if max_num_predict else None
+        self.operation_num_predict = dict(operation_num_predict or {})
+        self.content_requirements = content_requirements or {}
+        self.tokens_per_word = float(tokens_per_word)
+        self.output_headroom = float(output_headroom)
+        self.ctx_margin = int(ctx_margin)
+        self.min_num_predict = int(min_num_predict)
+
+    @classmethod
+    def from_config(
+        cls,
+        sizing_config: Optional[Dict[str, Any]],
+        parameters: Optional[Dict[str, Any]] = None,
+        content_requirements: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> "RequestSizer":
+        """Create a sizer from the llm.context_sizing config section.
+
+        A missing section disables sizing, so the configured num_ctx and
+        num_predict are sent unchanged.
+
+        Args:
+            sizing_config: Optional dict with enabled, ctx_buckets,
+                          operation_num_predict, tokens_per_word,
+                          output_headroom, ctx_margin and min_num_predict keys
+            parameters: llm.parameters section (num_ctx and num_predict are
+                       used as upper bounds)
+            content_requirements: Output of ConfigLoader.get_content_requirements()
+
+        Returns:
+            Configured RequestSizer
+        """
+        parameters = parameters or {}
+        if not sizing_config:
+            return cls(enabled=False)
+        return cls(
+            enabled=sizing_config.get("enabled", True),
+            ctx_buckets=sizing_config.get("ctx_buckets") or DEFAULT_CTX_BUCKETS,
+            max_num_ctx=parameters.get("num_ctx"),
+            max_num_predict=parameters.get("num_predict"),
+            operation_num_predict=sizing_config.get("operation_num_predict"),
+            content_requirements=content_requirements,
+            tokens_per_word=sizing_config.get("tokens_per_word", DEFAULT_TOKENS_PER_WORD),
+            output_headroom=sizing_config.get("output_headroom", DEFAULT_OUTPUT_HEADROOM),
+            ctx_margin=sizing_config.get("ctx_margin", DEFAULT_CTX_MARGIN),
+            min_num_predict=sizing_config.get("min_num_predict", DEFAULT_MIN_NUM_PREDICT)
+        )
+
+    def output_budget(self, operation: Optional[str]) -> Optional[int]:
+        """Output token budget for an operation.
+
+        Word limits from the content requirements take precedence over
+        operation_num_predict. The result never exceeds max_num_predict.
+
+        Args:
+            operation: Operation name (e.g., "lecture")
+
+        Returns:
+            num_predict to send, or None to keep the configured value
+        """
+        budget = None
+        requirements = self.content_requirements.get(operation or "", {}) or {}
+        word_limit = next((requirements[k] for k in WORD_LIMIT_KEYS if requirements.get(k)), None)
+        if word_limit:
+            budget = max(
+                self.min_num_predict,
+                math.ceil(word_limit * self.tokens_per_word * self.output_headroom)
+            )
+        elif operation in self.operation_num_predict:
+            budget = int(self.operation_num_predict[operation])
+        if budget is None:
+            return self.max_num_predict
+        if self.max_num_predict:
+            budget = min(budget, self.max_num_predict)
+        return budget
+
+    def bucket_for(self, tokens: int) -> int:
+        """Round a token count up to the nearest context bucket.
+
+        Args:
+            tokens: Required context size
+
+        Returns:
+            Bucket size, capped at max_num_ctx
+        """
+        bucket = next((b for b in self.ctx_buckets if b >= tokens), None)
+        if bucket is None:
+            bucket = self.max_num_ctx or (self.ctx_buckets[-1] if self.ctx_buckets else tokens)
+        if self.max_num_ctx:
+            bucket = min(bucket, self.max_num_ctx)
+        return bucket
+
+    def size(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        operation: Optional[str] = None,
+        explicit: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """Compute num_ctx and num_predict for one request.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            operation: Operation name used to look up the output budget
+            explicit: Parameters passed explicitly by the caller; num_ctx or
+                     num_predict present there are kept as-is
+
+        Returns:
+            Dict with the num_ctx and/or num_predict overrides to apply
+            (empty when sizing is disabled)
+        """
+        if not self.enabled:
+            return {}
+        explicit = explicit or {}
+        sized: Dict[str, int] = {}
+
+        num_predict = explicit.get("num_predict")
+        if num_predict is None:
+            num_predict = self.output_budget(operation)
+            if num_predict is not None:
+                sized["num_predict"] = num_predict
+
+        if "num_ctx" not in explicit:
+            prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt)
+            output_tokens = num_predict if num_predict and num_predict > 0 else self.min_num_predict
+            sized["num_ctx"] = self.bucket_for(prompt_tokens + output_tokens + self.ctx_margin)
+        return sized
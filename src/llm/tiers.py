@@ -0,0 +1,198 @@
+"""Per-operation model tiers with escalation.
+
+Short artifacts (diagrams, extensions, visualizations) rarely need a large
+model's per-token latency. With llm.model_tiers enabled, each operation is
+mapped to a tier ("small", "large", ...) and OllamaClient sends its requests to
+that tier's model. Tiers are ordered smallest first. When a generator's
+validation fails, escalate() names the next larger tier's model for the retry
+(if the escalation policy agrees), so only the artifacts the small model gets
+wrong pay for the large one.
+
+Operations without a tier, and all operations when the section is missing or
+disabled, use llm.model.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# (operation, validation issues) -> whether to retry on the next larger tier
+EscalationPolicy = Callable[[str, Sequence[str]], bool]
+
+
+def escalate_on_any_issue(operation: str, issues: Sequence[str]) -> bool:
+    """Default escalation policy: escalate whenever validation reported issues."""
+    return bool(issues)
+
+
+class ModelTiers:
+    """Operation-to-model mapping and escalation between tiers.
+
+    Attributes:
+        enabled: Whether operations are routed to tier models
+        default_model: Model for operations without a tier (llm.model)
+        tiers: Tier name to model, smallest tier first
+        operations: Operation name to tier name
+        escalation: Whether failed validations move up a tier
+        policy: Hook deciding whether a failed validation escalates
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        enabled: bool = False,
+        tiers: Optional[Dict[str, str]] = None,
+        operations: Optional[Dict[str, str]] = None,
+        escalation: bool = True,
+        policy: Optional[EscalationPolicy] = None
+    ):
+        """Initialize the tiers.
+
+        Args:
+            default_model: Model for operations without a tier
+            enabled: Route operations to tier models (default: False)
+            tiers: Tier name to model, smallest first
+            operations: Operation name to tier name
+            escalation: Escalate failed validations to the next tier (default: True)
+            policy: Escalation policy (default: escalate on any issue)
+
+        Raises:
+            ValueError: If an operation refers to an unknown tier
+        """
+        self.default_model = default_model
+        self.enabled = bool(enabled)
+        self.tiers: Dict[str, str] = dict(tiers or {})
+        self.operations: Dict[str, str] = dict(operations or {})
+        self.escalation = bool(escalation)
+        self.policy: EscalationPolicy = policy or escalate_on_any_issue
+        unknown = sorted({tier for tier in self.operations.values() if tier not in self.tiers})
+        if unknown:
+            raise ValueError(f"model_tiers.operations refers to unknown tiers: {', '.join(unknown)}")
+        self._order: List[str] = list(self.tiers)
+        self._lock = threading.Lock()
+        self._requests: Dict[str, Dict[str, int]] = {}
+        self._escalations: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, tiers_config: Optional[Dict[str, Any]], default_model: str) -> "ModelTiers":
+        """Create tiers from the llm.model_tiers config section.
+
+        Args:
+            tiers_config: Optional dict with enabled, tiers, operations and
+                         escalate keys (missing section = disabled)
+            default_model: llm.model
+
+        Returns:
+            Configured ModelTiers
+        """
+        tiers_config = tiers_config or {}
+        return cls(
+            default_model,
+            enabled=tiers_config.get("enabled", False),
+            tiers=tiers_config.get("tiers"),
+            operations=tiers_config.get("operations"),
+            escalation=tiers_config.get("escalate", True)
+        )
+
+    def model_for(self, operation: Optional[str]) -> str:
+        """Get the model an operation's requests use.
+
+        Args:
+            operation: Operation name
+
+        Returns:
+            The operation's tier model, or the default model
+        """
+        if not self.enabled or operation not in self.operations:
+            return self.default_model
+        return self.tiers[self.operations[operation]]
+
+    def tier_of(self, model: str) -> Optional[str]:
+        """Get the smallest tier using a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Tier name, or None if no tier uses the model
+        """
+        for tier in self._order:
+            if self.tiers[tier] == model:
+                return tier
+        return None
+
+    def escalate(self, operation: str, model: str, issues: Sequence[str]) -> str:
+        """Pick the model for a retry after a failed validation.
+
+        Args:
+            operation: Operation name
+            model: Model that produced the failed output
+            issues: Validation issues of the failed output
+
+        Returns:
+            The next larger tier's model if escalation applies (enabled, a
+            larger tier exists, and the policy agrees), otherwise model
+        """
+        if not (self.enabled and self.escalation):
+            return model
+        tier = self.tier_of(model)
+        if tier is None or tier == self._order[-1]:
+            return model
+        if not self.policy(operation, issues):
+            return model
+        next_tier = self._order[self._order.index(tier) + 1]
+        next_model = self.tiers[next_tier]
+        with self._lock:
+            self._escalations[operation] = self._escalations.get(operation, 0) + 1
+        reason = f": {issues[0]}" if issues else ""
+        logger.info(
+            f"⬆️ Escalating {operation} from tier {tier} ({model}) to {next_tier} ({next_model}){reason}"
+        )
+        return next_model
+
+    def record(self, operation: Optional[str], model: str) -> None:
+        """Count a request sent to a model.
+
+        Args:
+            operation: Operation name
+            model: Model the request used
+        """
+        with self._lock:
+            per_operation = self._requests.setdefault(model, {})
+            key = operation or "unknown"
+            per_operation[key] = per_operation.get(key, 0) + 1
+
+    def describe(self) -> str:
+        """One-line description of the tiers and their operations."""
+        if not self.enabled:
+            return f"single model {self.default_model}"
+        parts = []
+        for tier in self._order:
+            operations = sorted(op for op, t in self.operations.items() if t == tier)
+            parts.append(f"{tier}={self.tiers[tier]}" + (f" ({', '.join(operations)})" if operations else ""))
+        return ", ".join(parts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get requests per model and escalations per operation.
+
+        Returns:
+            Dict with enabled, models (model name to tier (None for the default
+            model), total requests and requests per operation) and escalations
+            (operation to count)
+        """
+        with self._lock:
+            models = {
+                model: {
+                    "tier": self.tier_of(model),
+                    "requests": sum(per_operation.values()),
+                    "operations": dict(sorted(per_operation.items())),
+                }
+                for model, per_operation in self._requests.items()
+            }
+            return {
+                "enabled": self.enabled,
+                "models": models,
+                "escalations": dict(sorted(self._escalations.items())),
+            }
@@ -0,0 +1,333 @@
+"""Shared watchdog for in-flight Ollama requests.
+
+This module runs a single scheduler thread for all in-flight requests in the
+process. Each watched request contributes entries to a heap of deadlines
+(heartbeat, health check, stall check and expiry), so the number of monitoring
+threads stays at one regardless of how many requests run concurrently, and a
+request that finishes early simply drops out of the heap.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_INTERVAL = 5.0
+DEFAULT_HEALTH_CHECK_INTERVAL = 10.0
+DEFAULT_STALL_INTERVAL = 30.0
+# Watches expire slightly after the request timeout (matches the old sleeper threads)
+EXPIRY_FACTOR = 1.2
+# Scheduler thread exits after this many seconds with nothing to watch
+IDLE_TIMEOUT = 30.0
+
+HEARTBEAT = "heartbeat"
+HEALTH_CHECK = "health_check"
+STALL_CHECK = "stall_check"
+EXPIRE = "expire"
+
+
+@dataclass
+class WatchedRequest:
+    """State of one request tracked by the watchdog.
+
+    Attributes:
+        request_id: Request ID for logging
+        model: Model name being used
+        timeout: Request timeout in seconds
+        heartbeat_interval: Interval between heartbeat logs in seconds
+        health_check_interval: Interval between health checks in seconds
+        stall_interval: Seconds without progress before the stream is reported stalled
+        health_monitor: Optional OllamaHealthMonitor used for health checks
+        start_time: Time the watch started (time.time())
+        last_progress: Time of the last recorded stream progress
+        stalled: True if the stream is currently considered stalled
+        stall_count: Number of times a stall was detected
+        health_issues: Health issues reported during the request
+    """
+    request_id: str
+    model: str
+    timeout: float
+    heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL
+    health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL
+    stall_interval: float = DEFAULT_STALL_INTERVAL
+    health_monitor: Optional[Any] = None
+    start_time: float = field(default_factory=time.time)
+    last_progress: float = field(default_factory=time.time)
+    stalled: bool = False
+    stall_count: int = 0
+    health_issues: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the watch started."""
+        return time.time() - self.start_time
+
+
+class RequestWatchdog:
+    """Single-thread scheduler for heartbeats, health checks and stall detection.
+
+    Requests are registered with watch() and removed with unwatch(). The
+    scheduler thread starts lazily on the first watch and exits after
+    IDLE_TIMEOUT seconds with no watched requests.
+    """
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT):
+        """Initialize watchdog.
+
+        Args:
+            idle_timeout: Seconds without watched requests before the
+                         scheduler thread exits
+        """
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._heap: List[Tuple[float, int, str, str, WatchedRequest]] = []
+        self._watches: Dict[str, WatchedRequest] = {}
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._tasks_run = 0
+
+    def watch(
+        self,
+        request_id: str,
+        model: str,
+        timeout: float,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        stall_interval: float = DEFAULT_STALL_INTERVAL,
+        health_monitor: Optional[Any] = None
+    ) -> WatchedRequest:
+        """Start watching a request.
+
+        Watching a request ID that is already watched replaces the old watch
+        (e.g., on retry attempts that reuse the request ID).
+
+        Args:
+            request_id: Request ID for logging
+            model: Model name being used
+            timeout: Request timeout in seconds
+            heartbeat_interval: Interval between heartbeat logs in seconds
+            health_check_interval: Interval between health checks in seconds
+            stall_interval: Seconds without progress before reporting a stall
+            health_monitor: Optional OllamaHealthMonitor for health checks
+
+        Returns:
+            WatchedRequest tracking the request
+        """
+        watched = WatchedRequest(
+            request_id=request_id,
+            model=model,
+            timeout=timeout,
+            heartbeat_interval=heartbeat_interval,
+            health_check_interval=health_check_interval,
+            stall_interval=stall_interval,
+            health_monitor=health_monitor
+        )
+        now = watched.start_time
+        with self._condition:
+            self._watches[request_id] = watched
+            if heartbeat_interval > 0:
+                self._schedule(now + heartbeat_interval, HEARTBEAT, watched)
+            if health_monitor is not None and health_check_interval > 0:
+                self._schedule(now + health_check_interval, HEALTH_CHECK, watched)
+            if stall_interval > 0:
+                self._schedule(now + stall_interval, STALL_CHECK, watched)
+            self._schedule(now + timeout * EXPIRY_FACTOR, EXPIRE, watched)
+            self._ensure_thread()
+            self._condition.notify()
+        return watched
+
+    def touch(self, request_id: str) -> None:
+        """Record stream progress for a request (e.g., a chunk arrived).
+
+        Args:
+            request_id: Request ID
+        """
+        watched = self._watches.get(request_id)
+        if watched is None:
+            return
+        watched.last_progress = time.time()
+        if watched.stalled:
+            watched.stalled = False
+            logger.info(f"[{request_id}] Stream resumed after stall")
+
+    def unwatch(self, request_id: str) -> Optional[WatchedRequest]:
+        """Stop watching a request.
+
+        Pending heap entries for the request are discarded lazily when they
+        come due.
+
+        Args:
+            request_id: Request ID
+
+        Returns:
+            The removed WatchedRequest, or None if it was not watched
+        """
+        with self._condition:
+            watched = self._watches.pop(request_id, None)
+            self._condition.notify()
+        return watched
+
+    def get(self, request_id: str) -> Optional[WatchedRequest]:
+        """Get the watch state for a request, if watched."""
+        return self._watches.get(request_id)
+
+    def active_count(self) -> int:
+        """Number of requests currently watched."""
+        with self._condition:
+            return len(self._watches)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get watchdog statistics.
+
+        Returns:
+            Dict with active_requests, pending_deadlines, tasks_run and thread_running
+        """
+        with self._condition:
+            return {
+                "active_requests": len(self._watches),
+                "pending_deadlines": len(self._heap),
+                "tasks_run": self._tasks_run,
+                "thread_running": self._thread is not None and self._thread.is_alive()
+            }
+
+    def _schedule(self, due: float, kind: str, watched: WatchedRequest) -> None:
+        """Push a deadline onto the heap (caller holds the condition lock)."""
+        heapq.heappush(self._heap, (due, next(self._sequence), watched.request_id, kind, watched))
+
+    def _ensure_thread(self) -> None:
+        """Start the scheduler thread if it is not running (caller holds the lock)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="ollama-request-watchdog", daemon=True)
+        self._thread.start()
+
+    def _is_current(self, watched: WatchedRequest) -> bool:
+        """Check that a heap entry still belongs to an active watch."""
+        return self._watches.get(watched.request_id) is watched
+
+    def _run(self) -> None:
+        """Scheduler loop: wait for the earliest deadline and run its task."""
+        while True:
+            with self._condition:
+                # Drop entries of requests that are no longer watched
+                while self._heap and not self._is_current(self._heap[0][4]):
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._condition.wait(self.idle_timeout)
+                    if not self._heap and not self._watches:
+                        self._thread = None
+                        return
+                    continue
+
+                due, _, _, kind, watched = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                self._tasks_run += 1
+
+            # Run the task outside the lock so slow health checks don't block watch()/unwatch()
+            try:
+                next_due = self._run_task(kind, watched)
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"[{watched.request_id}] Watchdog {kind} failed: {e}")
+                next_due = None
+
+            with self._condition:
+                if next_due is not None and self._is_current(watched):
+                    self._schedule(next_due, kind, watched)
+
+    def _run_task(self, kind: str, watched: WatchedRequest) -> Optional[float]:
+        """Run one scheduled task.
+
+        Args:
+            kind: Task kind (heartbeat, health_check, stall_check or expire)
+            watched: Watched request
+
+        Returns:
+            Next due time for this task, or None to stop rescheduling it
+        """
+        now = time.time()
+        if kind == HEARTBEAT:
+            self._log_heartbeat(watched)
+            return now + watched.heartbeat_interval
+        if kind == HEALTH_CHECK:
+            self._check_health(watched)
+            return now + watched.health_check_interval
+        if kind == STALL_CHECK:
+            return self._check_stall(watched, now)
+        if kind == EXPIRE:
+            with self._condition:
+                if self._is_current(watched):
+                    self._watches.pop(watched.request_id, None)
+            logger.debug(f"[{watched.request_id}] Watchdog expired after {watched.elapsed:.1f}s")
+        return None
+
+    def _log_heartbeat(self, watched: WatchedRequest) -> None:
+        """Log a progress heartbeat for a long request."""
+        elapsed = watched.elapsed
+        remaining = watched.timeout - elapsed
+        logger.debug(
+            f"[{watched.request_id}] 🔄 Progress: {elapsed:.1f}s/{watched.timeout}s ({remaining:.1f}s left)"
+        )
+
+    def _check_health(self, watched: WatchedRequest) -> None:
+        """Run a health check for a request and log issues."""
+        health_status = watched.health_monitor.monitor_request_health(
+            watched.request_id,
+            watched.model,
+            watched.start_time,
+            watched.timeout,
+            watched.health_check_interval
+        )
+        if not health_status:
+            return
+
+        watched.health_issues.append(health_status)
+        issue = health_status.get("issue")
+        if issue == "service_unavailable":
+            logger.error(
+                f"[{watched.request_id}] ❌ Critical: Ollama unavailable (may hang/fail)"
+            )
+        elif issue == "model_not_loaded":
+            logger.warning(
+                f"[{watched.request_id}] ⚠️ Model not loaded after {health_status['elapsed']:.1f}s (may be slow)"
+            )
+
+    def _check_stall(self, watched: WatchedRequest, now: float) -> float:
+        """Report a stalled stream if no progress was recorded recently.
+
+        Returns:
+            Next due time for the stall check
+        """
+        idle_for = now - watched.last_progress
+        if idle_for >= watched.stall_interval:
+            if not watched.stalled:
+                watched.stalled = True
+                watched.stall_count += 1
+                logger.warning(
+                    f"[{watched.request_id}] Stream stalled: no progress for {idle_for:.1f}s "
+                    f"(elapsed: {watched.elapsed:.1f}s)"
+                )
+            return now + watched.stall_interval
+        return watched.last_progress + watched.stall_interval
+
+
+# Global watchdog instance
+_global_watchdog = RequestWatchdog()
+
+
+def get_watchdog() -> RequestWatchdog:
+    """Get the global request watchdog instance.
+
+    Returns:
+        Global RequestWatchdog instance
+    """
+    return _global_watchdog
@@ -7,6 +7,7 @@ logging setup, and other helper functions.
 from src.utils.helpers import (
     ensure_directory,
     slugify,
+    atomic_write_text,
     save_markdown,
     load_markdown,
     format_timestamp,
@@ -22,6 +23,7 @@ from src.utils.logging_setup import (
     log_status_with_text,
     log_error_summary,
     get_logging_config,
+    OrderedLogSections,
 )
 from src.utils.error_collector import ErrorCollector
 from src.utils.summary_generator import (
@@ -55,6 +57,7 @@ from src.utils.content_analysis import (
 __all__ = [
     'ensure_directory',
     'slugify',
+    'atomic_write_text',
     'save_markdown',
     'load_markdown',
     'format_timestamp',
@@ -68,6 +71,7 @@ __all__ = [
     'log_status_with_text',
     'log_error_summary',
     'get_logging_config',
+    'OrderedLogSections',
     'ErrorCollector',
     'generate_stage_summary',
     'generate_validation_summary',
@@ -4,6 +4,7 @@ This module provides a centralized error collection system that categorizes
 and tracks errors/warnings by severity, type, content type, and context.
 """
 
+import threading
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
@@ -43,7 +44,8 @@ class ErrorCollector:
     """Centralized error and warning collector.
     
     Collects, categorizes, and tracks errors/warnings during content generation.
-    Provides methods to query, filter, and summarize collected issues.
+    Provides methods to query, filter, and summarize collected issues. Safe to
+    share between generator threads.
     """
     
     def __init__(self):
@@ -51,6 +53,7 @@ class ErrorCollector:
         self._errors: List[ErrorEntry] = []
         self._warnings: List[ErrorEntry] = []
         self._info: List[ErrorEntry] = []
+        self._lock = threading.Lock()
     
     def add_error(
         self,
@@ -86,13 +89,29 @@ class ErrorCollector:
             metadata=metadata or {}
         )
         
-        severity_upper = severity.upper()
-        if severity_upper == ErrorSeverity.CRITICAL.value:
-            self._errors.append(entry)
-        elif severity_upper == ErrorSeverity.WARNING.value:
-            self._warnings.append(entry)
-        else:
-            self._info.append(entry)
+        self._append(entry)
+    
+    def _append(self, entry: ErrorEntry) -> None:
+        """Store an entry in the list for its severity."""
+        with self._lock:
+            if entry.severity == ErrorSeverity.CRITICAL.value:
+                self._errors.append(entry)
+            elif entry.severity == ErrorSeverity.WARNING.value:
+                self._warnings.append(entry)
+            else:
+                self._info.append(entry)
+    
+    def merge(self, other: "ErrorCollector") -> None:
+        """Add all issues of another collector, keeping their order.
+        
+        Used to fold per-session collectors into the stage collector in session
+        order when sessions are processed concurrently.
+        
+        Args:
+            other: Collector to copy issues from
+        """
+        for entry in other.get_critical_issues() + other.get_warnings() + other.get_info():
+            self._append(entry)
     
     def add_warning(
         self,
@@ -132,7 +151,8 @@ class ErrorCollector:
         Returns:
             List of all error entries sorted by severity (CRITICAL first)
         """
-        all_issues = self._errors + self._warnings + self._info
+        with self._lock:
+            all_issues = self._errors + self._warnings + self._info
         # Sort by severity: CRITICAL > WARNING > INFO
         severity_order = {
             ErrorSeverity.CRITICAL.value: 0,
@@ -147,7 +167,8 @@ class ErrorCollector:
         Returns:
             List of critical error entries
         """
-        return self._errors.copy()
+        with self._lock:
+            return self._errors.copy()
     
     def get_warnings(self) -> List[ErrorEntry]:
         """Get all warnings.
@@ -155,7 +176,8 @@ class ErrorCollector:
         Returns:
             List of warning entries
         """
-        return self._warnings.copy()
+        with self._lock:
+            return self._warnings.copy()
     
     def get_info(self) -> List[ErrorEntry]:
         """Get all info-level entries.
@@ -163,7 +185,8 @@ class ErrorCollector:
         Returns:
             List of info entries
         """
-        return self._info.copy()
+        with self._lock:
+            return self._info.copy()
     
     def get_by_content_type(self, content_type: str) -> List[ErrorEntry]:
         """Get all issues for a specific content type.
@@ -253,9 +276,10 @@ class ErrorCollector:
     
     def clear(self) -> None:
         """Clear all collected errors and warnings."""
-        self._errors.clear()
-        self._warnings.clear()
-        self._info.clear()
+        with self._lock:
+            self._errors.clear()
+            self._warnings.clear()
+            self._info.clear()
     
     def to_dict(self) -> Dict[str, Any]:
         """Export all issues to dictionary format.
@@ -275,7 +299,7 @@ class ErrorCollector:
                     "session_num": e.session_num,
                     "metadata": e.metadata
                 }
-                for e in self._errors
+                for e in self.get_critical_issues()
             ],
             "warnings": [
                 {
@@ -288,7 +312,7 @@ class ErrorCollector:
                     "session_num": w.session_num,
                     "metadata": w.metadata
                 }
-                for w in self._warnings
+                for w in self.get_warnings()
             ],
             "info": [
                 {
@@ -301,7 +325,7 @@ class ErrorCollector:
                     "session_num": i.session_num,
                     "metadata": i.metadata
                 }
-                for i in self._info
+                for i in self.get_info()
             ],
             "summary": self.get_summary()
         }
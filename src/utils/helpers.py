@@ -5,8 +5,10 @@ system checks, and other helper operations.
 """
 
 import logging
+import os
 import re
 import subprocess
+import tempfile
 import unicodedata
 from datetime import datetime
 from pathlib import Path
@@ -90,6 +92,61 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+def _current_umask() -> int:
+    """Get the process umask.
+    
+    Read from /proc where available: os.umask() can only read it by setting
+    it, which briefly affects files other threads create meanwhile.
+    """
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def atomic_write_text(filepath: Union[str, Path], content: str, encoding: str = 'utf-8') -> Path:
+    """Write a text file so readers never see it partially written.
+    
+    The content goes to a temporary file next to the target (named
+    ".<name>.<random>.tmp"), is flushed to disk and then renamed over the
+    target. A process killed mid-write leaves the old file (or none) plus a
+    temporary file, never a truncated target. The file keeps the target's
+    permissions, or gets the umask default (like open()) if it is new.
+    
+    Args:
+        filepath: Path of the file to write
+        content: Text content
+        encoding: Text encoding (default: utf-8)
+        
+    Returns:
+        Path of the written file
+    """
+    filepath = Path(filepath)
+    try:
+        mode = filepath.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_current_umask()
+    fd, tmp_name = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file owner-only (0600)
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filepath)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return filepath
+
+
 def save_markdown(filepath: Union[str, Path], content: str) -> None:
     """Save markdown content to a file.
     
@@ -103,7 +160,7 @@ def save_markdown(filepath: Union[str, Path], content: str) -> None:
     ensure_directory(filepath.parent)
     
     # Write content
-    filepath.write_text(content, encoding='utf-8')
+    atomic_write_text(filepath, content)
     logger.info(f"Saved markdown file: {filepath}")
 
 
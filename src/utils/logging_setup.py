@@ -4,12 +4,15 @@ This module provides utilities for setting up consistent logging across
 all scripts and modules, with support for both console and file output.
 """
 
+import contextvars
 import logging
 import sys
+import threading
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 
 
 # Clean separators (simpler, more readable)
@@ -488,6 +491,112 @@ def log_stream_progress_compact(
     )
 
 
+# Section (OrderedLogSections, index) the current thread's records belong to
+_log_section: contextvars.ContextVar[Optional[Tuple["OrderedLogSections", int]]] = contextvars.ContextVar(
+    "log_section", default=None
+)
+
+
+class _SectionFilter(logging.Filter):
+    """Handler filter holding back records logged inside a section."""
+
+    def __init__(self, sections: "OrderedLogSections", handler: logging.Handler):
+        super().__init__()
+        self.sections = sections
+        self.handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        section = _log_section.get()
+        if section is None or section[0] is not self.sections:
+            return True
+        return not self.sections._hold(section[1], self.handler, record)
+
+
+class OrderedLogSections:
+    """Emit the logs of concurrently processed items as whole, ordered sections.
+    
+    While active, records logged inside capture(index) (including from worker
+    threads started with a copy of the context) are held back per index. Once
+    close(index) has been called for an index and every index before it, its
+    records are written to the root handlers in one block, so sessions
+    processed in parallel read like a sequential run. Records logged outside
+    any section are written immediately.
+    
+    Example:
+        >>> with OrderedLogSections() as sections:
+        ...     with sections.capture(0):
+        ...         logger.info("Session 1")   # held until close(0)
+        ...     sections.close(0)              # written now
+    """
+    
+    def __init__(self):
+        """Initialize without any sections."""
+        self._lock = threading.RLock()
+        self._held: Dict[int, List[Tuple[logging.Handler, logging.LogRecord]]] = {}
+        self._closed: set = set()
+        self._next = 0
+        self._filters: List[_SectionFilter] = []
+    
+    def __enter__(self) -> "OrderedLogSections":
+        for handler in logging.getLogger().handlers:
+            section_filter = _SectionFilter(self, handler)
+            handler.addFilter(section_filter)
+            self._filters.append(section_filter)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        # Write whatever is still held (e.g., after an interrupt), in order
+        with self._lock:
+            self._closed.update(self._held)
+            self._flush(final=True)
+        for section_filter in self._filters:
+            section_filter.handler.removeFilter(section_filter)
+        self._filters.clear()
+    
+    @contextmanager
+    def capture(self, index: int) -> Iterator[None]:
+        """Hold back records logged in this block as part of section index.
+        
+        Args:
+            index: Position of the section in the output (0-based)
+        """
+        token = _log_section.set((self, index))
+        try:
+            yield
+        finally:
+            _log_section.reset(token)
+    
+    def close(self, index: int) -> None:
+        """Mark a section complete and write every section that is now in order.
+        
+        Args:
+            index: Section to close
+        """
+        with self._lock:
+            self._closed.add(index)
+            self._flush()
+    
+    def _hold(self, index: int, handler: logging.Handler, record: logging.LogRecord) -> bool:
+        # Returns False (write now) for sections that were already written
+        with self._lock:
+            if index < self._next:
+                return False
+            self._held.setdefault(index, []).append((handler, record))
+            return True
+    
+    def _flush(self, final: bool = False) -> None:
+        # Called with the lock held; handlers are called outside any section
+        token = _log_section.set(None)
+        try:
+            while self._next in self._closed or (final and self._held):
+                for handler, record in self._held.pop(self._next, []):
+                    handler.handle(record)
+                self._closed.discard(self._next)
+                self._next += 1
+        finally:
+            _log_section.reset(token)
+
+
 def get_logging_config(config_loader) -> Dict[str, Any]:
     """Extract logging configuration from ConfigLoader.
     
@@ -5,6 +5,7 @@ and adapts retry strategies based on success rates and error types.
 """
 
 import logging
+import threading
 from typing import Dict, List, Any, Optional, Callable, Tuple
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
@@ -50,7 +51,9 @@ class RetryStats:
 class SmartRetrySystem:
     """Smart retry system with pattern learning.
     
-    Tracks retry patterns, learns from failures, and adapts strategies.
+    Tracks retry patterns, learns from failures, and adapts strategies. The
+    global instance is shared by generators running in parallel threads, so
+    history and statistics are only read and updated under a lock.
     """
     
     def __init__(self, max_history: int = 100):
@@ -63,6 +66,7 @@ class SmartRetrySystem:
         self.pattern_history: deque = deque(maxlen=max_history)
         self.stats = RetryStats()
         self.content_type_stats: Dict[str, RetryStats] = defaultdict(RetryStats)
+        self._lock = threading.RLock()
     
     def record_attempt(
         self,
@@ -95,41 +99,42 @@ class SmartRetrySystem:
             fix_applied=fix_applied
         )
         
-        self.pattern_history.append(pattern)
-        
-        # Update stats
-        self.stats.total_attempts += 1
-        if success:
-            self.stats.successful_attempts += 1
-        else:
-            self.stats.failed_attempts += 1
-        
-        # Update content type stats
-        ct_stats = self.content_type_stats[content_type]
-        ct_stats.total_attempts += 1
-        if success:
-            ct_stats.successful_attempts += 1
-        else:
-            ct_stats.failed_attempts += 1
-        
-        # Update error frequency
-        self.stats.error_frequency[error_type] += 1
-        ct_stats.error_frequency[error_type] += 1
-        
-        # Update strategy success rates
-        if strategy_used:
-            if strategy_used not in self.stats.strategy_success_rates:
-                self.stats.strategy_success_rates[strategy_used] = 0.0
+        with self._lock:
+            self.pattern_history.append(pattern)
+        
+            # Update stats
+            self.stats.total_attempts += 1
+            if success:
+                self.stats.successful_attempts += 1
+            else:
+                self.stats.failed_attempts += 1
+        
+            # Update content type stats
+            ct_stats = self.content_type_stats[content_type]
+            ct_stats.total_attempts += 1
+            if success:
+                ct_stats.successful_attempts += 1
+            else:
+                ct_stats.failed_attempts += 1
+        
+            # Update error frequency
+            self.stats.error_frequency[error_type] += 1
+            ct_stats.error_frequency[error_type] += 1
+        
+            # Update strategy success rates
+            if strategy_used:
+                if strategy_used not in self.stats.strategy_success_rates:
+                    self.stats.strategy_success_rates[strategy_used] = 0.0
             
-            # Calculate success rate for this strategy
-            strategy_patterns = [p for p in self.pattern_history if p.strategy_used == strategy_used]
-            if strategy_patterns:
-                successes = sum(1 for p in strategy_patterns if p.success)
-                self.stats.strategy_success_rates[strategy_used] = successes / len(strategy_patterns)
-        
-        # Recalculate overall success rate
-        if self.stats.total_attempts > 0:
-            self.stats.success_rate = self.stats.successful_attempts / self.stats.total_attempts
+                # Calculate success rate for this strategy
+                strategy_patterns = [p for p in self.pattern_history if p.strategy_used == strategy_used]
+                if strategy_patterns:
+                    successes = sum(1 for p in strategy_patterns if p.success)
+                    self.stats.strategy_success_rates[strategy_used] = successes / len(strategy_patterns)
+        
+            # Recalculate overall success rate
+            if self.stats.total_attempts > 0:
+                self.stats.success_rate = self.stats.successful_attempts / self.stats.total_attempts
     
     def analyze_error_pattern(self, error_message: str, content_type: str) -> Dict[str, Any]:
         """Analyze error message to identify pattern and suggest strategy.
@@ -194,10 +199,11 @@ class SmartRetrySystem:
         Returns:
             Success rate (0.0-1.0)
         """
-        category_patterns = [
-            p for p in self.pattern_history
-            if p.content_type == content_type and error_category in p.error_type.lower()
-        ]
+        with self._lock:
+            category_patterns = [
+                p for p in self.pattern_history
+                if p.content_type == content_type and error_category in p.error_type.lower()
+            ]
         
         if not category_patterns:
             return 0.0
@@ -334,7 +340,8 @@ class SmartRetrySystem:
         else:
             stats = self.stats
         
-        sorted_errors = sorted(stats.error_frequency.items(), key=lambda x: x[1], reverse=True)
+        with self._lock:
+            sorted_errors = sorted(stats.error_frequency.items(), key=lambda x: x[1], reverse=True)
         return sorted_errors[:limit]
 
 
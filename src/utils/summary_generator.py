@@ -119,13 +119,37 @@ def generate_validation_summary(
     logger.info("═" * 80)
 
 
+def format_llm_metrics(totals: Dict[str, Any]) -> str:
+    """Format aggregated LLM request metrics as one summary line.
+    
+    Args:
+        totals: Aggregate from MetricsSink.get_summary() (run or one operation)
+        
+    Returns:
+        Line with request count, prefill/decode tokens, time and rate, and
+        model load time
+    """
+    line = (
+        f"{totals['requests']} requests | "
+        f"prefill {totals['prompt_tokens']:,}t in {totals['prefill_seconds']:.1f}s "
+        f"({totals['prefill_tps']:.0f}t/s) | "
+        f"decode {totals['output_tokens']:,}t in {totals['decode_seconds']:.1f}s "
+        f"({totals['decode_tps']:.1f}t/s)"
+    )
+    if totals.get('load_seconds'):
+        line += f" | load {totals['load_seconds']:.1f}s ({totals['reloads']} reloads)"
+    return line
+
+
 def generate_stage_summary(
     collector: ErrorCollector,
     stage_name: str,
     logger: logging.Logger,
     total_items: Optional[int] = None,
     successful_items: Optional[int] = None,
-    failed_items: Optional[int] = None
+    failed_items: Optional[int] = None,
+    llm_metrics: Optional[Dict[str, Any]] = None,
+    model_tiers: Optional[Dict[str, Any]] = None
 ) -> None:
     """Generate stage-level summary with compliance statistics.
     
@@ -136,6 +160,10 @@ def generate_stage_summary(
         total_items: Total number of items processed (optional)
         successful_items: Number of successful items (optional)
         failed_items: Number of failed items (optional)
+        llm_metrics: Optional MetricsSink.get_summary() result; adds per-run
+                    and per-operation token counts and prefill/decode/load times
+        model_tiers: Optional ModelTiers.get_stats() result; adds requests
+                    per model and tier, and escalations per operation
     """
     summary = collector.get_summary()
     critical_issues = collector.get_critical_issues()
@@ -217,6 +245,27 @@ def generate_stage_summary(
     logger.info(f"    - Critical Errors: {summary['total_errors']}")
     logger.info(f"    - Warnings: {summary['total_warnings']}")
     
+    # LLM performance (Ollama-reported token counts and durations)
+    if llm_metrics and llm_metrics.get('run', {}).get('requests'):
+        logger.info("")
+        logger.info("  LLM Performance:")
+        logger.info(f"    - Run: {format_llm_metrics(llm_metrics['run'])}")
+        for operation, totals in llm_metrics.get('operations', {}).items():
+            logger.info(f"    - {operation}: {format_llm_metrics(totals)}")
+    
+    # Model tiers (requests per model, escalations to larger tiers)
+    if model_tiers and model_tiers.get('enabled') and model_tiers.get('models'):
+        logger.info("")
+        logger.info("  Model Tiers:")
+        for model, stats in model_tiers['models'].items():
+            tier = stats.get('tier') or 'default'
+            operations = ", ".join(f"{op} {n}" for op, n in stats.get('operations', {}).items())
+            logger.info(f"    - {model} ({tier}): {stats.get('requests', 0)} requests ({operations})")
+        escalations = model_tiers.get('escalations', {})
+        if escalations:
+            escalated = ", ".join(f"{op} {n}" for op, n in escalations.items())
+            logger.info(f"    - Escalations: {sum(escalations.values())} ({escalated})")
+    
     # Top critical issues
     if critical_issues:
         logger.info("")
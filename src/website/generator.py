@@ -10,7 +10,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from src.config.loader import ConfigLoader
-from src.utils.helpers import ensure_directory, slugify
+from src.utils.helpers import atomic_write_text, ensure_directory, slugify
 from src.website import content_loader
 from src.website import templates
 
@@ -112,7 +112,7 @@ class WebsiteGenerator:
         )
         
         # Write HTML file
-        output_path.write_text(html_content, encoding='utf-8')
+        atomic_write_text(output_path, html_content)
         logger.info(f"Website generated: {output_path.resolve()}")
         
         return output_path
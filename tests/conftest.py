@@ -10,6 +10,9 @@ import time
 import requests
 import logging
 
+from src.llm.client import OllamaClient
+from src.llm.fake_server import FakeOllamaServer
+
 
 logger = logging.getLogger(__name__)
 
@@ -137,3 +140,71 @@ def skip_if_no_ollama():
     if not verify_model_available(model_name):
         pytest.skip(f"{model_name} model not available")
 
+
+@pytest.fixture
+def local_ollama():
+    """Start a local Ollama stand-in server for the duration of a test."""
+    server = FakeOllamaServer(response_text="Hello from local server", chunked=False)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def second_ollama():
+    """Start a second local Ollama stand-in on another port (multi-endpoint tests)."""
+    server = FakeOllamaServer(response_text="Hello from second server", chunked=False)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_client():
+    """Factory for OllamaClients talking to local stand-in servers.
+    
+    Call it with a server (requests go to its /api/generate) or a list of
+    endpoint base URLs (llm.endpoints). Keyword arguments add or override
+    llm config keys; max_retries, retry_delay and content_requirements go to
+    the client (default: no retries). Clients are closed after the test.
+    """
+    clients = []
+    
+    def factory(target, max_retries=0, retry_delay=0.01, content_requirements=None, **config):
+        if isinstance(target, (list, tuple)):
+            urls = {"api_url": f"{target[0]}/api/generate", "endpoints": list(target)}
+        else:
+            urls = {"api_url": target.generate_url}
+        client = OllamaClient(
+            {
+                "model": "gemma3:4b",
+                "timeout": 30,
+                "health_state": {"ttl": 60, "background_refresh": False},
+                **urls,
+                **config,
+            },
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            content_requirements=content_requirements,
+        )
+        clients.append(client)
+        return client
+    
+    yield factory
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def wait_until():
+    """Poll a condition instead of sleeping for a fixed time.
+    
+    Call it with a zero-argument callable; it returns as soon as the callable
+    returns a truthy value and fails the test after timeout seconds.
+    """
+    def wait(condition, timeout=5.0, interval=0.01):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() >= deadline:
+                pytest.fail(f"Condition not met within {timeout}s")
+            time.sleep(interval)
+    
+    return wait
@@ -0,0 +1,99 @@
+"""Tests for the asyncio Ollama client.
+
+Covers await generate() and async streaming through OllamaClient's layers
+(response cache, concurrency governor), and task cancellation disconnecting
+the request.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.llm.async_client import AsyncOllamaClient
+from src.llm.client import LLMError
+
+
+class TestAsyncOllamaClient:
+    """Test AsyncOllamaClient generation and streaming."""
+
+    def test_generate(self, local_ollama, make_client):
+        """Test async generate returns the full response."""
+        client = AsyncOllamaClient(client=make_client(local_ollama))
+        assert asyncio.run(client.generate("Say hello", use_cache=False)) == "Hello from local server"
+
+    def test_needs_config_or_client(self):
+        """Test a client without config or OllamaClient is rejected."""
+        with pytest.raises(ValueError):
+            AsyncOllamaClient()
+
+    def test_stream_yields_pieces(self, local_ollama, make_client):
+        """Test stream() yields the text as it arrives, in order."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = " ".join(f"w{i}" for i in range(20))
+        client = AsyncOllamaClient(client=make_client(local_ollama))
+
+        async def collect():
+            return [piece async for piece in client.stream("Count", use_cache=False)]
+
+        pieces = asyncio.run(collect())
+        assert "".join(pieces) == local_ollama.response_text
+        assert len(pieces) > 5
+
+    def test_cache_hit_streams_whole_text(self, local_ollama, make_client, tmp_path):
+        """Test a cached response is served by stream() in one piece without a request."""
+        client = AsyncOllamaClient(client=make_client(
+            local_ollama, response_cache={"enabled": True, "directory": str(tmp_path / "cache")}
+        ))
+        asyncio.run(client.generate("Say hello"))
+
+        async def collect():
+            return [piece async for piece in client.stream("Say hello")]
+
+        assert asyncio.run(collect()) == ["Hello from local server"]
+        assert local_ollama.count("/api/generate") == 1
+
+    def test_gather_shares_governor(self, local_ollama, make_client, tmp_path):
+        """Test concurrent tasks hold the endpoint's concurrency slots."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        client = AsyncOllamaClient(client=make_client(
+            local_ollama, concurrency={"max_parallel": 2, "lock_dir": str(tmp_path)}
+        ))
+
+        async def main():
+            return await asyncio.gather(*(client.generate(f"Say hello {i}", use_cache=False) for i in range(5)))
+
+        assert asyncio.run(main()) == ["Hello from local server"] * 5
+        stats = client.client.concurrency.get_stats()
+        assert stats["peak_in_flight"] == 2
+        assert stats["in_flight"] == 0
+
+    def test_task_cancel_disconnects(self, local_ollama, make_client):
+        """Test cancelling the awaiting task stops the server's stream."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = " ".join(f"w{i}" for i in range(2000))
+        client = AsyncOllamaClient(client=make_client(local_ollama))
+
+        async def main():
+            task = asyncio.ensure_future(client.generate("Long", use_cache=False))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        time.sleep(0.1)
+        sent = local_ollama.chunks_sent
+        time.sleep(0.2)
+        assert local_ollama.chunks_sent == sent < 500
+        assert client.client.concurrency.get_stats()["in_flight"] == 0
+
+    def test_failure_raises_llm_error(self, local_ollama, make_client):
+        """Test generation errors surface as LLMError."""
+        local_ollama.generate_status = 500
+        client = AsyncOllamaClient(client=make_client(local_ollama))
+        with pytest.raises(LLMError):
+            asyncio.run(client.generate("Say hello", use_cache=False))
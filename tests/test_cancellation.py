@@ -0,0 +1,172 @@
+"""Tests for request cancellation.
+
+Covers token callbacks and scopes, and requests cancelled while streaming,
+before the first token or during a retry backoff being disconnected so
+the server stops generating.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.llm.cancellation import CancellationToken, cancellation_scope, get_active_token
+from src.llm.client import RequestCancelledError, StreamTimeoutError
+from src.llm.latency import StreamDeadlines
+
+LONG_RESPONSE = " ".join(f"word{i}" for i in range(2000))
+
+
+def cancel_later(token, delay):
+    """Cancel a token from another thread after delay seconds."""
+    timer = threading.Timer(delay, token.cancel, args=("test",))
+    timer.start()
+    return timer
+
+
+class TestCancellationToken:
+    """Test token state, callbacks and scopes."""
+
+    def test_callbacks_run_once(self):
+        """Test callbacks run on the first cancel only, and at once when added late."""
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append("early"))
+        assert token.cancel("stop") and not token.cancel("again")
+        token.add_callback(lambda: calls.append("late"))
+        assert calls == ["early", "late"]
+        assert token.cancelled and token.reason == "stop"
+
+    def test_child_follows_parent_only(self):
+        """Test a child is cancelled with its parent but not the other way round."""
+        parent = CancellationToken()
+        child, detached = parent.child(), parent.child()
+        detached.detach()
+        child.cancel("child only")
+        assert not parent.cancelled
+        sibling = parent.child()
+        parent.cancel("all")
+        assert sibling.cancelled and sibling.reason == "all"
+        assert not detached.cancelled
+
+    def test_wait_returns_on_cancel(self):
+        """Test wait() wakes up as soon as the token is cancelled."""
+        token = CancellationToken()
+        cancel_later(token, 0.1)
+        start = time.time()
+        assert token.wait(5)
+        assert time.time() - start < 1
+
+    def test_scope_reaches_worker_threads(self):
+        """Test the active token is seen by work submitted with a copied context."""
+        with cancellation_scope() as token:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                seen = executor.submit(contextvars.copy_context().run, get_active_token).result()
+        assert seen is token
+        assert get_active_token() is None
+
+
+class TestClientCancellation:
+    """Test cancelled requests are disconnected promptly."""
+
+    def test_cancel_while_streaming(self, local_ollama, make_client):
+        """Test cancelling a streaming request closes it and the server stops sending."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = LONG_RESPONSE
+        client = make_client(local_ollama)
+        token = CancellationToken()
+        cancel_later(token, 0.1)
+        start = time.time()
+        with pytest.raises(RequestCancelledError):
+            client.generate("Lecture", use_cache=False, cancel_token=token)
+        assert time.time() - start < 1
+        time.sleep(0.1)
+        sent = local_ollama.chunks_sent
+        time.sleep(0.2)
+        assert local_ollama.chunks_sent == sent < 200
+        assert client.concurrency.get_stats()["in_flight"] == 0
+        client.close()
+
+    def test_cancel_before_first_token(self, local_ollama, make_client):
+        """Test a request still waiting for response headers is disconnected."""
+        local_ollama.chunked = True
+        local_ollama.first_token_delay = 0.5
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = LONG_RESPONSE
+        client = make_client(local_ollama)
+        start = time.time()
+        with cancellation_scope() as token:
+            cancel_later(token, 0.1)
+            with pytest.raises(RequestCancelledError):
+                client.generate("Lecture", use_cache=False)
+        assert time.time() - start < 0.4
+        time.sleep(0.7)
+        assert local_ollama.chunks_sent <= 2
+        client.close()
+
+    def test_cancel_while_waiting_for_slot(self, local_ollama, make_client, tmp_path):
+        """Test a request queued behind the concurrency limit is cancelled without being sent."""
+        client = make_client(local_ollama, concurrency={"max_parallel": 1, "lock_dir": str(tmp_path)})
+        slot = client.concurrency.acquire()
+        token = CancellationToken()
+        cancel_later(token, 0.1)
+        start = time.time()
+        with pytest.raises(RequestCancelledError):
+            client.generate("Lecture", use_cache=False, cancel_token=token)
+        assert time.time() - start < 1
+        assert local_ollama.count("/api/generate") == 0
+        client.concurrency.release(slot)
+        assert client.concurrency.get_stats()["in_flight"] == 0
+
+    def test_cancelled_request_not_retried(self, local_ollama, make_client):
+        """Test cancellation during a retry backoff ends the request without another attempt."""
+        local_ollama.disconnect = True
+        client = make_client(local_ollama, max_retries=3)
+        client.retry_delay = 2
+        token = CancellationToken()
+        cancel_later(token, 0.1)
+        start = time.time()
+        with pytest.raises(RequestCancelledError):
+            client.generate("Lecture", use_cache=False, cancel_token=token)
+        assert time.time() - start < 1
+        assert local_ollama.count("/api/generate") == 1
+        client.close()
+
+    def test_request_handler_cancel(self, local_ollama, make_client):
+        """Test RequestHandler.cancel_request() disconnects the request."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = LONG_RESPONSE
+        client = make_client(local_ollama)
+
+        def cancel_in_flight():
+            time.sleep(0.1)
+            for request_id in list(client._request_tokens):
+                client.request_handler.cancel_request(request_id)
+
+        threading.Thread(target=cancel_in_flight).start()
+        with pytest.raises(RequestCancelledError):
+            client.generate("Lecture", use_cache=False)
+        client.close()
+
+    def test_stream_timeout_closes_stream(self, local_ollama, make_client):
+        """Test a stream abandoned after a timeout stops being generated."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.01
+        local_ollama.response_text = LONG_RESPONSE
+        client = make_client(local_ollama)
+        deadlines = StreamDeadlines.static(30)
+        deadlines.total = deadlines.max_total = 0.1
+        response = client.connection_pool.post(
+            local_ollama.generate_url, json={"model": "gemma3:4b", "prompt": "x"}, stream=True
+        )
+        with pytest.raises(StreamTimeoutError):
+            client._parse_streaming_response(response, "req-1", timeout=1, deadlines=deadlines)
+        time.sleep(0.1)
+        sent = local_ollama.chunks_sent
+        time.sleep(0.2)
+        assert local_ollama.chunks_sent == sent < 200
+        client.close()
@@ -0,0 +1,178 @@
+"""Tests for single-flight request coalescing.
+
+Covers identical in-flight requests sharing one result across threads
+and clients, and errors reaching every waiter.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.llm.client import LLMError, OllamaClient
+from src.llm.coalesce import CoalescedRequestCancelled, RequestCoalescer, get_request_coalescer
+
+
+def _run_threads(target, count):
+    """Run target(i) in count threads and wait for them."""
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestRequestCoalescer:
+    """Test RequestCoalescer single-flight behavior."""
+
+    def test_identical_calls_share_one_execution(self):
+        """Test concurrent calls with one key execute fn once."""
+        coalescer = RequestCoalescer()
+        calls = []
+        results = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.1)
+            return "shared"
+
+        _run_threads(lambda i: results.append(coalescer.run("k", fn)), 5)
+        assert results == ["shared"] * 5
+        assert len(calls) == 1
+        stats = coalescer.get_stats()
+        assert stats["executed"] == 1
+        assert stats["coalesced"] == 4
+        assert stats["in_flight"] == 0
+
+    def test_different_keys_run_separately(self):
+        """Test distinct keys are not coalesced."""
+        coalescer = RequestCoalescer()
+        results = []
+        _run_threads(lambda i: results.append(coalescer.run(f"k{i}", lambda: i)), 3)
+        assert sorted(results) == [0, 1, 2]
+        assert coalescer.get_stats()["coalesced"] == 0
+
+    def test_sequential_calls_not_cached(self):
+        """Test a completed flight does not serve later calls."""
+        coalescer = RequestCoalescer()
+        calls = []
+        coalescer.run("k", lambda: calls.append(1))
+        coalescer.run("k", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_exception_propagates_to_followers(self):
+        """Test the leader's exception is raised in every caller."""
+        coalescer = RequestCoalescer()
+        errors = []
+
+        def fn():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call(i):
+            try:
+                coalescer.run("k", fn)
+            except ValueError as e:
+                errors.append(str(e))
+
+        _run_threads(call, 4)
+        assert errors == ["boom"] * 4
+
+    def test_cancel_releases_waiters_and_calls_on_cancel(self):
+        """Test cancel() wakes followers, aborts the leader and runs on_cancel."""
+        coalescer = RequestCoalescer()
+        release = threading.Event()
+        cancelled_hook = threading.Event()
+        outcomes = []
+
+        def fn():
+            release.wait(5)
+            return "late"
+
+        def call(i):
+            try:
+                outcomes.append(coalescer.run("k", fn, request_id=f"r{i}", on_cancel=cancelled_hook.set))
+            except CoalescedRequestCancelled:
+                outcomes.append("cancelled")
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(3)]
+        threads[0].start()
+        time.sleep(0.05)
+        for t in threads[1:]:
+            t.start()
+        time.sleep(0.05)
+
+        assert coalescer.cancel("k") is True
+        threads[1].join(1)
+        threads[2].join(1)
+        assert outcomes == ["cancelled", "cancelled"]
+        assert cancelled_hook.is_set()
+
+        release.set()
+        threads[0].join(1)
+        assert outcomes == ["cancelled"] * 3
+        assert coalescer.get_stats()["cancelled"] == 1
+        assert coalescer.cancel("k") is False
+
+    def test_follower_timeout_detaches(self):
+        """Test a follower that stops waiting does not affect the leader."""
+        coalescer = RequestCoalescer()
+        leader_result = []
+        leader = threading.Thread(
+            target=lambda: leader_result.append(coalescer.run("k", lambda: time.sleep(0.15) or "done"))
+        )
+        leader.start()
+        time.sleep(0.05)
+        with pytest.raises(CoalescedRequestCancelled):
+            coalescer.run("k", lambda: "unused", timeout=0.05)
+        leader.join()
+        assert leader_result == ["done"]
+        assert coalescer.get_stats()["abandoned"] == 1
+
+
+class TestClientCoalescing:
+    """Test OllamaClient coalesces identical in-flight requests."""
+
+    @pytest.fixture
+    def slow_config(self, local_ollama):
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.05
+        return {"model": "gemma3:4b", "api_url": local_ollama.generate_url, "timeout": 10}
+
+    def test_identical_prompts_reach_ollama_once(self, slow_config, local_ollama):
+        """Test N identical concurrent generations send one request."""
+        client = OllamaClient(slow_config)
+        before = get_request_coalescer().get_stats()["coalesced"]
+        results = []
+        _run_threads(lambda i: results.append(client.generate("Same diagram prompt", operation="diagram")), 4)
+        assert results == ["Hello from local server"] * 4
+        assert local_ollama.count("/api/generate") == 1
+        assert get_request_coalescer().get_stats()["coalesced"] - before == 3
+
+    def test_separate_clients_share_flight(self, slow_config, local_ollama):
+        """Test identical requests from different clients are coalesced."""
+        clients = [OllamaClient(slow_config) for _ in range(3)]
+        _run_threads(lambda i: clients[i].generate("Shared prompt"), 3)
+        assert local_ollama.count("/api/generate") == 1
+
+    def test_use_cache_false_not_coalesced(self, slow_config, local_ollama):
+        """Test callers asking for a fresh response get their own request."""
+        client = OllamaClient(slow_config)
+        _run_threads(lambda i: client.generate("Fresh prompt", use_cache=False), 3)
+        assert local_ollama.count("/api/generate") == 3
+
+    def test_errors_shared_by_waiters(self, slow_config, local_ollama):
+        """Test an HTTP error from the shared request reaches every caller."""
+        local_ollama.generate_status = 500
+        client = OllamaClient(slow_config)
+        errors = []
+
+        def call(i):
+            try:
+                client.generate("Failing prompt")
+            except LLMError as e:
+                errors.append(e)
+
+        _run_threads(call, 3)
+        assert len(errors) == 3
+        assert local_ollama.count("/api/generate") <= 3
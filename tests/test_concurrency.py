@@ -0,0 +1,184 @@
+"""Tests for the LLM concurrency governor.
+
+Covers max_parallel resolution, the in-flight limit shared by threads
+and processes, and clients sharing one limit per endpoint.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.llm.cancellation import CancellationToken
+from src.llm.client import OllamaClient
+from src.llm.concurrency import (
+    ConcurrencyCancelledError,
+    ConcurrencyGovernor,
+    ConcurrencyTimeoutError,
+    get_concurrency_governor,
+    resolve_max_parallel,
+)
+
+
+def _run_concurrently(governor, workers, hold=0.05):
+    """Run workers that hold a slot briefly; return the peak concurrency seen."""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal active, peak
+        with governor.slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(hold)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return peak
+
+
+class TestResolveMaxParallel:
+    """Test limit resolution from config and environment."""
+
+    def test_config_value_wins(self, monkeypatch):
+        """Test configured value takes precedence over the environment."""
+        monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "8")
+        assert resolve_max_parallel(2) == 2
+
+    def test_environment_fallback(self, monkeypatch):
+        """Test OLLAMA_NUM_PARALLEL is used when config is null."""
+        monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "3")
+        assert resolve_max_parallel(None) == 3
+
+    def test_default(self, monkeypatch):
+        """Test default when nothing is configured."""
+        monkeypatch.delenv("OLLAMA_NUM_PARALLEL", raising=False)
+        assert resolve_max_parallel(None) == 4
+
+    def test_invalid_values_ignored(self, monkeypatch):
+        """Test invalid values fall through to the next source."""
+        monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "lots")
+        assert resolve_max_parallel(0) == 4
+
+
+class TestConcurrencyGovernor:
+    """Test ConcurrencyGovernor limits and metrics."""
+
+    def test_thread_limit(self, tmp_path):
+        """Test no more than max_parallel threads hold a slot."""
+        governor = ConcurrencyGovernor("http://a", max_parallel=2, lock_dir=str(tmp_path))
+        assert _run_concurrently(governor, workers=8) == 2
+        stats = governor.get_stats()
+        assert stats["acquired"] == 8
+        assert stats["in_flight"] == 0
+        assert stats["peak_in_flight"] == 2
+        assert stats["max_wait"] > 0
+
+    def test_process_local_limit(self):
+        """Test the limit without cross-process slot files."""
+        governor = ConcurrencyGovernor("http://b", max_parallel=3, cross_process=False)
+        assert _run_concurrently(governor, workers=9) == 3
+        assert governor.get_stats()["cross_process"] is False
+
+    def test_acquire_timeout(self, tmp_path):
+        """Test acquire raises when no slot frees up in time."""
+        governor = ConcurrencyGovernor("http://c", max_parallel=1, lock_dir=str(tmp_path))
+        slot = governor.acquire()
+        with pytest.raises(ConcurrencyTimeoutError):
+            governor.acquire(timeout=0.05)
+        governor.release(slot)
+        governor.release(governor.acquire(timeout=0.05))
+        assert governor.get_stats()["waiting"] == 0
+
+    @pytest.mark.parametrize("cross_process", [True, False])
+    def test_acquire_cancelled(self, tmp_path, cross_process):
+        """Test a waiting acquire gives up soon after its token is cancelled."""
+        governor = ConcurrencyGovernor("http://d", max_parallel=1, cross_process=cross_process, lock_dir=str(tmp_path))
+        slot = governor.acquire()
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel, args=("test",)).start()
+        start = time.time()
+        with pytest.raises(ConcurrencyCancelledError):
+            governor.acquire(cancel_token=token)
+        assert time.time() - start < 0.5
+        governor.release(slot)
+        governor.release(governor.acquire(timeout=0.05))
+        stats = governor.get_stats()
+        assert stats["waiting"] == 0
+        assert stats["acquired"] == 2
+
+    def test_cross_process_limit(self, tmp_path):
+        """Test a slot held by another process blocks this process."""
+        repo_root = Path(__file__).resolve().parent.parent
+        script = (
+            "import sys, time\n"
+            "from src.llm.concurrency import ConcurrencyGovernor\n"
+            f"g = ConcurrencyGovernor('http://shared', max_parallel=1, lock_dir={str(tmp_path)!r})\n"
+            "g.acquire()\n"
+            "print('held', flush=True)\n"
+            "time.sleep(0.4)\n"
+        )
+        holder = subprocess.Popen(
+            [sys.executable, "-c", script], cwd=repo_root, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            assert holder.stdout.readline().strip() == "held"
+            governor = ConcurrencyGovernor("http://shared", max_parallel=1, lock_dir=str(tmp_path))
+            with pytest.raises(ConcurrencyTimeoutError):
+                governor.acquire(timeout=0.1)
+            start = time.time()
+            slot = governor.acquire(timeout=5)
+            assert time.time() - start < 5
+            governor.release(slot)
+        finally:
+            holder.wait(timeout=10)
+
+    def test_registry_shares_governor(self):
+        """Test one governor per endpoint."""
+        first = get_concurrency_governor("http://registry-test:1", {"max_parallel": 2})
+        second = get_concurrency_governor("http://registry-test:1/", {"max_parallel": 9})
+        assert first is second
+        assert first.max_parallel == 2
+
+
+class TestClientConcurrency:
+    """Test clients route requests through the governor."""
+
+    def test_sync_clients_share_limit(self, local_ollama, tmp_path):
+        """Test concurrent generate() calls never exceed max_parallel."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.02
+        config = {
+            "model": "gemma3:4b",
+            "api_url": local_ollama.generate_url,
+            "timeout": 10,
+            "concurrency": {"max_parallel": 1, "lock_dir": str(tmp_path)},
+        }
+        clients = [OllamaClient(config), OllamaClient(config)]
+        assert clients[0].concurrency is clients[1].concurrency
+        results = []
+
+        def worker(client, i):
+            results.append(client.generate(f"Say hello {i}", operation="diagram"))
+
+        threads = [threading.Thread(target=worker, args=(clients[i % 2], i)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = clients[0].concurrency.get_stats()
+        assert results == ["Hello from local server"] * 4
+        assert stats["peak_in_flight"] == 1
+        assert stats["acquired"] == 4
+        assert stats["in_flight"] == 0
@@ -0,0 +1,132 @@
+"""Tests for the shared Ollama connection pool.
+
+Covers pool configuration, keep-alive reuse and thread safety, and
+clients sharing one pool for health checks and generation.
+"""
+
+import threading
+
+import pytest
+
+from src.llm.client import OllamaClient
+from src.llm.connection_pool import OllamaConnectionPool
+from src.llm.health import OllamaHealthMonitor
+
+
+@pytest.fixture
+def local_llm_config(local_ollama):
+    """LLM configuration pointing at the local stand-in server."""
+    return {
+        "model": "gemma3:4b",
+        "api_url": local_ollama.generate_url,
+        "timeout": 10,
+        "parameters": {"temperature": 0.7},
+        "connection_pool": {"pool_connections": 2, "pool_maxsize": 4, "keep_alive": True},
+    }
+
+
+class TestOllamaConnectionPool:
+    """Test OllamaConnectionPool behavior."""
+
+    def test_from_config_defaults(self):
+        """Test pool creation with no config section."""
+        pool = OllamaConnectionPool.from_config(None)
+        stats = pool.get_stats()
+        assert stats["pool_connections"] == 4
+        assert stats["pool_maxsize"] == 16
+        assert stats["keep_alive"] is True
+        assert stats["requests_sent"] == 0
+
+    def test_from_config_values(self):
+        """Test pool creation from llm.connection_pool values."""
+        pool = OllamaConnectionPool.from_config(
+            {"pool_connections": 1, "pool_maxsize": 2, "keep_alive": False}
+        )
+        assert pool.pool_connections == 1
+        assert pool.pool_maxsize == 2
+        assert pool.session.headers["Connection"] == "close"
+
+    def test_keep_alive_reuses_connection(self, local_ollama):
+        """Test sequential requests reuse a single TCP connection."""
+        pool = OllamaConnectionPool()
+        for _ in range(5):
+            response = pool.get(f"{local_ollama.base_url}/api/version", timeout=5)
+            assert response.status_code == 200
+
+        assert len(local_ollama.client_ports()) == 1
+        assert pool.get_stats()["requests_sent"] == 5
+        pool.close()
+
+    def test_keep_alive_disabled_opens_new_connections(self, local_ollama):
+        """Test keep_alive=False opens a connection per request."""
+        pool = OllamaConnectionPool(keep_alive=False)
+        for _ in range(3):
+            pool.get(f"{local_ollama.base_url}/api/version", timeout=5)
+
+        assert len(local_ollama.client_ports()) == 3
+        pool.close()
+
+    def test_thread_safe_concurrent_requests(self, local_ollama):
+        """Test concurrent requests from several threads share the pool safely."""
+        pool = OllamaConnectionPool(pool_maxsize=4)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(5):
+                    assert pool.get(f"{local_ollama.base_url}/api/version", timeout=5).status_code == 200
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        assert pool.get_stats()["requests_sent"] == 20
+        # Connections are bounded by pool size, not by request count
+        assert len(local_ollama.client_ports()) <= 4
+        pool.close()
+
+    def test_close_allows_reuse(self, local_ollama):
+        """Test pool can be used again after close()."""
+        pool = OllamaConnectionPool()
+        pool.get(f"{local_ollama.base_url}/api/version", timeout=5)
+        pool.close()
+        assert pool.get(f"{local_ollama.base_url}/api/version", timeout=5).status_code == 200
+
+
+class TestClientUsesSharedPool:
+    """Test OllamaClient routes all traffic through one pool."""
+
+    def test_client_components_share_pool(self, local_llm_config):
+        """Test health monitor and request handler share the client's pool."""
+        client = OllamaClient(local_llm_config)
+        assert client.health_monitor.connection_pool is client.connection_pool
+        assert client.request_handler.health_monitor.connection_pool is client.connection_pool
+        assert client.connection_pool.pool_maxsize == 4
+
+    def test_generate_and_health_checks_reuse_connection(self, local_llm_config, local_ollama):
+        """Test pre-flight checks, generation and health checks reuse one connection."""
+        client = OllamaClient(local_llm_config)
+
+        result = client.generate("Say hello", operation="lecture")
+        assert result == "Hello from local server"
+
+        status = client.health_monitor.check_service_status()
+        assert status["available"] is True
+        assert client.check_connection()[0] is True
+
+        paths = [path for _, path, _, _ in local_ollama.requests]
+        assert "/api/generate" in paths
+        assert "/api/version" in paths
+        assert len(local_ollama.client_ports()) == 1
+        client.close()
+
+    def test_standalone_health_monitor_creates_pool(self, local_ollama):
+        """Test OllamaHealthMonitor works without an injected pool."""
+        monitor = OllamaHealthMonitor(local_ollama.base_url)
+        assert monitor.check_service_status()["version"] == "0.0.0-local"
+        assert monitor._check_model_exists("gemma3:4b") is True
@@ -0,0 +1,142 @@
+"""Tests for token-budgeted prompt context and the outline digest."""
+
+import pytest
+
+from src.llm.client import OllamaClient
+from src.llm.context_budget import (
+    LEGACY_MAX_CHARS,
+    TRIM_MARKER,
+    ContextBudget,
+    fit_text,
+    outline_digest,
+)
+from src.llm.sizing import estimate_tokens
+
+
+MODULES = [
+    {
+        "module_id": 1,
+        "module_name": "Cells",
+        "module_description": "Structure and function of cells",
+        "sessions": [
+            {
+                "session_number": 1,
+                "session_title": "Membranes",
+                "subtopics": ["Lipid bilayer", "Transport"],
+                "learning_objectives": ["Explain diffusion"],
+                "key_concepts": ["Osmosis"],
+            },
+            {"session_number": 2, "session_title": "Organelles", "subtopics": ["Mitochondria"]},
+        ],
+    },
+    {
+        "module_id": 2,
+        "module_name": "Genetics",
+        "module_description": "Inheritance",
+        "sessions": [{"session_number": 3, "session_title": "Mendel", "subtopics": ["Alleles"]}],
+    },
+]
+
+
+def paragraphs(count, words=40):
+    """Build text of numbered paragraphs."""
+    return "\n\n".join(" ".join(f"p{i}w{j}" for j in range(words)) for i in range(count))
+
+
+class TestOutlineDigest:
+    """Test the compact outline built from the JSON outline."""
+
+    def test_current_module_in_full(self):
+        """Test the current module lists every session's details."""
+        digest = outline_digest(MODULES, 1)
+        assert "Module 1: Cells (current module)" in digest
+        assert "Overview: Structure and function of cells" in digest
+        assert "Session 2: Organelles" in digest
+        assert "Subtopics: Lipid bilayer; Transport" in digest
+        assert "Objectives: Explain diffusion" in digest
+        assert "Key Concepts: Osmosis" in digest
+
+    def test_other_modules_as_titles(self):
+        """Test other modules contribute one line each."""
+        digest = outline_digest(MODULES, 1)
+        assert "Module 2: Genetics (1 sessions)" in digest
+        assert "Mendel" not in digest
+        assert "Inheritance" not in digest
+
+
+class TestFitText:
+    """Test trimming a single text."""
+
+    def test_fits_unchanged(self):
+        """Test text within the allowance is returned as-is."""
+        assert fit_text("short text", 100) == "short text"
+
+    def test_trims_at_paragraph(self):
+        """Test trimmed text ends at a paragraph boundary with a marker."""
+        text = paragraphs(20)
+        fitted = fit_text(text, 500)
+        assert fitted.endswith(TRIM_MARKER)
+        assert estimate_tokens(fitted) <= 500
+        assert text.startswith(fitted[:-len(TRIM_MARKER)])
+        assert fitted[:-len(TRIM_MARKER)].endswith("w39")
+
+    def test_tiny_allowance(self):
+        """Test an allowance smaller than the marker yields nothing."""
+        assert fit_text(paragraphs(5), 2) == ""
+
+
+class TestContextBudget:
+    """Test fitting pieces into a per-operation budget."""
+
+    def test_under_budget_unchanged(self):
+        """Test pieces that fit together are not touched."""
+        budget = ContextBudget(default_tokens=10000)
+        pieces = [("outline", "a b c"), ("lecture.md", paragraphs(3))]
+        assert budget.fit(pieces) == pieces
+        assert budget.get_stats()["trimmed"] == 0
+
+    def test_small_pieces_kept_whole(self):
+        """Test a small piece survives while large ones share the rest."""
+        budget = ContextBudget(operations={"extension": 2000})
+        outline = outline_digest(MODULES, 1)
+        pieces = [("outline", outline), ("lecture.md", paragraphs(80)), ("lab.md", paragraphs(60))]
+        fitted = dict(budget.fit(pieces, "extension"))
+        assert fitted["outline"] == outline
+        assert fitted["lecture.md"].endswith(TRIM_MARKER)
+        assert fitted["lab.md"].endswith(TRIM_MARKER)
+        assert sum(estimate_tokens(text) for text in fitted.values()) <= 2000
+        assert [name for name, _ in budget.fit(pieces, "extension")] == ["outline", "lecture.md", "lab.md"]
+
+    def test_explicit_budget_and_stats(self):
+        """Test max_tokens overrides the operation's budget and is counted."""
+        budget = ContextBudget(default_tokens=100000)
+        pieces = [("lecture.md", paragraphs(80))]
+        fitted = budget.fit(pieces, "lecture", max_tokens=300)
+        assert estimate_tokens(fitted[0][1]) <= 300
+        stats = budget.get_stats()
+        assert stats["fitted"] == 1 and stats["trimmed"] == 1
+        assert stats["tokens_out"] < stats["tokens_in"]
+
+    def test_budget_for(self):
+        """Test per-operation budgets fall back to the default."""
+        budget = ContextBudget.from_config({"default_tokens": 5000, "operations": {"lecture": 1000}})
+        assert budget.budget_for("lecture") == 1000
+        assert budget.budget_for("lab") == 5000
+        assert budget.budget_for(None) == 5000
+
+    def test_missing_section_keeps_legacy_cap(self):
+        """Test a missing section only applies the 50K-character cap per piece."""
+        budget = ContextBudget.from_config(None)
+        assert not budget.enabled
+        text = "x" * (LEGACY_MAX_CHARS + 100)
+        assert budget.fit_piece(text) == text[:LEGACY_MAX_CHARS]
+
+    @pytest.mark.parametrize("section,enabled", [(None, False), ({"default_tokens": 4000}, True)])
+    def test_client_attribute(self, section, enabled):
+        """Test OllamaClient builds its budget from llm.context_budget."""
+        config = {"model": "m", "api_url": "http://localhost:1/api/generate", "timeout": 5}
+        if section:
+            config["context_budget"] = section
+        client = OllamaClient(config)
+        assert client.context_budget.enabled is enabled
+        client.close()
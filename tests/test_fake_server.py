@@ -0,0 +1,159 @@
+"""Tests for the local fake Ollama server.
+
+Covers canned outputs passing the content analyzers, responses chosen by
+operation, and the timing and fault injection knobs.
+"""
+
+import json
+import time
+
+import pytest
+import requests
+
+from src.config.loader import ConfigLoader
+from src.generate.stages.outline_schema import build_outline_schema
+from src.generate.stages.stage1_outline import OutlineGenerator
+from src.llm.client import LLMError
+from src.llm.fake_server import CANNED_OUTPUTS, FakeOllamaServer, canned_outline, detect_operation
+from src.llm.guards import RepetitionGuard
+from src.utils.content_analysis import analyzers
+
+
+@pytest.fixture
+def fake_ollama():
+    """Start a fake server with canned per-operation outputs."""
+    with FakeOllamaServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def requirements():
+    """Content requirements from the repo config."""
+    return ConfigLoader("config").get_content_requirements()
+
+
+class TestCannedOutputs:
+    """Test the canned outputs pass the content analyzers."""
+
+    @pytest.mark.parametrize("operation,analyze,requirements_key", [
+        ("lecture", analyzers.analyze_lecture, "lecture"),
+        ("lab", analyzers.analyze_lab, None),
+        ("questions", analyzers.analyze_questions, None),
+        ("study_notes", analyzers.analyze_study_notes, "study_notes"),
+        ("diagram", analyzers.analyze_visualization, "visualization"),
+        ("visualization", analyzers.analyze_visualization, "visualization"),
+        ("application", analyzers.analyze_application, "application"),
+        ("extension", analyzers.analyze_extension, "extension"),
+        ("integration", analyzers.analyze_integration, "integration"),
+        ("investigation", analyzers.analyze_investigation, "investigation"),
+        ("open_questions", analyzers.analyze_open_questions, "open_questions"),
+    ])
+    def test_output_passes_analyzer(self, requirements, operation, analyze, requirements_key):
+        """Test each canned output produces no analyzer warnings."""
+        text = CANNED_OUTPUTS[operation]
+        metrics = analyze(text, requirements[requirements_key]) if requirements_key else analyze(text)
+        assert metrics["warnings"] == []
+
+    @pytest.mark.parametrize("operation", sorted(CANNED_OUTPUTS))
+    def test_output_does_not_trip_repetition_guard(self, operation):
+        """Test no streamed prefix of a canned output looks like a loop."""
+        guard = RepetitionGuard()
+        words = CANNED_OUTPUTS[operation].split(" ")
+        for i in range(1, len(words) + 1):
+            assert guard.check(" ".join(words[:i])) is None
+
+    def test_outline_follows_schema(self):
+        """Test the outline has the schema's module count and list bounds."""
+        loader = ConfigLoader("config")
+        bounds = loader.get_outline_bounds()
+        body = {
+            "prompt": "Design a course with EXACTLY 3 modules and EXACTLY 7 total sessions.",
+            "format": build_outline_schema(3, bounds),
+        }
+        outline = json.loads(canned_outline(body))
+        assert len(outline["modules"]) == 3
+        assert sum(len(m["sessions"]) for m in outline["modules"]) == 7
+        session = outline["modules"][0]["sessions"][0]
+        assert len(session["key_concepts"]) >= bounds["key_concepts"].get("min", 3)
+        assert OutlineGenerator(loader, None)._validate_outline_json(outline, 3)
+
+
+class TestOperationRouting:
+    """Test responses are chosen by the request's operation."""
+
+    def test_detect_operation(self):
+        """Test the request ID prefix wins over body heuristics."""
+        assert detect_operation("lec:1a2b3c", {}) == "lecture"
+        assert detect_operation("opq:1a2b3c", {}) == "open_questions"
+        assert detect_operation(None, {"format": {"type": "object"}}) == "outline"
+        assert detect_operation("req:1a2b3c", {"prompt": "Draw a Mermaid diagram"}) == "diagram"
+        assert detect_operation(None, {"prompt": "Hello"}) is None
+
+    def test_client_gets_canned_output(self, fake_ollama, make_client):
+        """Test the client's X-Request-ID header selects the output."""
+        client = make_client(fake_ollama)
+        assert client.generate("Write notes", operation="study_notes", use_cache=False) == CANNED_OUTPUTS["study_notes"]
+        assert fake_ollama.operations == ["study_notes"]
+        client.close()
+
+    def test_overrides(self, fake_ollama, make_client):
+        """Test per-operation outputs and a fixed response text take precedence."""
+        client = make_client(fake_ollama)
+        fake_ollama.outputs["lecture"] = "Short lecture"
+        assert client.generate("Lecture", operation="lecture", use_cache=False) == "Short lecture"
+        fake_ollama.response_text = "Fixed"
+        assert client.generate("Lab", operation="lab", use_cache=False) == "Fixed"
+        client.close()
+
+
+class TestFaultInjection:
+    """Test timing knobs and injected faults as seen by the client."""
+
+    def test_streams_ndjson_chunks(self, fake_ollama):
+        """Test /api/generate streams one chunked NDJSON line per token plus a done line."""
+        fake_ollama.response_text = "one two three"
+        response = requests.post(fake_ollama.generate_url, json={"model": "m", "prompt": "x"}, stream=True)
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert [line["response"] for line in lines] == ["one", " two", " three", ""]
+        assert lines[-1]["done"] and lines[-1]["eval_count"] == 3
+
+    def test_ttft_and_token_rate(self, fake_ollama, make_client):
+        """Test first-token delay and tokens_per_second set the stream duration."""
+        client = make_client(fake_ollama)
+        fake_ollama.response_text = " ".join(f"w{i}" for i in range(10))
+        fake_ollama.first_token_delay = 0.1
+        fake_ollama.tokens_per_second = 100
+        start = time.time()
+        client.generate("Go", operation="lecture", use_cache=False)
+        assert 0.2 <= time.time() - start < 1.0
+        client.close()
+
+    def test_stall(self, fake_ollama, make_client):
+        """Test the stream pauses once after stall_after tokens."""
+        client = make_client(fake_ollama)
+        fake_ollama.response_text = "a b c d e"
+        fake_ollama.stall_after = 2
+        fake_ollama.stall_seconds = 0.2
+        start = time.time()
+        assert client.generate("Go", operation="lecture", use_cache=False) == "a b c d e"
+        assert time.time() - start >= 0.2
+        client.close()
+
+    def test_disconnect_after(self, fake_ollama, make_client):
+        """Test a dropped stream fails the request after the tokens sent."""
+        client = make_client(fake_ollama)
+        fake_ollama.disconnect_after = 3
+        with pytest.raises(LLMError):
+            client.generate("Go", operation="lecture", use_cache=False)
+        assert fake_ollama.chunks_sent == 3
+        client.close()
+
+    def test_malformed_lines_skipped(self, fake_ollama, make_client):
+        """Test malformed JSON lines are skipped without losing text."""
+        client = make_client(fake_ollama)
+        fake_ollama.malformed_every = 50
+        assert client.generate("Go", operation="lecture", use_cache=False) == CANNED_OUTPUTS["lecture"]
+        lecture_tokens = len(CANNED_OUTPUTS["lecture"].split(" "))
+        assert fake_ollama.chunks_sent == lecture_tokens + lecture_tokens // 50 + 1
+        client.close()
@@ -0,0 +1,102 @@
+"""Tests for batch generation (OllamaClient.generate_many and run_batch).
+
+Covers run_batch ordering, error capture and bounded concurrency, and
+generate_many() batches sent to a local stand-in server.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.llm.batch import GenerationRequest, run_batch
+from src.llm.client import LLMError
+from src.llm.prefix import SharedPrefix, shared_prefix
+
+
+class TestRunBatch:
+    """Test ordering, error capture, concurrency and progress."""
+
+    def test_results_in_input_order(self):
+        """Test results follow input order even when items finish out of order."""
+        delays = [0.2, 0.0, 0.1]
+
+        def task(i):
+            def run():
+                time.sleep(delays[i])
+                if i == 1:
+                    raise ValueError("bad item")
+                return i
+            return run
+
+        progress = []
+        results = run_batch(
+            [task(i) for i in range(3)], 3, progress=lambda done, total, r: progress.append((done, total, r.index))
+        )
+        assert [r.index for r in results] == [0, 1, 2]
+        assert results[0].result() == 0 and results[2].value == 2
+        assert not results[1].ok and isinstance(results[1].error, ValueError)
+        with pytest.raises(ValueError):
+            results[1].result()
+        assert progress == [(1, 3, 1), (2, 3, 2), (3, 3, 0)]
+
+    def test_concurrency_bounded(self):
+        """Test no more than max_concurrency items run at once."""
+        lock = threading.Lock()
+        running = [0, 0]  # current, peak
+
+        def task():
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        run_batch([task] * 8, 3)
+        assert running[1] == 3
+
+    def test_workers_see_active_prefix(self):
+        """Test worker threads run in a copy of the caller's context."""
+        from src.llm.prefix import get_active_prefix
+
+        prefix = SharedPrefix("p", "Shared")
+        with shared_prefix(prefix):
+            results = run_batch([get_active_prefix] * 2, 2)
+        assert all(r.value is prefix for r in results)
+
+
+class TestGenerateMany:
+    """Test the client's batch entry point against the local server."""
+
+    def test_generate_many(self, local_ollama, make_client):
+        """Test specs as objects and dicts, results in order."""
+        client = make_client(local_ollama)
+        results = client.generate_many([
+            GenerationRequest("First", operation="application", use_cache=False),
+            {"prompt": "Second", "system": "Be brief", "operation": "extension", "timeout": 20, "use_cache": False},
+        ])
+        assert [r.value for r in results] == ["Hello from local server"] * 2
+        assert [r.label for r in results] == ["application", "extension"]
+        bodies = [b for _, path, _, b in local_ollama.requests if path == "/api/generate"]
+        assert {b["prompt"] for b in bodies} == {"First", "Second"}
+        assert any(b.get("system") == "Be brief" for b in bodies)
+        client.close()
+
+    def test_failures_reported_per_item(self, local_ollama, make_client):
+        """Test a failing request does not hide the others' results."""
+        local_ollama.generate_status = 500
+        client = make_client(local_ollama)
+        results = client.generate_many([{"prompt": "A", "use_cache": False}, {"prompt": "B", "use_cache": False}])
+        assert all(isinstance(r.error, LLMError) for r in results)
+        client.close()
+
+    def test_parallel_requests(self, local_ollama, make_client):
+        """Test requests of a batch are in flight together."""
+        local_ollama.first_token_delay = 0.3
+        client = make_client(local_ollama, concurrency={"max_parallel": 4})
+        start = time.time()
+        results = client.generate_many([{"prompt": f"P{i}", "use_cache": False} for i in range(4)])
+        assert all(r.ok for r in results)
+        assert time.time() - start < 1.0
+        client.close()
@@ -0,0 +1,104 @@
+"""Tests for streaming guards.
+
+Covers each guard's trip condition and a tripped guard closing the
+stream early without a retry.
+"""
+
+import time
+
+import pytest
+
+from src.llm.client import GuardTrippedError
+from src.llm.guards import (
+    RepetitionGuard,
+    StreamGuard,
+    WordLimitGuard,
+    json_object_guard,
+    mermaid_header_guard,
+    run_guards,
+)
+
+
+class TestGuards:
+    """Test guard checks on partial output."""
+
+    def test_json_guard_waits_for_enough_text(self):
+        """Test a short prefix is never judged."""
+        assert json_object_guard(within_chars=50).check("Sure, here is") is None
+
+    def test_json_guard_accepts_fenced_json(self):
+        """Test a code fence before the opening brace is allowed."""
+        guard = json_object_guard(within_chars=50)
+        assert guard.check("```json\n" + '{"course_title": "Biology", ' * 5) is None
+
+    def test_json_guard_trips_on_prose(self):
+        """Test prose without an opening brace trips the guard."""
+        reason = json_object_guard(within_chars=50).check("Here is a course outline for you. " * 3)
+        assert reason.startswith("JSON extraction failed")
+
+    def test_mermaid_guard(self):
+        """Test a diagram type declaration is required near the start."""
+        guard = mermaid_header_guard(within_chars=50)
+        assert guard.check("```mermaid\ngraph TD\n    A[Cell] --> B[Nucleus]\n" * 2) is None
+        assert "missing diagram type" in guard.check("The cell contains many organelles. " * 3).lower()
+
+    def test_word_limit_guard(self):
+        """Test the guard trips only past max_words times the slack."""
+        guard = WordLimitGuard(max_words=10, slack=1.5)
+        assert guard.check("word " * 15) is None
+        assert "exceeds maximum word count" in guard.check("word " * 16).lower()
+
+    def test_repetition_guard(self):
+        """Test a looping passage trips and varied text does not."""
+        guard = RepetitionGuard(span=20, repeats=4)
+        assert guard.check("The mitochondria is the powerhouse. " * 4) is not None
+        varied = " ".join(f"Sentence number {i} is different." for i in range(40))
+        assert guard.check(varied) is None
+
+    def test_repetition_guard_ignores_punctuation(self):
+        """Test recurring closing brackets are not a loop."""
+        guard = RepetitionGuard(span=20, repeats=4)
+        assert guard.check("\n    }\n  ]\n},\n" * 20) is None
+
+    def test_run_guards_skips_failing_guard(self):
+        """Test a guard raising an exception does not abort the generation."""
+
+        class BrokenGuard(StreamGuard):
+            name = "broken"
+
+            def check(self, text):
+                raise RuntimeError("bug")
+
+        assert run_guards([BrokenGuard()], "text") is None
+        guard, reason = run_guards([BrokenGuard(), WordLimitGuard(1, slack=1)], "two words")
+        assert guard.name == "word_limit" and reason
+
+
+class TestClientGuards:
+    """Test OllamaClient aborts guarded streams."""
+
+    def test_guard_aborts_stream_early(self, local_ollama, make_client):
+        """Test a tripped guard closes the stream long before generation ends."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.005
+        local_ollama.response_text = "Here is the course outline you asked for. " * 250
+        client = make_client(local_ollama)
+        start = time.time()
+        with pytest.raises(GuardTrippedError) as exc_info:
+            client.generate("Outline", use_cache=False, guards=[json_object_guard()])
+        assert time.time() - start < 3
+        assert exc_info.value.guard == "json_start"
+        assert exc_info.value.partial_text.startswith("Here is the course outline")
+        time.sleep(0.2)
+        assert local_ollama.chunks_sent < 500
+        assert local_ollama.count("/api/generate") == 1  # Not retried
+        client.close()
+
+    def test_passing_guard_returns_text(self, local_ollama, make_client):
+        """Test output satisfying the guards is returned unchanged."""
+        local_ollama.chunked = True
+        text = " ".join(f"Sentence {i} explains a different idea." for i in range(60))
+        local_ollama.response_text = text
+        client = make_client(local_ollama)
+        assert client.generate("Lecture", use_cache=False, guards=[RepetitionGuard(), WordLimitGuard(1000)]) == text
+        client.close()
@@ -0,0 +1,137 @@
+"""Tests for the shared cached Ollama health state.
+
+Covers GPU usage parsed from /api/ps, the TTL-cached state shared across
+threads, and clients reading it instead of probing on every request.
+"""
+
+import threading
+import time
+
+from src.llm.client import OllamaClient
+from src.llm.health_state import (
+    OllamaHealthState,
+    get_health_state,
+    gpu_usage_from_ps,
+)
+
+
+class TestGpuUsageFromPs:
+    """Test GPU usage derivation from /api/ps entries."""
+
+    def test_no_models_loaded(self):
+        """Test empty /api/ps result."""
+        info = gpu_usage_from_ps([])
+        assert info["using_gpu"] is False
+        assert info["processor_info"] == "No models loaded"
+        assert info["models_loaded"] == []
+
+    def test_full_gpu(self):
+        """Test model fully offloaded to GPU."""
+        info = gpu_usage_from_ps([{"name": "gemma3:4b", "size": 100, "size_vram": 100}])
+        assert info["using_gpu"] is True
+        assert info["processor_info"] == "100% GPU"
+        assert info["models_loaded"] == ["gemma3:4b"]
+
+    def test_full_cpu(self):
+        """Test model running on CPU only."""
+        info = gpu_usage_from_ps([{"name": "gemma3:4b", "size": 100, "size_vram": 0}])
+        assert info["using_gpu"] is False
+        assert info["processor_info"] == "100% CPU"
+
+    def test_mixed_split(self):
+        """Test partially offloaded model uses ollama ps format."""
+        info = gpu_usage_from_ps([{"name": "gemma3:4b", "size": 100, "size_vram": 52}])
+        assert info["using_gpu"] is True
+        assert info["details"][0]["processor"] == "48%/52% CPU/GPU"
+
+
+class TestOllamaHealthState:
+    """Test OllamaHealthState caching and refresh."""
+
+    def test_snapshot_is_cached_within_ttl(self, local_ollama):
+        """Test repeated reads within TTL issue a single probe."""
+        state = OllamaHealthState(local_ollama.base_url, ttl=30, background_refresh=False)
+        for _ in range(10):
+            snapshot = state.get_snapshot()
+            assert snapshot.available is True
+        assert snapshot.version == "0.0.0-local"
+        assert snapshot.models_available == ["gemma3:4b"]
+        assert local_ollama.count("/api/version") == 1
+        assert local_ollama.count("/api/ps") == 1
+
+    def test_snapshot_refreshes_after_ttl(self, local_ollama):
+        """Test a stale snapshot is refreshed on read."""
+        state = OllamaHealthState(local_ollama.base_url, ttl=0.05, background_refresh=False)
+        state.get_snapshot()
+        time.sleep(0.1)
+        state.get_snapshot()
+        assert local_ollama.count("/api/version") == 2
+
+    def test_concurrent_readers_share_one_refresh(self, local_ollama):
+        """Test concurrent reads of an empty state probe only once."""
+        state = OllamaHealthState(local_ollama.base_url, ttl=30, background_refresh=False)
+        threads = [threading.Thread(target=state.get_snapshot) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert local_ollama.count("/api/version") == 1
+
+    def test_unavailable_service(self):
+        """Test snapshot for an unreachable service."""
+        state = OllamaHealthState("http://127.0.0.1:9", ttl=30, background_refresh=False)
+        snapshot = state.get_snapshot()
+        assert snapshot.available is False
+        assert snapshot.error
+        assert state.get_gpu_usage()["using_gpu"] is False
+        assert snapshot.to_service_status()["available"] is False
+
+    def test_gpu_usage_reads_cached_ps(self, local_ollama):
+        """Test GPU usage comes from /api/ps without a subprocess."""
+        local_ollama.ps_models = [{"name": "gemma3:4b", "size": 10, "size_vram": 10}]
+        state = OllamaHealthState(local_ollama.base_url, ttl=30, background_refresh=False)
+        info = state.get_gpu_usage()
+        assert info["using_gpu"] is True
+        assert info["models_loaded"] == ["gemma3:4b"]
+
+    def test_background_refresher_keeps_state_fresh(self, local_ollama):
+        """Test background thread refreshes the snapshot while it is read."""
+        state = OllamaHealthState(local_ollama.base_url, ttl=0.05, background_refresh=True)
+        state.get_snapshot()
+        time.sleep(0.3)
+        assert state.get_stats()["refresh_count"] >= 3
+        assert state.get_stats()["refresher_running"] is True
+        state.stop()
+        assert state.get_stats()["refresher_running"] is False
+
+    def test_registry_returns_shared_instance(self, local_ollama):
+        """Test get_health_state returns one instance per base URL."""
+        first = get_health_state(local_ollama.base_url, background_refresh=False)
+        second = get_health_state(local_ollama.base_url + "/")
+        assert first is second
+
+
+class TestClientUsesHealthState:
+    """Test OllamaClient reads the shared health state."""
+
+    def test_generate_does_not_probe_per_request(self, local_ollama):
+        """Test several generations share one cached pre-flight probe."""
+        config = {
+            "model": "gemma3:4b",
+            "api_url": local_ollama.generate_url,
+            "timeout": 10,
+            "health_state": {"ttl": 30, "background_refresh": False},
+        }
+        client = OllamaClient(config)
+        for _ in range(3):
+            assert client.generate("Say hello", operation="diagram")
+        assert local_ollama.count("/api/generate") == 3
+        assert local_ollama.count("/api/version") == 1
+
+    def test_check_gpu_usage_uses_state(self, local_ollama):
+        """Test client GPU check reads cached /api/ps data."""
+        client = OllamaClient({"model": "gemma3:4b", "api_url": local_ollama.generate_url})
+        info = client.check_gpu_usage()
+        assert info["models_loaded"] == ["gemma3:4b"]
+        assert client.health_monitor.health_state is client.health_state
+        assert client.request_handler.health_monitor.health_state is client.health_state
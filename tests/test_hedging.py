@@ -0,0 +1,76 @@
+"""Tests for hedged requests.
+
+Covers when a hedge is sent and clients duplicating a straggling
+request to another endpoint, keeping the faster copy.
+"""
+
+import time
+
+from src.llm.hedging import HedgePolicy
+from src.llm.latency import LatencyProfile
+
+
+HEDGING = {"enabled": True, "operations": ["diagram"], "min_delay": 0.2}
+
+
+def warm_up(client, count=5):
+    """Complete enough diagram requests for the profile to yield a delay."""
+    for i in range(count):
+        client.generate(f"Warm up {i}", operation="diagram", use_cache=False)
+
+
+class TestHedgePolicy:
+    """Test when requests are hedged."""
+
+    def test_delay_from_profile(self):
+        """Test the delay is the observed percentile once enough samples exist."""
+        profile = LatencyProfile(path=None, enabled=False, min_samples=3)
+        policy = HedgePolicy(enabled=True, operations=["diagram"], quantile=0.9, min_delay=0.5)
+        assert policy.delay(profile, "m", "diagram") is None
+        for ttft in (1.0, 2.0, 3.0):
+            profile.record("m", "diagram", ttft=ttft, total=5.0)
+        assert policy.delay(profile, "m", "diagram") == 3.0
+        assert policy.delay(profile, "m", "lecture") is None
+
+    def test_disabled_by_default(self):
+        """Test a missing config section never hedges."""
+        profile = LatencyProfile(path=None, enabled=False, min_samples=1)
+        profile.record("m", "diagram", ttft=1.0, total=2.0)
+        assert HedgePolicy.from_config(None).delay(profile, "m", "diagram") is None
+
+
+class TestClientHedging:
+    """Test OllamaClient sends and cancels hedges."""
+
+    def test_straggler_hedged_to_other_endpoint(self, local_ollama, second_ollama, make_client, wait_until):
+        """Test a request without a first chunk is duplicated and the faster copy wins."""
+        client = make_client([local_ollama.base_url, second_ollama.base_url], hedging=HEDGING)
+        warm_up(client)
+        local_ollama.first_token_delay = 1
+        start = time.time()
+        assert client.generate("Draw a cell", operation="diagram", use_cache=False) == "Hello from second server"
+        assert time.time() - start < 0.8
+        assert client.hedging.get_stats() == {"hedged": 1, "hedge_wins": 1, "primary_wins": 0, "both_failed": 0}
+        # The losing copy is dropped once its response arrives
+        wait_until(lambda: not client._request_tokens)
+        wait_until(lambda: all(e["outstanding"] == 0 for e in client.router.get_stats()["endpoints"]))
+        client.close()
+
+    def test_prompt_first_chunk_not_hedged(self, local_ollama, make_client):
+        """Test requests answering within the delay are never duplicated."""
+        client = make_client([local_ollama.base_url], hedging=HEDGING)
+        warm_up(client)
+        assert client.generate("Draw a cell", operation="diagram", use_cache=False) == "Hello from local server"
+        assert client.hedging.get_stats()["hedged"] == 0
+        assert local_ollama.count("/api/generate") == 6
+        client.close()
+
+    def test_other_operations_not_hedged(self, local_ollama, second_ollama, make_client):
+        """Test only configured operations are hedged."""
+        client = make_client([local_ollama.base_url, second_ollama.base_url], hedging=HEDGING)
+        for i in range(5):
+            client.generate(f"Warm up {i}", operation="lecture", use_cache=False)
+        local_ollama.first_token_delay = 0.3
+        assert client.generate("Lecture", operation="lecture", use_cache=False) == "Hello from local server"
+        assert client.hedging.get_stats()["hedged"] == 0
+        client.close()
@@ -0,0 +1,171 @@
+"""Tests for atomic writes and the crash-safe run journal.
+
+The stage 2 test runs the real pipeline against a local FakeOllamaServer.
+"""
+
+import json
+import os
+import shutil
+import stat
+from pathlib import Path
+
+import pytest
+
+from src.config.loader import ConfigLoader
+from src.generate.orchestration.journal import RunJournal
+from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.fake_server import FakeOllamaServer, canned_outline
+from src.utils.helpers import atomic_write_text
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestAtomicWriteText:
+    """Test files are replaced whole."""
+
+    def test_writes_and_replaces(self, tmp_path):
+        """Test the target gets the new content and no temporary file is left."""
+        target = tmp_path / "lecture.md"
+        atomic_write_text(target, "first")
+        atomic_write_text(target, "second")
+        assert target.read_text() == "second"
+        assert [p.name for p in tmp_path.iterdir()] == ["lecture.md"]
+
+    def test_permissions(self, tmp_path):
+        """Test a new file gets the umask default and a replaced one keeps its mode."""
+        old_umask = os.umask(0o022)
+        try:
+            target = tmp_path / "lecture.md"
+            atomic_write_text(target, "first")
+            assert stat.S_IMODE(target.stat().st_mode) == 0o644
+            target.chmod(0o640)
+            atomic_write_text(target, "second")
+            assert stat.S_IMODE(target.stat().st_mode) == 0o640
+        finally:
+            os.umask(old_umask)
+
+
+class TestRunJournal:
+    """Test recording, replaying and cleaning up runs."""
+
+    def test_replay_after_load(self, tmp_path):
+        """Test a loaded journal knows finished, unfinished and attempted artifacts."""
+        lecture = tmp_path / "lecture.md"
+        lecture.write_text("Lecture")
+        journal = RunJournal.create(tmp_path / "runs", course="biology")
+        journal.start(lecture)
+        journal.retry(lecture, TimeoutError("slow"))
+        journal.done(lecture, "Lecture")
+        journal.start(tmp_path / "lab.md")
+        journal.start(tmp_path / "notes.md")
+        journal.failed(tmp_path / "notes.md", ValueError("bad"))
+
+        loaded = RunJournal.load(journal.run_id, tmp_path / "runs")
+        assert loaded.info == {"course": "biology"}
+        assert loaded.is_done(lecture)
+        assert loaded.attempts(lecture) == 2
+        assert loaded.unfinished() == [str(tmp_path / "lab.md")]
+
+    def test_changed_file_is_not_done(self, tmp_path):
+        """Test an artifact whose file changed or vanished is generated again."""
+        lecture = tmp_path / "lecture.md"
+        lecture.write_text("Lecture")
+        journal = RunJournal.create(tmp_path)
+        journal.start(lecture)
+        journal.done(lecture, "Lecture")
+        lecture.write_text("Lect")
+        assert not journal.is_done(lecture)
+        lecture.unlink()
+        assert not journal.is_done(lecture)
+
+    def test_cleanup_removes_partial_files(self, tmp_path):
+        """Test unfinished artifacts and their interrupted temp files are removed."""
+        lab = tmp_path / "lab.md"
+        lab.write_text("half a la")
+        (tmp_path / ".lab.md.abc123.tmp").write_text("half")
+        (tmp_path / "lecture.md").write_text("Lecture")
+        journal = RunJournal.create(tmp_path / "runs")
+        journal.start(tmp_path / "lecture.md")
+        journal.done(tmp_path / "lecture.md", "Lecture")
+        journal.start(lab)
+
+        removed = RunJournal.load(journal.run_id, tmp_path / "runs").cleanup()
+        assert sorted(p.name for p in removed) == [".lab.md.abc123.tmp", "lab.md"]
+        assert (tmp_path / "lecture.md").exists()
+
+    def test_cleanup_within_session(self, tmp_path):
+        """Test a worker's cleanup leaves other sessions' unfinished files alone."""
+        leased, other = tmp_path / "session_01", tmp_path / "session_02"
+        for session_dir in (leased, other):
+            session_dir.mkdir()
+            (session_dir / "lab.md").write_text("half a la")
+            (session_dir / ".lab.md.abc123.tmp").write_text("half")
+        journal = RunJournal.create(tmp_path / "runs")
+        journal.start(leased / "lab.md")
+        journal.start(other / "lab.md")
+
+        removed = RunJournal.load(journal.run_id, tmp_path / "runs").cleanup(within=leased)
+        assert sorted(p.name for p in removed) == [".lab.md.abc123.tmp", "lab.md"]
+        assert all(p.parent == leased for p in removed)
+        assert (other / "lab.md").exists()
+        assert (other / ".lab.md.abc123.tmp").exists()
+
+    def test_truncated_last_line_ignored(self, tmp_path):
+        """Test a line cut short by a kill does not break resuming."""
+        journal = RunJournal.create(tmp_path)
+        journal.stage_done("03", outline_path="outline.json")
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "stage_do')
+        loaded = RunJournal.load(journal.run_id, tmp_path)
+        assert loaded.stage_result("03") == {"outline_path": "outline.json"}
+        assert loaded.stage_result("04") is None
+
+    def test_start_or_resume(self, tmp_path):
+        """Test a new run starts without an ID and an unknown ID is an error."""
+        journal = RunJournal.start_or_resume(None, tmp_path, stage="05_generate_secondary")
+        assert RunJournal.start_or_resume(journal.run_id, tmp_path).info == {"stage": "05_generate_secondary"}
+        with pytest.raises(FileNotFoundError):
+            RunJournal.start_or_resume("missing", tmp_path)
+        with pytest.raises(FileExistsError):
+            RunJournal.create(tmp_path, run_id=journal.run_id)
+
+
+def test_stage2_resume_regenerates_only_unfinished(tmp_path, monkeypatch):
+    """Test resuming an interrupted stage 2 run regenerates only the cut-off artifact."""
+    shutil.copytree(PROJECT_ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    with FakeOllamaServer() as server:
+        config_file = tmp_path / "config" / "llm_config.yaml"
+        config_file.write_text(
+            config_file.read_text()
+            .replace("http://localhost:11434/api/generate", server.generate_url)
+            .replace("  response_cache:\n    enabled: true", "  response_cache:\n    enabled: false")
+        )
+        loader = ConfigLoader(tmp_path / "config")
+        outline = json.loads(canned_outline({
+            "prompt": "EXACTLY 1 modules and EXACTLY 1 total sessions",
+            "format": build_outline_schema(1, loader.get_outline_bounds()),
+        }))
+        outline_path = tmp_path / "outline.json"
+        outline_path.write_text(json.dumps({"course_metadata": {"name": "Journal Course"}, "modules": outline["modules"]}))
+
+        journal = RunJournal.create(tmp_path / "runs")
+        generator = ContentGenerator(loader, outline_path=outline_path)
+        results = generator.stage2_generate_content_by_session(max_workers=4, journal=journal)
+        assert [r["status"] for r in results] == ["success"]
+
+        # Simulate a kill while the lab was being rewritten: a start event
+        # without its done, and a truncated file
+        lab_path = results[0]["lab_path"]
+        journal.start(lab_path)
+        lab_path.write_text(lab_path.read_text()[:20])
+
+        start = len(server.operations)
+        resumed = RunJournal.load(journal.run_id, tmp_path / "runs")
+        generator = ContentGenerator(loader, outline_path=outline_path)
+        results = generator.stage2_generate_content_by_session(max_workers=4, journal=resumed)
+
+    assert [r["status"] for r in results] == ["success"]
+    assert server.operations[start:] == ["lab"]
+    assert resumed.is_done(lab_path) and not resumed.unfinished()
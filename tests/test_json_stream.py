@@ -0,0 +1,140 @@
+"""Tests for incremental JSON validation and the outline schema.
+
+Covers the incremental parser, the guard that stops a stream once it
+stops being valid JSON, the outline schema bounds and the format field
+sent with structured requests.
+"""
+
+import json
+
+import pytest
+
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.client import GuardTrippedError
+from src.llm.json_stream import JSONStreamError, JSONStreamGuard, JSONStreamParser
+
+BOUNDS = {
+    "subtopics": {"min": 3, "max": 7},
+    "learning_objectives": {"min": 3, "max": 7},
+    "key_concepts": {"min": 3, "max": 7},
+}
+
+
+def feed_in_pieces(text, size=3):
+    """Feed text to a new parser in small pieces and close it."""
+    parser = JSONStreamParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    parser.close()
+    return parser
+
+
+class TestJSONStreamParser:
+    """Test character-level JSON validation."""
+
+    @pytest.mark.parametrize("document", [
+        '{"a": [1, -2.5e3, 0, true, false, null, "x\\u00e9\\n"], "b": {}}',
+        '  []  ',
+        '"text"',
+        '42',
+    ])
+    def test_valid_documents(self, document):
+        """Test documents accepted by json.loads are accepted in any split."""
+        json.loads(document)
+        assert feed_in_pieces(document).complete
+
+    @pytest.mark.parametrize("document, position", [
+        ('{"a" 1}', 5),
+        ('{"a": 1,}', 8),
+        ('[1 2]', 3),
+        ('{a: 1}', 1),
+        ('{"a": tru}', 9),
+        ('{"a": "x\ny"}', 8),
+        ('{} trailing', 3),
+        ('```json\n{}', 0),
+    ])
+    def test_first_bad_character_reported(self, document, position):
+        """Test the error points at the first character that breaks the document."""
+        parser = JSONStreamParser()
+        with pytest.raises(JSONStreamError) as exc_info:
+            parser.feed(document)
+        assert exc_info.value.position == position
+
+    def test_invalid_number_detected_when_terminated(self):
+        """Test numbers are checked once the next character ends them."""
+        parser = JSONStreamParser()
+        parser.feed('{"a": 01')
+        with pytest.raises(JSONStreamError, match="Invalid number"):
+            parser.feed('}')
+
+    def test_truncated_document(self):
+        """Test close() rejects a document that stopped early."""
+        parser = JSONStreamParser()
+        parser.feed('{"modules": [{"module_id": 1')
+        assert parser.depth == 3 and not parser.complete
+        with pytest.raises(JSONStreamError, match="Unexpected end"):
+            parser.close()
+
+
+class TestJSONStreamGuard:
+    """Test the guard feeds only new text."""
+
+    def test_guard_trips_on_bad_json(self):
+        """Test the guard passes valid prefixes and trips on the first bad character."""
+        guard = JSONStreamGuard()
+        assert guard.check('{"course_metadata": {"name": "Bio"') is None
+        assert guard.check('{"course_metadata": {"name": "Bio", "level": "Intro"}') is None
+        reason = guard.check('{"course_metadata": {"name": "Bio", "level": "Intro"} oops')
+        assert reason.startswith("JSON extraction failed")
+
+    def test_guard_restarts_on_new_stream(self):
+        """Test shorter text than already consumed starts a new document."""
+        guard = JSONStreamGuard()
+        assert guard.check('{"a": [1, 2, 3]}') is None
+        assert guard.check('{"b": 1') is None
+
+
+class TestOutlineSchema:
+    """Test the outline schema matches the outline validator."""
+
+    def test_schema_fields(self):
+        """Test required fields and item bounds."""
+        schema = build_outline_schema(3, BOUNDS)
+        assert schema["required"] == ["course_metadata", "modules"]
+        modules = schema["properties"]["modules"]
+        assert modules["minItems"] == modules["maxItems"] == 3
+        session = modules["items"]["properties"]["sessions"]["items"]
+        assert set(session["required"]) == {
+            "session_number", "session_title", "subtopics", "learning_objectives", "key_concepts", "rationale",
+        }
+        assert session["properties"]["subtopics"] == {
+            "type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 7,
+        }
+        json.dumps(schema)  # Sent as the request's format field
+
+
+class TestClientStructuredOutput:
+    """Test format is sent to Ollama and bad JSON aborts the stream."""
+
+    def test_format_sent_in_payload(self, local_ollama, make_client):
+        """Test a schema passed in params is sent as the top-level format field."""
+        local_ollama.response_text = '{"course_metadata": {}, "modules": []}'
+        schema = build_outline_schema(2, BOUNDS)
+        client = make_client(local_ollama)
+        text = client.generate("Outline", params={"format": schema}, use_cache=False, guards=[JSONStreamGuard()])
+        assert json.loads(text) == {"course_metadata": {}, "modules": []}
+        body = [b for _, path, _, b in local_ollama.requests if path == "/api/generate"][-1]
+        assert body["format"] == schema
+        client.close()
+
+    def test_malformed_json_aborts_stream(self, local_ollama, make_client):
+        """Test a stream turning into invalid JSON is closed at once."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.005
+        local_ollama.response_text = '{"course_metadata": {"name": "Bio"}} ' + "and some more words " * 200
+        client = make_client(local_ollama)
+        with pytest.raises(GuardTrippedError) as exc_info:
+            client.generate("Outline", use_cache=False, guards=[JSONStreamGuard()])
+        assert exc_info.value.guard == "json_stream"
+        assert len(exc_info.value.partial_text) < 200
+        client.close()
@@ -0,0 +1,151 @@
+"""Tests for learned stream deadlines.
+
+Covers percentiles, the persisted per-model/operation profile and the
+first-chunk and stall deadlines a client derives from it.
+"""
+
+import json
+import time
+
+import pytest
+
+from src.llm.client import StreamTimeoutError
+from src.llm.latency import LatencyProfile, StreamDeadlines, percentile
+
+
+def make_profile(tmp_path, **kwargs):
+    """Create a profile persisted under tmp_path."""
+    options = {"min_samples": 3, "safety_factor": 2.0, "min_first_chunk": 5, "min_stall": 2, **kwargs}
+    return LatencyProfile(path=str(tmp_path / "profile.json"), **options)
+
+
+def adaptive_timeouts(tmp_path):
+    """Client adaptive_timeouts config that learns from two samples."""
+    return {"path": str(tmp_path / "profile.json"), "min_samples": 2, "min_first_chunk": 0.1, "min_stall": 0.3}
+
+
+def add_samples(profile, count, operation="lecture", ttft=2.0, total=100.0, max_gap=0.5):
+    for _ in range(count):
+        profile.record("gemma3:4b", operation, ttft=ttft, total=total, max_gap=max_gap, decode_tps=40, connect=0.01)
+
+
+class TestPercentile:
+    """Test nearest-rank percentiles."""
+
+    def test_percentile(self):
+        """Test high percentiles pick the upper tail."""
+        values = list(range(1, 101))
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 1.0) == 100
+        assert percentile([7.0], 0.95) == 7.0
+
+
+class TestLatencyProfile:
+    """Test deadline derivation and persistence."""
+
+    def test_static_until_min_samples(self, tmp_path):
+        """Test too few samples keep the static limits."""
+        profile = make_profile(tmp_path)
+        add_samples(profile, 2)
+        assert profile.deadlines("gemma3:4b", "lecture", 180) == StreamDeadlines.static(180)
+
+    def test_learned_deadlines(self, tmp_path):
+        """Test first-chunk and stall come from percentiles, total never shrinks."""
+        profile = make_profile(tmp_path)
+        add_samples(profile, 3)
+        deadlines = profile.deadlines("gemma3:4b", "lecture", 180)
+        assert deadlines.learned and deadlines.samples == 3
+        assert deadlines.first_chunk == 5  # 2s x 2 raised to the floor
+        assert deadlines.stall == 2
+        assert deadlines.connect == 1
+        assert deadlines.total == 270  # Static 1.5 x 180 kept
+
+    def test_slow_operation_gets_longer_total(self, tmp_path):
+        """Test long but healthy operations are not cut off at the static limit."""
+        profile = make_profile(tmp_path)
+        add_samples(profile, 3, total=400.0)
+        deadlines = profile.deadlines("gemma3:4b", "lecture", 180)
+        assert deadlines.total == 800
+        assert deadlines.max_total > deadlines.total
+
+    def test_deadlines_capped_by_static(self, tmp_path):
+        """Test learned first-chunk and stall never exceed the static values."""
+        profile = make_profile(tmp_path)
+        add_samples(profile, 3, ttft=500.0, max_gap=100.0)
+        deadlines = profile.deadlines("gemma3:4b", "lecture", 180)
+        assert deadlines.first_chunk == 180
+        assert deadlines.stall == 30
+
+    def test_profiles_are_per_operation(self, tmp_path):
+        """Test samples of one operation do not affect another."""
+        profile = make_profile(tmp_path)
+        add_samples(profile, 3, operation="lecture")
+        assert not profile.deadlines("gemma3:4b", "outline", 240).learned
+
+    def test_disabled_keeps_static(self, tmp_path):
+        """Test enabled=False records samples but keeps static limits."""
+        profile = make_profile(tmp_path, enabled=False)
+        add_samples(profile, 5)
+        assert not profile.deadlines("gemma3:4b", "lecture", 180).learned
+
+    def test_persisted_and_windowed(self, tmp_path):
+        """Test samples survive a restart and only the last window is kept."""
+        profile = make_profile(tmp_path, window=4)
+        add_samples(profile, 6)
+        reloaded = make_profile(tmp_path, window=4)
+        assert reloaded.get_stats()["gemma3:4b|lecture"]["samples"] == 4
+        assert reloaded.deadlines("gemma3:4b", "lecture", 180).learned
+
+    def test_unreadable_file_ignored(self, tmp_path):
+        """Test a corrupt profile file starts an empty profile."""
+        (tmp_path / "profile.json").write_text("{not json")
+        profile = make_profile(tmp_path)
+        assert profile.get_stats() == {}
+
+
+class TestClientAdaptiveTimeouts:
+    """Test OllamaClient records latency and applies learned deadlines."""
+
+    def test_requests_recorded(self, local_ollama, tmp_path, make_client):
+        """Test completed requests add samples to the persisted profile."""
+        client = make_client(local_ollama, adaptive_timeouts=adaptive_timeouts(tmp_path))
+        client.generate("Say hello", operation="lecture", use_cache=False)
+        client.generate("Say hello again", operation="lecture", use_cache=False)
+        data = json.loads((tmp_path / "profile.json").read_text())
+        samples = data["profiles"]["gemma3:4b|lecture"]
+        assert len(samples) == 2
+        assert all(0 < s["ttft"] <= s["total"] for s in samples)
+        assert samples[0]["decode_tps"] == pytest.approx(50, rel=0.01)
+        client.close()
+
+    def test_hung_request_fails_fast(self, local_ollama, tmp_path, make_client):
+        """Test a request far beyond the usual time to first token fails in seconds."""
+        client = make_client(local_ollama, adaptive_timeouts=adaptive_timeouts(tmp_path))
+        client.generate("Say hello", operation="lecture", use_cache=False)
+        client.generate("Say hello again", operation="lecture", use_cache=False)
+        local_ollama.first_token_delay = 1
+        start = time.time()
+        with pytest.raises(StreamTimeoutError, match="latency profile"):
+            client.generate("Hang please", operation="lecture", use_cache=False)
+        assert time.time() - start < 0.8
+        client.close()
+
+    def test_cold_model_gets_static_first_chunk(self, local_ollama, tmp_path, make_client):
+        """Test a model that is not loaded is given the static first-chunk limit."""
+        local_ollama.ps_models = []
+        client = make_client(local_ollama, adaptive_timeouts=adaptive_timeouts(tmp_path))
+        client.generate("Say hello", operation="lecture", use_cache=False)
+        client.generate("Say hello again", operation="lecture", use_cache=False)
+        local_ollama.first_token_delay = 0.3
+        assert client.generate("Load the model", operation="lecture", use_cache=False) == "Hello from local server"
+        client.close()
+
+    def test_timeout_override_uses_static_limits(self, local_ollama, tmp_path, make_client):
+        """Test an explicit timeout_override is not shortened by the profile."""
+        client = make_client(local_ollama, adaptive_timeouts=adaptive_timeouts(tmp_path))
+        client.generate("Say hello", operation="lecture", use_cache=False)
+        client.generate("Say hello again", operation="lecture", use_cache=False)
+        local_ollama.first_token_delay = 0.3
+        text = client.generate("Slow start", operation="lecture", use_cache=False, timeout_override=30)
+        assert text == "Hello from local server"
+        client.close()
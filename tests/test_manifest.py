@@ -0,0 +1,124 @@
+"""Tests for the input-hash build manifest and incremental regeneration.
+
+The stage 2 test runs the real pipeline against a local FakeOllamaServer.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.config.loader import ConfigLoader
+from src.generate.orchestration.manifest import (
+    MANIFEST_FILENAME,
+    BuildManifest,
+    content_hash,
+    inputs_hash,
+)
+from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.fake_server import CANNED_OUTPUTS, FakeOllamaServer, canned_outline
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestBuildManifest:
+    """Test recording and checking artifacts."""
+
+    def test_inputs_hash_ignores_key_order(self):
+        """Test equal inputs hash equally regardless of key order."""
+        assert inputs_hash({"a": 1, "b": [1, 2]}) == inputs_hash({"b": [1, 2], "a": 1})
+        assert inputs_hash({"a": 1}) != inputs_hash({"a": 2})
+
+    def test_fresh_after_record(self, tmp_path):
+        """Test a recorded artifact is fresh for the same inputs, in a new load too."""
+        (tmp_path / "lecture.md").write_text("Lecture")
+        manifest = BuildManifest.load(tmp_path)
+        manifest.record("lecture.md", "inputs-1", "Lecture")
+        assert manifest.is_fresh("lecture.md", "inputs-1")
+        reloaded = BuildManifest.load(tmp_path)
+        assert reloaded.is_fresh("lecture.md", "inputs-1")
+        assert reloaded.entries["lecture.md"]["output"] == content_hash("Lecture")
+
+    def test_stale_cases(self, tmp_path):
+        """Test changed inputs, edited or missing files and unknown artifacts are stale."""
+        (tmp_path / "lecture.md").write_text("Lecture")
+        manifest = BuildManifest.load(tmp_path)
+        manifest.record("lecture.md", "inputs-1", "Lecture")
+        assert not manifest.is_fresh("lecture.md", "inputs-2")
+        assert not manifest.is_fresh("lab.md", "inputs-1")
+        (tmp_path / "lecture.md").write_text("Lect")  # truncated or edited
+        assert not manifest.is_fresh("lecture.md", "inputs-1")
+        (tmp_path / "lecture.md").unlink()
+        assert not manifest.is_fresh("lecture.md", "inputs-1")
+
+    def test_unreadable_manifest_loads_empty(self, tmp_path):
+        """Test a corrupt manifest makes everything stale instead of failing."""
+        (tmp_path / MANIFEST_FILENAME).write_text("{not json")
+        assert BuildManifest.load(tmp_path).entries == {}
+
+
+def generate_course(tmp_path, server, incremental=True):
+    """Run stage 2 for a 1-module, 2-session course; return results and requests."""
+    loader = ConfigLoader(tmp_path / "config")
+    outline_path = tmp_path / "outline.json"
+    if not outline_path.exists():
+        outline = json.loads(canned_outline({
+            "prompt": "EXACTLY 1 modules and EXACTLY 2 total sessions",
+            "format": build_outline_schema(1, loader.get_outline_bounds()),
+        }))
+        outline_path.write_text(json.dumps({"course_metadata": {"name": "Manifest Course"}, "modules": outline["modules"]}))
+    start = len(server.operations)
+    generator = ContentGenerator(loader, outline_path=outline_path)
+    results = generator.stage2_generate_content_by_session(max_workers=4, incremental=incremental)
+    return results, server.operations[start:]
+
+
+@pytest.fixture
+def course_env(tmp_path, monkeypatch):
+    """Copy the config to tmp_path, pointed at a fake server without response cache."""
+    shutil.copytree(PROJECT_ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    with FakeOllamaServer() as server:
+        config_file = tmp_path / "config" / "llm_config.yaml"
+        config_file.write_text(
+            config_file.read_text()
+            .replace("http://localhost:11434/api/generate", server.generate_url)
+            .replace("  response_cache:\n    enabled: true", "  response_cache:\n    enabled: false")
+        )
+        yield tmp_path, server
+
+
+@pytest.mark.slow
+def test_stage2_regenerates_only_stale(course_env):
+    """Test unchanged artifacts are kept and a changed lecture invalidates its dependents."""
+    tmp_path, server = course_env
+    results, operations = generate_course(tmp_path, server)
+    assert [r["status"] for r in results] == ["success"] * 2
+    assert operations.count("lecture") == 2
+    manifest = BuildManifest.load(results[0]["session_dir"])
+    assert {"lecture.md", "lab.md", "study_notes.md", "questions.md", "diagram_1.mmd"} <= set(manifest.entries)
+
+    # Nothing changed: every artifact is up to date
+    results, operations = generate_course(tmp_path, server)
+    assert [r["status"] for r in results] == ["success"] * 2
+    assert operations == []
+
+    # A new lecture prompt (with new lecture text) rebuilds everything built from
+    # the lecture, but not the diagrams
+    config_file = tmp_path / "config" / "llm_config.yaml"
+    config_file.write_text(config_file.read_text().replace(
+        'system: "You are an expert {subject} professor writing detailed lecture content',
+        'system: "You are an experienced {subject} professor writing detailed lecture content',
+        1
+    ))
+    server.outputs["lecture"] = CANNED_OUTPUTS["lecture"] + "\n\nOne more paragraph about the topic."
+    results, operations = generate_course(tmp_path, server)
+    assert [r["status"] for r in results] == ["success"] * 2
+    assert sorted(operations) == sorted(["lecture", "lab", "study_notes", "questions"] * 2)
+
+    # --force regenerates everything
+    _, operations = generate_course(tmp_path, server, incremental=False)
+    assert operations.count("lecture") == 2
+    assert "diagram" in operations
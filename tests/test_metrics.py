@@ -0,0 +1,103 @@
+"""Tests for Ollama-reported request metrics.
+
+Covers metrics parsed from the final stream chunk, their aggregation in
+the sink, and clients recording them for each request.
+"""
+
+import pytest
+
+from src.llm.client import OllamaClient
+from src.llm.metrics import MetricsSink, RequestMetrics
+
+FINAL_CHUNK = {
+    "model": "gemma3:4b",
+    "done": True,
+    "prompt_eval_count": 2000,
+    "eval_count": 500,
+    "prompt_eval_duration": 1_000_000_000,
+    "eval_duration": 10_000_000_000,
+    "load_duration": 3_000_000_000,
+    "total_duration": 14_500_000_000,
+}
+
+
+class TestRequestMetrics:
+    """Test conversion of the final stream chunk."""
+
+    def test_from_final_chunk(self):
+        """Test counts and nanosecond durations are converted."""
+        metrics = RequestMetrics.from_final_chunk("lec:abc123", "lecture", "m", FINAL_CHUNK, wall_seconds=15.0)
+        assert metrics.prompt_tokens == 2000
+        assert metrics.output_tokens == 500
+        assert metrics.prefill_seconds == pytest.approx(1.0)
+        assert metrics.decode_seconds == pytest.approx(10.0)
+        assert metrics.load_seconds == pytest.approx(3.0)
+        assert metrics.total_seconds == pytest.approx(14.5)
+        assert metrics.prefill_tps == pytest.approx(2000.0)
+        assert metrics.decode_tps == pytest.approx(50.0)
+        assert metrics.reloaded
+        assert metrics.model == "gemma3:4b"
+        assert "load 3.0s" in metrics.describe()
+
+    def test_missing_fields(self):
+        """Test chunks without counts produce zeros, not errors."""
+        metrics = RequestMetrics.from_final_chunk("req:1", None, "m", {"done": True})
+        assert metrics.operation == "unknown"
+        assert metrics.prompt_tokens == 0
+        assert metrics.decode_tps == 0.0
+        assert not metrics.reloaded
+        assert metrics.to_dict()["model"] == "m"
+
+
+class TestMetricsSink:
+    """Test per-run and per-operation aggregation."""
+
+    def test_aggregates(self):
+        """Test totals and rates per operation and for the run."""
+        sink = MetricsSink()
+        sink.record(RequestMetrics.from_final_chunk("a", "lecture", "m", FINAL_CHUNK))
+        sink.record(RequestMetrics.from_final_chunk("b", "lecture", "m", {**FINAL_CHUNK, "load_duration": 0}))
+        sink.record(RequestMetrics.from_final_chunk("c", "diagram", "m", {**FINAL_CHUNK, "eval_count": 100}))
+        summary = sink.get_summary()
+        assert summary["run"]["requests"] == 3
+        assert summary["run"]["output_tokens"] == 1100
+        assert summary["run"]["reloads"] == 2
+        assert summary["operations"]["lecture"]["requests"] == 2
+        assert summary["operations"]["lecture"]["decode_tps"] == pytest.approx(50.0)
+        assert summary["operations"]["diagram"]["output_tokens"] == 100
+        assert len(sink.records()) == 3
+
+    def test_keep_records_limit_and_reset(self):
+        """Test the record list is bounded while aggregates stay complete."""
+        sink = MetricsSink(keep_records=1)
+        for i in range(3):
+            sink.record(RequestMetrics.from_final_chunk(str(i), "lab", "m", FINAL_CHUNK))
+        assert len(sink.records()) == 1
+        assert sink.get_summary()["run"]["requests"] == 3
+        sink.reset()
+        assert sink.get_summary()["run"]["requests"] == 0
+        assert sink.get_summary()["operations"] == {}
+
+
+class TestClientMetrics:
+    """Test OllamaClient records metrics from real streams."""
+
+    def test_generate_records_final_chunk(self, local_ollama):
+        """Test a completed request lands in the client's metrics sink."""
+        local_ollama.load_duration = 2.0
+        config = {"model": "gemma3:4b", "api_url": local_ollama.generate_url, "timeout": 30}
+        client = OllamaClient(config, max_retries=1, retry_delay=0.1)
+        client.metrics = MetricsSink()
+        client.generate("Explain osmosis", operation="lecture", use_cache=False)
+
+        summary = client.metrics.get_summary()
+        lecture = summary["operations"]["lecture"]
+        assert lecture["requests"] == 1
+        assert lecture["prompt_tokens"] == 10
+        assert lecture["output_tokens"] == 4  # "Hello from local server"
+        assert lecture["decode_tps"] == pytest.approx(50.0)
+        assert lecture["reloads"] == 1
+        record = client.metrics.records()[0]
+        assert record.wall_seconds > 0
+        assert not client._final_chunks
+        client.close()
@@ -0,0 +1,173 @@
+"""Tests for processing sessions concurrently.
+
+Covers ordered log sections, the thread-safe ErrorCollector and
+SmartRetrySystem, and stage 2 logs against a local FakeOllamaServer.
+"""
+
+import json
+import logging
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from src.config.loader import ConfigLoader
+from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.batch import run_batch
+from src.llm.fake_server import FakeOllamaServer, canned_outline
+from src.utils.error_collector import ErrorCollector
+from src.utils.logging_setup import OrderedLogSections
+from src.utils.smart_retry import SmartRetrySystem
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+logger = logging.getLogger("test_parallel_sessions")
+
+
+def messages(caplog):
+    """Messages captured from the test logger, in output order."""
+    return [record.getMessage() for record in caplog.records if record.name == logger.name]
+
+
+class TestOrderedLogSections:
+    """Test sections are written whole and in index order."""
+
+    def test_sections_written_in_order(self, caplog):
+        """Test a later section finishing first waits for the earlier one."""
+        with caplog.at_level(logging.INFO), OrderedLogSections() as sections:
+            logger.info("start")
+            with sections.capture(1):
+                logger.info("s1 a")
+            sections.close(1)
+            assert messages(caplog) == ["start"]
+            with sections.capture(0):
+                logger.info("s0 a")
+            with sections.capture(1):
+                logger.info("s1 late")
+            sections.close(0)
+            assert messages(caplog) == ["start", "s0 a", "s1 a", "s1 late"]
+            # Sections already written log straight through
+            with sections.capture(0):
+                logger.info("s0 after")
+        assert messages(caplog)[-1] == "s0 after"
+
+    def test_threads_do_not_interleave(self, caplog):
+        """Test concurrent sections come out as contiguous blocks."""
+        def task(index):
+            for line in range(3):
+                logger.info(f"s{index} line {line}")
+                time.sleep(0.01 * (4 - index))
+            return index
+
+        with caplog.at_level(logging.INFO), OrderedLogSections() as sections:
+            def session_task(index):
+                try:
+                    with sections.capture(index):
+                        return task(index)
+                finally:
+                    sections.close(index)
+
+            run_batch([lambda index=index: session_task(index) for index in range(4)], 4)
+        assert messages(caplog) == [f"s{i} line {line}" for i in range(4) for line in range(3)]
+
+    def test_exit_flushes_unclosed(self, caplog):
+        """Test leaving the block writes sections that were never closed."""
+        with caplog.at_level(logging.INFO):
+            with OrderedLogSections() as sections:
+                with sections.capture(2):
+                    logger.info("s2")
+                with sections.capture(0):
+                    logger.info("s0")
+            assert messages(caplog) == ["s0", "s2"]
+            # Filters are removed afterwards
+            logger.info("plain")
+        assert messages(caplog)[-1] == "plain"
+
+
+class TestThreadSafeCollectors:
+    """Test the ErrorCollector and SmartRetrySystem under concurrency."""
+
+    def test_error_collector_concurrent_adds(self):
+        """Test no issue is lost when many threads add at once."""
+        collector = ErrorCollector()
+
+        def add(worker):
+            for i in range(200):
+                collector.add_warning("validation", f"w{worker}-{i}", content_type="lecture")
+                collector.add_error("generation", f"e{worker}-{i}", content_type="lab")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add, range(8)))
+        assert len(collector.get_warnings()) == 1600
+        assert len(collector.get_critical_issues()) == 1600
+        assert collector.get_summary()["total_issues"] == 3200
+
+    def test_merge_keeps_order(self):
+        """Test merging per-session collectors reproduces sequential order."""
+        sessions = [ErrorCollector() for _ in range(3)]
+        for index, collector in enumerate(sessions):
+            collector.add_warning("validation", f"session {index}", content_type="lecture")
+            collector.add_error("generation", f"session {index}", content_type="lab")
+        merged = ErrorCollector()
+        for collector in sessions:
+            merged.merge(collector)
+        assert [w.message for w in merged.get_warnings()] == ["session 0", "session 1", "session 2"]
+        assert [c.message for c in merged.get_critical_issues()] == ["session 0", "session 1", "session 2"]
+
+    def test_smart_retry_concurrent_records(self):
+        """Test concurrent attempts are all counted and history stays bounded."""
+        retry = SmartRetrySystem(max_history=50)
+        barrier = threading.Barrier(8)
+
+        def record(worker):
+            barrier.wait()
+            for i in range(100):
+                retry.record_attempt("Timeout", "request timeout", "lecture", 1, success=i % 2 == 0)
+                retry.get_most_common_errors("lecture")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(record, range(8)))
+        stats = retry.get_stats("lecture")
+        assert stats.total_attempts == 800
+        assert stats.successful_attempts == 400
+        assert len(retry.pattern_history) == 50
+
+
+@pytest.mark.slow
+def test_stage2_logs_sessions_in_order(tmp_path, monkeypatch, caplog):
+    """Test concurrent stage 2 writes each session's logs as one ordered block."""
+    shutil.copytree(PROJECT_ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    with FakeOllamaServer() as server:
+        config_file = tmp_path / "config" / "llm_config.yaml"
+        config_file.write_text(
+            config_file.read_text().replace("http://localhost:11434/api/generate", server.generate_url)
+        )
+        loader = ConfigLoader(tmp_path / "config")
+        outline = json.loads(canned_outline({
+            "prompt": "EXACTLY 2 modules and EXACTLY 4 total sessions",
+            "format": build_outline_schema(2, loader.get_outline_bounds()),
+        }))
+        outline_path = tmp_path / "outline.json"
+        outline_path.write_text(json.dumps({"course_metadata": {"name": "Ordered Course"}, "modules": outline["modules"]}))
+
+        generator = ContentGenerator(loader, outline_path=outline_path)
+        with caplog.at_level(logging.INFO):
+            results = generator.stage2_generate_content_by_session(workers=4)
+
+    assert [r["status"] for r in results] == ["success"] * 4
+    lines = [record.getMessage() for record in caplog.records]
+    # Each session's block runs from its header to its completion line
+    headers = [i for i, line in enumerate(lines) if re.match(r"\n\[\d/4\] Session", line)]
+    completions = [i for i, line in enumerate(lines) if re.match(r"  ✓ Session \d+ completed", line)]
+    assert len(headers) == len(completions) == 4
+    assert [lines[i].split("/")[0] for i in headers] == ["\n[1", "\n[2", "\n[3", "\n[4"]
+    for index, (header, completion) in enumerate(zip(headers, completions)):
+        assert header < completion
+        if index + 1 < len(headers):
+            assert completion < headers[index + 1]
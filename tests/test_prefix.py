@@ -0,0 +1,151 @@
+"""Tests for shared session prompt prefixes.
+
+Covers the shared prefix context, prefix reuse statistics, and clients
+sending identical leading text and num_ctx for a session's operations to
+a server that reports prompt_eval_count like a KV prefix cache.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.llm.prefix import (
+    TASK_HEADER,
+    PrefixReuseStats,
+    SharedPrefix,
+    build_session_prefix,
+    get_active_prefix,
+    shared_prefix,
+)
+
+MODULE = {"module_id": 1, "module_name": "Cells", "module_description": "Cell structure"}
+SESSION = {
+    "session_number": 2,
+    "session_title": "Membranes",
+    "subtopics": ["Lipid bilayer", "Transport"],
+    "learning_objectives": ["Explain diffusion"],
+    "key_concepts": ["Osmosis"],
+}
+
+CLIENT_CONFIG = {
+    "parameters": {"num_ctx": 128000, "num_predict": 64000},
+    "context_sizing": {"enabled": True, "operation_num_predict": {"lab": 2048, "diagram": 1024}},
+}
+
+
+def make_prefix(**kwargs):
+    """Build the test session prefix."""
+    return build_session_prefix({"name": "Biology 101", "subject": "biology"}, MODULE, SESSION, 12, **kwargs)
+
+
+class TestSharedPrefix:
+    """Test prefix layout."""
+
+    def test_session_prefix_contents(self):
+        """Test course, module and session blocks appear in stable order."""
+        prefix = make_prefix()
+        text = prefix.text
+        assert prefix.name == "m1s2"
+        assert text.index("COURSE") < text.index("MODULE") < text.index("SESSION")
+        assert "Session 2 of 12: Membranes" in text
+        assert "- Lipid bilayer" in text
+        assert "Overview: Cell structure" in text
+
+    def test_extra_sections_after_session(self):
+        """Test extra blocks (e.g., outline) follow the session block."""
+        prefix = make_prefix(extra_sections=[("COURSE OUTLINE", "outline text"), ("EMPTY", "")])
+        assert prefix.text.index("SESSION") < prefix.text.index("COURSE OUTLINE")
+        assert "EMPTY" not in prefix.text
+
+    def test_assemble_keeps_prefix_identical(self):
+        """Test different operations share system prompt and leading text."""
+        prefix = make_prefix()
+        system_a, prompt_a = prefix.assemble("Write a lecture", "You are a professor")
+        system_b, prompt_b = prefix.assemble("Design a lab", "You design labs")
+        assert system_a == system_b == prefix.system_prompt
+        assert prompt_a.startswith(prefix.text + "\n\n" + TASK_HEADER)
+        assert prompt_b.startswith(prefix.text + "\n\n" + TASK_HEADER)
+        assert "You are a professor" in prompt_a
+        assert prompt_a.endswith("Write a lecture")
+
+    def test_key_depends_on_content(self):
+        """Test different prefixes get different keys."""
+        assert SharedPrefix("a").key != SharedPrefix("b").key
+        assert SharedPrefix("a").key == SharedPrefix("a").key
+
+    def test_context_manager_and_threads(self):
+        """Test the active prefix is scoped and propagates via copy_context."""
+        prefix = make_prefix()
+        assert get_active_prefix() is None
+        with shared_prefix(prefix):
+            assert get_active_prefix() is prefix
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert executor.submit(get_active_prefix).result() is None
+                assert executor.submit(contextvars.copy_context().run, get_active_prefix).result() is prefix
+        assert get_active_prefix() is None
+
+
+class TestPrefixReuseStats:
+    """Test prefill savings accounting."""
+
+    def test_first_use_saves_nothing(self):
+        """Test the first request of a prefix pays the full prefill."""
+        stats = PrefixReuseStats()
+        assert stats.record(SharedPrefix("x" * 700), 300, 250) == 0
+        assert stats.get_stats()["reused_requests"] == 0
+
+    def test_measured_savings(self):
+        """Test savings come from the calibrated prompt_eval_count shortfall."""
+        stats = PrefixReuseStats()
+        prefix = SharedPrefix("x" * 700)
+        stats.record(prefix, 400, 200)  # Calibrates 0.5 evaluated tokens per estimated token
+        assert stats.record(prefix, 400, 50) == 150
+        result = stats.get_stats()
+        assert result["prefill_tokens_saved"] == 150
+        assert result["requests"] == 2
+        assert result["prompt_tokens_evaluated"] == 250
+
+    def test_estimated_savings_without_counts(self):
+        """Test the prefix size is assumed saved when counts are missing."""
+        stats = PrefixReuseStats()
+        prefix = SharedPrefix("x" * 700)
+        stats.record(prefix, 400)
+        assert stats.record(prefix, 400) == prefix.tokens
+
+
+class TestClientPrefix:
+    """Test OllamaClient prefix mode against a prefix-caching server."""
+
+    def generate_bodies(self, server):
+        return [body for _, path, _, body in server.requests if path == "/api/generate"]
+
+    def test_requests_share_prefix_and_num_ctx(self, local_ollama, make_client):
+        """Test operations of a session send identical leading text and num_ctx."""
+        local_ollama.prompt_cache = True
+        client = make_client(local_ollama, prompt_prefix={"enabled": True, "reserve_tokens": 8192}, **CLIENT_CONFIG)
+        prefix = make_prefix(extra_sections=[("SESSION CONTENT", "lecture text " * 500)])
+        with shared_prefix(prefix):
+            client.generate("Design a lab", system_prompt="You design labs", operation="lab", use_cache=False)
+            client.generate("Draw a diagram", system_prompt="You draw", operation="diagram", use_cache=False)
+        lab, diagram = self.generate_bodies(local_ollama)
+        assert lab["system"] == diagram["system"] == prefix.system_prompt
+        assert lab["prompt"].startswith(prefix.text)
+        assert diagram["prompt"].startswith(prefix.text)
+        assert lab["num_ctx"] == diagram["num_ctx"]
+        assert lab["num_predict"] == 2048
+        assert diagram["num_predict"] == 1024
+
+        stats = client.log_prefix_reuse()
+        assert stats["requests"] == 2
+        assert stats["reused_requests"] == 1
+        assert stats["prefill_tokens_saved"] > prefix.tokens // 2
+        client.close()
+
+    def test_disabled_ignores_prefix(self, local_ollama, make_client):
+        """Test prefix mode off sends the operation prompt unchanged."""
+        client = make_client(local_ollama, prompt_prefix={"enabled": False}, **CLIENT_CONFIG)
+        client.generate("Design a lab", system_prompt="You design labs", prefix=make_prefix(), use_cache=False)
+        body = self.generate_bodies(local_ollama)[0]
+        assert body["prompt"] == "Design a lab"
+        assert body["system"] == "You design labs"
+        assert client.prefix_stats.get_stats()["requests"] == 0
+        client.close()
@@ -0,0 +1,176 @@
+"""Tests for the on-disk LLM response cache.
+
+Covers cache keys, the on-disk store (LRU eviction, corrupt entries,
+refresh) and clients answering repeated prompts from the cache.
+"""
+
+import os
+import time
+
+from src.llm.cache import ResponseCache, make_cache_key
+from src.llm.client import OllamaClient
+
+
+class TestCacheKey:
+    """Test content-addressed key computation."""
+
+    def test_same_inputs_same_key(self):
+        """Test identical requests produce identical keys."""
+        params = {"temperature": 0.7, "top_p": 0.9}
+        assert make_cache_key("m", "p", "s", params) == make_cache_key("m", "p", "s", dict(params))
+
+    def test_param_order_irrelevant(self):
+        """Test parameter ordering does not change the key."""
+        assert make_cache_key("m", "p", None, {"a": 1, "b": 2}) == make_cache_key("m", "p", None, {"b": 2, "a": 1})
+
+    def test_output_affecting_inputs_change_key(self):
+        """Test model, prompts and sampling params are part of the key."""
+        base = make_cache_key("m", "p", "s", {"temperature": 0.7})
+        assert make_cache_key("m2", "p", "s", {"temperature": 0.7}) != base
+        assert make_cache_key("m", "p2", "s", {"temperature": 0.7}) != base
+        assert make_cache_key("m", "p", "s2", {"temperature": 0.7}) != base
+        assert make_cache_key("m", "p", "s", {"temperature": 0.1}) != base
+
+    def test_performance_params_ignored(self):
+        """Test options that don't affect output are excluded from the key."""
+        base = make_cache_key("m", "p", None, {"temperature": 0.7})
+        assert make_cache_key("m", "p", None, {"temperature": 0.7, "num_thread": 8, "keep_alive": "5m"}) == base
+
+
+class TestResponseCache:
+    """Test ResponseCache storage and eviction."""
+
+    def test_put_and_get(self, tmp_path):
+        """Test stored responses are returned on lookup."""
+        cache = ResponseCache(directory=str(tmp_path))
+        cache.put("ab" * 32, "cached text", {"operation": "lecture"})
+        assert cache.get("ab" * 32) == "cached text"
+        assert cache.get("cd" * 32) is None
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["stores"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test entries survive a new cache instance (e.g., a re-run)."""
+        ResponseCache(directory=str(tmp_path)).put("ef" * 32, "persisted")
+        assert ResponseCache(directory=str(tmp_path)).get("ef" * 32) == "persisted"
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted over the size cap."""
+        cache = ResponseCache(directory=str(tmp_path), max_size_mb=0.003)  # ~3 KB
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for key in keys:
+            cache.put(key, "x" * 900)
+            time.sleep(0.01)
+        # Touch the oldest entry so the second one becomes least recently used
+        assert cache.get(keys[0]) is not None
+        time.sleep(0.01)
+        cache.put("99" * 32, "y" * 900)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get("99" * 32) is not None
+        assert cache.get_stats()["evictions"] >= 1
+        assert cache.total_size() <= cache.max_size_bytes
+
+    def test_corrupt_entry_is_miss(self, tmp_path):
+        """Test unreadable entries are treated as misses."""
+        cache = ResponseCache(directory=str(tmp_path))
+        key = "12" * 32
+        path = tmp_path / key[:2] / f"{key}.json"
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json", encoding="utf-8")
+        assert cache.get(key) is None
+
+    def test_disabled_cache(self, tmp_path):
+        """Test a disabled cache neither stores nor returns entries."""
+        cache = ResponseCache(directory=str(tmp_path), enabled=False)
+        cache.put("34" * 32, "text")
+        assert cache.get("34" * 32) is None
+        assert not any(tmp_path.iterdir())
+
+    def test_refresh_skips_lookups_but_stores(self, tmp_path):
+        """Test refresh mode misses every lookup and replaces stored entries."""
+        cache = ResponseCache(directory=str(tmp_path))
+        cache.put("56" * 32, "old")
+        cache.refresh = True
+        assert cache.get("56" * 32) is None
+        cache.put("56" * 32, "new")
+        cache.refresh = False
+        assert cache.get("56" * 32) == "new"
+
+    def test_missing_config_disables(self):
+        """Test no response_cache section means no caching."""
+        assert ResponseCache.from_config(None).enabled is False
+
+    def test_deterministic_mode_pins_params(self):
+        """Test deterministic mode pins temperature and seed."""
+        cache = ResponseCache(deterministic=True, seed=7)
+        assert cache.pin_params({"temperature": 0.9, "top_p": 0.9}) == {"temperature": 0.0, "seed": 7, "top_p": 0.9}
+        assert ResponseCache().pin_params({"temperature": 0.9}) == {"temperature": 0.9}
+
+    def test_clear(self, tmp_path):
+        """Test clear removes all entries."""
+        cache = ResponseCache(directory=str(tmp_path))
+        cache.put("56" * 32, "text")
+        cache.clear()
+        assert cache.get("56" * 32) is None
+        assert cache.total_size() == 0
+
+
+class TestClientCaching:
+    """Test OllamaClient reads and writes the response cache."""
+
+    def _config(self, local_ollama, tmp_path, **cache_options):
+        return {
+            "model": "gemma3:4b",
+            "api_url": local_ollama.generate_url,
+            "timeout": 10,
+            "parameters": {"temperature": 0.7},
+            "response_cache": {"directory": str(tmp_path), **cache_options},
+        }
+
+    def test_identical_prompt_served_from_cache(self, local_ollama, tmp_path):
+        """Test a repeated request does not reach Ollama."""
+        client = OllamaClient(self._config(local_ollama, tmp_path))
+        assert client.generate("Say hello", system_prompt="Be brief") == "Hello from local server"
+        assert client.generate("Say hello", system_prompt="Be brief") == "Hello from local server"
+        assert local_ollama.count("/api/generate") == 1
+        assert client.response_cache.get_stats()["hits"] == 1
+
+    def test_rerun_uses_cache(self, local_ollama, tmp_path):
+        """Test a new client (e.g., re-running a script) reuses cached answers."""
+        OllamaClient(self._config(local_ollama, tmp_path)).generate("Explain osmosis")
+        OllamaClient(self._config(local_ollama, tmp_path)).generate("Explain osmosis")
+        assert local_ollama.count("/api/generate") == 1
+
+    def test_different_prompt_misses(self, local_ollama, tmp_path):
+        """Test different prompts are sent to Ollama."""
+        client = OllamaClient(self._config(local_ollama, tmp_path))
+        client.generate("Prompt one")
+        client.generate("Prompt two")
+        assert local_ollama.count("/api/generate") == 2
+
+    def test_use_cache_false_bypasses(self, local_ollama, tmp_path):
+        """Test use_cache=False always sends the request."""
+        client = OllamaClient(self._config(local_ollama, tmp_path))
+        client.generate("Say hello")
+        client.generate("Say hello", use_cache=False)
+        assert local_ollama.count("/api/generate") == 2
+
+    def test_deterministic_mode_sends_pinned_params(self, local_ollama, tmp_path):
+        """Test deterministic mode sends pinned temperature and seed."""
+        client = OllamaClient(self._config(local_ollama, tmp_path, deterministic=True, seed=123))
+        client.generate("Say hello")
+        _, _, _, body = local_ollama.requests[-1]
+        assert body["temperature"] == 0.0
+        assert body["seed"] == 123
+
+    def test_cache_files_written(self, local_ollama, tmp_path):
+        """Test successful responses are written to the cache directory."""
+        client = OllamaClient(self._config(local_ollama, tmp_path))
+        client.generate("Say hello", operation="lecture")
+        files = list(tmp_path.glob("*/*.json"))
+        assert len(files) == 1
+        assert os.path.getsize(files[0]) > 0
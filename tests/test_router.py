@@ -0,0 +1,107 @@
+"""Tests for multi-endpoint routing and failover.
+
+Covers endpoint selection, ejection of unhealthy endpoints and their
+readmission, and clients moving a request to another endpoint when a
+connection drops or a stream times out.
+"""
+
+import time
+
+import pytest
+
+from src.llm.client import LLMError, OllamaClient
+from src.llm.router import normalize_base_url
+
+DEAD_URL = "http://127.0.0.1:9"
+
+
+class TestEndpointRouter:
+    """Test endpoint selection and ejection."""
+
+    def test_normalize_base_url(self):
+        """Test generate URLs and trailing slashes map to the base URL."""
+        assert normalize_base_url("http://h:11434/api/generate") == "http://h:11434"
+        assert normalize_base_url("http://h:11434/") == "http://h:11434"
+
+    def test_single_endpoint_defaults_to_api_url(self, local_ollama):
+        """Test a client without llm.endpoints routes to api_url only."""
+        client = OllamaClient({"model": "gemma3:4b", "api_url": local_ollama.generate_url})
+        assert [e.base_url for e in client.router.endpoints] == [local_ollama.base_url]
+        assert client.health_state is client.router.primary.health_state
+        client.close()
+
+    def test_duplicate_endpoints_dropped(self, local_ollama, make_client):
+        """Test the same server listed twice is one endpoint."""
+        client = make_client([local_ollama.base_url, local_ollama.generate_url])
+        assert len(client.router.endpoints) == 1
+        client.close()
+
+    def test_least_outstanding_selected(self, local_ollama, second_ollama, make_client):
+        """Test the endpoint with fewer outstanding requests wins, ties go first."""
+        client = make_client([local_ollama.base_url, second_ollama.base_url])
+        first, second = client.router.endpoints
+        assert client.router.select() is first
+        client.router.start_request(first)
+        assert client.router.select() is second
+        client.router.finish_request(first)
+        assert client.router.select() is first
+        client.close()
+
+    def test_unhealthy_endpoint_ejected(self, local_ollama, make_client):
+        """Test an endpoint failing its health check is skipped and ejected."""
+        client = make_client([DEAD_URL, local_ollama.base_url])
+        assert client.generate("Say hello", use_cache=False) == "Hello from local server"
+        dead, live = client.router.get_stats()["endpoints"]
+        assert dead["ejected"] and dead["failures"] == 1 and dead["requests"] == 0
+        assert live["requests"] == 1
+        client.close()
+
+    def test_readmitted_after_cooldown(self, local_ollama, second_ollama, make_client):
+        """Test an ejected endpoint comes back once its health check passes."""
+        client = make_client([local_ollama.base_url, second_ollama.base_url], router={"eject_seconds": 0.05})
+        first, second = client.router.endpoints
+        client.router.eject(first, "test")
+        assert client.router.select() is second
+        time.sleep(0.1)
+        assert client.router.select() is first
+        assert not first.ejected
+        client.close()
+
+
+class TestClientFailover:
+    """Test OllamaClient fails over instead of backing off."""
+
+    def test_connection_error_fails_over_without_backoff(self, local_ollama, second_ollama, make_client):
+        """Test a dropped connection moves the request to the other endpoint at once."""
+        local_ollama.disconnect = True
+        client = make_client([local_ollama.base_url, second_ollama.base_url], retry_delay=5)
+        start = time.time()
+        assert client.generate("Say hello", use_cache=False) == "Hello from second server"
+        assert time.time() - start < 3
+        assert local_ollama.count("/api/generate") == 1
+        stats = client.router.get_stats()
+        assert stats["failovers"] == 1
+        assert stats["endpoints"][0]["ejected"]
+        assert all(e["outstanding"] == 0 for e in stats["endpoints"])
+        client.close()
+
+    def test_stream_timeout_fails_over(self, local_ollama, second_ollama, make_client):
+        """Test a stream timeout on one endpoint is retried on another."""
+        local_ollama.chunked = True
+        local_ollama.token_delay = 0.5
+        local_ollama.response_text = "slow " * 10
+        client = make_client([local_ollama.base_url, second_ollama.base_url], timeout=0.2)
+        assert client.generate("Say hello", use_cache=False) == "Hello from second server"
+        assert client.router.get_stats()["failovers"] == 1
+        client.close()
+
+    def test_all_endpoints_failing_raises(self, local_ollama, second_ollama, make_client):
+        """Test the request fails once every endpoint has been tried."""
+        local_ollama.disconnect = True
+        second_ollama.disconnect = True
+        client = make_client([local_ollama.base_url, second_ollama.base_url])
+        with pytest.raises(LLMError, match="Connection error"):
+            client.generate("Say hello", use_cache=False)
+        assert local_ollama.count("/api/generate") == 1
+        assert second_ollama.count("/api/generate") == 1
+        client.close()
@@ -0,0 +1,142 @@
+"""Tests for the dependency-graph task scheduler.
+
+The stage 2 test runs the real pipeline against a local FakeOllamaServer.
+"""
+
+import contextvars
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.config.loader import ConfigLoader
+from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.orchestration.scheduler import DependencyFailedError, TaskGraph
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.fake_server import FakeOllamaServer, canned_outline
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestTaskGraph:
+    """Test dependency ordering, failure propagation and concurrency."""
+
+    def test_dependencies_receive_values(self):
+        """Test nodes run after their dependencies and get their values."""
+        graph = TaskGraph()
+        graph.add("lecture", lambda inputs: "L")
+        graph.add("lab", lambda inputs: inputs["lecture"] + "+lab", deps=["lecture"])
+        graph.add("questions", lambda inputs: sorted(inputs.items()), deps=["lecture", "lab"])
+        results = graph.run(max_workers=4)
+        assert list(results) == ["lecture", "lab", "questions"]
+        assert results["lab"].value == "L+lab"
+        assert results["questions"].value == [("lab", "L+lab"), ("lecture", "L")]
+
+    def test_failure_skips_dependents(self):
+        """Test a failed node skips everything downstream but not siblings."""
+        ran = []
+
+        def fail(inputs):
+            raise ValueError("lecture failed")
+
+        graph = TaskGraph()
+        graph.add("lecture", fail)
+        graph.add("lab", lambda inputs: ran.append("lab"), deps=["lecture"])
+        graph.add("questions", lambda inputs: ran.append("questions"), deps=["lab"])
+        graph.add("diagram", lambda inputs: ran.append("diagram") or "D")
+        results = graph.run(max_workers=2)
+        assert ran == ["diagram"]
+        assert isinstance(results["lecture"].error, ValueError) and not results["lecture"].skipped
+        assert results["lab"].skipped and isinstance(results["questions"].error, DependencyFailedError)
+        assert results["diagram"].ok
+        with pytest.raises(ValueError):
+            results["lecture"].result()
+
+    def test_independent_nodes_overlap(self):
+        """Test independent nodes run concurrently up to max_workers."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(inputs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.1)
+            with lock:
+                active.pop()
+
+        graph = TaskGraph()
+        for i in range(6):
+            graph.add(f"n{i}", work)
+        start = time.time()
+        graph.run(max_workers=3)
+        assert max(peak) == 3
+        assert time.time() - start < 0.5
+
+    def test_ready_nodes_start_in_insertion_order(self):
+        """Test an earlier session's nodes win over later ones once ready."""
+        order = []
+        graph = TaskGraph()
+        for session in ("s1", "s2"):
+            graph.add(f"{session}:lecture", lambda inputs, s=session: order.append(f"{s}:lecture"))
+            graph.add(f"{session}:lab", lambda inputs, s=session: order.append(f"{s}:lab"), deps=[f"{session}:lecture"])
+        graph.run(max_workers=1)
+        assert order == ["s1:lecture", "s1:lab", "s2:lecture", "s2:lab"]
+
+    def test_invalid_graph(self):
+        """Test duplicate keys and unknown dependencies are rejected."""
+        graph = TaskGraph()
+        graph.add("a", lambda inputs: None)
+        with pytest.raises(ValueError, match="Duplicate"):
+            graph.add("a", lambda inputs: None)
+        with pytest.raises(ValueError, match="unknown"):
+            graph.add("b", lambda inputs: None, deps=["missing"])
+
+    def test_context_and_progress(self):
+        """Test workers see the caller's context and progress covers every node."""
+        var = contextvars.ContextVar("var", default=None)
+        var.set("session")
+        seen = []
+        graph = TaskGraph()
+        graph.add("a", lambda inputs: var.get())
+        graph.add("b", lambda inputs: None, deps=["a"])
+        results = graph.run(max_workers=2, progress=lambda done, total, result: seen.append((done, total)))
+        assert results["a"].value == "session"
+        assert seen == [(1, 2), (2, 2)]
+
+
+@pytest.mark.slow
+def test_stage2_runs_sessions_as_graph(tmp_path, monkeypatch):
+    """Test stage 2 generates every artifact of every session through the graph."""
+    shutil.copytree(PROJECT_ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    with FakeOllamaServer() as server:
+        config_file = tmp_path / "config" / "llm_config.yaml"
+        config_file.write_text(
+            config_file.read_text().replace("http://localhost:11434/api/generate", server.generate_url)
+        )
+        loader = ConfigLoader(tmp_path / "config")
+        outline = json.loads(canned_outline({
+            "prompt": "EXACTLY 2 modules and EXACTLY 3 total sessions",
+            "format": build_outline_schema(2, loader.get_outline_bounds()),
+        }))
+        outline_path = tmp_path / "outline.json"
+        outline_path.write_text(json.dumps({"course_metadata": {"name": "Graph Course"}, "modules": outline["modules"]}))
+
+        generator = ContentGenerator(loader, outline_path=outline_path)
+        results = generator.stage2_generate_content_by_session(max_workers=4)
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    for result in results:
+        for key in ("lecture_path", "lab_path", "notes_path", "questions_path"):
+            assert result[key].exists()
+        assert result["diagram_paths"] and all(path.exists() for path in result["diagram_paths"])
+        assert set(result["quality_scores"]) == {"lecture", "questions", "study_notes"}
+    # Diagrams start right away instead of after the lecture, lab and notes
+    operations = server.operations
+    assert operations.count("lecture") == 3
+    assert operations.index("diagram") < operations.index("lab")
@@ -0,0 +1,126 @@
+"""Tests for per-request num_ctx / num_predict sizing.
+
+Covers token estimates, the sizes chosen per operation and the sized
+num_ctx / num_predict sent in request payloads.
+"""
+
+from src.llm.sizing import RequestSizer, estimate_tokens
+
+PARAMETERS = {"temperature": 0.7, "num_ctx": 128000, "num_predict": 64000}
+SIZING = {
+    "enabled": True,
+    "ctx_buckets": [2048, 4096, 8192, 16384, 32768, 65536, 131072],
+    "tokens_per_word": 1.5,
+    "output_headroom": 2.0,
+    "operation_num_predict": {"diagram": 2048},
+}
+REQUIREMENTS = {
+    "lecture": {"min_word_count": 1000, "max_word_count": 1500},
+    "application": {"max_total_words": 1000},
+    "visualization": {"min_nodes": 10},
+}
+
+
+def make_sizer(**overrides):
+    """Create a sizer from the test config with optional section overrides."""
+    return RequestSizer.from_config({**SIZING, **overrides}, PARAMETERS, REQUIREMENTS)
+
+
+class TestEstimateTokens:
+    """Test prompt token estimation."""
+
+    def test_empty(self):
+        """Test empty and missing text count as zero tokens."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens(None) == 0
+
+    def test_rounds_up(self):
+        """Test estimates are conservative (rounded up)."""
+        assert estimate_tokens("abcd") == 2
+        assert estimate_tokens("x" * 3500) == 1000
+
+
+class TestRequestSizer:
+    """Test num_ctx bucketing and num_predict caps."""
+
+    def test_missing_section_disables_sizing(self):
+        """Test no context_sizing section leaves parameters unchanged."""
+        sizer = RequestSizer.from_config(None, PARAMETERS, REQUIREMENTS)
+        assert not sizer.enabled
+        assert sizer.size("prompt", operation="lecture") == {}
+
+    def test_word_limit_caps_num_predict(self):
+        """Test max_word_count and max_total_words bound the output budget."""
+        sizer = make_sizer()
+        assert sizer.output_budget("lecture") == 4500
+        assert sizer.output_budget("application") == 3000
+
+    def test_operation_budget_without_word_limit(self):
+        """Test operation_num_predict applies when there is no word limit."""
+        sizer = make_sizer()
+        assert sizer.output_budget("diagram") == 2048
+        assert sizer.output_budget("visualization") == 64000
+        assert sizer.output_budget(None) == 64000
+
+    def test_budget_never_exceeds_configured_num_predict(self):
+        """Test configured num_predict stays an upper bound."""
+        sizer = make_sizer(output_headroom=100)
+        assert sizer.output_budget("lecture") == 64000
+
+    def test_num_ctx_rounded_to_bucket(self):
+        """Test num_ctx covers prompt + output and lands on a bucket."""
+        sized = make_sizer().size("x" * 6000, operation="lecture")
+        assert sized == {"num_predict": 4500, "num_ctx": 8192}
+
+    def test_similar_prompts_share_bucket(self):
+        """Test small prompt differences don't change num_ctx (no reloads)."""
+        sizer = make_sizer()
+        assert sizer.size("x" * 10000, operation="diagram")["num_ctx"] == \
+            sizer.size("x" * 15000, operation="diagram")["num_ctx"]
+
+    def test_num_ctx_capped_at_configured_maximum(self):
+        """Test huge prompts never exceed the configured num_ctx."""
+        sized = make_sizer().size("x" * 1_000_000, operation="lecture")
+        assert sized["num_ctx"] == 128000
+
+    def test_explicit_params_kept(self):
+        """Test explicit num_ctx / num_predict are not overridden."""
+        sizer = make_sizer()
+        assert sizer.size("x" * 6000, operation="lecture", explicit={"num_ctx": 4096}) == {"num_predict": 4500}
+        sized = sizer.size("x" * 6000, operation="lecture", explicit={"num_predict": 20000})
+        assert sized == {"num_ctx": 32768}
+
+
+class TestClientSizing:
+    """Test OllamaClient sends sized parameters."""
+
+    def last_generate_body(self, server):
+        return [body for _, path, _, body in server.requests if path == "/api/generate"][-1]
+
+    def test_payload_uses_sized_parameters(self, local_ollama, make_client):
+        """Test the request payload carries the sized num_ctx / num_predict."""
+        client = make_client(local_ollama, parameters=dict(PARAMETERS), context_sizing=SIZING, content_requirements=REQUIREMENTS)
+        client.generate("Explain osmosis", operation="lecture", use_cache=False)
+        body = self.last_generate_body(local_ollama)
+        assert body["num_predict"] == 4500
+        assert body["num_ctx"] == 8192
+        assert body["temperature"] == 0.7
+        client.close()
+
+    def test_explicit_params_override_sizing(self, local_ollama, make_client):
+        """Test per-call params win over the sizing policy."""
+        client = make_client(local_ollama, parameters=dict(PARAMETERS), context_sizing=SIZING, content_requirements=REQUIREMENTS)
+        client.generate("Explain osmosis", params={"num_ctx": 2048}, operation="lecture", use_cache=False)
+        body = self.last_generate_body(local_ollama)
+        assert body["num_ctx"] == 2048
+        assert body["num_predict"] == 4500
+        client.close()
+
+    def test_disabled_sends_configured_parameters(self, local_ollama, make_client):
+        """Test disabled sizing sends the configured values unchanged."""
+        client = make_client(local_ollama, parameters=dict(PARAMETERS), context_sizing={"enabled": False}, content_requirements=REQUIREMENTS)
+        client.generate("Explain osmosis", operation="lecture", use_cache=False)
+        body = self.last_generate_body(local_ollama)
+        assert body["num_ctx"] == 128000
+        assert body["num_predict"] == 64000
+        client.close()
@@ -215,3 +215,34 @@ class TestSummaryGenerator:
 
 
 
+    
+    def test_generate_stage_summary_llm_metrics(self, caplog):
+        """Test stage summary reports per-run and per-operation LLM metrics."""
+        collector = ErrorCollector()
+        totals = {
+            "requests": 2, "prompt_tokens": 3000, "output_tokens": 800,
+            "prefill_seconds": 1.5, "decode_seconds": 20.0, "load_seconds": 4.0,
+            "wall_seconds": 25.0, "reloads": 1, "prefill_tps": 2000.0, "decode_tps": 40.0,
+        }
+        llm_metrics = {"run": totals, "operations": {"lecture": totals}}
+        
+        test_logger = logging.getLogger("test")
+        with caplog.at_level(logging.INFO, logger="test"):
+            generate_stage_summary(collector, "Test Stage", test_logger, total_items=1, llm_metrics=llm_metrics)
+        
+        all_log_text = caplog.text
+        assert "LLM Performance" in all_log_text
+        assert "Run: 2 requests | prefill 3,000t in 1.5s (2000t/s) | decode 800t in 20.0s (40.0t/s)" in all_log_text
+        assert "load 4.0s (1 reloads)" in all_log_text
+        assert "lecture: 2 requests" in all_log_text
+    
+    def test_generate_stage_summary_without_llm_requests(self, caplog):
+        """Test the LLM section is omitted when no requests were recorded."""
+        collector = ErrorCollector()
+        empty = {"run": {"requests": 0}, "operations": {}}
+        
+        test_logger = logging.getLogger("test")
+        with caplog.at_level(logging.INFO, logger="test"):
+            generate_stage_summary(collector, "Test Stage", test_logger, llm_metrics=empty)
+        
+        assert "LLM Performance" not in caplog.text
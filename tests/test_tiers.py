@@ -0,0 +1,153 @@
+"""Tests for per-operation model tiers and escalation.
+
+Routing tests run OllamaClient against a real FakeOllamaServer and check the
+model named in each request body.
+"""
+
+import logging
+
+import pytest
+
+from src.llm.client import OllamaClient
+from src.llm.fake_server import FakeOllamaServer
+from src.llm.tiers import ModelTiers
+from src.utils.error_collector import ErrorCollector
+from src.utils.summary_generator import generate_stage_summary
+
+
+TIERS_CONFIG = {
+    "enabled": True,
+    "tiers": {"small": "gemma3:1b", "large": "gemma3:4b"},
+    "operations": {"diagram": "small", "lecture": "large"},
+}
+
+
+@pytest.fixture
+def fake_ollama():
+    """Start a fake server with canned per-operation outputs."""
+    with FakeOllamaServer() as server:
+        yield server
+
+
+def make_config(server, model_tiers=None):
+    """Create a client config for the server."""
+    config = {
+        "model": "gemma3:4b",
+        "api_url": server.generate_url,
+        "timeout": 10,
+        "health_state": {"ttl": 30, "background_refresh": False},
+    }
+    if model_tiers is not None:
+        config["model_tiers"] = model_tiers
+    return config
+
+
+def sent_models(server):
+    """Models named in the server's /api/generate request bodies."""
+    return [body["model"] for _, path, _, body in server.requests if path == "/api/generate"]
+
+
+class TestModelTiers:
+    """Test tier lookup, escalation and stats."""
+
+    def test_disabled_by_default(self):
+        """Test a missing section routes everything to the default model."""
+        tiers = ModelTiers.from_config(None, "gemma3:4b")
+        assert not tiers.enabled
+        assert tiers.model_for("diagram") == "gemma3:4b"
+        assert tiers.escalate("diagram", "gemma3:4b", ["too short"]) == "gemma3:4b"
+        assert tiers.describe() == "single model gemma3:4b"
+
+    def test_model_for(self):
+        """Test listed operations use their tier and others the default."""
+        tiers = ModelTiers.from_config(TIERS_CONFIG, "gemma3:12b")
+        assert tiers.model_for("diagram") == "gemma3:1b"
+        assert tiers.model_for("lecture") == "gemma3:4b"
+        assert tiers.model_for("lab") == "gemma3:12b"
+        assert tiers.model_for(None) == "gemma3:12b"
+
+    def test_unknown_tier_rejected(self):
+        """Test an operation mapped to an undefined tier is a config error."""
+        with pytest.raises(ValueError, match="medium"):
+            ModelTiers("m", enabled=True, tiers={"small": "a"}, operations={"diagram": "medium"})
+
+    def test_escalate(self):
+        """Test failed validations move up one tier and stop at the largest."""
+        tiers = ModelTiers.from_config(TIERS_CONFIG, "gemma3:4b")
+        assert tiers.escalate("diagram", "gemma3:1b", ["too few nodes"]) == "gemma3:4b"
+        assert tiers.escalate("diagram", "gemma3:4b", ["too few nodes"]) == "gemma3:4b"
+        assert tiers.escalate("diagram", "gemma3:1b", []) == "gemma3:1b"
+        assert tiers.get_stats()["escalations"] == {"diagram": 1}
+
+    def test_escalation_off_and_policy(self):
+        """Test escalate: false and a custom policy keep the failed model."""
+        tiers = ModelTiers.from_config({**TIERS_CONFIG, "escalate": False}, "gemma3:4b")
+        assert tiers.escalate("diagram", "gemma3:1b", ["issue"]) == "gemma3:1b"
+
+        tiers = ModelTiers.from_config(TIERS_CONFIG, "gemma3:4b")
+        tiers.policy = lambda operation, issues: any("mermaid" in i for i in issues)
+        assert tiers.escalate("diagram", "gemma3:1b", ["too short"]) == "gemma3:1b"
+        assert tiers.escalate("diagram", "gemma3:1b", ["invalid mermaid"]) == "gemma3:4b"
+
+    def test_stats(self):
+        """Test requests are counted per model and operation."""
+        tiers = ModelTiers.from_config(TIERS_CONFIG, "gemma3:12b")
+        tiers.record("diagram", "gemma3:1b")
+        tiers.record("diagram", "gemma3:1b")
+        tiers.record("lab", "gemma3:12b")
+        stats = tiers.get_stats()
+        assert stats["models"]["gemma3:1b"] == {"tier": "small", "requests": 2, "operations": {"diagram": 2}}
+        assert stats["models"]["gemma3:12b"]["tier"] is None
+
+
+class TestClientRouting:
+    """Test OllamaClient sends each operation to its tier model."""
+
+    def test_requests_use_tier_models(self, fake_ollama):
+        """Test the request body names the operation's model."""
+        client = OllamaClient(make_config(fake_ollama, TIERS_CONFIG), max_retries=0)
+        client.generate("Draw", operation="diagram", use_cache=False)
+        client.generate("Teach", operation="lecture", use_cache=False)
+        client.generate("Explore", operation="lab", use_cache=False)
+        assert sent_models(fake_ollama) == ["gemma3:1b", "gemma3:4b", "gemma3:4b"]
+        client.close()
+
+    def test_explicit_model_overrides_tier(self, fake_ollama):
+        """Test generate(model=...) wins over the tier, as escalated retries need."""
+        client = OllamaClient(make_config(fake_ollama, TIERS_CONFIG), max_retries=0)
+        model = client.escalate_model("diagram", client.model_for("diagram"), ["too short"])
+        client.generate("Draw", operation="diagram", use_cache=False, model=model)
+        assert sent_models(fake_ollama) == ["gemma3:4b"]
+        assert client.tiers.get_stats()["models"]["gemma3:4b"]["operations"] == {"diagram": 1}
+        client.close()
+
+    def test_cache_hits_not_counted(self, fake_ollama, tmp_path):
+        """Test only requests sent to Ollama count toward the model's requests."""
+        config = make_config(fake_ollama, TIERS_CONFIG)
+        config["response_cache"] = {"enabled": True, "directory": str(tmp_path / "cache")}
+        client = OllamaClient(config, max_retries=0)
+        client.generate("Draw", operation="diagram")
+        client.generate("Draw", operation="diagram")
+        assert len(sent_models(fake_ollama)) == 1
+        assert client.tiers.get_stats()["models"]["gemma3:1b"]["operations"] == {"diagram": 1}
+        client.close()
+
+    def test_disabled_uses_llm_model(self, fake_ollama):
+        """Test without model_tiers every request uses llm.model."""
+        client = OllamaClient(make_config(fake_ollama), max_retries=0)
+        client.generate("Draw", operation="diagram", use_cache=False)
+        assert sent_models(fake_ollama) == ["gemma3:4b"]
+        client.close()
+
+
+def test_stage_summary_reports_tiers(caplog):
+    """Test the stage summary lists requests per model and escalations."""
+    tiers = ModelTiers.from_config(TIERS_CONFIG, "gemma3:4b")
+    tiers.record("diagram", "gemma3:1b")
+    tiers.escalate("diagram", "gemma3:1b", ["too short"])
+    test_logger = logging.getLogger("test_tiers_summary")
+    with caplog.at_level(logging.INFO, logger="test_tiers_summary"):
+        generate_stage_summary(ErrorCollector(), "Test Stage", test_logger, model_tiers=tiers.get_stats())
+    assert "Model Tiers:" in caplog.text
+    assert "gemma3:1b (small): 1 requests (diagram 1)" in caplog.text
+    assert "Escalations: 1 (diagram 1)" in caplog.text
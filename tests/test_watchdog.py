@@ -0,0 +1,171 @@
+"""Tests for the shared request watchdog.
+
+Covers one watchdog thread serving many requests (heartbeats, stall
+detection, expiry, health checks) and RequestHandler watching its
+requests through it.
+"""
+
+import logging
+import threading
+import time
+
+from src.llm.client import OllamaClient
+from src.llm.health import OllamaHealthMonitor
+from src.llm.request_handler import RequestHandler
+from src.llm.watchdog import RequestWatchdog, get_watchdog
+
+
+def _watchdog_threads():
+    """Return live watchdog scheduler threads."""
+    return [t for t in threading.enumerate() if t.name == "ollama-request-watchdog"]
+
+
+class TestRequestWatchdog:
+    """Test RequestWatchdog scheduling."""
+
+    def test_single_thread_for_many_requests(self):
+        """Test concurrent watches share one scheduler thread."""
+        watchdog = RequestWatchdog()
+        for i in range(50):
+            watchdog.watch(f"req-{i}", "gemma3:4b", timeout=30, heartbeat_interval=0.05)
+        assert watchdog.active_count() == 50
+        assert len(_watchdog_threads()) <= 2  # this watchdog + possibly the global one
+        for i in range(50):
+            watchdog.unwatch(f"req-{i}")
+        assert watchdog.active_count() == 0
+
+    def test_heartbeat_logged(self, caplog, wait_until):
+        """Test heartbeats are logged for a watched request."""
+        watchdog = RequestWatchdog()
+        with caplog.at_level(logging.DEBUG, logger="src.llm.watchdog"):
+            watchdog.watch("hb-1", "gemma3:4b", timeout=30, heartbeat_interval=0.05)
+            wait_until(lambda: any("[hb-1] 🔄 Progress" in r.getMessage() for r in caplog.records))
+            watchdog.unwatch("hb-1")
+
+    def test_unwatched_request_stops_heartbeats(self, caplog):
+        """Test a finished request no longer produces heartbeats."""
+        watchdog = RequestWatchdog()
+        watchdog.watch("done-1", "gemma3:4b", timeout=30, heartbeat_interval=0.05)
+        watchdog.unwatch("done-1")
+        with caplog.at_level(logging.DEBUG, logger="src.llm.watchdog"):
+            time.sleep(0.15)
+        assert not any("[done-1]" in r.getMessage() for r in caplog.records)
+        assert watchdog.get_stats()["pending_deadlines"] == 0
+
+    def test_stall_detection_and_resume(self, caplog, wait_until):
+        """Test a stream without progress is reported stalled, then resumed."""
+        watchdog = RequestWatchdog()
+        with caplog.at_level(logging.INFO, logger="src.llm.watchdog"):
+            watched = watchdog.watch("stall-1", "gemma3:4b", timeout=30, stall_interval=0.1)
+            wait_until(lambda: watched.stalled)
+            assert watched.stall_count == 1
+            watchdog.touch("stall-1")
+            assert watched.stalled is False
+            watchdog.unwatch("stall-1")
+        assert any("Stream stalled" in r.getMessage() for r in caplog.records)
+
+    def test_progress_prevents_stall(self):
+        """Test regular progress keeps the stream from being reported stalled."""
+        watchdog = RequestWatchdog()
+        watched = watchdog.watch("busy-1", "gemma3:4b", timeout=30, stall_interval=0.15)
+        for _ in range(6):
+            time.sleep(0.05)
+            watchdog.touch("busy-1")
+        assert watched.stall_count == 0
+        watchdog.unwatch("busy-1")
+
+    def test_watch_expires_after_timeout(self, wait_until):
+        """Test watches are dropped slightly after the request timeout."""
+        watchdog = RequestWatchdog()
+        watchdog.watch("exp-1", "gemma3:4b", timeout=0.1)
+        assert watchdog.get("exp-1") is not None
+        wait_until(lambda: watchdog.get("exp-1") is None, timeout=1)
+
+    def test_health_checks_run(self, local_ollama, wait_until):
+        """Test health checks run against the health monitor."""
+        watchdog = RequestWatchdog()
+        monitor = OllamaHealthMonitor(local_ollama.base_url)
+        local_ollama.ps_models = []
+        watched = watchdog.watch(
+            "hc-1", "gemma3:4b", timeout=0.2, health_check_interval=0.05, health_monitor=monitor
+        )
+        wait_until(lambda: any(issue["issue"] == "model_not_loaded" for issue in watched.health_issues), timeout=1)
+        watchdog.unwatch("hc-1")
+        assert watchdog.get_stats()["tasks_run"] > 0
+
+    def test_thread_exits_when_idle(self, wait_until):
+        """Test the scheduler thread exits after the idle timeout."""
+        watchdog = RequestWatchdog(idle_timeout=0.05)
+        watchdog.watch("idle-1", "gemma3:4b", timeout=30)
+        watchdog.unwatch("idle-1")
+        wait_until(lambda: watchdog.get_stats()["thread_running"] is False, timeout=1)
+        watchdog.watch("idle-2", "gemma3:4b", timeout=30)
+        assert watchdog.get_stats()["thread_running"] is True
+        watchdog.unwatch("idle-2")
+
+
+class TestRequestHandlerUsesWatchdog:
+    """Test RequestHandler and OllamaClient register with the watchdog."""
+
+    def test_handler_starts_no_threads_per_request(self, local_ollama):
+        """Test concurrent monitored requests do not add threads per request."""
+        watchdog = RequestWatchdog()
+        handler = RequestHandler(local_ollama.base_url, watchdog=watchdog)
+        baseline = threading.active_count()
+        results = []
+
+        def worker(i):
+            response = handler.execute_with_monitoring(
+                request_func=lambda: handler.health_monitor.connection_pool.get(
+                    f"{local_ollama.base_url}/api/version", timeout=5
+                ),
+                timeout=30,
+                request_id=f"h-{i}",
+                model="gemma3:4b"
+            )
+            results.append(response.status_code)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [200] * 8
+        assert watchdog.active_count() == 0
+        # Only the scheduler thread (and the local server's keep-alive handlers) remain
+        assert threading.active_count() <= baseline + 1 + 8
+
+    def test_keep_watching_until_finished(self, local_ollama):
+        """Test keep_watching leaves the request watched until finish_request()."""
+        watchdog = RequestWatchdog()
+        handler = RequestHandler(local_ollama.base_url, watchdog=watchdog)
+        handler.execute_with_monitoring(
+            request_func=lambda: handler.health_monitor.connection_pool.get(
+                f"{local_ollama.base_url}/api/version", timeout=5
+            ),
+            timeout=30,
+            request_id="kw-1",
+            model="gemma3:4b",
+            keep_watching=True
+        )
+        assert watchdog.get("kw-1") is not None
+        handler.finish_request("kw-1")
+        assert watchdog.get("kw-1") is None
+
+    def test_cancel_request_unwatches(self):
+        """Test cancel_request stops watchdog monitoring."""
+        watchdog = RequestWatchdog()
+        handler = RequestHandler(watchdog=watchdog)
+        watchdog.watch("c-1", "gemma3:4b", timeout=30)
+        handler.cancel_request("c-1")
+        assert watchdog.get("c-1") is None
+
+    def test_client_generate_leaves_no_watches(self, local_ollama):
+        """Test generate() removes its watch once the stream is consumed."""
+        client = OllamaClient({"model": "gemma3:4b", "api_url": local_ollama.generate_url, "timeout": 10})
+        assert client.request_handler.watchdog is get_watchdog()
+        assert client.generate("Say hello", operation="lecture") == "Hello from local server"
+        assert not any(
+            request_id.startswith("lec:") for request_id in list(get_watchdog()._watches)
+        )
@@ -0,0 +1,227 @@
+"""Tests for the lease-based work queue.
+
+Covers leases, heartbeats, expiry and requeue across threads and processes;
+the stage 2 test runs two queue workers against a local FakeOllamaServer.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.config.loader import ConfigLoader
+from src.generate.orchestration.pipeline import ContentGenerator
+from src.generate.orchestration.work_queue import (
+    DONE,
+    FAILED,
+    LEASED,
+    PENDING,
+    LeaseHeartbeat,
+    WorkQueue,
+    run_worker,
+)
+from src.generate.stages.outline_schema import build_outline_schema
+from src.llm.fake_server import FakeOllamaServer, canned_outline
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def session_tasks(count):
+    """(key, payload) pairs for count sessions."""
+    return [(f"session_{i:02d}", {"session": i}) for i in range(count)]
+
+
+class TestWorkQueue:
+    """Test enqueueing, leasing and finishing tasks."""
+
+    def test_enqueue_is_idempotent(self, tmp_path):
+        """Test every worker can enqueue the same tasks without duplicates."""
+        queue = WorkQueue(tmp_path / "queue.sqlite")
+        assert queue.enqueue("q", session_tasks(3)) == 3
+        assert queue.enqueue("q", session_tasks(4)) == 1
+        assert queue.enqueue("other", session_tasks(1)) == 1
+        assert queue.counts("q") == {PENDING: 4, LEASED: 0, DONE: 0, FAILED: 0}
+
+    def test_lease_and_complete(self, tmp_path):
+        """Test tasks are leased oldest first, once each."""
+        queue = WorkQueue(tmp_path / "queue.sqlite")
+        queue.enqueue("q", session_tasks(2))
+        first = queue.lease("q", "w1")
+        second = queue.lease("q", "w2")
+        assert (first.key, first.payload, first.attempts) == ("session_00", {"session": 0}, 1)
+        assert second.key == "session_01"
+        assert queue.lease("q", "w3") is None
+        assert not queue.complete(first, "w2")  # not w2's lease
+        assert queue.complete(first, "w1")
+        assert queue.counts("q")[DONE] == 1 and queue.counts("q")[LEASED] == 1
+
+    def test_fail_requeues_until_max_attempts(self, tmp_path):
+        """Test a failing task is retried, then marked failed with its error."""
+        queue = WorkQueue(tmp_path / "queue.sqlite", max_attempts=2)
+        queue.enqueue("q", session_tasks(1))
+        assert queue.fail(queue.lease("q", "w1"), "w1", "timeout") == PENDING
+        task = queue.lease("q", "w2")
+        assert task.attempts == 2
+        assert queue.fail(task, "w2", "timeout again") == FAILED
+        assert queue.lease("q", "w1") is None
+        assert queue.failures("q") == [("session_00", "timeout again")]
+
+    def test_expired_lease_is_requeued(self, tmp_path):
+        """Test a task whose worker stopped heartbeating goes to another worker."""
+        queue = WorkQueue(tmp_path / "queue.sqlite", lease_seconds=0.05)
+        queue.enqueue("q", session_tasks(1))
+        stale = queue.lease("q", "dead")
+        time.sleep(0.1)
+        task = queue.lease("q", "alive")
+        assert task.key == stale.key and task.attempts == 2
+        # The old holder can neither renew nor finish it
+        assert not queue.heartbeat(stale, "dead")
+        assert not queue.complete(stale, "dead")
+        assert queue.complete(task, "alive")
+
+    def test_heartbeat_keeps_lease(self, tmp_path):
+        """Test a heartbeating worker keeps its task past the lease length."""
+        queue = WorkQueue(tmp_path / "queue.sqlite", lease_seconds=0.15)
+        queue.enqueue("q", session_tasks(1))
+        task = queue.lease("q", "w1")
+        with LeaseHeartbeat(queue, task, "w1", interval=0.03) as heartbeat:
+            time.sleep(0.3)
+            assert queue.lease("q", "w2") is None
+        assert not heartbeat.lost
+        assert queue.complete(task, "w1")
+
+
+class TestRunWorker:
+    """Test workers draining a shared queue."""
+
+    def test_concurrent_workers_run_each_task_once(self, tmp_path):
+        """Test several workers split the tasks without running any twice."""
+        queue = WorkQueue(tmp_path / "queue.sqlite")
+        queue.enqueue("q", session_tasks(20))
+        ran = []
+        lock = threading.Lock()
+
+        def handler(task):
+            time.sleep(0.01)
+            with lock:
+                ran.append(task.key)
+            return True
+
+        stats = []
+        threads = [
+            threading.Thread(target=lambda w=w: stats.append(run_worker(queue, "q", handler, worker=f"w{w}", poll_interval=0.01)))
+            for w in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(ran) == [key for key, _ in session_tasks(20)]
+        assert sum(s["done"] for s in stats) == 20
+        assert queue.counts("q")[DONE] == 20
+
+    def test_failures_retried_then_given_up(self, tmp_path):
+        """Test a failing handler's task is retried and a raising one ends up failed."""
+        queue = WorkQueue(tmp_path / "queue.sqlite", max_attempts=2)
+        queue.enqueue("q", session_tasks(2))
+        attempts = {}
+
+        def handler(task):
+            attempts[task.key] = attempts.get(task.key, 0) + 1
+            if task.key == "session_01":
+                raise RuntimeError("model unavailable")
+            return attempts[task.key] > 1
+
+        stats = run_worker(queue, "q", handler, worker="w1", poll_interval=0.01)
+        assert attempts == {"session_00": 2, "session_01": 2}
+        assert stats == {"done": 1, "failed": 3, "lost": 0}
+        assert queue.failures("q") == [("session_01", "RuntimeError: model unavailable")]
+
+    def test_takes_over_task_of_killed_process(self, tmp_path):
+        """Test a task leased by a process that died is finished by another worker."""
+        queue_path = tmp_path / "queue.sqlite"
+        queue = WorkQueue(queue_path, lease_seconds=0.2)
+        queue.enqueue("q", session_tasks(2))
+        script = (
+            "import os\n"
+            "from src.generate.orchestration.work_queue import WorkQueue\n"
+            f"queue = WorkQueue({str(queue_path)!r}, lease_seconds=0.2)\n"
+            "queue.lease('q', 'doomed')\n"
+            "os._exit(1)  # killed mid-task\n"
+        )
+        env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+        subprocess.run([sys.executable, "-c", script], env=env, check=False)
+        assert queue.counts("q")[LEASED] == 1
+
+        ran = []
+        stats = run_worker(queue, "q", lambda task: ran.append(task.key) or True, worker="w1", poll_interval=0.02)
+        assert sorted(ran) == ["session_00", "session_01"]
+        assert stats["done"] == 2
+        assert queue.counts("q")[DONE] == 2
+
+
+@pytest.mark.slow
+def test_stage2_workers_share_sessions(tmp_path, monkeypatch):
+    """Test two queue workers generate every session exactly once between them."""
+    shutil.copytree(PROJECT_ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    with FakeOllamaServer() as server:
+        config_file = tmp_path / "config" / "llm_config.yaml"
+        config_file.write_text(
+            config_file.read_text()
+            .replace("http://localhost:11434/api/generate", server.generate_url)
+            .replace("  response_cache:\n    enabled: true", "  response_cache:\n    enabled: false")
+        )
+        loader = ConfigLoader(tmp_path / "config")
+        outline = json.loads(canned_outline({
+            "prompt": "EXACTLY 2 modules and EXACTLY 4 total sessions",
+            "format": build_outline_schema(2, loader.get_outline_bounds()),
+        }))
+        outline_path = tmp_path / "outline.json"
+        outline_path.write_text(json.dumps({"course_metadata": {"name": "Queue Course"}, "modules": outline["modules"]}))
+
+        queue = WorkQueue(tmp_path / "queue.sqlite")
+        queue.enqueue("04", [
+            (f"m{module['module_id']}s{session['session_number']}",
+             {"module_id": module["module_id"], "session_number": session["session_number"]})
+            for module in outline["modules"]
+            for session in module["sessions"]
+        ])
+        results = []
+        lock = threading.Lock()
+
+        def work(worker):
+            generator = ContentGenerator(loader, outline_path=outline_path)
+            plan = generator.plan_sessions()
+            jobs = {
+                (job["module"]["module_id"], job["session"]["session_number"]): job
+                for job in plan["sessions"]
+            }
+
+            def handler(task):
+                job = jobs[(task.payload["module_id"], task.payload["session_number"])]
+                result = generator.generate_session(plan, job, max_workers=2)
+                with lock:
+                    results.append(result)
+                return result["status"] == "success"
+
+            run_worker(queue, "04", handler, worker=worker, poll_interval=0.05)
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(results) == 4 and all(r["status"] == "success" for r in results)
+    assert sorted((r["module_id"], r["session_number"]) for r in results) == sorted(
+        (m["module_id"], s["session_number"]) for m in outline["modules"] for s in m["sessions"]
+    )
+    assert server.operations.count("lecture") == 4
+    assert queue.counts("04")[DONE] == 4